@@ -1,7 +1,55 @@
-# todo, clean up * imports
-from .run import generateinputs, Global, run_scenario
-from .moopack import moo
-from .tco import opportunity_cost, tco_analysis, tco_stock_emissions, tcocalc
-from .objectives import accel, fueleconomy, gradeability
+"""T3CO package. Submodules and API functions are imported on first attribute access, e.g. t3co.run_scenario or \
+    t3co.evaluate_batch, so importing t3co and starting pool workers does not load FASTSim, pymoo, or plotting \
+    libraries until they are used."""
 
-from . import tests
+import importlib
+
+# package attributes and their submodules
+SUBMODULES = {
+    "generateinputs": "t3co.run.generateinputs",
+    "Global": "t3co.run.Global",
+    "run_scenario": "t3co.run.run_scenario",
+    "moo": "t3co.moopack.moo",
+    "opportunity_cost": "t3co.tco.opportunity_cost",
+    "tco_analysis": "t3co.tco.tco_analysis",
+    "tco_stock_emissions": "t3co.tco.tco_stock_emissions",
+    "tcocalc": "t3co.tco.tcocalc",
+    "accel": "t3co.objectives.accel",
+    "fueleconomy": "t3co.objectives.fueleconomy",
+    "gradeability": "t3co.objectives.gradeability",
+    "tests": "t3co.tests",
+}
+
+# package API functions and their submodules
+FUNCTIONS = {
+    "evaluate_batch": "t3co.run.batch",
+}
+
+__all__ = list(SUBMODULES) + list(FUNCTIONS)
+
+
+def __getattr__(name: str):
+    """
+    This function imports a submodule or API function on first access of its package attribute
+
+    Args:
+        name (str): package attribute name
+
+    Raises:
+        AttributeError: name is not a package attribute
+
+    Returns:
+        attr (module | function): imported submodule or API function
+    """
+    if name in SUBMODULES:
+        attr = importlib.import_module(SUBMODULES[name])
+    elif name in FUNCTIONS:
+        attr = getattr(importlib.import_module(FUNCTIONS[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = attr
+    return attr
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -12,6 +12,7 @@ import importlib
 
 from t3co import Global as gl
 from t3co import moo
+from t3co.run import analysis_context
 importlib.reload(moo)
 
 
@@ -23,7 +24,7 @@ RANGE, ACCEL, GRADE, TCO = moo.RANGE, moo.ACCEL, moo.GRADE, moo.TCO
 # eventually needs parameterization
 vnum = 1  #
 vocation = "Conv 2020 tech,  750 mi range"
-gl.vocation_scenario = vocation
+context = analysis_context.create_analysis_context(vocation)
 gl.FASTSIM_INPUTS = gl.T2COBENCHMARKDATADIR / 't3cobenchmarkFASTSimInputs.csv'
 gl.OTHER_INPUTS = gl.T2COBENCHMARKDATADIR / 't3cobenchmarkOtherInputs.csv'
 
@@ -52,7 +53,7 @@ for knob, bounds in knobs_bounds_all.items():
     problem = moo.run_optimization(
         pop_size, n_max_gen, tol, {knob: bounds}, vnum, 
         obj_list=[TCO], use_jit=True, optimize_pt=gl.HEV, 
-        skip_optimization=True
+        skip_optimization=True, context=context
     )
     xs = np.linspace(bounds[0], bounds[1], 15)
 
@@ -5,6 +5,7 @@ from fastsim import vehicle
 
 from t3co import Global as gl
 from t3co import moo
+from t3co.run import analysis_context
 from t3co.run_scenario import rerun, limit_cargo_kg_for_moo_hev_bev, set_max_battery_kwh, set_max_motor_kw
 
 RANGE, ACCEL, GRADE, TCO = moo.RANGE, moo.ACCEL, moo.GRADE, moo.TCO
@@ -15,7 +16,7 @@ if __name__ == '__main__':
     # eventually needs parameterization
     vnum = 1  #
     vocation = "Conv 2020 tech,  750 mi range"
-    gl.vocation_scenario = vocation
+    context = analysis_context.create_analysis_context(vocation)
     gl.FASTSIM_INPUTS = gl.T2COBENCHMARKDATADIR / 't3cobenchmarkFASTSimInputs.csv'
     gl.OTHER_INPUTS = gl.T2COBENCHMARKDATADIR / 't3cobenchmarkOtherInputs.csv'
 
@@ -38,7 +39,7 @@ if __name__ == '__main__':
     res, problem, solutions, solution = moo.run_optimization(
         pop_size, n_max_gen, knobs_bounds, vnum,
         optimize_pt=gl.BEV, skip_optimization=False, obj_list=[RANGE, ACCEL, GRADE, TCO],
-        use_jit=True
+        use_jit=True, context=context
     )
     if type(solution) is str and solution == 'solution not found':
         print("ALERT", solution)
@@ -0,0 +1,459 @@
+"""Module for dense grid or Latin hypercube sweeps of the optimization knobs of a selection, for building response surfaces"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import importlib.util
+import json
+import logging
+import os
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from t3co import sweep
+from t3co.moopack import moo
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+
+logger = logging.getLogger(__name__)
+
+SAMPLINGS = ["grid", "lhs"]
+FILE_FORMATS = ["csv", "parquet"]
+# parquet part files are smaller and faster to read back than csv, they require the 'parquet' extra of t3co (pyarrow)
+DEFAULT_FILE_FORMAT = "parquet"
+# sweep definition saved next to the part files, checked on resume
+SPEC_FILE = "knob_sweep_spec.json"
+# scalar get_design_results outputs written for each point
+RESULT_KEYS = [
+    "grade_6",
+    "grade_1p25",
+    "accel_60_loaded",
+    "accel_30_loaded",
+    "range",
+    "ess_max_kw",
+    "pct_fc_kwh",
+]
+
+# T3COBatchProblem of this process, built by init_sweep_problem
+SWEEP_PROBLEM = None
+
+
+def get_sweep_points(
+    knobs_bounds: dict, n_points: int | dict, sampling: str = "grid", seed: int = 1
+) -> np.ndarray:
+    """
+    This function samples the knobs. 'grid' is the full factorial of n_points evenly spaced values from the lower \
+        to the upper bound of each knob, n_points being the same for every knob or a dict of knob: n_points. \
+        'lhs' is n_points Latin hypercube samples.
+
+    Args:
+        knobs_bounds (dict): dict of knob: (lower bound, upper bound)
+        n_points (int | dict): points per knob for 'grid', total points for 'lhs'
+        sampling (str, optional): 'grid' or 'lhs'. Defaults to "grid".
+        seed (int, optional): random seed of 'lhs'. Defaults to 1.
+
+    Returns:
+        X (np.ndarray): (n, k) array of knob values, one column per knob in the order of knobs_bounds
+    """
+    assert sampling in SAMPLINGS, f"sampling {sampling} not in {SAMPLINGS}"
+    bounds = np.array(list(knobs_bounds.values()), dtype=float).reshape(-1, 2)
+    if sampling == "grid":
+        if not isinstance(n_points, dict):
+            n_points = {knob: n_points for knob in knobs_bounds}
+        axes = [
+            np.linspace(lbound, ubound, n_points[knob])
+            for knob, (lbound, ubound) in zip(knobs_bounds, bounds)
+        ]
+        return np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(
+            -1, len(axes)
+        )
+
+    rng = np.random.default_rng(seed)
+    # one sample in each of the n_points strata of each knob, strata shuffled independently per knob
+    strata = rng.permuted(np.tile(np.arange(n_points), (len(bounds), 1)), axis=1).T
+    u = (strata + rng.uniform(size=strata.shape)) / n_points
+    return bounds[:, 0] + u * (bounds[:, 1] - bounds[:, 0])
+
+
+def get_sweep_problem_kwargs(
+    sel: int, config: run_scenario.Config, knobs: list, bounds: dict = None
+) -> dict:
+    """
+    This function gets the T3COBatchProblem inputs of a sweep from the scenario file, like sweep.run_moo. Only the \
+        swept knobs are applied, the other knobs keep their baseline vehicle and scenario values.
+
+    Args:
+        sel (int): selection number
+        config (run_scenario.Config): Config object
+        knobs (list): swept knobs, in KNOBS
+        bounds (dict, optional): dict of knob: (lower bound, upper bound) overriding the scenario file bounds. Defaults to None.
+
+    Returns:
+        problem_kwargs (dict): T3COBatchProblem keyword arguments
+    """
+    vdf = pd.read_csv(config.vehicle_file, index_col="selection", skip_blank_lines=True)
+    sdf = pd.read_csv(
+        config.scenario_file, index_col="selection", skip_blank_lines=True
+    )
+    optpt = vdf.loc[int(str(sel).split("_")[0]), "veh_pt_type"]
+    objectives, constraints = sweep.get_objectives_constraints(
+        sel, sdf, verbose=False
+    )
+    scenario_bounds, curve_settings = sweep.get_knobs_bounds_curves(
+        sel,
+        optpt,
+        sdf,
+        pd.read_csv(config.lw_imp_curves),
+        pd.read_csv(config.aero_drag_imp_curves),
+        pd.read_csv(config.eng_eff_imp_curves),
+    )
+    scenario_bounds.update(bounds or {})
+    for knob in knobs:
+        assert knob in moo.KNOBS, f"knob {knob} not in defined parameters: {moo.KNOBS}"
+        assert (
+            knob in scenario_bounds
+        ), f"no bounds for knob {knob} in the scenario file of selection {sel}, provide them in bounds"
+
+    return {
+        "knobs_bounds": {
+            knob: tuple(float(b) for b in scenario_bounds[knob]) for knob in knobs
+        },
+        "vnum": sel,
+        "optimize_pt": optpt,
+        "obj_list": objectives,
+        "constr_list": constraints,
+        "config": config,
+        **curve_settings,
+    }
+
+
+def init_sweep_problem(problem_kwargs: dict) -> None:
+    """
+    This function builds the T3COBatchProblem that evaluates sweep chunks in this process
+
+    Args:
+        problem_kwargs (dict): T3COBatchProblem keyword arguments, see get_sweep_problem_kwargs
+    """
+    global SWEEP_PROBLEM
+    # T3COProblem appends the overshoot tolerance constraint to constr_list
+    SWEEP_PROBLEM = moo.T3COBatchProblem(
+        **dict(problem_kwargs, constr_list=list(problem_kwargs["constr_list"]))
+    )
+
+
+def evaluate_sweep_chunk(chunk: tuple) -> pd.DataFrame:
+    """
+    This function evaluates a chunk of sweep points with the T3COBatchProblem of this process, through the same \
+        objective and constraint code as the optimization. A point is feasible for a constraint if its G value is <= 0.
+
+    Args:
+        chunk (tuple): (point_ids, X), point numbers and (n, k) array of knob values
+
+    Returns:
+        chunk_df (pd.DataFrame): Dataframe with one row of knob values, objectives, constraints, feasibility, \
+            and results per point
+    """
+    point_ids, X = chunk
+    problem = SWEEP_PROBLEM
+    obj_arr_F, constr_arr, _, batch_results = problem.evaluate_batch(X)
+    # the records are not reported, keep them from growing over a dense sweep
+    problem.setup_opt_records()
+
+    chunk_df = pd.DataFrame(X, columns=problem.knobs)
+    chunk_df.insert(0, "point", point_ids)
+    for j, obj in enumerate(problem.obj_list):
+        chunk_df[obj] = obj_arr_F[:, j]
+    for j, constraint in enumerate(problem.get_constraint_names()):
+        chunk_df[f"G_{constraint}"] = constr_arr[:, j]
+        chunk_df[f"feasible_{constraint}"] = constr_arr[:, j] <= 0
+    chunk_df["feasible"] = (constr_arr <= 0).all(axis=1)
+
+    for key in RESULT_KEYS:
+        chunk_df[key] = [design_results[key] for design_results in batch_results]
+    chunk_df["mpgge"] = [
+        mpgge if np.isscalar(mpgge) else None
+        for mpgge in (r["rs_sweep"]["mpgge"]["mpgge"] for r in batch_results)
+    ]
+    chunk_df["msrp"] = [r["rs_sweep"]["veh_msrp_set"]["msrp"] for r in batch_results]
+    chunk_df["disc_cost"] = [r["rs_sweep"]["disc_cost"] for r in batch_results]
+    return chunk_df
+
+
+def check_file_format(file_format: str) -> None:
+    """
+    This function checks that the part files of a sweep can be written in file_format
+
+    Args:
+        file_format (str): 'csv' or 'parquet'
+
+    Raises:
+        ImportError: if file_format is 'parquet' and pyarrow is not installed
+    """
+    if file_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise ImportError(
+            "knob_sweep parquet part files require pyarrow, install it with "
+            "`pip install t3co[parquet]` or use file_format 'csv'"
+        )
+
+
+def get_part_files(out_dir: Path, file_format: str) -> list:
+    """
+    This function lists the part files of a sweep
+
+    Args:
+        out_dir (Path): sweep results directory
+        file_format (str): 'csv' or 'parquet'
+
+    Returns:
+        part_files (list): sorted list of part file paths
+    """
+    return sorted(out_dir.glob(f"part_*.{file_format}"))
+
+
+def write_sweep_part(chunk_df: pd.DataFrame, out_dir: Path, file_format: str) -> None:
+    """
+    This function writes the results of a chunk to its own part file. The file is written under a temporary name \
+        and renamed, so an interrupted sweep never leaves a partial part file.
+
+    Args:
+        chunk_df (pd.DataFrame): chunk results from evaluate_sweep_chunk
+        out_dir (Path): sweep results directory
+        file_format (str): 'csv' or 'parquet'
+    """
+    part_file = out_dir / f"part_{chunk_df['point'].iloc[0]:08d}.{file_format}"
+    tmp_file = part_file.with_name(part_file.name + ".tmp")
+    if file_format == "parquet":
+        chunk_df.to_parquet(tmp_file, index=False)
+    else:
+        chunk_df.to_csv(tmp_file, index=False)
+    os.replace(tmp_file, part_file)
+
+
+def read_sweep_results(
+    out_dir: str | Path, file_format: str = DEFAULT_FILE_FORMAT
+) -> pd.DataFrame:
+    """
+    This function reads the part files of a sweep into one dataframe
+
+    Args:
+        out_dir (str | Path): sweep results directory
+        file_format (str, optional): 'csv' or 'parquet'. Defaults to DEFAULT_FILE_FORMAT.
+
+    Returns:
+        sweep_df (pd.DataFrame): Dataframe with one row per evaluated point, sorted by point
+    """
+    read = pd.read_parquet if file_format == "parquet" else pd.read_csv
+    parts = [read(part_file) for part_file in get_part_files(Path(out_dir), file_format)]
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts).sort_values("point").reset_index(drop=True)
+
+
+def run_knob_sweep(
+    sel: int,
+    config: run_scenario.Config,
+    knobs: list,
+    bounds: dict = None,
+    n_points: int | dict = 5,
+    sampling: str = "grid",
+    seed: int = 1,
+    chunk_size: int = 16,
+    n_processors: int = 1,
+    out_dir: str | Path = None,
+    file_format: str = DEFAULT_FILE_FORMAT,
+    resume: bool = True,
+) -> pd.DataFrame:
+    """
+    This function sweeps the knobs of a selection over grid or Latin hypercube points. Points are evaluated in chunks \
+        by T3COBatchProblem, in n_processors processes, and each finished chunk is \
+        written to a part file in out_dir. With resume, points already in out_dir are not evaluated again.
+
+    Args:
+        sel (int): selection number
+        config (run_scenario.Config): Config object
+        knobs (list): swept knobs, in KNOBS
+        bounds (dict, optional): dict of knob: (lower bound, upper bound) overriding the scenario file bounds. Defaults to None.
+        n_points (int | dict, optional): points per knob for 'grid', total points for 'lhs'. Defaults to 5.
+        sampling (str, optional): 'grid' or 'lhs'. Defaults to "grid".
+        seed (int, optional): random seed of 'lhs'. Defaults to 1.
+        chunk_size (int, optional): points per chunk and part file. Defaults to 16.
+        n_processors (int, optional): number of processes. Defaults to 1.
+        out_dir (str | Path, optional): if provided, results are streamed to part files in this directory. Defaults to None.
+        file_format (str, optional): 'csv' or 'parquet' part files, see check_file_format. Defaults to DEFAULT_FILE_FORMAT.
+        resume (bool, optional): if True, continues the sweep in out_dir, else its part files are removed. Defaults to True.
+
+    Returns:
+        sweep_df (pd.DataFrame): Dataframe with one row per point, sorted by point
+    """
+    assert file_format in FILE_FORMATS, f"file_format {file_format} not in {FILE_FORMATS}"
+    if out_dir is not None:
+        check_file_format(file_format)
+    problem_kwargs = get_sweep_problem_kwargs(sel, config, knobs, bounds)
+    X = get_sweep_points(problem_kwargs["knobs_bounds"], n_points, sampling, seed)
+
+    done = set()
+    if out_dir is not None:
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        spec = json.loads(
+            json.dumps(
+                {
+                    "selection": sel,
+                    "knobs_bounds": problem_kwargs["knobs_bounds"],
+                    "n_points": n_points,
+                    "sampling": sampling,
+                    "seed": seed,
+                    "obj_list": problem_kwargs["obj_list"],
+                    "constr_list": problem_kwargs["constr_list"],
+                }
+            )
+        )
+        spec_file = out_dir / SPEC_FILE
+        if resume and spec_file.exists():
+            with open(spec_file) as f:
+                if json.load(f) != spec:
+                    raise Exception(
+                        f"{out_dir} holds results of a different sweep, see {spec_file}"
+                    )
+            done = set(read_sweep_results(out_dir, file_format).get("point", []))
+        else:
+            for part_file in get_part_files(out_dir, file_format):
+                part_file.unlink()
+        with open(spec_file, "w") as f:
+            json.dump(spec, f, indent=4)
+
+    remaining = np.array([i for i in range(len(X)) if i not in done], dtype=int)
+    chunks = [
+        (remaining[i : i + chunk_size], X[remaining[i : i + chunk_size]])
+        for i in range(0, len(remaining), chunk_size)
+    ]
+    logger.info(
+        "knob_sweep: selection %s, knobs %s, %s points, %s already done",
+        sel,
+        knobs,
+        len(X),
+        len(done),
+    )
+
+    t0 = time.time()
+    chunk_dfs = []
+    n_done = len(done)
+
+    def on_chunk_done(chunk_df):
+        nonlocal n_done
+        n_done += len(chunk_df)
+        if out_dir is not None:
+            write_sweep_part(chunk_df, out_dir, file_format)
+        else:
+            chunk_dfs.append(chunk_df)
+        logger.info(
+            "knob_sweep: %s/%s points, %.1f s elapsed", n_done, len(X), time.time() - t0
+        )
+
+    if n_processors > 1 and len(chunks) > 1:
+        with Pool(
+            processes=n_processors,
+            initializer=init_sweep_problem,
+            initargs=(problem_kwargs,),
+        ) as pool:
+            for chunk_df in pool.imap_unordered(evaluate_sweep_chunk, chunks):
+                on_chunk_done(chunk_df)
+    elif chunks:
+        init_sweep_problem(problem_kwargs)
+        for chunk in chunks:
+            on_chunk_done(evaluate_sweep_chunk(chunk))
+
+    if out_dir is not None:
+        return read_sweep_results(out_dir, file_format)
+    if not chunk_dfs:
+        return pd.DataFrame()
+    return pd.concat(chunk_dfs).sort_values("point").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        prog="KNOB_SWEEP",
+        description="""Sweeps the optimization knobs of a selection over grid or Latin hypercube points""",
+    )
+    parser.add_argument(
+        "--config",
+        default=gl.SWEEP_PATH.parents[0] / "resources/T3COConfig.csv",
+        type=str,
+        help="Input Config file",
+    )
+    parser.add_argument(
+        "--analysis-id",
+        default=0,
+        type=int,
+        help="Analysis key from input Config file - 'config.analysis_id'",
+    )
+    parser.add_argument("--selection", required=True, type=int, help="Selection")
+    parser.add_argument(
+        "--knobs",
+        required=True,
+        type=str,
+        help=f"""List of knobs in {moo.KNOBS}. Ex: --knobs "['ess_max_kwh', 'mc_max_kw']" """,
+    )
+    parser.add_argument(
+        "--bounds",
+        default=None,
+        type=str,
+        help="""Dictionary of knob bounds overriding the scenario file. Ex: --bounds "{'ess_max_kwh': (100, 600)}" """,
+    )
+    parser.add_argument(
+        "--n-points",
+        default="5",
+        type=str,
+        help="""Points per knob for grid, total points for lhs. Ex: --n-points 5 or --n-points "{'ess_max_kwh': 11, 'mc_max_kw': 5}" """,
+    )
+    parser.add_argument(
+        "--sampling", default="grid", type=str, choices=SAMPLINGS, help="Sampling"
+    )
+    parser.add_argument("--seed", default=1, type=int, help="Random seed of lhs")
+    parser.add_argument(
+        "--chunk-size", default=16, type=int, help="Points per chunk and part file"
+    )
+    parser.add_argument(
+        "--n-processors", default=1, type=int, help="Number of processes"
+    )
+    parser.add_argument(
+        "--out-dir", default="knob_sweep", type=str, help="Output directory"
+    )
+    parser.add_argument(
+        "--format",
+        default=DEFAULT_FILE_FORMAT,
+        type=str,
+        choices=FILE_FORMATS,
+        help="Part file format, parquet requires pyarrow "
+        "(the 'parquet' extra of t3co)",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Remove the results in the output directory instead of resuming",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    config = run_scenario.load_config(args.config, args.analysis_id)
+    sweep_df = run_knob_sweep(
+        args.selection,
+        config,
+        ast.literal_eval(args.knobs),
+        bounds=ast.literal_eval(args.bounds) if args.bounds else None,
+        n_points=ast.literal_eval(args.n_points),
+        sampling=args.sampling,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        n_processors=args.n_processors,
+        out_dir=args.out_dir,
+        file_format=args.format,
+        resume=not args.no_resume,
+    )
+    logger.info("knob_sweep results:\n%s", sweep_df)
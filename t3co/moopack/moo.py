@@ -5,9 +5,7 @@ from typing import Tuple
 import warnings
 from time import gmtime, strftime
 
-import autograd.numpy as anp
 import fastsim
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
@@ -19,9 +17,12 @@ from pymoo.algorithms.soo.nonconvex.pattern import PatternSearch
 # from pymoo.algorithms.so_local_search import LocalSearch
 from pymoo.algorithms.soo.nonconvex.pso import PSO
 import pymoo.core
+import pymoo.core.algorithm
+from pymoo.core.callback import Callback
 from pymoo.core.problem import ElementwiseProblem
 import pymoo.core.result
 from pymoo.operators.sampling.lhs import LatinHypercubeSampling as LHS
+from pymoo.operators.survival.rank_and_crowding.metrics import calc_crowding_distance
 
 # pymoo stuff
 from pymoo.optimize import minimize
@@ -29,8 +30,12 @@ from pymoo.termination.default import DefaultMultiObjectiveTermination as MODT
 from pymoo.termination.ftol import MultiObjectiveSpaceTermination
 from pymoo.util.display.output import Output
 import pymoo
+from t3co.objectives import gradeability
 from t3co.run import Global as gl
 from t3co.run import run_scenario
+from t3co.tco import tcocalc
+
+logger = logging.getLogger(__name__)
 
 # PyMoo runs a vehicle optimization with POC accounted for that produces 3 designs that
 # meet accel and grade targets and are within 1% of target range.  Grant says this is
@@ -73,6 +78,18 @@ CONSTRAINTS = [
     C_RATE,
     PHEV_MINIMIZE_FUEL_USE_CONSTRAINT,
 ]
+# order of the constraint columns of G, see T3COProblem.get_batch_objs
+CONSTRAINTS_G_ORDER = [
+    GRADE6,
+    GRADE125,
+    ACCEL60,
+    ACCEL30,
+    ACCEL_GRADE_OVERSHOOT,
+    RANGE,
+    C_RATE,
+    TRACE_MISS_DIST_PERCENT,
+    PHEV_MINIMIZE_FUEL_USE_CONSTRAINT,
+]
 
 
 # optimization parameters
@@ -125,6 +142,196 @@ KNOBS = [
 ]
 
 
+class ParetoArchive:
+    """
+    Class for a bounded archive of non-dominated solutions evaluated by T3COProblem, keyed by the knob values x. \
+        Each entry retains the full vehicle_scenario_sweep outputs and the vehicle and scenario state of x so that \
+        Pareto-front reports can be assembled without re-running vehicle_scenario_sweep.
+    """
+
+    def __init__(self, max_size: int = 100) -> None:
+        """
+        This constructor initializes an empty archive
+
+        Args:
+            max_size (int, optional): maximum number of archived solutions. Defaults to 100.
+        """
+        self.max_size = max_size
+        self.entries = {}
+        self.n_hits = 0
+        self.n_misses = 0
+
+    @staticmethod
+    def copy_solution(
+        out: dict, vehicle: fastsim.vehicle.Vehicle, scenario: run_scenario.Scenario
+    ) -> tuple:
+        """
+        This method copies the shared, mutable vehicle and scenario objects of an evaluated solution, all other sweep \
+            outputs are created per evaluation
+
+        Args:
+            out (dict): Output dictionary from vehicle_scenario_sweep
+            vehicle (fastsim.vehicle.Vehicle): vehicle state of the solution
+            scenario (run_scenario.Scenario): scenario state of the solution
+
+        Returns:
+            out, vehicle, scenario (tuple): out with its vehicle and scenario copied, and copies of vehicle and scenario
+        """
+        state = copy.deepcopy(
+            {
+                "vehicle": vehicle,
+                "scenario": scenario,
+                "out_vehicle": out["vehicle"],
+                "out_scenario": out["scenario"],
+            }
+        )
+        return (
+            {
+                **out,
+                "vehicle": state["out_vehicle"],
+                "scenario": state["out_scenario"],
+            },
+            state["vehicle"],
+            state["scenario"],
+        )
+
+    @staticmethod
+    def get_key(x: np.array) -> tuple:
+        """
+        This method converts knob values into an archive key
+
+        Args:
+            x (np.array): Array of optimization knob values
+
+        Returns:
+            key (tuple): Tuple of knob values
+        """
+        return tuple(float(xi) for xi in np.atleast_1d(x))
+
+    @staticmethod
+    def dominates(F_a: np.array, cv_a: float, F_b: np.array, cv_b: float) -> bool:
+        """
+        This method checks constrained domination: feasible solutions dominate infeasible ones, infeasible solutions \
+            are compared by constraint violation, and feasible solutions by Pareto domination of objectives
+
+        Args:
+            F_a (np.array): objectives of solution a
+            cv_a (float): constraint violation of solution a
+            F_b (np.array): objectives of solution b
+            cv_b (float): constraint violation of solution b
+
+        Returns:
+            dominates (bool): True if solution a dominates solution b
+        """
+        if cv_a > 0 or cv_b > 0:
+            return cv_a < cv_b
+        return bool(np.all(F_a <= F_b) and np.any(F_a < F_b))
+
+    def add(
+        self,
+        x: np.array,
+        F: np.array,
+        G: np.array,
+        out: dict,
+        vehicle: fastsim.vehicle.Vehicle,
+        scenario: run_scenario.Scenario,
+    ) -> bool:
+        """
+        This method adds an evaluated solution if it is not dominated by an archived solution, and removes archived \
+            solutions it dominates. If the archive exceeds max_size, the most crowded solution is dropped.
+
+        Args:
+            x (np.array): Array of optimization knob values
+            F (np.array): Array of objectives
+            G (np.array): Array of constraints, feasible when <= 0
+            out (dict): Output dictionary from vehicle_scenario_sweep, archived as passed, see copy_solution
+            vehicle (fastsim.vehicle.Vehicle): vehicle state of x, archived as passed
+            scenario (run_scenario.Scenario): scenario state of x, archived as passed
+
+        Returns:
+            added (bool): True if the solution was archived
+        """
+        key = self.get_key(x)
+        F = np.atleast_1d(np.array(F, dtype=float))
+        cv = float(np.sum(np.maximum(np.atleast_1d(np.array(G, dtype=float)), 0)))
+        if key in self.entries:
+            return False
+        for entry in self.entries.values():
+            if self.dominates(entry["F"], entry["cv"], F, cv):
+                return False
+        for k in [
+            k
+            for k, entry in self.entries.items()
+            if self.dominates(F, cv, entry["F"], entry["cv"])
+        ]:
+            del self.entries[k]
+
+        self.entries[key] = {
+            "F": F,
+            "cv": cv,
+            "out": out,
+            "vehicle": vehicle,
+            "scenario": scenario,
+        }
+
+        if len(self.entries) > self.max_size:
+            keys = list(self.entries.keys())
+            crowding = calc_crowding_distance(
+                np.array([self.entries[k]["F"] for k in keys])
+            )
+            del self.entries[keys[int(np.argmin(crowding))]]
+        return key in self.entries
+
+    def get(self, x: np.array) -> dict:
+        """
+        This method looks up an archived solution
+
+        Args:
+            x (np.array): Array of optimization knob values
+
+        Returns:
+            entry (dict): Dictionary containing F, cv, out, vehicle, and scenario, or None on a miss
+        """
+        entry = self.entries.get(self.get_key(x))
+        if entry is None:
+            self.n_misses += 1
+        else:
+            self.n_hits += 1
+        return entry
+
+
+class ParetoArchiveCallback(Callback):
+    """
+    Class for the pymoo callback that keeps the ParetoArchive of an optimization. With save_history, pymoo \
+        deep-copies the algorithm and its problem into res.history every generation, but detaches the callback first, \
+        so the archive is not copied. The problem queues its evaluated solutions in pending_solutions, and the \
+        callback adds them to the archive after each generation.
+    """
+
+    def __init__(self, problem: "T3COProblem", max_size: int = 100) -> None:
+        """
+        This constructor initializes an empty archive and starts queueing the solutions of problem
+
+        Args:
+            problem (T3COProblem): optimized problem
+            max_size (int, optional): maximum number of archived solutions. Defaults to 100.
+        """
+        super().__init__()
+        self.archive = ParetoArchive(max_size)
+        problem.pending_solutions = []
+
+    def notify(self, algorithm: pymoo.core.algorithm.Algorithm) -> None:
+        """
+        This method adds the solutions evaluated in the last generation to the archive
+
+        Args:
+            algorithm (pymoo.core.algorithm.Algorithm): running algorithm
+        """
+        for solution in algorithm.problem.pending_solutions:
+            self.archive.add(*solution)
+        algorithm.problem.pending_solutions = []
+
+
 class T3COProblem(ElementwiseProblem):
     """
     Class for creating PyMoo problem.
@@ -205,6 +412,7 @@ class T3COProblem(ElementwiseProblem):
 
         # TODO: figure out parallelization and then modify the following line accordingly
         _ = kwargs.pop("parallelization", None)
+        elementwise = kwargs.pop("elementwise", True)
 
         # possible TODO: make this a dict for grade, accel, and range tolerance
         self.range_overshoot_tol = kwargs.pop("range_overshoot_tol", None)
@@ -251,10 +459,21 @@ class T3COProblem(ElementwiseProblem):
         self.knobs_bounds = knobs_bounds
 
         knobs = [key for key in knobs_bounds.keys()]
-        lower_bounds = anp.array([val[0] for bound, val in knobs_bounds.items()])
-        upper_bounds = anp.array([val[1] for bound, val in knobs_bounds.items()])
+        lower_bounds = np.array([val[0] for bound, val in knobs_bounds.items()])
+        upper_bounds = np.array([val[1] for bound, val in knobs_bounds.items()])
 
         self.write_tsv = kwargs.pop("write_tsv", False)
+        # output directories of the TCO results of the designs, see analysis_context.create_analysis_context
+        self.context = kwargs.pop("context", None)
+
+        # non-dominated solutions and their outputs, read when assembling Pareto-front reports, see ParetoArchiveCallback
+        self.pareto_archive = None
+        # evaluated solutions not yet added to the archive, None if they are not archived
+        self.pending_solutions = None
+        # if not None, gradeability is estimated away from the grade targets, see gradeability.screen_gradeability
+        self.gradeability_screening_tol = kwargs.pop("gradeability_screening_tol", None)
+        # estimated and simulated gradeability tests of this problem
+        self.gradeability_agreement = gradeability.GradeabilityAgreement()
 
         self.obj_list = obj_list
         if obj_list is None:
@@ -348,6 +567,7 @@ class T3COProblem(ElementwiseProblem):
 
         # n_ieq_constr, number of constraints that must yield < 0
         super().__init__(
+            elementwise=elementwise,
             n_var=n_args,
             n_obj=n_obj,
             n_ieq_constr=n_constr,
@@ -668,28 +888,78 @@ class T3COProblem(ElementwiseProblem):
         assert len(x_dict) == 0, f"Unapplied knobs: {list(x_dict.keys())}"
 
         # calculate objectives
-        get_accel_loaded = False
-        get_grade = False
-        obj_arr_F = []
-        g6_acvhd, g125_acvhd, z60l_acvhd, z30l_acvhd, tco_acvhd, mpgge, range_achvd = [
-            None
-        ] * 7
-        if GRADE6 in self.constr_list or GRADE125 in self.constr_list:
-            get_grade = True
-        if ACCEL30 in self.constr_list or ACCEL60 in self.constr_list:
-            get_accel_loaded = True
-
-        rs_sweep = run_scenario.vehicle_scenario_sweep(
+        rs_sweep = self.run_design_sweep(optvehicle, self.opt_scenario, write_tsv)
+        design_results = self.get_design_results(rs_sweep, optvehicle)
+        design_results.update(
+            {
+                KNOB_WTDELTAPERC: wt_delta_perc_guess,
+                KNOB_CDA: CdA_reduction_perc,
+                KNOB_FCPEAKEFF: fc_peak_eff_guess,
+                KNOB_FCMAXKW: fc_max_out_kw_guess,
+                KNOB_ess_max_kwh: max_ess_kwh_guess,
+                KNOB_mc_max_kw: max_motor_kw_guess,
+                KNOB_fs_kwh: fs_kwh_guess,
+            }
+        )
+        obj_arr_F, constraint_results_G = self.get_batch_objs([design_results])
+
+        return obj_arr_F[0], constraint_results_G[0], rs_sweep
+
+    def run_design_sweep(
+        self,
+        optvehicle: fastsim.vehicle.Vehicle,
+        scenario: run_scenario.Scenario,
+        write_tsv: bool = False,
+        veh_cost_set: dict = None,
+        gradeability_screening: dict = None,
+    ) -> dict:
+        """
+        This method runs vehicle_scenario_sweep for one design, with the accel and grade tests required by the constraints
+
+        Args:
+            optvehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object of the design
+            scenario (run_scenario.Scenario): Scenario object of the design
+            write_tsv (bool, optional): if True, save intermediate dataframes. Defaults to False.
+            veh_cost_set (dict, optional): precalculated MSRP breakdown of the design. Defaults to None.
+            gradeability_screening (dict, optional): gradeability screening of the design from its population, \
+                see gradeability.get_screening_row. Defaults to None.
+
+        Returns:
+            rs_sweep (dict): Output dictionary from vehicle_scenario_sweep
+        """
+        get_grade = GRADE6 in self.constr_list or GRADE125 in self.constr_list
+        get_accel_loaded = ACCEL30 in self.constr_list or ACCEL60 in self.constr_list
+
+        return run_scenario.vehicle_scenario_sweep(
             optvehicle,
-            self.opt_scenario,
-            designcycle,
+            scenario,
+            self.designcycle,
             verbose=self.verbose,
             get_accel=False,  # don't want non-loaded accel values, for now
             get_accel_loaded=get_accel_loaded,
             get_gradeability=get_grade,
             write_tsv=write_tsv,
+            early_stop=True,
+            gradeability_screening_tol=self.gradeability_screening_tol,
+            gradeability_screening=gradeability_screening,
+            gradeability_agreement=self.gradeability_agreement,
+            veh_cost_set=veh_cost_set,
+            context=self.context,
         )
 
+    def get_design_results(
+        self, rs_sweep: dict, optvehicle: fastsim.vehicle.Vehicle
+    ) -> dict:
+        """
+        This method collects the vehicle_scenario_sweep outputs of one design that objectives and constraints are calculated from
+
+        Args:
+            rs_sweep (dict): Output dictionary from vehicle_scenario_sweep
+            optvehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object of the design
+
+        Returns:
+            design_results (dict): Dictionary of achieved TCO, performance, range, and PHEV fuel usage
+        """
         mpgge = rs_sweep["mpgge"]
         g6_acvhd, g125_acvhd = (
             rs_sweep["grade_6_mph_ach"],
@@ -700,6 +970,7 @@ class T3COProblem(ElementwiseProblem):
             rs_sweep["zero_to_30_loaded"],
         )
         tco_acvhd = rs_sweep["tot_cost"]
+        range_achvd = None
         if optvehicle.veh_pt_type in [gl.BEV, gl.CONV, gl.HEV]:
             range_achvd = rs_sweep["primary_fuel_range_mi"]
         elif optvehicle.veh_pt_type == gl.PHEV:
@@ -727,13 +998,55 @@ class T3COProblem(ElementwiseProblem):
                 / (phev_cd_battery_used_kwh + phev_cd_fuel_used_kwh),
                 2,
             )
+
+        max_dist_frac_result = None
+        if TRACE_MISS_DIST_PERCENT in self.constr_list:
+            cycle_records = rs_sweep["design_cycle_sim_drive_record"]
+            max_dist_frac_result = max(
+                sdr.trace_miss_dist_frac for sdr in cycle_records
+            )
+
+        return {
+            "tco": tco_acvhd,
+            "mpgge": mpgge,
+            "grade_6": g6_acvhd,
+            "grade_1p25": g125_acvhd,
+            "accel_60_loaded": z60l_acvhd,
+            "accel_30_loaded": z30l_acvhd,
+            "range": range_achvd,
+            "pct_fc_kwh": pct_fc_kwh,
+            "phev_cd_fuel_used_kwh": phev_cd_fuel_used_kwh,
+            "phev_cd_battery_used_kwh": phev_cd_battery_used_kwh,
+            "max_dist_frac": max_dist_frac_result,
+            "ess_max_kw": optvehicle.ess_max_kw,
+            "ess_max_kwh": optvehicle.ess_max_kwh,
+        }
+
+    def get_batch_objs(self, batch_results: list) -> Tuple[np.array, np.array]:
+        """
+        This method calculates the objectives and constraints of a batch of designs as array operations and appends \
+            them to the optimization records. Results of a design that were not calculated are None.
+
+        Args:
+            batch_results (list): list of get_design_results dictionaries, updated with the knob values of each design
+
+        Returns:
+            obj_arr_F (np.array): Array of objectives, one row per design - tot_cost and phev_cd_fuel_used_kwh
+            constraint_results_G (np.array): Array of constraints, one row per design
+        """
+        n_designs = len(batch_results)
+
+        def get_array(key):
+            return np.array([results[key] for results in batch_results], dtype=float)
+
         #                                                           #
         # ********************** objectives  ********************** #
         #                                                           #
+        obj_arr_F = []
         if TCO in self.obj_list:
-            obj_arr_F.append(tco_acvhd)
+            obj_arr_F.append(get_array("tco"))
         if PHEV_MINIMIZE_FUEL_USE_OBJECTIVE in self.obj_list:
-            obj_arr_F.append(phev_cd_fuel_used_kwh)
+            obj_arr_F.append(get_array("phev_cd_fuel_used_kwh"))
         #                                                           #
         # ******************** end objectives  ******************** #
         #                                                           #
@@ -743,37 +1056,32 @@ class T3COProblem(ElementwiseProblem):
         #
         #                                                           #
 
-        self.accel_30_constraint.append(None)
-        self.accel_60_constraint.append(None)
-        self.grade_6_constraint.append(None)
-        self.grade_1p25_constraint.append(None)
-        self.range_constraint.append(None)
-        self.grade_accel_overshoot_tol_constraint.append(None)
-        self.c_rate_constraint.append(None)
-        self.trace_miss_distance_percent_constraint_record.append(None)
-        self.phev_min_fuel_use_prcnt_const_record.append(None)
-
+        constraint_records = {}
         constraint_results_G = []
         # calculate constraint violations
         # speed at grade minus target should be negative when constraint is met
         if GRADE6 in self.constr_list:
             constraint_results_G.append(
-                self.opt_scenario.min_speed_at_6pct_grade_in_5min_mph - g6_acvhd
+                self.opt_scenario.min_speed_at_6pct_grade_in_5min_mph
+                - get_array("grade_6")
             )
         if GRADE125 in self.constr_list:
             constraint_results_G.append(
-                self.opt_scenario.min_speed_at_1p25pct_grade_in_5min_mph - g125_acvhd
+                self.opt_scenario.min_speed_at_1p25pct_grade_in_5min_mph
+                - get_array("grade_1p25")
             )
         if ACCEL60 in self.constr_list:
             # zero-to-speed time should minus max allowable (target value) should
             # be negative when constraint is met
             # 9 sec achvd - 10 sec target = -1
             constraint_results_G.append(
-                z60l_acvhd - self.opt_scenario.max_time_0_to_60mph_at_gvwr_s
+                get_array("accel_60_loaded")
+                - self.opt_scenario.max_time_0_to_60mph_at_gvwr_s
             )
         if ACCEL30 in self.constr_list:
             constraint_results_G.append(
-                z30l_acvhd - self.opt_scenario.max_time_0_to_30mph_at_gvwr_s
+                get_array("accel_30_loaded")
+                - self.opt_scenario.max_time_0_to_30mph_at_gvwr_s
             )
 
         # calculate limiting grade/accel requirement if all constraints met
@@ -781,83 +1089,84 @@ class T3COProblem(ElementwiseProblem):
             constr_perc = {}
             if GRADE125 in self.constr_list:
                 # todo, -abs() for all of these?
-                g125c = (
+                constr_perc[GRADE125] = (
                     -(
-                        g125_acvhd
+                        get_array("grade_1p25")
                         - self.opt_scenario.min_speed_at_1p25pct_grade_in_5min_mph
                     )
                     / self.opt_scenario.min_speed_at_1p25pct_grade_in_5min_mph
                 )
-                constr_perc[GRADE125] = g125c
-                self.grade_1p25_constraint[-1] = g125c
+                constraint_records["grade_1p25_constraint"] = constr_perc[GRADE125]
             if GRADE6 in self.constr_list:
-                g6c = (
-                    -(g6_acvhd - self.opt_scenario.min_speed_at_6pct_grade_in_5min_mph)
+                constr_perc[GRADE6] = (
+                    -(
+                        get_array("grade_6")
+                        - self.opt_scenario.min_speed_at_6pct_grade_in_5min_mph
+                    )
                     / self.opt_scenario.min_speed_at_6pct_grade_in_5min_mph
                 )
-                constr_perc[GRADE6] = g6c
-                self.grade_6_constraint[-1] = g6c
+                constraint_records["grade_6_constraint"] = constr_perc[GRADE6]
             if ACCEL60 in self.constr_list:
-                z60c = (
-                    z60l_acvhd - self.opt_scenario.max_time_0_to_60mph_at_gvwr_s
+                constr_perc[ACCEL60] = (
+                    get_array("accel_60_loaded")
+                    - self.opt_scenario.max_time_0_to_60mph_at_gvwr_s
                 ) / self.opt_scenario.max_time_0_to_60mph_at_gvwr_s
-                constr_perc[ACCEL60] = z60c
-                self.accel_60_constraint[-1] = z60c
+                constraint_records["accel_60_constraint"] = constr_perc[ACCEL60]
             if ACCEL30 in self.constr_list:
-                z30c = (
-                    z30l_acvhd - self.opt_scenario.max_time_0_to_30mph_at_gvwr_s
+                constr_perc[ACCEL30] = (
+                    get_array("accel_30_loaded")
+                    - self.opt_scenario.max_time_0_to_30mph_at_gvwr_s
                 ) / self.opt_scenario.max_time_0_to_30mph_at_gvwr_s
-                constr_perc[ACCEL30] = z30c
-                self.accel_30_constraint[-1] = z30c
+                constraint_records["accel_30_constraint"] = constr_perc[ACCEL30]
 
             # if all constraints meet target, then find closest overshoot and ensure it's below tolerance
-            if (len(constr_perc) > 0) & (
-                np.array(list(constr_perc.values())) < 0
-            ).all():
-                # say largest negative percent is -.1 (closest to target, 10% exceeding)
-                # tolerance is .05
-                # -(-.1) - 0.05 = 0.05, >= 0, constraint is violated. Constraints are in bounds if they return < 0
-                min_grade_accel_excess = (
-                    -constr_perc[max(constr_perc, key=constr_perc.get)]
-                    - self.grade_accel_overshoot_tol
+            # say largest negative percent is -.1 (closest to target, 10% exceeding)
+            # tolerance is .05
+            # -(-.1) - 0.05 = 0.05, >= 0, constraint is violated. Constraints are in bounds if they return < 0
+            min_grade_accel_excess = np.full(n_designs, -1.0)  # no constraint to satisfy
+            if len(constr_perc) > 0:
+                constr_perc_arr = np.array(list(constr_perc.values()))
+                min_grade_accel_excess = np.where(
+                    (constr_perc_arr < 0).all(axis=0),
+                    -constr_perc_arr.max(axis=0) - self.grade_accel_overshoot_tol,
+                    min_grade_accel_excess,
                 )
-            else:
-                min_grade_accel_excess = -1  # no constraint to satisfy
             constraint_results_G.append(min_grade_accel_excess)
-            self.grade_accel_overshoot_tol_constraint[-1] = min_grade_accel_excess
+            constraint_records["grade_accel_overshoot_tol_constraint"] = (
+                min_grade_accel_excess
+            )
 
         if RANGE in self.constr_list:
+            range_achvd = get_array("range")
             # if you fall short of range target
-            if self.range_overshoot_tol is None:
-                range_mi_cv = (
-                    self.opt_scenario.target_range_mi - range_achvd
-                )  # pos return, failed
-            else:
-                if range_achvd <= self.opt_scenario.target_range_mi:
-                    range_mi_cv = (
-                        self.opt_scenario.target_range_mi - range_achvd
-                    )  # pos return, failed
-                else:
-                    range_mi_cv = range_achvd - (
+            range_mi_cv = (
+                self.opt_scenario.target_range_mi - range_achvd
+            )  # pos return, failed
+            if self.range_overshoot_tol is not None:
+                range_mi_cv = np.where(
+                    range_achvd <= self.opt_scenario.target_range_mi,
+                    range_mi_cv,
+                    range_achvd
+                    - (
                         self.opt_scenario.target_range_mi
                         * (1 + self.range_overshoot_tol)
-                    )
+                    ),
+                )
 
             constraint_results_G.append(range_mi_cv)
-            self.range_constraint[-1] = range_mi_cv
+            constraint_records["range_constraint"] = range_mi_cv
 
         # c rate constraint
         if C_RATE in self.constr_list:
-            self.c_rate_constraint[-1] = (
-                self.mooadvancedvehicle.ess_max_kw / self.mooadvancedvehicle.ess_max_kwh
-                - np.interp(
-                    self.mooadvancedvehicle.ess_max_kwh,
-                    # TODO, this 2D array needs to be an input
-                    [1.0, 10.0, 188.0, 660.0],  # battery sizes kwh
-                    [24.0, 12.0, 2.0, 0.7],  # c rates (kw/kwh)
-                )
+            ess_max_kwh = get_array("ess_max_kwh")
+            c_rate_cv = get_array("ess_max_kw") / ess_max_kwh - np.interp(
+                ess_max_kwh,
+                # TODO, this 2D array needs to be an input
+                [1.0, 10.0, 188.0, 660.0],  # battery sizes kwh
+                [24.0, 12.0, 2.0, 0.7],  # c rates (kw/kwh)
             )
-            constraint_results_G.append(self.c_rate_constraint[-1])
+            constraint_results_G.append(c_rate_cv)
+            constraint_records["c_rate_constraint"] = c_rate_cv
 
         # # trace miss constraint
         if TRACE_MISS_DIST_PERCENT in self.constr_list:
@@ -865,15 +1174,12 @@ class T3COProblem(ElementwiseProblem):
                 self.opt_scenario.trace_miss_dist_percent > 0
                 and self.opt_scenario.trace_miss_dist_percent < 1
             ), "scenario file input trace_miss_dist_percent must be decimal value greater than 0 and less than 1"
-            cycle_records = rs_sweep["design_cycle_sim_drive_record"]
-            max_dist_frac_result = max(
-                sdr.trace_miss_dist_frac for sdr in cycle_records
-            )
             # .1 -> 10%
             max_dist_frac_miss = self.opt_scenario.trace_miss_dist_percent
-            constraint_results_G.append(max_dist_frac_result - max_dist_frac_miss)
-            self.trace_miss_distance_percent_constraint_record[-1] = (
-                max_dist_frac_result - max_dist_frac_miss
+            trace_miss_cv = get_array("max_dist_frac") - max_dist_frac_miss
+            constraint_results_G.append(trace_miss_cv)
+            constraint_records["trace_miss_distance_percent_constraint_record"] = (
+                trace_miss_cv
             )
 
         if PHEV_MINIMIZE_FUEL_USE_CONSTRAINT in self.constr_list:
@@ -883,39 +1189,74 @@ class T3COProblem(ElementwiseProblem):
             assert (
                 self.opt_scenario.constraint_phev_minimize_fuel_use_percent < 1
             ), "scenario.constraint_phev_minimize_fuel_use_percent must be value > 0 and < 1"
-            constraint_results_G.append(
-                pct_fc_kwh - self.opt_scenario.constraint_phev_minimize_fuel_use_percent
+            phev_fuel_use_cv = (
+                get_array("pct_fc_kwh")
+                - self.opt_scenario.constraint_phev_minimize_fuel_use_percent
             )
-            self.phev_min_fuel_use_prcnt_const_record[-1] = (
-                pct_fc_kwh - self.opt_scenario.constraint_phev_minimize_fuel_use_percent
+            constraint_results_G.append(phev_fuel_use_cv)
+            constraint_records["phev_min_fuel_use_prcnt_const_record"] = (
+                phev_fuel_use_cv
             )
 
         #                                                           #
         # ******************** end constraints ******************** #
         #                                                           #
 
-        # append reporting variables
-        # obj vars
-        self.r_tcos.append(tco_acvhd)
-        self.r_cd_fc_kwh_percent.append(pct_fc_kwh)
-        self.r_cd_fc_kwh_used.append(phev_cd_fuel_used_kwh)
-        self.r_cd_elec_kwh_used.append(phev_cd_battery_used_kwh)
-
-        self.r_grade_6s.append(g6_acvhd)
-        self.r_grade_1p25s.append(g125_acvhd)
-        self.r_accel_60l.append(z60l_acvhd)
-        self.r_accel_30l.append(z30l_acvhd)
-        self.r_fuel_efficiencies.append(mpgge)
-        self.r_ranges.append(range_achvd)
-        self.r_wt_delta_perc_guess.append(wt_delta_perc_guess)
-        self.r_CdA_reduction_perc.append(CdA_reduction_perc)
-        self.r_fc_peak_eff_guess.append(fc_peak_eff_guess)
-        self.r_fc_max_out_kw_guess.append(fc_max_out_kw_guess)
-        self.r_fs_kwh_guess.append(fs_kwh_guess)
-        self.r_max_ess_kwh_guess.append(max_ess_kwh_guess)
-        self.r_max_motor_kw_guess.append(max_motor_kw_guess)
-
-        return np.array(obj_arr_F), np.array(constraint_results_G), rs_sweep
+        # append reporting variables, None for constraints that are not calculated
+        for record in [
+            "accel_30_constraint",
+            "accel_60_constraint",
+            "grade_6_constraint",
+            "grade_1p25_constraint",
+            "range_constraint",
+            "grade_accel_overshoot_tol_constraint",
+            "c_rate_constraint",
+            "trace_miss_distance_percent_constraint_record",
+            "phev_min_fuel_use_prcnt_const_record",
+        ]:
+            getattr(self, record).extend(
+                constraint_records.get(record, [None] * n_designs)
+            )
+        for record, key in [
+            # obj vars
+            ("r_tcos", "tco"),
+            ("r_cd_fc_kwh_percent", "pct_fc_kwh"),
+            ("r_cd_fc_kwh_used", "phev_cd_fuel_used_kwh"),
+            ("r_cd_elec_kwh_used", "phev_cd_battery_used_kwh"),
+            ("r_grade_6s", "grade_6"),
+            ("r_grade_1p25s", "grade_1p25"),
+            ("r_accel_60l", "accel_60_loaded"),
+            ("r_accel_30l", "accel_30_loaded"),
+            ("r_fuel_efficiencies", "mpgge"),
+            ("r_ranges", "range"),
+            ("r_wt_delta_perc_guess", KNOB_WTDELTAPERC),
+            ("r_CdA_reduction_perc", KNOB_CDA),
+            ("r_fc_peak_eff_guess", KNOB_FCPEAKEFF),
+            ("r_fc_max_out_kw_guess", KNOB_FCMAXKW),
+            ("r_fs_kwh_guess", KNOB_fs_kwh),
+            ("r_max_ess_kwh_guess", KNOB_ess_max_kwh),
+            ("r_max_motor_kw_guess", KNOB_mc_max_kw),
+        ]:
+            getattr(self, record).extend(results[key] for results in batch_results)
+
+        obj_arr_F = np.array(obj_arr_F).T.reshape(n_designs, len(obj_arr_F))
+        constraint_results_G = np.array(constraint_results_G).T.reshape(
+            n_designs, len(constraint_results_G)
+        )
+        return obj_arr_F, constraint_results_G
+
+    def get_constraint_names(self) -> list:
+        """
+        This method returns the names of the constraints in the order of the columns of G
+
+        Returns:
+            constraint_names (list): list of constraint names, one per column of G
+        """
+        return [
+            constraint
+            for constraint in CONSTRAINTS_G_ORDER
+            if constraint in self.constr_list
+        ]
 
     def _evaluate(self, x: dict, out: dict, *args, **kwargs) -> None:
         """
@@ -925,7 +1266,18 @@ class T3COProblem(ElementwiseProblem):
             x (dict): Dictionary containing optimization knobs
             out (dict): Dictionary containing TCO results for optimization runs
         """
-        obj_arr_F, constr_arr, _ = self.get_objs(x)
+        obj_arr_F, constr_arr, rs_sweep = self.get_objs(x)
+        if self.pending_solutions is not None:
+            self.pending_solutions.append(
+                (
+                    np.copy(x),
+                    obj_arr_F,
+                    constr_arr,
+                    *ParetoArchive.copy_solution(
+                        rs_sweep, self.mooadvancedvehicle, self.opt_scenario
+                    ),
+                )
+            )
         out["F"] = obj_arr_F
 
         if len(constr_arr) > 0:
@@ -1019,6 +1371,8 @@ class T3COProblem(ElementwiseProblem):
 
         # todo, figure out how to get mpgge in the other y axis
         if plot:
+            import matplotlib.pyplot as plt
+
             resdir = gl.MOO_KNOB_SWEEP_PLOTS_DIR
             if not resdir.exists():
                 resdir.mkdir()
@@ -1067,7 +1421,9 @@ class T3COProblem(ElementwiseProblem):
 
     def get_tco_from_moo_advanced_result(self, x: dict) -> dict:
         """
-        This method is a utility function to get detailed TCO information from optimized MOO result
+        This method is a utility function to get detailed TCO information from optimized MOO result. Results are read \
+            from pareto_archive and vehicle_scenario_sweep is only re-run on a miss. In both cases, mooadvancedvehicle \
+            and opt_scenario are left in the state of x.
 
         Args:
             x (dict): Dictionary containing optimization knobs - [max motor kw, battery kwh, drag coeff % improvement]
@@ -1075,38 +1431,291 @@ class T3COProblem(ElementwiseProblem):
         Returns:
             out (dict): Dictionary containing TCO results for optimization runs
         """
-        x_dict = {knob: x[self.knobs.index(knob)] for knob in self.knobs}
-        wt_delta_perc_guess = x_dict.pop(KNOB_WTDELTAPERC, None)
-        CdA_reduction_perc = x_dict.pop(KNOB_CDA, None)
-        fc_peak_eff_guess = x_dict.pop(KNOB_FCPEAKEFF, None)
-        fc_max_out_kw_guess = x_dict.pop(KNOB_FCMAXKW, None)
-        max_ess_kwh_guess = x_dict.pop(KNOB_ess_max_kwh, None)
-        max_motor_kw_guess = x_dict.pop(KNOB_mc_max_kw, None)
-        fs_kwh_guess = x_dict.pop(KNOB_fs_kwh, None)
+        if logger.isEnabledFor(logging.DEBUG):
+            x_dict = {knob: round(x[self.knobs.index(knob)], 4) for knob in self.knobs}
+            logger.debug("MOO Final Solution: %s", x_dict)
 
-        print("MOO Final Solution:")
-        if wt_delta_perc_guess is not None:
-            print(KNOB_WTDELTAPERC.rjust(20, " "), f":{round(wt_delta_perc_guess, 4)}")
-        if CdA_reduction_perc is not None:
-            print(KNOB_CDA.rjust(20, " "), f":{round(CdA_reduction_perc, 4)}")
-        if fc_peak_eff_guess is not None:
-            print(KNOB_FCPEAKEFF.rjust(20, " "), f":{round(fc_peak_eff_guess, 4)}")
-        if fc_max_out_kw_guess is not None:
-            print(KNOB_FCMAXKW.rjust(20, " "), f":{round(fc_max_out_kw_guess, 4)}")
-        if max_ess_kwh_guess is not None:
-            print(KNOB_ess_max_kwh.rjust(20, " "), f":{round(max_ess_kwh_guess, 4)}")
-        if max_motor_kw_guess is not None:
-            print(KNOB_mc_max_kw.rjust(20, " "), f":{round(max_motor_kw_guess, 4)}")
-        if fs_kwh_guess is not None:
-            print(KNOB_fs_kwh.rjust(20, " "), f":{round(fs_kwh_guess, 4)}")
-
-        _, _, out = self.get_objs(x, write_tsv=False)
+        entry = None if self.pareto_archive is None else self.pareto_archive.get(x)
+        if entry is None:
+            _, _, out = self.get_objs(x, write_tsv=False)
+        else:
+            # restore in place, callers hold references to mooadvancedvehicle and opt_scenario
+            self.mooadvancedvehicle.__dict__.update(
+                copy.deepcopy(entry["vehicle"]).__dict__
+            )
+            self.opt_scenario.__dict__.update(copy.deepcopy(entry["scenario"]).__dict__)
+            out = entry["out"]
 
         return out
 
     # ------------------------------------ end utility functions ------------------------------------
 
 
+class T3COBatchProblem(T3COProblem):
+    """
+    Class for a population-batched T3COProblem. pymoo passes the whole population matrix to _evaluate; knob values, \
+        glider costs and masses, MSRP, and objectives and constraints are calculated for the population as array operations. \
+        With gradeability_screening_tol, the gradeability of the population is screened at once and only the designs \
+        near the grade targets are simulated. Only the per-design vehicle_scenario_sweep runs remain per row, \
+        run in order in the calling process: sim_drive holds the GIL, so threads do not run them faster, and \
+        selections are already spread over processes by the sweep. Each design runs on its own copies of the initial mooadvancedvehicle and opt_scenario; like T3COProblem, these are left in the \
+        state of the last design.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        This constructor initializes a T3COProblem that is not elementwise, see T3COProblem.__init__
+        """
+        super().__init__(*args, elementwise=False, **kwargs)
+        self.base_vehicle_and_scenario = copy.deepcopy(
+            (self.mooadvancedvehicle, self.opt_scenario)
+        )
+
+    def get_batch_knob_values(self, X: np.array) -> dict:
+        """
+        This method applies the light-weighting, CdA, and engine efficiency knobs to the population as array \
+            operations, like weight_delta_percent_knob, cda_percent_delta_knob, and fc_peak_eff_knob
+
+        Args:
+            X (np.array): Population matrix, one row of knob values per design
+
+        Returns:
+            knob_values (dict): Dictionary of arrays of vehicle and scenario fields, one value per design
+        """
+        n_designs = len(X)
+        glider_kg = np.full(n_designs, self.opt_scenario.originalglider_kg)
+        knob_values = {
+            "vehicle_glider_cost_dol": np.full(
+                n_designs, self.opt_scenario.originalGliderPrice
+            )
+        }
+
+        # light-weighting before CdA adjustment, as in get_objs
+        if KNOB_WTDELTAPERC in self.knobs:
+            wt_perc_reduction = X[:, self.knobs.index(KNOB_WTDELTAPERC)]
+            wt_delta_cost_per_kg = np.interp(
+                x=wt_perc_reduction,
+                xp=self.ltwt_delta_percs,
+                fp=self.ltwt_dol_per_kg_costs,
+            )
+            wt_delta_kg = glider_kg * wt_perc_reduction
+            # lightweight cost curve points up to wt_delta_kg, padded by repeating the last point so every design
+            # integrates over the same number of points
+            curve_kg = self.ltwt_delta_percs[None, :] * glider_kg[:, None]
+            is_below = self.ltwt_delta_percs[None, :] <= wt_perc_reduction[:, None]
+            n_below = is_below.sum(axis=1)[:, None]
+            has_end = ~(is_below & (curve_kg == wt_delta_kg[:, None])).any(axis=1)
+            x_pts = np.column_stack([curve_kg, wt_delta_kg])
+            y_pts = np.column_stack(
+                [
+                    np.broadcast_to(self.ltwt_dol_per_kg_costs, curve_kg.shape),
+                    wt_delta_cost_per_kg,
+                ]
+            )
+            pt_index = np.arange(x_pts.shape[1])[None, :]
+            pt_index = np.where(
+                pt_index < n_below,
+                pt_index,
+                np.where(has_end[:, None], x_pts.shape[1] - 1, n_below - 1),
+            )
+            knob_values["vehicle_glider_cost_dol"] = knob_values[
+                "vehicle_glider_cost_dol"
+            ] + np.trapz(
+                np.take_along_axis(y_pts, pt_index, axis=1),
+                np.take_along_axis(x_pts, pt_index, axis=1),
+                axis=1,
+            )
+            glider_kg = glider_kg - wt_delta_kg
+
+        if KNOB_CDA in self.knobs:
+            CdA_perc_reduction = X[:, self.knobs.index(KNOB_CDA)]
+            knob_values["drag_coef"] = np.maximum(
+                0.01, self.opt_scenario.originaldrag_coef * (1 - CdA_perc_reduction)
+            )
+            # glider cost and mass penalties, see cda_percent_delta_knob
+            cda_perc = CdA_perc_reduction * 100
+            knob_values["vehicle_glider_cost_dol"] = knob_values[
+                "vehicle_glider_cost_dol"
+            ] + (
+                self.cda_cost_coeff_a * cda_perc + self.cda_cost_coeff_b * cda_perc**2
+            )
+            glider_kg = glider_kg + np.minimum(
+                gl.lbs_to_kgs(
+                    self.cda_mass_coeff_a
+                    * self.cda_perc_imp_at_which_wt_penalty_maxes_out
+                    + self.cda_mass_coeff_b
+                    * self.cda_perc_imp_at_which_wt_penalty_maxes_out**2
+                ),
+                gl.lbs_to_kgs(
+                    self.cda_mass_coeff_a * cda_perc
+                    + self.cda_mass_coeff_b * cda_perc**2
+                ),
+            )
+        knob_values["glider_kg"] = glider_kg
+
+        if KNOB_FCPEAKEFF in self.knobs:
+            fc_peak_eff = X[:, self.knobs.index(KNOB_FCPEAKEFF)]
+            knob_values["fc_ice_cost_dol_per_kw"] = (
+                self.opt_scenario.originalIceDolPerKw
+                + np.interp(fc_peak_eff, self.fc_eff_array, self.fc_cost_coeff_array)
+            )
+            # see adjust_fc_peak_eff
+            old_peak_eff = self.opt_scenario.origfc_eff_map.max()
+            knob_values["fc_eff_map"] = self.opt_scenario.origfc_eff_map[
+                None, :
+            ] * (1 + (fc_peak_eff - old_peak_eff) / old_peak_eff)[:, None]
+
+        return knob_values
+
+    def get_batch_designs(self, X: np.array) -> list:
+        """
+        This method creates the vehicle and scenario of each design of the population from copies of the initial \
+            mooadvancedvehicle and opt_scenario
+
+        Args:
+            X (np.array): Population matrix, one row of knob values per design
+
+        Returns:
+            designs (list): list of (vehicle, scenario) tuples, one per design
+        """
+        knob_values = self.get_batch_knob_values(X)
+        designs = []
+        for i, x in enumerate(X):
+            optvehicle, scenario = copy.deepcopy(self.base_vehicle_and_scenario)
+            scenario.vehicle_glider_cost_dol = knob_values["vehicle_glider_cost_dol"][i]
+            optvehicle.glider_kg = knob_values["glider_kg"][i]
+            if "drag_coef" in knob_values:
+                optvehicle.drag_coef = knob_values["drag_coef"][i]
+            optvehicle.set_veh_mass()
+            if "fc_eff_map" in knob_values:
+                scenario.fc_ice_cost_dol_per_kw = knob_values["fc_ice_cost_dol_per_kw"][
+                    i
+                ]
+                optvehicle.fc_eff_map = knob_values["fc_eff_map"][i]
+                optvehicle.set_derived()
+
+            # sizing setters, in the order of get_objs
+            if KNOB_FCMAXKW in self.knobs:
+                run_scenario.set_max_fuel_converter_kw(
+                    optvehicle, x[self.knobs.index(KNOB_FCMAXKW)]
+                )
+            if KNOB_fs_kwh in self.knobs:
+                run_scenario.set_fuel_store_kwh(
+                    optvehicle, x[self.knobs.index(KNOB_fs_kwh)]
+                )
+            if KNOB_ess_max_kwh in self.knobs:
+                run_scenario.set_max_battery_kwh(
+                    optvehicle, x[self.knobs.index(KNOB_ess_max_kwh)]
+                )
+            if KNOB_mc_max_kw in self.knobs:
+                run_scenario.set_max_motor_kw(
+                    optvehicle, scenario, x[self.knobs.index(KNOB_mc_max_kw)]
+                )
+
+            # enforce 0 <= cargo kg <= initial cargo kg for BEV and HEV optimizations
+            if self.optimize_pt in [gl.BEV, gl.HEV]:
+                run_scenario.limit_cargo_kg_for_moo_hev_bev(scenario, optvehicle)
+            designs.append((optvehicle, scenario))
+        return designs
+
+    def evaluate_batch(self, X: np.array) -> Tuple[np.array, np.array, list, list]:
+        """
+        This method evaluates a population of designs and appends them to the optimization records
+
+        Args:
+            X (np.array): Population matrix, one row of knob values per design
+
+        Returns:
+            obj_arr_F (np.array): Array of objectives, one row per design
+            constr_arr (np.array): Array of constraints, one row per design
+            designs (list): list of (vehicle, scenario) tuples, one per design
+            batch_results (list): list of get_design_results dictionaries with knob values, one per design
+        """
+        designs = self.get_batch_designs(X)
+        vehicles = [optvehicle for optvehicle, _ in designs]
+        scenarios = [scenario for _, scenario in designs]
+        # MSRP of the population in one call, the other cost coefficients are not changed by knobs
+        veh_cost_sets = tcocalc.calculate_dollar_cost_batch(
+            scenarios[0],
+            [v.veh_pt_type for v in vehicles],
+            [v.fc_max_kw for v in vehicles],
+            [v.fs_kwh for v in vehicles],
+            [v.mc_max_kw for v in vehicles],
+            [v.ess_max_kwh for v in vehicles],
+            fc_eff_type=[v.fc_eff_type for v in vehicles],
+            vehicle_glider_cost_dol=[s.vehicle_glider_cost_dol for s in scenarios],
+            fc_ice_cost_dol_per_kw=[s.fc_ice_cost_dol_per_kw for s in scenarios],
+        )
+        gradeability_screenings = [None] * len(designs)
+        if self.gradeability_screening_tol is not None and (
+            GRADE6 in self.constr_list or GRADE125 in self.constr_list
+        ):
+            # at the test weight, the scenario targets and weights are not changed by knobs
+            screening = gradeability.screen_gradeability(
+                vehicles, scenarios[0], self.gradeability_screening_tol
+            )
+            gradeability_screenings = [
+                gradeability.get_screening_row(screening, i)
+                for i in range(len(designs))
+            ]
+
+        def run_design_sweep(i):
+            return self.run_design_sweep(
+                vehicles[i],
+                scenarios[i],
+                veh_cost_set=tcocalc.get_cost_set(veh_cost_sets, i),
+                gradeability_screening=gradeability_screenings[i],
+            )
+
+        rs_sweeps = [run_design_sweep(i) for i in range(len(designs))]
+
+        batch_results = []
+        for x, (optvehicle, _), rs_sweep in zip(X, designs, rs_sweeps):
+            design_results = self.get_design_results(rs_sweep, optvehicle)
+            design_results.update(
+                {
+                    knob: x[self.knobs.index(knob)] if knob in self.knobs else None
+                    for knob in KNOBS
+                }
+            )
+            batch_results.append(design_results)
+        obj_arr_F, constr_arr = self.get_batch_objs(batch_results)
+        for design_results, rs_sweep in zip(batch_results, rs_sweeps):
+            design_results["rs_sweep"] = rs_sweep
+        return obj_arr_F, constr_arr, designs, batch_results
+
+    def _evaluate(self, X: np.array, out: dict, *args, **kwargs) -> None:
+        """
+        This method evaluates a population when running Pymoo optimization
+
+        Args:
+            X (np.array): Population matrix, one row of knob values per design
+            out (dict): Dictionary containing TCO results for optimization runs
+        """
+        obj_arr_F, constr_arr, designs, batch_results = self.evaluate_batch(X)
+        if self.pending_solutions is not None:
+            for x, (optvehicle, scenario), F, G, design_results in zip(
+                X, designs, obj_arr_F, constr_arr, batch_results
+            ):
+                self.pending_solutions.append(
+                    (
+                        np.copy(x),
+                        F,
+                        G,
+                        *ParetoArchive.copy_solution(
+                            design_results["rs_sweep"], optvehicle, scenario
+                        ),
+                    )
+                )
+        # in place, callers hold references to mooadvancedvehicle and opt_scenario
+        self.mooadvancedvehicle.__dict__.update(designs[-1][0].__dict__)
+        self.opt_scenario.__dict__.update(designs[-1][1].__dict__)
+        out["F"] = obj_arr_F
+
+        if constr_arr.shape[1] > 0:
+            out["G"] = constr_arr
+
+
 # TODO, needs refactor
 class T3CODisplay(Output):
     """
@@ -1213,6 +1822,12 @@ def run_optimization(
     optimize_pt = kwargs.pop("optimize_pt")
     return_least_infeasible = kwargs.pop("optimize_pt", False)
     skip_optimization = kwargs.pop("skip_optimization", False)
+    # if True, the population is evaluated in batches by T3COBatchProblem
+    batch_eval = kwargs.pop("batch_eval", False)
+    # if not None, the optimization also terminates after this number of design evaluations
+    n_max_evals = kwargs.pop("n_max_evals", None)
+    # maximum number of solutions in the ParetoArchive of the optimization
+    pareto_archive_size = kwargs.pop("pareto_archive_size", 100)
 
     if verbose:
         print("Running optimization.")
@@ -1220,7 +1835,8 @@ def run_optimization(
     if verbose:
         print(knobs_bounds)
 
-    problem = T3COProblem(
+    problem_class = T3COBatchProblem if batch_eval else T3COProblem
+    problem = problem_class(
         parallelization=("threads", 1),
         knobs_bounds=knobs_bounds,
         vnum=vnum,
@@ -1235,8 +1851,15 @@ def run_optimization(
     if skip_optimization:
         return None, problem, None, None
 
-    print(
-        f"moo.run_optimization algo {algo}, x_tol {x_tol}, f_tol {f_tol}, nth_gen {nth_gen}, n_last {n_last}, n_max_gen {n_max_gen}, pop_size {pop_size}"
+    logger.info(
+        "moo.run_optimization algo %s, x_tol %s, f_tol %s, nth_gen %s, n_last %s, n_max_gen %s, pop_size %s",
+        algo,
+        x_tol,
+        f_tol,
+        nth_gen,
+        n_last,
+        n_max_gen,
+        pop_size,
     )
 
     assert (
@@ -1251,13 +1874,13 @@ def run_optimization(
             sampling=kwargs.pop("sampling", LHS()),
         )
     elif algo == ALGO_NelderMead:
-        print("moo.run_optimization Nelder Mead")
+        logger.debug("moo.run_optimization Nelder Mead")
         algorithm = NelderMead()
     elif algo == ALGO_PatternSearch:
-        print("moo.run_optimization PatternSearch")
+        logger.debug("moo.run_optimization PatternSearch")
         algorithm = PatternSearch()
     elif algo == ALGO_PSO:
-        print("moo.run_optimization Particle Swarm")
+        logger.debug("moo.run_optimization Particle Swarm")
         algorithm = PSO()
     # elif algo == 'LocalSearch':
     #     print('moo.run_optimization LocalSearch')
@@ -1270,11 +1893,12 @@ def run_optimization(
         # n_last=n_last, these are expected in MODT... which is weird bc the docs seem to say it is
         # nth_gen=nth_gen,
         n_max_gen=n_max_gen,
-        n_max_evals=None,
+        n_max_evals=n_max_evals,
     )
 
     # this check no longer works now that kwargs are pass to T3COProblem and dict types are immutable
     # assert len(kwargs) == 0, f'Invalid kwargs: {list(kwargs.keys())}'
+    archive_callback = ParetoArchiveCallback(problem, pareto_archive_size)
     try:
         res = minimize(
             problem,
@@ -1283,22 +1907,27 @@ def run_optimization(
             seed=1,
             verbose=True,
             save_history=True,
+            callback=archive_callback,
             return_least_infeasible=return_least_infeasible,
             #    display=T3CODisplay()
         )
     except Exception:
-        logging.exception(
-            f"moo.run_optimization: Optimization errored out for algorithm {algo}"
+        logger.exception(
+            "moo.run_optimization: Optimization errored out for algorithm %s", algo
         )
         res, problem = None, None
         return res, problem, EXCEPTION_THROWN
+    problem.pareto_archive = archive_callback.archive
+    problem.pending_solutions = None
 
     t1 = time.time()
-    print(f"\nElapsed time for optimization: {t1 - t0} s")
+    logger.info("Elapsed time for optimization: %s s", t1 - t0)
+    if problem.gradeability_screening_tol is not None:
+        problem.gradeability_agreement.log_stats()
     if verbose:
         print("\nParameter pareto sets:")
     if res.X is None:
-        print("moo.run_optimization: moo failed to converge")
+        logger.warning("moo.run_optimization: moo failed to converge")
         return res, problem, OPTIMIZATION_FAILED_TO_CONVERGE
 
     # res.X holds results of optimization
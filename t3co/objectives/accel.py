@@ -15,6 +15,35 @@ from t3co.run import Global as gl
 from t3co.run import run_scenario
 import fastsim
 
+# accel test cycles, keyed by (cycle speed mph, cycle seconds)
+ACCEL_CYCLE_CACHE = {}
+
+
+def get_accel_cycle(cyc_mph: float = 90, cyc_secs: int = 300) -> cycle.Cycle:
+    """
+    This function returns the accel test cycle, a constant cyc_mph target from standstill. Cycles are built once \
+        and cached in ACCEL_CYCLE_CACHE.
+
+    Args:
+        cyc_mph (float, optional): target speed in mph. Defaults to 90.
+        cyc_secs (int, optional): cycle length in seconds. Defaults to 300.
+
+    Returns:
+        cyc_accel (fastsim.cycle.Cycle): FASTSim Cycle object of the accel test
+    """
+    key = (cyc_mph, cyc_secs)
+    if key not in ACCEL_CYCLE_CACHE:
+        accel_cyc_secs = np.arange(cyc_secs)
+        cyc_dict = {
+            "time_s": accel_cyc_secs,
+            "mps": np.append(
+                [0], np.ones(len(accel_cyc_secs) - 1) * cyc_mph / params.MPH_PER_MPS
+            ),
+            "cycGrade": np.zeros(len(accel_cyc_secs)),
+        }
+        ACCEL_CYCLE_CACHE[key] = cycle.Cycle.from_dict(cyc_dict)
+    return ACCEL_CYCLE_CACHE[key]
+
 
 def get_accel(
     analysis_vehicle: fastsim.vehicle.Vehicle,
@@ -22,6 +51,7 @@ def get_accel(
     set_weight_to_max_kg: bool = True,
     verbose=False,
     ess_init_soc=None,
+    early_stop: bool = False,
 ) -> Tuple[float, float, fastsim.vehicle.Vehicle]:
     """
     This function runs a simdrive for getting 0-to-60 and 0-30 mph time with fully laden weight at GVWR (plus gvwr_credit_kg?)
@@ -30,9 +60,12 @@ def get_accel(
     Args:
         analysis_vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object for analysis vehicle
         scenario (run_scenario.Scenario, optional): Scenario object for current selection. Defaults to None.
-        set_weight_to_max_kg (bool, optional): if True, runs run_scenario.set_test_weight(). Defaults to True.
+        set_weight_to_max_kg (bool, optional): if True, runs the test on run_scenario.get_test_vehicle(), \
+            analysis_vehicle is not modified. Defaults to True.
         verbose (bool, optional): if True, prints the process steps. Defaults to False.
         ess_init_soc (float, optional): ESS initial SOC override. Defaults to None.
+        early_stop (bool, optional): if True, stops the simulation once 60 mph is passed, with identical accel times. \
+            accel_simdrive then only holds the simulated steps. Defaults to False.
 
     Returns:
         zero_to_sixty (float): 0-60 mph acceleration time in sec
@@ -42,10 +75,9 @@ def get_accel(
     """
     CYC_MPH = 90
 
-    kg_before = None
+    test_vehicle = analysis_vehicle
     if set_weight_to_max_kg and scenario is not None:
-        kg_before = analysis_vehicle.veh_kg
-        run_scenario.set_test_weight(analysis_vehicle, scenario)
+        test_vehicle = run_scenario.get_test_vehicle(analysis_vehicle, scenario)
 
     # load the vehicle
     t0 = time.time()
@@ -54,21 +86,17 @@ def get_accel(
         print(f"f'{Path(__file__).name}:: Vehicle load time: {time.time() - t0:.3f} s")
     # load the cycles
     t0 = time.time()
-    accel_cyc_secs = np.arange(300)
-    cyc_dict = {
-        "time_s": accel_cyc_secs,
-        "mps": np.append(
-            [0], np.ones(len(accel_cyc_secs) - 1) * CYC_MPH / params.MPH_PER_MPS
-        ),
-        "cycGrade": np.zeros(len(accel_cyc_secs)),
-    }
-
-    cyc_accel = cycle.Cycle.from_dict(cyc_dict)
+    cyc_accel = get_accel_cycle(CYC_MPH)
 
-    accel_simdrive = run_scenario.get_objective_simdrive(analysis_vehicle, cyc_accel)
+    accel_simdrive = run_scenario.get_objective_simdrive(test_vehicle, cyc_accel)
 
     run_scenario.run_grade_or_accel(
-        "accel", analysis_vehicle, accel_simdrive, ess_init_soc
+        "accel",
+        test_vehicle,
+        accel_simdrive,
+        ess_init_soc,
+        stop_speeds_mph=[60, 30],
+        early_stop=early_stop,
     )
     # print(f'accel:get_accel::>>> {type(accel_simdrive.sim_params)} accel_simdrive.sim_params.trace_miss_dist_tol', accel_simdrive.sim_params.trace_miss_dist_tol)
     # print(f'accel:get_accel::>>> {type(accel_simdrive.sim_params)} accel_simdrive.sim_params.trace_miss_speed_mps_tol ', accel_simdrive.sim_params.trace_miss_speed_mps_tol )
@@ -77,6 +105,10 @@ def get_accel(
         <= accel_simdrive.sim_params.trace_miss_dist_tol
     )
 
+    # only the simulated steps, all steps unless the simulation stopped early
+    mph_ach = np.array(accel_simdrive.mph_ach)[: accel_simdrive.i]
+    time_s = cyc_accel.time_s[: accel_simdrive.i]
+
     def test_accel(speed_mph_target: float) -> float:
         """
         This function gets the time it takes to reach target speed
@@ -88,16 +120,16 @@ def get_accel(
             zero_to_target_mph_s (float): Time taken to reach target speed
         """
         # seconds to target mph test
-        if (np.array(accel_simdrive.mph_ach) >= speed_mph_target).any():
+        if (mph_ach >= speed_mph_target).any():
             zero_to_target_mph_s = np.interp(
                 x=speed_mph_target,
-                xp=np.array(accel_simdrive.mph_ach),
-                fp=cyc_accel.time_s,
+                xp=mph_ach,
+                fp=time_s,
             )
         else:
             # in case vehicle never exceeds speed_mph_target mph, penalize it a lot with a high number
             # print(analysis_vehicle.scenario_name + f' did not achieve {speed_mph_target} mph during the accel test')
-            zero_to_target_mph_s = -accel_simdrive.mph_ach[-1]
+            zero_to_target_mph_s = -mph_ach[-1]
 
         return zero_to_target_mph_s
 
@@ -106,14 +138,6 @@ def get_accel(
     # seconds to 30 test
     zero_to_thirty = test_accel(30)
 
-    #  an assert to ensure that vehicle weight is reset correctly
-    if set_weight_to_max_kg and scenario is not None:
-        run_scenario.reset_vehicle_weight(analysis_vehicle)
-        kg_after = analysis_vehicle.veh_kg
-        assert (
-            kg_after == kg_before
-        ), f"total vehicle kg (veh_kg) kg_after must be to kg_before, {kg_after} != {kg_before}"
-
     return zero_to_sixty, zero_to_thirty, accel_simdrive
 
 
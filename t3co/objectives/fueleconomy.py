@@ -7,12 +7,24 @@ from pathlib import Path
 from typing import List, Tuple
 
 import fastsim
-import matplotlib.pyplot as plt
 import numpy as np
 
+from t3co.objectives import simdrive_context
 from t3co.run import Global as gl
 from t3co.run import run_scenario
 
+# composite fields of get_mpgge, weighted harmonic means of the per-cycle values
+COMPOSITE_FIELDS = ["mpgge", "grid_mpgge", "mpgde", "kwh_per_mi"]
+PHEV_CS_COMPOSITE_FIELDS = ["cs_fuel_mpgge", "cs_fuel_mpgde", "cs_fuel_kwh__mi"]
+PHEV_CD_COMPOSITE_FIELDS = [
+    "cd_fuel_mpgge",
+    "cd_fuel_mpgde",
+    "cd_electric_mpgge",
+    "cd_grid_electric_mpgge",
+    "cd_electric_kwh__mi",
+    "cd_fuel_kwh__mi",
+]
+
 
 def get_range_mi(
     mpgge_info: dict, vehicle: fastsim.vehicle.Vehicle, scenario: run_scenario.Scenario
@@ -38,73 +50,103 @@ def get_range_mi(
     Returns:
         range_dict (dict): Dictionary containing different range results
     """
-    range_dict = {}
-    kwh_per_gge = gl.get_kwh_per_gge()
     if vehicle.veh_pt_type == gl.BEV:
         assert (
             vehicle.fs_kwh == 0 and vehicle.fc_max_kw == 0
         ), "Error! BEV vehicle has non-zero ICE attributes - vehicle mass calculation may be off"
-        mpgge = mpgge_info["mpgge"]  # use fuel efficiency from battery
-        range_mi = (
-            vehicle.ess_max_kwh
-            * (vehicle.max_soc - vehicle.min_soc)
-            * mpgge
-            / kwh_per_gge
-        )
-        range_dict["primary_fuel_range_mi"] = range_mi
     elif vehicle.veh_pt_type == gl.CONV:
         assert (
             vehicle.ess_max_kwh == 0 and vehicle.mc_max_kw == 0
         ), "Error! CONV vehicle has non-zero BEV attributes - vehicle mass calculation may be off"
-        mpgge = mpgge_info["mpgge"]
-        range_mi = (vehicle.fs_kwh / kwh_per_gge) * mpgge
-        range_dict["primary_fuel_range_mi"] = range_mi
-    elif vehicle.veh_pt_type == gl.HEV:
-        mpgge = mpgge_info["mpgge"]
+    elif vehicle.veh_pt_type not in [gl.HEV, gl.PHEV]:
+        return {}
+    range_dict = {
+        key: values[()]
+        for key, values in get_range_mi_batch(
+            mpgge_info,
+            vehicle.veh_pt_type,
+            vehicle.ess_max_kwh,
+            vehicle.max_soc,
+            vehicle.min_soc,
+            vehicle.fs_kwh,
+        ).items()
+    }
+    # if sim_drive:
+    #     range_dict["cycle_distance_mi"] = sum(sim_drive.cyc.mps * np.diff(sim_drive.cyc.time_s)[0]) * gl.m_to_mi
+    #     range_dict["mean_cyc_speed_mph"] = sum(sim_drive.cyc.mps)/max(sim_drive.cyc.time_s) * gl.mps_to_mph
+    # elif range_cyc:
+    #     range_dict["cycle_distance_mi"] = sum(range_cyc.mps * np.diff(range_cyc.time_s)[0]) * gl.m_to_mi
+    #     range_dict["mean_cyc_speed_mph"] = sum(range_cyc.mps)/max(range_cyc.time_s) * gl.mps_to_mph
+    return range_dict
+
+
+def get_range_mi_batch(
+    mpgge_comp: dict,
+    veh_pt_type: str,
+    ess_max_kwh: np.ndarray,
+    max_soc: np.ndarray,
+    min_soc: np.ndarray,
+    fs_kwh: np.ndarray,
+) -> dict:
+    """
+    This function computes the ranges of get_range_mi for many designs of one powertrain type as array operations. \
+        get_range_mi runs it for one vehicle. Inputs are broadcast against each other.
+
+    Args:
+        mpgge_comp (dict): Dictionary of composite MPGGE arrays from get_mpgge_batch
+        veh_pt_type (str): vehicle powertrain type of all designs - gl.CONV, gl.HEV, gl.PHEV, or gl.BEV
+        ess_max_kwh (np.ndarray): Array of battery energy [kWh]
+        max_soc (np.ndarray): Array of battery max SOC
+        min_soc (np.ndarray): Array of battery min SOC
+        fs_kwh (np.ndarray): Array of fuel storage energy [kWh]
+
+    Returns:
+        range_dict (dict): Dictionary containing arrays of the range results, with the keys of get_range_mi
+    """
+    kwh_per_gge = gl.get_kwh_per_gge()
+    ess_max_kwh, max_soc, min_soc, fs_kwh = (
+        np.asarray(values, dtype=float)
+        for values in [ess_max_kwh, max_soc, min_soc, fs_kwh]
+    )
+    if veh_pt_type == gl.BEV:
+        range_mi = ess_max_kwh * (max_soc - min_soc) * mpgge_comp["mpgge"] / kwh_per_gge
+        return {"primary_fuel_range_mi": range_mi}
+    elif veh_pt_type == gl.CONV:
+        range_mi = (fs_kwh / kwh_per_gge) * mpgge_comp["mpgge"]
+        return {"primary_fuel_range_mi": range_mi}
+    elif veh_pt_type == gl.HEV:
         elec_range_mi = (
-            vehicle.ess_max_kwh
-            * (vehicle.max_soc - vehicle.min_soc)
-            * mpgge
-            / kwh_per_gge
+            ess_max_kwh * (max_soc - min_soc) * mpgge_comp["mpgge"] / kwh_per_gge
         )
-        conv_range_mi = (vehicle.fs_kwh / kwh_per_gge) * mpgge
-        range_mi = elec_range_mi + conv_range_mi
-        range_dict["primary_fuel_range_mi"] = range_mi
-    elif vehicle.veh_pt_type == gl.PHEV:
+        conv_range_mi = (fs_kwh / kwh_per_gge) * mpgge_comp["mpgge"]
+        return {"primary_fuel_range_mi": elec_range_mi + conv_range_mi}
+    elif veh_pt_type == gl.PHEV:
         # https://github.nrel.gov/AVCI/FASTSim_TCO_Truck/issues/24#issuecomment-39958
         # charge depleting range [miles]
         # CDrangeMiles = MIN( ESSmaxKWh*(CDmaxSOC- CDminSOC)/ CDelectricityKWhperMile , maxFuelStorKWh/33.7/ CDfuelGGEperMile )
-        cd_range_mi = min(
-            vehicle.ess_max_kwh
-            * (vehicle.max_soc - vehicle.min_soc)
-            / mpgge_info["cd_electric_kwh__mi"],
-            vehicle.fs_kwh / kwh_per_gge * mpgge_info["cd_fuel_mpgge"],
+        cd_range_mi = np.minimum(
+            ess_max_kwh * (max_soc - min_soc) / mpgge_comp["cd_electric_kwh__mi"],
+            fs_kwh / kwh_per_gge * mpgge_comp["cd_fuel_mpgge"],
         )
         # charge sustaining range [miles]
         # note, CS range in this way of thinking, is essentially what range is *left over* after you've exhausted the battery to min SOC
         # and switch into CS mode from CD mode, thus we subtract cd_gge_used from the GGE fuel stores of the vehicle
-        cd_gge_used = cd_range_mi / mpgge_info["cd_fuel_mpgge"]
-        gge_capacity = vehicle.fs_kwh / kwh_per_gge
-        cs_range_mi = (gge_capacity - cd_gge_used) * mpgge_info["cs_fuel_mpgge"]
-        true_range_mi = cd_range_mi + cs_range_mi
-        range_dict = {
+        cd_gge_used = cd_range_mi / mpgge_comp["cd_fuel_mpgge"]
+        gge_capacity = fs_kwh / kwh_per_gge
+        cs_range_mi = (gge_capacity - cd_gge_used) * mpgge_comp["cs_fuel_mpgge"]
+        return {
             "cd_aer_phev_range_mi": cd_range_mi,
             "cs_phev_range_mi": cs_range_mi,
-            "true_phev_range_mi": true_range_mi,
+            "true_phev_range_mi": cd_range_mi + cs_range_mi,
             "primary_fuel_range_mi": cd_range_mi,
         }
-    # if sim_drive:
-    #     range_dict["cycle_distance_mi"] = sum(sim_drive.cyc.mps * np.diff(sim_drive.cyc.time_s)[0]) * gl.m_to_mi
-    #     range_dict["mean_cyc_speed_mph"] = sum(sim_drive.cyc.mps)/max(sim_drive.cyc.time_s) * gl.mps_to_mph
-    # elif range_cyc:
-    #     range_dict["cycle_distance_mi"] = sum(range_cyc.mps * np.diff(range_cyc.time_s)[0]) * gl.m_to_mi
-    #     range_dict["mean_cyc_speed_mph"] = sum(range_cyc.mps)/max(range_cyc.time_s) * gl.mps_to_mph
-    return range_dict
+    raise ValueError(f"unknown vehicle powertrain type {veh_pt_type}")
 
 
 def get_sim_drive(erc, v, scenario):
     """
-    This helper method returns a FASTSim SimDrive object using the vehicle, drive cycle and scenario
+    This helper method returns a FASTSim SimDrive object using the vehicle, drive cycle and scenario. \
+        The Rust cycle and vehicle are reused across calls through simdrive_context.SimDriveContext.
 
     Args:
         erc (fastsim.cycle.Cycle| List[Tuple[fastsim.cycle.Cycle, float): FASTSim range cycle object or list of tuples of cycles
@@ -114,25 +156,93 @@ def get_sim_drive(erc, v, scenario):
     Returns:
         sim_drive (fastsim.simdrive.SimDrive): FASTSim SimDrive object
     """
-    sim_drive = fastsim.simdrive.SimDrive(erc, v)
-    sim_drive = sim_drive.to_rust()
-
-    sim_params = sim_drive.sim_params
-    sim_params.reset_orphaned()
+    sim_params = {}
     # sim_params.verbose = False
     if scenario.missed_trace_correction:
-        sim_params.missed_trace_correction = True
-        sim_params.max_time_dilation = scenario.max_time_dilation
-        sim_params.min_time_dilation = scenario.min_time_dilation
-        sim_params.time_dilation_tol = scenario.time_dilation_tol
-    sim_drive.sim_params = sim_params
+        sim_params = {
+            "missed_trace_correction": True,
+            "max_time_dilation": scenario.max_time_dilation,
+            "min_time_dilation": scenario.min_time_dilation,
+            "time_dilation_tol": scenario.time_dilation_tol,
+        }
+    context = simdrive_context.get_sim_drive_context(erc, v, sim_params)
 
-    props = sim_drive.props
-    props.reset_orphaned()  # see if this is needed
-    props.kwh_per_gge = gl.get_kwh_per_gge()
-    sim_drive.props = props
+    return context.get_sim_drive(v)
 
-    return sim_drive
+
+def get_composite(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    This function computes the weighted harmonic mean of per-cycle values over the last axis, cycles with a value \
+        of 0 are left out of the denominator
+
+    Args:
+        values (np.ndarray): Array of per-cycle values, cycles on the last axis
+        weights (np.ndarray): Array of cycle weights
+
+    Returns:
+        composite (np.ndarray): Array of composite values, one per row of values
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    return np.sum(weights, axis=-1) / np.sum(
+        np.divide(
+            weights,
+            values,
+            out=np.zeros(np.broadcast(weights, values).shape),
+            where=values != 0,
+        ),
+        axis=-1,
+    )
+
+
+def get_mpgge_batch(
+    cycle_results: dict,
+    weights: np.ndarray,
+    veh_pt_type: str,
+    phev_util_factor: np.ndarray = None,
+) -> dict:
+    """
+    This function computes the composite fields of get_mpgge for many designs of one powertrain type as array \
+        operations, from per-cycle simulation outputs of N designs over M cycles
+
+    Args:
+        cycle_results (dict): Dictionary of (N, M) arrays of the per-cycle mpgge fields of get_mpgge
+        weights (np.ndarray): Array of M cycle weights, or (N, M) array
+        veh_pt_type (str): vehicle powertrain type of all designs - gl.CONV, gl.HEV, gl.PHEV, or gl.BEV
+        phev_util_factor (np.ndarray, optional): Array of PHEV utility factors, ave_combined_kwh__mile is computed if provided. Defaults to None.
+
+    Returns:
+        mpgge_comp (dict): Dictionary containing arrays of the composite fields, with the keys of get_mpgge
+    """
+    if veh_pt_type != gl.PHEV:
+        return {
+            field: get_composite(cycle_results[field], weights)
+            for field in COMPOSITE_FIELDS
+        }
+
+    mpgge_comp = {
+        field: get_composite(cycle_results[field], weights)
+        for field in PHEV_CS_COMPOSITE_FIELDS
+    }
+    mpgge_comp["cd_fuel_used_kwh_total"] = np.sum(
+        cycle_results["cd_fuel_used_kwh"], axis=-1
+    )
+    mpgge_comp["cd_battery_used_kwh"] = np.sum(
+        cycle_results["cd_elec_used_kwh"], axis=-1
+    )
+    mpgge_comp.update(
+        {
+            field: get_composite(cycle_results[field], weights)
+            for field in PHEV_CD_COMPOSITE_FIELDS
+        }
+    )
+    if phev_util_factor is not None:
+        uf = np.asarray(phev_util_factor, dtype=float)
+        mpgge_comp["ave_combined_kwh__mile"] = (
+            uf * (mpgge_comp["cd_electric_kwh__mi"] + mpgge_comp["cd_fuel_kwh__mi"])
+            + (1 - uf) * mpgge_comp["cs_fuel_kwh__mi"]
+        )
+    return mpgge_comp
 
 
 def get_mpgge(
@@ -331,172 +441,19 @@ def get_mpgge(
         mpgges.append(mpgge)
         weights.append(w)
 
+    cycle_results = {
+        field: np.array([[m[field] for m in mpgges]]) for field in mpgges[0]
+    }
+    uf = None
     if v.veh_pt_type == gl.PHEV:
-        cs_fuel_mpgge_i = np.array([m["cs_fuel_mpgge"] for m in mpgges])
-        cs_fuel_mpgde_i = np.array([m["cs_fuel_mpgde"] for m in mpgges])
-        cs_fuel_kwh__mi_i = np.array([m["cs_fuel_kwh__mi"] for m in mpgges])
-
-        cd_fuel_used_kwh_i = [m["cd_fuel_used_kwh"] for m in mpgges]
-        cd_battery_used_kwh_i = [m["cd_elec_used_kwh"] for m in mpgges]
-        cd_fuel_mpgge_i = np.array([m["cd_fuel_mpgge"] for m in mpgges])
-        cd_fuel_mpgde_i = np.array([m["cd_fuel_mpgde"] for m in mpgges])
-        cd_electric_mpgge_i = np.array([m["cd_electric_mpgge"] for m in mpgges])
-        cd_grid_electric_mpgge_i = np.array(
-            [m["cd_grid_electric_mpgge"] for m in mpgges]
-        )
-        cd_electric_kwh__mi_i = np.array([m["cd_electric_kwh__mi"] for m in mpgges])
-        cd_fuel_kwh__mi_i = np.array([m["cd_fuel_kwh__mi"] for m in mpgges])
-
-        mpgge_comp = {
-            # Charge sustaining
-            "cs_fuel_mpgge": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    cs_fuel_mpgge_i,
-                    out=np.zeros_like(cs_fuel_mpgge_i),
-                    where=cs_fuel_mpgge_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            "cs_fuel_mpgde": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    cs_fuel_mpgde_i,
-                    out=np.zeros_like(cs_fuel_mpgde_i),
-                    where=cs_fuel_mpgde_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            "cs_fuel_kwh__mi": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    cs_fuel_kwh__mi_i,
-                    out=np.zeros_like(cs_fuel_kwh__mi_i),
-                    where=cs_fuel_kwh__mi_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            # Charge depleting
-            "cd_fuel_used_kwh_total": sum(cd_fuel_used_kwh_i),
-            "cd_battery_used_kwh": sum(cd_battery_used_kwh_i),
-            "cd_fuel_mpgge": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    cd_fuel_mpgge_i,
-                    out=np.zeros_like(cd_fuel_mpgge_i),
-                    where=cd_fuel_mpgge_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            "cd_fuel_mpgde": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    cd_fuel_mpgde_i,
-                    out=np.zeros_like(cd_fuel_mpgde_i),
-                    where=cd_fuel_mpgde_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            "cd_electric_mpgge": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    cd_electric_mpgge_i,
-                    out=np.zeros_like(cd_electric_mpgge_i),
-                    where=cd_electric_mpgge_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            "cd_grid_electric_mpgge": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    cd_grid_electric_mpgge_i,
-                    out=np.zeros_like(cd_grid_electric_mpgge_i),
-                    where=cd_grid_electric_mpgge_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            "cd_electric_kwh__mi": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    cd_electric_kwh__mi_i,
-                    out=np.zeros_like(cd_electric_kwh__mi_i),
-                    where=cd_electric_kwh__mi_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            "cd_fuel_kwh__mi": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    cd_fuel_kwh__mi_i,
-                    out=np.zeros_like(cd_fuel_kwh__mi_i),
-                    where=cd_fuel_kwh__mi_i != 0,
-                    casting="unsafe",
-                )
-            ),
-        }
         # also report: AveCombinedkWhperMile = UF*(CDelectricityKWhperMile + CDfuelKWhpermile) + (1-UF)*CSfuelKWhperMile
         uf = run_scenario.get_phev_util_factor(scenario, v, mpgge)
-        mpgge_comp["ave_combined_kwh__mile"] = (
-            uf * (mpgge_comp["cd_electric_kwh__mi"] + mpgge_comp["cd_fuel_kwh__mi"])
-            + (1 - uf) * mpgge_comp["cs_fuel_kwh__mi"]
-        )
-    else:
-        mpgge_i = np.array([m["mpgge"] for m in mpgges])
-        grid_mpgge_i = np.array([m["grid_mpgge"] for m in mpgges])
-        mpgde_i = np.array([m["mpgde"] for m in mpgges])
-        kwh_per_m_i = np.array([m["kwh_per_mi"] for m in mpgges])
-        mpgge_comp = {
-            "mpgge": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    mpgge_i,
-                    out=np.zeros_like(mpgge_i),
-                    where=mpgge_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            "grid_mpgge": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    grid_mpgge_i,
-                    out=np.zeros_like(grid_mpgge_i),
-                    where=grid_mpgge_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            "mpgde": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    mpgde_i,
-                    out=np.zeros_like(mpgde_i),
-                    where=mpgde_i != 0,
-                    casting="unsafe",
-                )
-            ),
-            # energy consumption kWh/mi is wt-averaged normally (doesn't require inverting / harmonic averaging)
-            "kwh_per_mi": np.sum(weights)
-            / np.sum(
-                np.divide(
-                    weights,
-                    kwh_per_m_i,
-                    out=np.zeros_like(kwh_per_m_i),
-                    where=kwh_per_m_i != 0,
-                    casting="unsafe",
-                )
-            ),
-        }
+    mpgge_comp = {
+        field: values[0]
+        for field, values in get_mpgge_batch(
+            cycle_results, weights, v.veh_pt_type, phev_util_factor=uf
+        ).items()
+    }
 
     if diagnostic:
         return mpgge_comp, sim_drives, mpgges
@@ -505,6 +462,8 @@ def get_mpgge(
 
 # %%
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     vehicle_input_path = Path(
         gl.T3CO_INPUTS_DIR / "tda_example/TDA_FY22_vehicle_model_assumptions.csv"
     ).resolve()
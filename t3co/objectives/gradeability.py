@@ -1,6 +1,8 @@
 # %%
 from __future__ import annotations
 
+import logging
+import threading
 import time
 from pathlib import Path
 from typing import Tuple
@@ -13,6 +15,466 @@ from fastsim import parameters as params
 from t3co.run import Global as gl
 from t3co.run import run_scenario
 
+SIX_GRADE = 0.06
+ONE_POINT_TWENTY_FIVE_GRADE = 0.0125
+CYC_SECONDS = 100
+CYC_MPH = 90
+
+logger = logging.getLogger(__name__)
+
+# constant grade test cycles, keyed by (grade, first time step mph, cycle seconds, cycle mph)
+GRADE_CYCLE_CACHE = {}
+
+
+def get_grade_cycle(
+    target_grade: float,
+    first_time_step_mph: float = 0,
+    cyc_secs: int = 100,
+    cyc_mph: float = 90,
+) -> cycle.Cycle:
+    """
+    This function returns a constant grade test cycle with a constant cyc_mph target after the first time step. \
+        Cycles are built once and cached in GRADE_CYCLE_CACHE.
+
+    Args:
+        target_grade (float): constant grade
+        first_time_step_mph (float, optional): speed at the first time step in mph. Defaults to 0.
+        cyc_secs (int, optional): cycle length in seconds. Defaults to 100.
+        cyc_mph (float, optional): target speed in mph. Defaults to 90.
+
+    Returns:
+        grade_cycle (fastsim.cycle.Cycle): FASTSim Cycle object of the gradeability test
+    """
+    key = (target_grade, first_time_step_mph, cyc_secs, cyc_mph)
+    if key not in GRADE_CYCLE_CACHE:
+        target_grade_cyc_secs = np.arange(cyc_secs)
+        cyc_dict = {
+            "cycSecs": target_grade_cyc_secs,
+            "cycMps": np.append([first_time_step_mph], np.ones(cyc_secs - 1) * cyc_mph)
+            / params.MPH_PER_MPS,
+            "cycGrade": np.ones(cyc_secs) * target_grade,
+        }
+        GRADE_CYCLE_CACHE[key] = cycle.Cycle.from_dict(cyc_dict)
+    return GRADE_CYCLE_CACHE[key]
+
+
+# powertrains whose gradeability test is estimated from the power balance, others are always simulated
+ANALYTIC_PT_TYPES = [gl.CONV, gl.BEV]
+
+
+class GradeabilityAgreement:
+    """
+    Class for recording agreement between estimated and simulated gradeability test speeds, and how often \
+        get_gradeability_screened falls back to simulation. Each optimization problem has its own record, which \
+        the designs of a population update from a thread pool, so updates hold a lock and only running sums are kept.
+    """
+
+    def __init__(self) -> None:
+        """
+        This constructor initializes empty records
+        """
+        self.lock = threading.Lock()
+        self.n_estimated = 0
+        self.n_simulated = 0
+        self.n_compared = 0
+        self.sum_err_mph = 0.0
+        self.sum_abs_err_mph = 0.0
+        self.max_abs_err_mph = np.nan
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def add(self, simulated: bool, comparisons: list = ()) -> None:
+        """
+        This method records a gradeability test of a vehicle that was estimated or simulated
+
+        Args:
+            simulated (bool): if True, the test was simulated, else estimated
+            comparisons (list, optional): (target_grade, estimate_mph, simulated_mph) tuples of test speeds that \
+                were both estimated and simulated. Defaults to ().
+        """
+        with self.lock:
+            if simulated:
+                self.n_simulated += 1
+            else:
+                self.n_estimated += 1
+            for _, estimate_mph, simulated_mph in comparisons:
+                err = estimate_mph - simulated_mph
+                self.n_compared += 1
+                self.sum_err_mph += err
+                self.sum_abs_err_mph += abs(err)
+                self.max_abs_err_mph = np.nanmax([self.max_abs_err_mph, abs(err)])
+
+    def get_stats(self) -> dict:
+        """
+        This method summarizes the recorded agreement
+
+        Returns:
+            stats (dict): Dictionary containing numbers of estimated and simulated tests and errors of the estimate in mph
+        """
+        with self.lock:
+            n_compared = self.n_compared
+            return {
+                "n_estimated": self.n_estimated,
+                "n_simulated": self.n_simulated,
+                "n_compared": n_compared,
+                "mean_err_mph": self.sum_err_mph / n_compared if n_compared else np.nan,
+                "mean_abs_err_mph": (
+                    self.sum_abs_err_mph / n_compared if n_compared else np.nan
+                ),
+                "max_abs_err_mph": self.max_abs_err_mph,
+            }
+
+    def log_stats(self) -> None:
+        """
+        This method logs the agreement summary
+        """
+        stats = self.get_stats()
+        logger.info(
+            "gradeability estimated %s, simulated %s, compared %s, mean error %.4f mph, mean abs error %.4f mph, "
+            "max abs error %.4f mph",
+            stats["n_estimated"],
+            stats["n_simulated"],
+            stats["n_compared"],
+            stats["mean_err_mph"],
+            stats["mean_abs_err_mph"],
+            stats["max_abs_err_mph"],
+        )
+
+
+def get_power_balance_inputs(
+    analysis_vehicle: fastsim.vehicle.Vehicle, veh_kg: float = None
+) -> dict:
+    """
+    This function gets the vehicle inputs of the gradeability power balance. Full-load transmission output power follows \
+        SimDrive.set_comp_lims, with engine and motor output ramping up from zero at fc_sec_to_peak_pwr and mc_sec_to_peak_pwr. \
+        The traction limit is ignored, it does not bind at the test grades.
+
+    Args:
+        analysis_vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object for analysis vehicle
+        veh_kg (float, optional): test weight, vehicle veh_kg if None. Defaults to None.
+
+    Returns:
+        power_balance_inputs (dict): Dictionary of power balance inputs
+    """
+    v = analysis_vehicle
+    mc_lim_kw = 0.0
+    offset_kw = v.aux_kw
+    if v.mc_max_kw > 0:
+        max_elec_kw = v.ess_max_kw - v.aux_kw
+        avail_elec_kw = min(max_elec_kw, v.mc_max_elec_in_kw)
+        if max_elec_kw > 0:
+            if avail_elec_kw == max(v.mc_kw_in_array):
+                mc_lim_kw = min(v.mc_kw_out_array[-1], v.mc_max_kw)
+            else:
+                mc_lim_kw = min(
+                    v.mc_kw_out_array[
+                        np.argmax(
+                            v.mc_kw_in_array
+                            > min(max(v.mc_kw_in_array) - 0.01, avail_elec_kw)
+                        )
+                        - 1
+                    ],
+                    v.mc_max_kw,
+                )
+        if not (v.no_elec_sys or v.no_elec_aux):
+            offset_kw = min(max_elec_kw, 0)
+    return {
+        "veh_kg": v.veh_kg if veh_kg is None else veh_kg,
+        "drag_coef": v.drag_coef,
+        "frontal_area_m2": v.frontal_area_m2,
+        "wheel_rr_coef": v.wheel_rr_coef,
+        "wheel_inertia_kg": v.wheel_inertia_kg_m2 * v.num_wheels / v.wheel_radius_m**2,
+        "trans_eff": v.trans_eff,
+        "fc_max_kw": v.fc_max_kw,
+        "fc_ramp_kw_per_s": (
+            v.fc_max_kw / v.fc_sec_to_peak_pwr if v.fc_max_kw > 0 else 0.0
+        ),
+        "mc_lim_kw": mc_lim_kw,
+        "mc_ramp_kw_per_s": (
+            v.mc_max_kw / v.mc_sec_to_peak_pwr if v.mc_max_kw > 0 else 0.0
+        ),
+        "offset_kw": offset_kw,
+    }
+
+
+def get_road_load_kw(
+    target_grade: float, mps: np.ndarray, inputs: dict, props: params.PhysicalProperties
+) -> np.ndarray:
+    """
+    This function calculates drag, ascent, and rolling resistance power at constant speed, as in SimDrive.set_power_calcs
+
+    Args:
+        target_grade (float): constant grade
+        mps (np.ndarray): speeds in m/s
+        inputs (dict): Dictionary of power balance input arrays
+        props (fastsim.parameters.PhysicalProperties): FASTSim physical properties
+
+    Returns:
+        road_load_kw (np.ndarray): road load power in kW
+    """
+    grade_angle = np.arctan(target_grade)
+    return (
+        0.5
+        * props.air_density_kg_per_m3
+        * inputs["drag_coef"]
+        * inputs["frontal_area_m2"]
+        * mps**3
+        + inputs["veh_kg"]
+        * props.a_grav_mps2
+        * (np.sin(grade_angle) + inputs["wheel_rr_coef"] * np.cos(grade_angle))
+        * mps
+    ) / 1_000
+
+
+def solve_increasing(f, lo: np.ndarray, hi: np.ndarray, n_iter: int = 40) -> np.ndarray:
+    """
+    This function finds roots of an elementwise increasing function by vectorized bisection, clipped to [lo, hi]
+
+    Args:
+        f (function): elementwise increasing function of an array
+        lo (np.ndarray): lower bounds
+        hi (np.ndarray): upper bounds
+        n_iter (int, optional): number of bisections. Defaults to 40.
+
+    Returns:
+        root (np.ndarray): roots of f
+    """
+    lo, hi = np.array(lo, dtype=float), np.array(hi, dtype=float)
+    hi_in = hi.copy()
+    for _ in range(n_iter):
+        mid = (lo + hi) / 2
+        above = f(mid) > 0
+        hi = np.where(above, mid, hi)
+        lo = np.where(above, lo, mid)
+    return np.where(f(hi_in) <= 0, hi_in, (lo + hi) / 2)
+
+
+def get_steady_state_mph(
+    target_grade: float, inputs: dict, cyc_mph: float = 90
+) -> np.ndarray:
+    """
+    This function solves road load versus full-load transmission output power for the steady-state speed on a constant \
+        grade, capped at the cycle speed
+
+    Args:
+        target_grade (float): constant grade
+        inputs (dict): Dictionary of power balance input arrays, from get_power_balance_inputs
+        cyc_mph (float, optional): cycle speed in mph. Defaults to 90.
+
+    Returns:
+        steady_state_mph (np.ndarray): steady-state speeds in mph
+    """
+    props = params.PhysicalProperties()
+    inputs = {
+        key: np.atleast_1d(np.array(val, dtype=float)) for key, val in inputs.items()
+    }
+    max_trans_kw_out = (
+        inputs["mc_lim_kw"] + inputs["fc_max_kw"] - inputs["offset_kw"]
+    ) * inputs["trans_eff"]
+    mps = solve_increasing(
+        lambda x: get_road_load_kw(target_grade, x, inputs, props) - max_trans_kw_out,
+        np.zeros_like(max_trans_kw_out),
+        np.full_like(max_trans_kw_out, cyc_mph / params.MPH_PER_MPS),
+    )
+    return mps * params.MPH_PER_MPS
+
+
+def estimate_grade_mph(
+    target_grade: float,
+    inputs: dict,
+    first_time_step_mph: float = 0,
+    cyc_secs: int = 100,
+    cyc_mph: float = 90,
+) -> np.ndarray:
+    """
+    This function estimates the speed reached at the end of a constant grade test cycle by stepping the power balance \
+        from first_time_step_mph at full load. Each 1 s step solves the kinetic energy balance for the achieved speed \
+        with solve_increasing, so a whole population is estimated at once. The speed approaches get_steady_state_mph.
+
+    Args:
+        target_grade (float): constant grade
+        inputs (dict): Dictionary of power balance input arrays, from get_power_balance_inputs
+        first_time_step_mph (float, optional): speed at the first time step in mph. Defaults to 0.
+        cyc_secs (int, optional): cycle length in seconds. Defaults to 100.
+        cyc_mph (float, optional): cycle speed in mph. Defaults to 90.
+
+    Returns:
+        grade_mph_ach (np.ndarray): estimated speeds at the end of the test in mph
+    """
+    props = params.PhysicalProperties()
+    inputs = {
+        key: np.atleast_1d(np.array(val, dtype=float)) for key, val in inputs.items()
+    }
+    cyc_mps = cyc_mph / params.MPH_PER_MPS
+    mass_kg = inputs["veh_kg"] + inputs["wheel_inertia_kg"]
+    mps = np.full_like(inputs["veh_kg"], first_time_step_mph / params.MPH_PER_MPS)
+    fc_kw = np.zeros_like(mps)
+    mc_kw = np.zeros_like(mps)
+    for _ in range(cyc_secs - 1):
+        fc_kw = np.minimum(inputs["fc_max_kw"], fc_kw + inputs["fc_ramp_kw_per_s"])
+        mc_kw = np.minimum(inputs["mc_lim_kw"], mc_kw + inputs["mc_ramp_kw_per_s"])
+        trans_kw = (mc_kw + fc_kw - inputs["offset_kw"]) * inputs["trans_eff"]
+        mps_prev = mps
+        mps = solve_increasing(
+            lambda x: mass_kg / 2 * (x**2 - mps_prev**2) / 1_000
+            + get_road_load_kw(target_grade, (x + mps_prev) / 2, inputs, props)
+            - trans_kw,
+            np.zeros_like(mps),
+            np.full_like(mps, cyc_mps),
+        )
+    return mps * params.MPH_PER_MPS
+
+
+def screen_gradeability(
+    vehicles: list,
+    scenario: run_scenario.Scenario,
+    screening_tol: float = 0.05,
+    set_weight_to_max_kg: bool = True,
+) -> dict:
+    """
+    This function estimates the 6% and 1.25% gradeability test speeds of a population of vehicles. Vehicles are \
+        estimable unless their powertrain is not in ANALYTIC_PT_TYPES or their battery cannot supply full power \
+        for the whole test. Vehicles need the simulation if not estimable or if an estimate is within screening_tol \
+        (relative) of the scenario target.
+
+    Args:
+        vehicles (list): list of FASTSim vehicle objects
+        scenario (run_scenario.Scenario): Scenario object with gradeability targets and test weight
+        screening_tol (float, optional): relative distance to target within which to simulate. Defaults to 0.05.
+        set_weight_to_max_kg (bool, optional): if True, estimates at GVWR plus gvwr_credit_kg. Defaults to True.
+
+    Returns:
+        screening (dict): Dictionary of grade_6_mph_ach and grade_1_25_mph_ach estimate arrays, is_estimable mask, \
+            and needs_simulation mask
+    """
+    veh_kg = (
+        scenario.gvwr_kg + scenario.gvwr_credit_kg if set_weight_to_max_kg else None
+    )
+    inputs_list = [get_power_balance_inputs(v, veh_kg) for v in vehicles]
+    inputs = {
+        key: np.array([inp[key] for inp in inputs_list]) for key in inputs_list[0]
+    }
+    is_estimable = np.array(
+        [
+            v.veh_pt_type in ANALYTIC_PT_TYPES
+            and not (
+                v.ess_max_kwh > 0
+                and (v.max_soc - v.min_soc)
+                * v.ess_max_kwh
+                * np.sqrt(v.ess_round_trip_eff)
+                < v.ess_max_kw * CYC_SECONDS / 3_600
+            )
+            for v in vehicles
+        ]
+    )
+    screening = {"is_estimable": is_estimable, "needs_simulation": ~is_estimable}
+    for key, target_grade, target_mph in [
+        ("grade_6_mph_ach", SIX_GRADE, scenario.min_speed_at_6pct_grade_in_5min_mph),
+        (
+            "grade_1_25_mph_ach",
+            ONE_POINT_TWENTY_FIVE_GRADE,
+            scenario.min_speed_at_1p25pct_grade_in_5min_mph,
+        ),
+    ]:
+        screening[key] = estimate_grade_mph(
+            target_grade, inputs, target_mph, CYC_SECONDS, CYC_MPH
+        )
+        screening["needs_simulation"] |= (
+            np.abs(screening[key] - target_mph) <= screening_tol * target_mph
+        )
+    return screening
+
+
+def get_screening_row(screening: dict, i: int) -> dict:
+    """
+    This function gets the screening of one vehicle from the screening of a population, as screen_gradeability \
+        returns it for a population of that vehicle
+
+    Args:
+        screening (dict): Dictionary of screening arrays from screen_gradeability
+        i (int): index of the vehicle in the population
+
+    Returns:
+        screening_row (dict): Dictionary of screening arrays of length 1
+    """
+    return {key: val[i : i + 1] for key, val in screening.items()}
+
+
+def get_grade_perf(
+    test_vehicle: fastsim.vehicle.Vehicle,
+    scenario: run_scenario.Scenario,
+    target_grade: float,
+    ess_init_soc: float = None,
+    early_stop: bool = False,
+    verbose: bool = False,
+) -> Tuple[float, fastsim.simdrive.SimDrive]:
+    """
+    This function obtains the maximum speed achieved on gradeability test for target grade. test_vehicle is only read, \
+        so the tests of both grades can run concurrently on the same vehicle.
+
+    Args:
+        test_vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object at test weight
+        scenario (run_scenario.Scenario): Scenario object for current selection, None to start from standstill
+        target_grade (float): Input constant grade for gradeability test
+        ess_init_soc (float, optional): ESS Initial SOC override. Defaults to None.
+        early_stop (bool, optional): if True, stops a CONV simulation once speed reaches an exact steady state. Defaults to False.
+        verbose (bool, optional): if True, prints process steps. Defaults to False.
+
+    Returns:
+        target_grade_mph_ach (float): Achieved maximum speed mph on gradeability test
+        grade_simdrive (fastsim.simdrive.SimDrive): FASTSim SimDrive object for constant grade cycle
+    """
+    t0 = time.time()
+    # Test speed achieved at end of 5 minutes at 6% grade (default)
+    first_time_step_mph = 0
+    if scenario is not None:
+        if target_grade == SIX_GRADE:
+            first_time_step_mph = scenario.min_speed_at_6pct_grade_in_5min_mph
+            if verbose:
+                print(
+                    f"f'{Path(__file__).name}:: scenario.min_speed_at_6pct_grade_in_5min_mph: {scenario.min_speed_at_6pct_grade_in_5min_mph}"
+                )
+        if target_grade == ONE_POINT_TWENTY_FIVE_GRADE:
+            first_time_step_mph = scenario.min_speed_at_1p25pct_grade_in_5min_mph
+            if verbose:
+                print(
+                    f"f'{Path(__file__).name}:: scenario.min_speed_at_1p25pct_grade_in_5min_mph: {scenario.min_speed_at_1p25pct_grade_in_5min_mph}"
+                )
+    if verbose:
+        print(f"f'{Path(__file__).name}:: first_time_step_mph: {first_time_step_mph}")
+    grade_cycle = get_grade_cycle(
+        target_grade, first_time_step_mph, CYC_SECONDS, CYC_MPH
+    )
+
+    if verbose:
+        print(f"f'{Path(__file__).name}:: Cycle load time: {time.time() - t0:.3f} s")
+
+    grade_simdrive = run_scenario.get_objective_simdrive(test_vehicle, grade_cycle)
+
+    run_scenario.run_grade_or_accel(
+        "grade",
+        test_vehicle,
+        grade_simdrive,
+        ess_init_soc,
+        early_stop=early_stop,
+    )
+
+    assert (
+        grade_simdrive.trace_miss_dist_frac
+        <= grade_simdrive.sim_params.trace_miss_dist_tol
+    )
+
+    # speed at the last simulated step, the last step of the cycle unless the simulation stopped early
+    target_grade_mph_ach = grade_simdrive.mph_ach[grade_simdrive.i - 1]
+    return target_grade_mph_ach, grade_simdrive
+
 
 def get_gradeability(
     analysis_vehicle: fastsim.vehicle.Vehicle,
@@ -20,6 +482,7 @@ def get_gradeability(
     verbose: bool = False,
     ess_init_soc: float = None,
     set_weight_to_max_kg: bool = True,
+    early_stop: bool = False,
 ) -> Tuple[float, float, fastsim.simdrive.SimDrive, fastsim.simdrive.SimDrive]:
     """
     This function runs SimDrives to determine the gradeability at given speed and the grade vehicle is
@@ -30,7 +493,10 @@ def get_gradeability(
         scenario (run_scenario.Scenario, optional): Scenario object for current selection. Defaults to None.
         verbose (bool, optional): if True, prints process steps. Defaults to False.
         ess_init_soc (float, optional): ESS Initial SOC override. Defaults to None.
-        set_weight_to_max_kg (bool, optional): if True, run_scenario.set_test_weight() overrides vehice weight to GVWR. Defaults to True.
+        set_weight_to_max_kg (bool, optional): if True, runs the tests on run_scenario.get_test_vehicle() at GVWR, \
+            analysis_vehicle is not modified. Defaults to True.
+        early_stop (bool, optional): if True, stops a CONV simulation once speed reaches an exact steady state, \
+            with identical achieved speeds. The SimDrives then only hold the simulated steps. Defaults to False.
 
     Returns:
         grade_6percent_mph_ach (float): Achieved speed on 6% grade test
@@ -38,94 +504,26 @@ def get_gradeability(
         grade_6_simdrive (fastsim.simdrive.SimDrive): FASTSim SimDrive for gradeability test of 6% grade
         grade_1p25_simdrive (fastsim.simdrive.SimDrive): FASTSim SimDrive for gradeability test of 1.25% grade
     """
-    SIX_GRADE = 0.06
-    ONE_POINT_TWENTY_FIVE_GRADE = 0.0125
-    CYC_SECONDS = 100
-    CYC_MPH = 90
-
     t0 = time.time()
 
+    test_vehicle = analysis_vehicle
     if scenario is not None and set_weight_to_max_kg:
-        kg_before = analysis_vehicle.veh_kg
-        run_scenario.set_test_weight(analysis_vehicle, scenario)
+        test_vehicle = run_scenario.get_test_vehicle(analysis_vehicle, scenario)
 
     if verbose:
         print(f"f'{Path(__file__).name}:: Vehicle load time: {time.time() - t0:.3f} s")
-    # load the cycles
 
-    def get_grade_perf(target_grade: float) -> Tuple[float, fastsim.simdrive.SimDrive]:
-        """
-        This function obtains the maximum speed achieved on gradeability test for target grade
-
-        Args:
-            target_grade (float): Input constant grade for gradeability test
-
-        Returns:
-            target_grade_mph_ach (float): Achieved maximum speed mph on gradeability test
-            grade_simdrive (fastsim.simdrive.SimDrive): FASTSim SimDrive object for constant grade cycle
-        """
-        # Test speed achieved at end of 5 minutes at 6% grade (default)
-        first_time_step_mph = 0
-        if scenario is not None:
-            if target_grade == SIX_GRADE:
-                first_time_step_mph = scenario.min_speed_at_6pct_grade_in_5min_mph
-                if verbose:
-                    print(
-                        f"f'{Path(__file__).name}:: scenario.min_speed_at_6pct_grade_in_5min_mph: {scenario.min_speed_at_6pct_grade_in_5min_mph}"
-                    )
-            if target_grade == ONE_POINT_TWENTY_FIVE_GRADE:
-                first_time_step_mph = scenario.min_speed_at_1p25pct_grade_in_5min_mph
-                if verbose:
-                    print(
-                        f"f'{Path(__file__).name}:: scenario.min_speed_at_1p25pct_grade_in_5min_mph: {scenario.min_speed_at_1p25pct_grade_in_5min_mph}"
-                    )
-        if verbose:
-            print(
-                f"f'{Path(__file__).name}:: first_time_step_mph: {first_time_step_mph}"
-            )
-        target_grade_cyc_secs = np.arange(CYC_SECONDS)
-        cyc_dict = {
-            "cycSecs": target_grade_cyc_secs,
-            "cycMps": np.append(
-                [first_time_step_mph], np.ones(CYC_SECONDS - 1) * CYC_MPH
-            )
-            / params.MPH_PER_MPS,
-            "cycGrade": np.ones(CYC_SECONDS) * target_grade,
-        }
-
-        grade_cycle = cycle.Cycle.from_dict(cyc_dict)
-
-        if verbose:
-            print(
-                f"f'{Path(__file__).name}:: Cycle load time: {time.time() - t0:.3f} s"
-            )
-
-        grade_simdrive = run_scenario.get_objective_simdrive(
-            analysis_vehicle, grade_cycle
-        )
-
-        run_scenario.run_grade_or_accel(
-            "grade", analysis_vehicle, grade_simdrive, ess_init_soc
-        )
-
-        assert (
-            grade_simdrive.trace_miss_dist_frac
-            <= grade_simdrive.sim_params.trace_miss_dist_tol
-        )
-
-        target_grade_mph_ach = grade_simdrive.mph_ach[-1]
-        return target_grade_mph_ach, grade_simdrive
-
-    grade_6percent_mph_ach, grade_6_simdrive = get_grade_perf(SIX_GRADE)
+    grade_6percent_mph_ach, grade_6_simdrive = get_grade_perf(
+        test_vehicle, scenario, SIX_GRADE, ess_init_soc, early_stop, verbose
+    )
     grade_1pt25percent_mph_ach, grade_1p25_simdrive = get_grade_perf(
-        ONE_POINT_TWENTY_FIVE_GRADE
+        test_vehicle,
+        scenario,
+        ONE_POINT_TWENTY_FIVE_GRADE,
+        ess_init_soc,
+        early_stop,
+        verbose,
     )
-    if scenario is not None and set_weight_to_max_kg:
-        run_scenario.reset_vehicle_weight(analysis_vehicle)
-        kg_after = analysis_vehicle.veh_kg
-        assert (
-            kg_after == kg_before
-        ), f"total vehicle kg (veh_kg) kg_after must be equal to kg_before: kg_after/kg_before {round(kg_after,4)}/{round(kg_before, 4)}"
 
     return (
         grade_6percent_mph_ach,
@@ -135,6 +533,85 @@ def get_gradeability(
     )
 
 
+def get_gradeability_screened(
+    analysis_vehicle: fastsim.vehicle.Vehicle,
+    scenario: run_scenario.Scenario,
+    verbose: bool = False,
+    ess_init_soc: float = None,
+    set_weight_to_max_kg: bool = True,
+    early_stop: bool = False,
+    screening_tol: float = 0.05,
+    screening: dict = None,
+    agreement: GradeabilityAgreement = None,
+) -> Tuple[float, float, fastsim.simdrive.SimDrive, fastsim.simdrive.SimDrive]:
+    """
+    This function returns the estimated gradeability test speeds from screen_gradeability when the vehicle is far from \
+        the targets, and falls back to get_gradeability otherwise. Fallbacks of estimable vehicles are recorded in \
+        agreement.
+
+    Args:
+        analysis_vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object for analysis vehicle
+        scenario (run_scenario.Scenario): Scenario object for current selection
+        verbose (bool, optional): if True, prints process steps and logs agreement stats. Defaults to False.
+        ess_init_soc (float, optional): ESS Initial SOC override, electrified vehicles with an override are simulated. Defaults to None.
+        set_weight_to_max_kg (bool, optional): if True, tests at GVWR plus gvwr_credit_kg. Defaults to True.
+        early_stop (bool, optional): passed to get_gradeability. Defaults to False.
+        screening_tol (float, optional): relative distance to target within which to simulate. Defaults to 0.05.
+        screening (dict, optional): screening of the vehicle, e.g. get_screening_row of the screening of its \
+            population, screened with screening_tol if None. Defaults to None.
+        agreement (GradeabilityAgreement, optional): record of estimated and simulated tests, e.g. of the \
+            optimization problem. Defaults to None, not recorded.
+
+    Returns:
+        grade_6percent_mph_ach (float): Achieved speed on 6% grade test
+        grade_1pt25percent_mph_ach (float): Achieved speed on 1.25% grade test
+        grade_6_simdrive (fastsim.simdrive.SimDrive): FASTSim SimDrive for 6% grade, None if estimated
+        grade_1p25_simdrive (fastsim.simdrive.SimDrive): FASTSim SimDrive for 1.25% grade, None if estimated
+    """
+    if screening is None:
+        screening = screen_gradeability(
+            [analysis_vehicle], scenario, screening_tol, set_weight_to_max_kg
+        )
+    is_estimable = screening["is_estimable"][0] and (
+        ess_init_soc is None or analysis_vehicle.veh_pt_type == gl.CONV
+    )
+    grade_6percent_mph_ach = float(screening["grade_6_mph_ach"][0])
+    grade_1pt25percent_mph_ach = float(screening["grade_1_25_mph_ach"][0])
+
+    if is_estimable and not screening["needs_simulation"][0]:
+        if agreement is not None:
+            agreement.add(simulated=False)
+        return grade_6percent_mph_ach, grade_1pt25percent_mph_ach, None, None
+
+    grade_results = get_gradeability(
+        analysis_vehicle,
+        scenario,
+        verbose=verbose,
+        ess_init_soc=ess_init_soc,
+        set_weight_to_max_kg=set_weight_to_max_kg,
+        early_stop=early_stop,
+    )
+    if agreement is not None:
+        agreement.add(
+            simulated=True,
+            comparisons=(
+                [
+                    (SIX_GRADE, grade_6percent_mph_ach, grade_results[0]),
+                    (
+                        ONE_POINT_TWENTY_FIVE_GRADE,
+                        grade_1pt25percent_mph_ach,
+                        grade_results[1],
+                    ),
+                ]
+                if is_estimable
+                else []
+            ),
+        )
+        if verbose:
+            agreement.log_stats()
+    return grade_results
+
+
 # %%
 
 if __name__ == "__main__":
@@ -0,0 +1,354 @@
+"""Module for reusing FASTSim Rust vehicle and cycle structures across SimDrive runs."""
+
+# %%
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import fastsim
+import numpy as np
+from fastsim import vehicle as fsvehicle
+
+from t3co.run import Global as gl
+
+# FASTSim vehicle fields copied by Vehicle.to_rust(), the remaining fields are derived by RustVehicle.set_derived()
+VEHICLE_INPUT_KEYS = [
+    key
+    for key in fsvehicle.keys_and_types.keys()
+    if key not in fsvehicle.KEYS_TO_REMOVE
+]
+# vehicle fields that cannot be set on a RustVehicle in place, the Rust vehicle is rebuilt when these change.
+# RustVehicle.set_derived() does not rederive efficiency arrays (fc_eff_array, ...) or component masses from these.
+REBUILD_KEYS = [
+    "props",
+    "fc_eff_map",
+    "fc_pwr_out_perc",
+    "fc_peak_eff_override",
+    "mc_eff_map",
+    "mc_pwr_out_perc",
+    "mc_peak_eff_override",
+    "veh_override_kg",
+]
+
+CYCLE_KEYS = ["time_s", "mps", "grade", "road_type"]
+
+# least recently used SimDriveContext objects, keyed by vehicle prototype, cycle, and simulation parameters
+MAX_SIM_DRIVE_CONTEXTS = 64
+SIM_DRIVE_CONTEXTS = OrderedDict()
+SIM_DRIVE_CONTEXTS_LOCK = threading.Lock()
+
+
+def get_vehicle_input(vehicle: fastsim.vehicle.Vehicle, key: str):
+    """
+    This function gets a vehicle input field in the form passed to RustVehicle by Vehicle.to_rust()
+
+    Args:
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
+        key (str): vehicle field name
+
+    Returns:
+        value: field value, arrays are copied
+    """
+    value = getattr(vehicle, key)
+    if key == "veh_override_kg" and value == 0.0:
+        return None
+    if key == "mc_eff_map" and value is None:
+        return np.zeros(11)
+    if isinstance(value, (np.ndarray, list)):
+        return np.array(value)
+    if key == "props":
+        return tuple(
+            getattr(value, prop)
+            for prop in [
+                "air_density_kg_per_m3",
+                "a_grav_mps2",
+                "kwh_per_gge",
+                "fuel_rho_kg__L",
+                "fuel_afr_stoich",
+            ]
+        )
+    return value
+
+
+def is_equal(a, b) -> bool:
+    """
+    This function compares two vehicle field values
+
+    Args:
+        a: first value
+        b: second value
+
+    Returns:
+        equal (bool): True if the values are equal
+    """
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return (
+            isinstance(a, np.ndarray)
+            and isinstance(b, np.ndarray)
+            and a.shape == b.shape
+            and np.array_equal(a, b, equal_nan=a.dtype.kind == "f")
+        )
+    if isinstance(a, float) and isinstance(b, float) and np.isnan(a) and np.isnan(b):
+        return True
+    return type(a) is type(b) and a == b
+
+
+def get_cycle_key(cyc: fastsim.cycle.Cycle) -> tuple:
+    """
+    This function gets a hashable key of a cycle's name and contents
+
+    Args:
+        cyc (fastsim.cycle.Cycle): FASTSim Cycle or RustCycle object
+
+    Returns:
+        cycle_key (tuple): cycle name and hashes of the cycle arrays
+    """
+    return (cyc.name,) + tuple(
+        hash(np.asarray(getattr(cyc, key)).tobytes()) for key in CYCLE_KEYS
+    )
+
+
+class SimDriveContext:
+    """
+    Class for a reusable FASTSim simulation context of one vehicle prototype and one cycle. The Rust cycle, \
+        simulation parameters, and physical properties are built once; the Rust vehicle is kept alive and only \
+        the vehicle fields that changed since the previous run are applied to it, skipping Vehicle.to_rust(). \
+        get_sim_drive() is thread-safe; the returned RustSimDrive objects are independent of the context.
+    """
+
+    def __init__(self, cyc: fastsim.cycle.Cycle, sim_params: dict = None) -> None:
+        """
+        This constructor converts the cycle to Rust
+
+        Args:
+            cyc (fastsim.cycle.Cycle): FASTSim Cycle or RustCycle object
+            sim_params (dict, optional): Dictionary of RustSimDriveParams overrides. Defaults to None.
+        """
+        if isinstance(cyc, fastsim.fastsimrust.RustCycle):
+            self.rust_cyc = cyc.copy()
+        else:
+            self.rust_cyc = cyc.to_rust()
+        self.sim_params_overrides = dict(sim_params or {})
+        self.sim_params = None
+        self.props = None
+        self.rust_veh = None
+        self.veh_inputs = {}
+        self.n_runs = 0
+        self.n_rebuilds = 0
+        self.n_updates = 0
+        self.lock = threading.Lock()
+
+    def rebuild_vehicle(self, vehicle: fastsim.vehicle.Vehicle) -> None:
+        """
+        This method converts the vehicle to Rust with Vehicle.to_rust()
+
+        Args:
+            vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
+        """
+        self.rust_veh = vehicle.to_rust()
+        self.veh_inputs = {
+            key: get_vehicle_input(vehicle, key) for key in VEHICLE_INPUT_KEYS
+        }
+        self.sim_params = None
+        self.props = None
+        self.n_rebuilds += 1
+
+    def sync_vehicle(self, vehicle: fastsim.vehicle.Vehicle) -> list:
+        """
+        This method applies the vehicle fields that changed since the previous run to the Rust vehicle in place \
+            and re-derives it. The Rust vehicle is rebuilt on the first run or if a field cannot be set in place.
+
+        Args:
+            vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
+
+        Returns:
+            changed_keys (list): List of vehicle fields that changed
+        """
+        if self.rust_veh is None:
+            self.rebuild_vehicle(vehicle)
+            return VEHICLE_INPUT_KEYS
+
+        veh_inputs = {
+            key: get_vehicle_input(vehicle, key) for key in VEHICLE_INPUT_KEYS
+        }
+        changed_keys = [
+            key
+            for key in VEHICLE_INPUT_KEYS
+            if not is_equal(veh_inputs[key], self.veh_inputs[key])
+        ]
+        if len(changed_keys) == 0:
+            return changed_keys
+        if set(changed_keys) & set(REBUILD_KEYS):
+            self.rebuild_vehicle(vehicle)
+            return changed_keys
+
+        try:
+            for key in changed_keys:
+                value = veh_inputs[key]
+                setattr(
+                    self.rust_veh,
+                    key,
+                    list(value) if isinstance(value, np.ndarray) else value,
+                )
+            self.rust_veh.set_derived()
+        except (AttributeError, TypeError, ValueError):
+            self.rebuild_vehicle(vehicle)
+            return changed_keys
+        self.veh_inputs = veh_inputs
+        self.n_updates += 1
+        return changed_keys
+
+    def get_sim_drive(
+        self, vehicle: fastsim.vehicle.Vehicle
+    ) -> fastsim.simdrive.RustSimDrive:
+        """
+        This method returns a RustSimDrive in its initial state for the current vehicle state. Each call returns \
+            a new RustSimDrive so results of previous runs are not overwritten.
+
+        Args:
+            vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
+
+        Returns:
+            sim_drive (fastsim.simdrive.RustSimDrive): FASTSim RustSimDrive object, not yet simulated
+        """
+        with self.lock:
+            self.sync_vehicle(vehicle)
+            sim_drive = fastsim.fastsimrust.RustSimDrive(self.rust_cyc, self.rust_veh)
+            if self.sim_params is None:
+                sim_params = sim_drive.sim_params
+                sim_params.reset_orphaned()
+                for key, value in self.sim_params_overrides.items():
+                    setattr(sim_params, key, value)
+                props = sim_drive.props
+                props.reset_orphaned()
+                props.kwh_per_gge = gl.get_kwh_per_gge()
+                self.sim_params, self.props = sim_params, props
+            sim_drive.sim_params = self.sim_params
+            sim_drive.props = self.props
+            self.n_runs += 1
+        return sim_drive
+
+
+def get_sim_drive_context(
+    cyc: fastsim.cycle.Cycle,
+    vehicle: fastsim.vehicle.Vehicle,
+    sim_params: dict = None,
+) -> SimDriveContext:
+    """
+    This function gets the SimDriveContext of a (vehicle prototype, cycle, simulation parameters) combination from \
+        SIM_DRIVE_CONTEXTS, creating it on a miss. The vehicle prototype is identified by scenario_name, selection, \
+        and veh_override_kg, so empty and test weight snapshots of a vehicle keep separate Rust vehicles.
+
+    Args:
+        cyc (fastsim.cycle.Cycle): FASTSim Cycle or RustCycle object
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
+        sim_params (dict, optional): Dictionary of RustSimDriveParams overrides. Defaults to None.
+
+    Returns:
+        context (SimDriveContext): simulation context
+    """
+    sim_params = sim_params or {}
+    key = (
+        str(vehicle.scenario_name),
+        str(vehicle.selection),
+        str(get_vehicle_input(vehicle, "veh_override_kg")),
+        get_cycle_key(cyc),
+        tuple(sorted(sim_params.items())),
+    )
+    with SIM_DRIVE_CONTEXTS_LOCK:
+        if key in SIM_DRIVE_CONTEXTS:
+            SIM_DRIVE_CONTEXTS.move_to_end(key)
+        else:
+            SIM_DRIVE_CONTEXTS[key] = SimDriveContext(cyc, sim_params)
+            if len(SIM_DRIVE_CONTEXTS) > MAX_SIM_DRIVE_CONTEXTS:
+                SIM_DRIVE_CONTEXTS.popitem(last=False)
+        return SIM_DRIVE_CONTEXTS[key]
+
+
+def get_default_init_soc(vehicle: fastsim.vehicle.Vehicle) -> float:
+    """
+    This function gets the initial SOC that RustSimDrive.sim_drive() uses when init_soc is not provided, \
+        for non-HEV powertrains
+
+    Args:
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
+
+    Returns:
+        init_soc (float): initial SOC
+    """
+    assert (
+        vehicle.veh_pt_type != gl.HEV
+    ), "HEV initial SOC is found by SOC balancing in sim_drive()"
+    if vehicle.veh_pt_type == gl.CONV:
+        return (vehicle.max_soc + vehicle.min_soc) / 2.0
+    return vehicle.max_soc
+
+
+def sim_drive_walk_early_stop(
+    sim_drive: fastsim.simdrive.RustSimDrive,
+    vehicle: fastsim.vehicle.Vehicle,
+    init_soc: float = None,
+    stop_speeds_mph: list = None,
+    stop_at_plateau: bool = False,
+) -> bool:
+    """
+    This function steps a RustSimDrive through its cycle like sim_drive_walk() and stops as soon as the remaining \
+        steps cannot change the caller's results. It is meant for the constant-target accel and grade test cycles:
+    - stop_speeds_mph: stop once achieved speed reaches the highest speed, the achieved speeds so far are partitioned \
+        about every speed (so np.interp on the simulated steps matches the full cycle), and power is not limited by \
+        ESS energy for the rest of the cycle, so achieved speed cannot fall back below the speeds
+    - stop_at_plateau: for CONV vehicles, stop once speed, fuel converter and fuel storage power are exactly \
+        unchanged from the previous step, after which every remaining step repeats it
+
+    Results of the simulated steps are identical to a full run; arrays after sim_drive.i are left at their initial values.
+
+    Args:
+        sim_drive (fastsim.simdrive.RustSimDrive): FASTSim RustSimDrive object, not yet simulated
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object of sim_drive
+        init_soc (float, optional): initial SOC, if None uses get_default_init_soc. Defaults to None.
+        stop_speeds_mph (list, optional): target speeds of the caller. Defaults to None.
+        stop_at_plateau (bool, optional): if True, stops at a steady state of CONV vehicles. Defaults to False.
+
+    Returns:
+        stopped (bool): True if the run stopped before the end of the cycle
+    """
+    if init_soc is None:
+        init_soc = get_default_init_soc(vehicle)
+    time_s = np.array(sim_drive.cyc.time_s)
+    n_steps = len(time_s)
+    stop_at_plateau = stop_at_plateau and vehicle.veh_pt_type == gl.CONV
+
+    sim_drive.init_for_step(init_soc)
+    stopped = False
+    while sim_drive.i < n_steps:
+        sim_drive.sim_drive_step()
+        i = sim_drive.i - 1
+        if sim_drive.i == n_steps:
+            break
+        if stop_speeds_mph and sim_drive.mph_ach[i] >= max(stop_speeds_mph):
+            mph_ach = np.array(sim_drive.mph_ach)[: i + 1]
+            partitioned = all(
+                np.all(mph_ach[np.argmax(mph_ach > speed) :] > speed)
+                or not np.any(mph_ach > speed)
+                for speed in stop_speeds_mph
+            )
+            ess_limited = vehicle.ess_max_kwh > 0 and (
+                sim_drive.soc[i] - vehicle.min_soc
+            ) * vehicle.ess_max_kwh < vehicle.ess_max_kw * (
+                time_s[-1] - time_s[i]
+            ) / 3.6e3
+            if partitioned and not ess_limited:
+                stopped = True
+                break
+        if (
+            stop_at_plateau
+            and i >= 2
+            and sim_drive.mps_ach[i] == sim_drive.mps_ach[i - 1]
+            and sim_drive.fc_kw_out_ach[i] == sim_drive.fc_kw_out_ach[i - 1]
+            and sim_drive.fs_kw_out_ach[i] == sim_drive.fs_kw_out_ach[i - 1]
+        ):
+            stopped = True
+            break
+    sim_drive.set_post_scalars()
+    return stopped
@@ -39,12 +39,6 @@ FC_EFF_TYPES = {
 maxGvwrKg = 0
 evGVWRAllowanceLbs = 0
 
-# store reference to range cycle used for optimization
-global_opt_range_cycle = None
-
-# store scenario_name of current run
-vocation_scenario = None
-
 kwh_per_gge = 33.7
 
 DieselGalPerGasGal = 0.887  # energy equivalent gallons of diesel per 1 gallon gas
@@ -69,9 +63,7 @@ def get_kwh_per_gge():
 # --------------------------- ###  directories and files ### ----------------------------
 
 
-TCO_INTERMEDIATES = None
-TCO_RESULTS = None
-TCO_RES_FIGS = None
+# TCO output directories are set per analysis, see analysis_context.AnalysisContext
 
 #  ## resources
 
@@ -87,42 +79,6 @@ T2COBENCHMARKDATADIR = OPTIMIZATION_AND_TCO_RCRS / "benchmarkdata"
 T3CO_INPUTS_DIR = OPTIMIZATION_AND_TCO_RCRS / "inputs"
 
 
-def set_tco_intermediates():
-    """
-    This function sets path for TCO_INTERMEDIATES to save tsv files
-    """
-    global TCO_INTERMEDIATES
-
-    # ./t3co/resources/f'vehicles/{vocation_scenario}/tco/tco_intermediates'
-    TCO_INTERMEDIATES = (
-        OPTIMIZATION_AND_TCO_RCRS
-        / f"vehicles/{vocation_scenario}/tco/tco_intermediates"
-    )
-    if not TCO_INTERMEDIATES.exists():
-        TCO_INTERMEDIATES.mkdir(parents=True)
-
-
-def set_tco_results():
-    """
-    This function sets path for TCO_RESULTS
-    """
-    global TCO_RESULTS
-    # ./t3co/resources/f'vehicles/{vocation_scenario}/tco/tco_results'
-    TCO_RESULTS = (
-        OPTIMIZATION_AND_TCO_RCRS / f"vehicles/{vocation_scenario}/tco/tco_results"
-    )
-    if not TCO_RESULTS.exists():
-        TCO_RESULTS.mkdir(parents=True)
-
-    global TCO_RES_FIGS
-    # ./t3co/resources/f'vehicles/{vocation_scenario}/result_figures/'
-    TCO_RES_FIGS = (
-        OPTIMIZATION_AND_TCO_RCRS / f"vehicles/{vocation_scenario}/result_figures/"
-    )
-    if not TCO_RES_FIGS.exists():
-        TCO_RES_FIGS.mkdir(parents=True)
-
-
 OPTIMIZATION_RESOURCES_AUX = OPTIMIZATION_AND_TCO_RCRS / "auxiliary"
 # FASTSim and Scenario input files
 FASTSIM_INPUTS_FILE = "FASTSimInputsHeader.csv"
@@ -143,7 +99,6 @@ MOO_KNOB_SWEEP_PLOTS_DIR = (
 )
 
 # TCO input files
-write_files = False
 ANN_TRAVEL_TSV = "annual-travel.tsv"
 EMISSION_RATE_TSV = "emission-rate.tsv"
 FUEL_EFF_TSV = "fuel-efficiency.tsv"
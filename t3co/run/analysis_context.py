@@ -0,0 +1,78 @@
+"""Module for the analysis context, the settings and output directories shared by the selections of an analysis. \
+    Contexts are immutable and passed through run_scenario and tco_analysis instead of being set as Global module \
+    variables, so selections of different analyses can be evaluated concurrently in one process."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from t3co.run import Global as gl
+
+# output directories created by this process
+CREATED_DIRS = set()
+CREATED_DIRS_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class AnalysisContext:
+    """
+    This class holds the vocation-scenario of an analysis and the directories of its TCO outputs. It cannot be modified, \
+        so one context can be shared by many threads.
+    """
+
+    vocation_scenario: str = None
+    write_files: bool = False
+    tco_intermediates: Path = None
+    tco_results: Path = None
+    tco_res_figs: Path = None
+
+
+# context without file outputs, used if no context is passed
+DEFAULT_CONTEXT = AnalysisContext()
+
+
+def make_dirs(*dirs: Path) -> None:
+    """
+    This function creates output directories, once per process
+
+    Args:
+        dirs (Path): directory paths
+    """
+    with CREATED_DIRS_LOCK:
+        for dir_path in dirs:
+            if dir_path not in CREATED_DIRS:
+                dir_path.mkdir(parents=True, exist_ok=True)
+                CREATED_DIRS.add(dir_path)
+
+
+def create_analysis_context(
+    vocation_scenario: str = None,
+    write_files: bool = False,
+    resources_dir: str | Path = gl.OPTIMIZATION_AND_TCO_RCRS,
+) -> AnalysisContext:
+    """
+    This function creates the AnalysisContext of a vocation-scenario and its TCO output directories, \
+        resources_dir/vehicles/{vocation_scenario}/tco/tco_intermediates, .../tco/tco_results, and .../result_figures
+
+    Args:
+        vocation_scenario (str, optional): vocation-scenario name. Defaults to None, no output directories.
+        write_files (bool, optional): if True, save the TCO intermediate dataframes to tco_intermediates. Defaults to False.
+        resources_dir (str | Path, optional): parent directory of the vehicles output directory. Defaults to gl.OPTIMIZATION_AND_TCO_RCRS.
+
+    Returns:
+        context (AnalysisContext): analysis context
+    """
+    if vocation_scenario is None:
+        return AnalysisContext(write_files=write_files)
+    vocation_dir = Path(resources_dir) / f"vehicles/{vocation_scenario}"
+    context = AnalysisContext(
+        vocation_scenario=vocation_scenario,
+        write_files=write_files,
+        tco_intermediates=vocation_dir / "tco/tco_intermediates",
+        tco_results=vocation_dir / "tco/tco_results",
+        tco_res_figs=vocation_dir / "result_figures",
+    )
+    make_dirs(context.tco_intermediates, context.tco_results, context.tco_res_figs)
+    return context
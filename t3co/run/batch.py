@@ -0,0 +1,264 @@
+"""Module for evaluating many vehicle and scenario selections in-process, for applications that embed T3CO. Inputs \
+    are dataframes with the columns of the vehicle and scenario input files, and results are returned as a dataframe. \
+    No results, logs, or TCO files are written unless an AnalysisContext with write_files is passed."""
+
+from __future__ import annotations
+
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastsim import cycle
+
+from t3co.run import analysis_context, cycle_index, run_scenario
+
+# result columns from the discounted cost categories of tco_analysis.discounted_costs, as in sweep.py results
+DISCOUNTED_COST_COLUMNS = {
+    "fueling_dwell_labor_cost_dol": "fueling labor cost",
+    "fueling_downtime_oppy_cost_dol": "fueling downtime cost",
+    "mr_downtime_oppy_cost_dol": "MR downtime cost",
+    "insurance_cost_dol": "insurance",
+    "residual_cost_dol": "residual cost",
+    "total_fuel_cost_dol": "Fuel",
+    "total_maintenance_cost_dol": "maintenance",
+}
+
+# inputs of the batch evaluated by this pool worker, see init_batch
+BATCH_INPUTS = {}
+
+
+def get_selection_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    This function gets an input dataframe with a selection column, e.g. from the sweep.py input dataframes indexed by \
+        selection
+
+    Args:
+        df (pd.DataFrame): vehicle or scenario input dataframe
+
+    Returns:
+        df (pd.DataFrame): input dataframe with a selection column
+    """
+    if "selection" in df.columns:
+        return df
+    assert (
+        df.index.name == "selection"
+    ), "input dataframes need a selection column or index"
+    return df.reset_index()
+
+
+def get_rust_cycles(cycles: dict) -> dict:
+    """
+    This function converts in-memory drive cycles to Rust cycles and adds their statistics to the cycle metadata index, \
+        see run_scenario.get_design_cycle_metadata
+
+    Args:
+        cycles (dict): drive cycles by drivecycle file name as used in the scenario drive_cycle column, \
+            e.g. regional_haul.csv. Values are Rust cycles, FASTSim cycles, or dataframes or dicts with the columns \
+            of the drivecycle files, e.g. cycSecs and cycMps or time_s and mps.
+
+    Returns:
+        rust_cycles (dict): Rust cycles by drivecycle file name
+    """
+    rust_cycles = {}
+    for name, cyc in cycles.items():
+        if isinstance(cyc, pd.DataFrame):
+            cyc = cyc.to_dict("list")
+        if isinstance(cyc, dict):
+            cyc = cycle.Cycle.from_dict(dict(cyc, name=Path(name).stem))
+        if isinstance(cyc, cycle.Cycle):
+            cyc = cyc.to_rust()
+        cycle_hash = cycle_index.get_cycle_hash(cyc)
+        cycle_index.add_to_index(
+            cycle_index.get_in_memory_path(name),
+            {
+                "name": name,
+                "hash": cycle_hash,
+                "cycle_hash": cycle_hash,
+                **cycle_index.calc_cycle_metadata(cyc),
+            },
+        )
+        rust_cycles[name] = cyc
+    return rust_cycles
+
+
+def get_result_row(out: dict) -> dict:
+    """
+    This function gets the results of a selection from the run_scenario.vehicle_scenario_sweep outputs, with the \
+        column names of the sweep.py results
+
+    Args:
+        out (dict): output dictionary of run_scenario.vehicle_scenario_sweep
+
+    Returns:
+        row (dict): Dictionary of results
+    """
+    disc_cost_agg = (
+        out["discounted_costs_df"]
+        .groupby("Category")
+        .sum(numeric_only=True)["Discounted Cost [$]"]
+    )
+    row = {
+        "veh_pt_type": out["vehicle"].veh_pt_type,
+        "discounted_tco_dol": out["disc_cost"],
+        "msrp_total_dol": out["veh_msrp_set"]["msrp"],
+        "range_ach_mi": out["primary_fuel_range_mi"],
+        "min_speed_at_6pct_grade_in_5min_ach_mph": out["grade_6_mph_ach"],
+        "min_speed_at_1p25pct_grade_in_5min_ach_mph": out["grade_1_25_mph_ach"],
+        "max_time_0_to_60mph_at_gvwr_ach_s": out["zero_to_60_loaded"],
+        "max_time_0_to_30mph_at_gvwr_ach_s": out["zero_to_30_loaded"],
+        "payload_cap_cost_multiplier": out["veh_opp_cost_set"][
+            "payload_cap_cost_multiplier"
+        ],
+        "discounted_downtime_oppy_cost_dol": out["opportunity_cost_set"][
+            "discounted_downtime_oppy_cost_dol"
+        ],
+        "payload_capacity_cost_dol": out["opportunity_cost_set"][
+            "payload_capacity_cost_dol"
+        ],
+    }
+    for column, category in DISCOUNTED_COST_COLUMNS.items():
+        row[column] = disc_cost_agg.get(category, np.nan)
+    row.update(out["mpgge"])
+    return row
+
+
+def evaluate_selection(sel: int | str, batch_inputs: dict) -> dict:
+    """
+    This function evaluates the vehicle and scenario of a selection
+
+    Args:
+        sel (int | str): selection number
+        batch_inputs (dict): Dictionary of vehicles_df, scenarios_df, config, cycles, context, raise_errors, \
+            and sweep_kwargs, see evaluate_batch
+
+    Returns:
+        row (dict): Dictionary of selection, scenario name, results, and error message, None if there was no error
+    """
+    scenarios_df = batch_inputs["scenarios_df"]
+    base_sel = int(float(str(sel).split("_")[0]))
+    scenario_names = scenarios_df.loc[
+        scenarios_df["selection"] == base_sel, "scenario_name"
+    ]
+    row = {
+        "selection": sel,
+        "scenario_name": scenario_names.iloc[0] if len(scenario_names) else None,
+        "error": None,
+    }
+    try:
+        vehicle = run_scenario.get_vehicle(sel, batch_inputs["vehicles_df"])
+        scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+            sel,
+            scenarios_df,
+            a_vehicle=vehicle,
+            config=batch_inputs["config"],
+            cycles=batch_inputs["cycles"],
+        )
+        out = run_scenario.vehicle_scenario_sweep(
+            vehicle,
+            scenario,
+            range_cyc,
+            context=batch_inputs["context"],
+            **batch_inputs["sweep_kwargs"],
+        )
+        row.update(get_result_row(out))
+    except Exception as err:
+        if batch_inputs["raise_errors"]:
+            raise
+        row["error"] = f"{type(err).__name__}: {err}"
+    return row
+
+
+def init_batch(batch_inputs: dict) -> None:
+    """
+    This function sets the batch inputs of a pool worker, so they are sent to each worker once
+
+    Args:
+        batch_inputs (dict): batch inputs, see evaluate_selection
+    """
+    global BATCH_INPUTS
+    BATCH_INPUTS = dict(batch_inputs)
+    # Rust cycles cannot be pickled, so the workers convert the cycles of the parent process again
+    if batch_inputs["cycles"] is not None:
+        BATCH_INPUTS["cycles"] = get_rust_cycles(batch_inputs["cycles"])
+
+
+def evaluate_batch_selection(sel: int | str) -> dict:
+    """
+    This function evaluates a selection with the batch inputs of this pool worker
+
+    Args:
+        sel (int | str): selection number
+
+    Returns:
+        row (dict): Dictionary of results, see evaluate_selection
+    """
+    return evaluate_selection(sel, BATCH_INPUTS)
+
+
+def evaluate_batch(
+    vehicles_df: pd.DataFrame,
+    scenarios_df: pd.DataFrame,
+    selections: list = None,
+    config: run_scenario.Config = None,
+    cycles: dict = None,
+    n_workers: int = 1,
+    context: analysis_context.AnalysisContext = None,
+    as_arrow: bool = False,
+    raise_errors: bool = False,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    This function evaluates the TCO and performance of many vehicle and scenario selections without input or result \
+        files. Vehicles, scenarios, and cycles are built from the dataframes and cycles, and drive cycles not in cycles \
+        are loaded from the drive cycle files, once per process.
+
+    Args:
+        vehicles_df (pd.DataFrame): dataframe with the columns of the vehicle model assumptions input file
+        scenarios_df (pd.DataFrame): dataframe with the columns of the scenario assumptions input file
+        selections (list, optional): selections to evaluate. Defaults to None, all selections of vehicles_df.
+        config (run_scenario.Config, optional): Config object with scenario attribute overrides. Defaults to None, \
+            no overrides.
+        cycles (dict, optional): in-memory drive cycles by drivecycle file name, see get_rust_cycles. Defaults to None.
+        n_workers (int, optional): number of worker processes. Defaults to 1, evaluate in this process.
+        context (analysis_context.AnalysisContext, optional): analysis context, e.g. to save TCO files. Defaults to None.
+        as_arrow (bool, optional): if True, return a pyarrow Table, requires pyarrow. Defaults to False.
+        raise_errors (bool, optional): if True, raise errors of a selection instead of reporting them in the error \
+            column. Defaults to False.
+        **kwargs: keyword arguments of run_scenario.vehicle_scenario_sweep, e.g. get_accel or early_stop
+
+    Returns:
+        results_df (pd.DataFrame): Dataframe with one row of results per selection, in the order of selections
+    """
+    vehicles_df = get_selection_df(vehicles_df)
+    scenarios_df = get_selection_df(scenarios_df)
+    if selections is None:
+        selections = vehicles_df["selection"].tolist()
+    batch_inputs = {
+        "vehicles_df": vehicles_df,
+        "scenarios_df": scenarios_df,
+        "config": config,
+        "cycles": get_rust_cycles(cycles) if cycles is not None else None,
+        "context": context,
+        "raise_errors": raise_errors,
+        "sweep_kwargs": kwargs,
+    }
+
+    if n_workers > 1 and len(selections) > 1:
+        # Rust cycles cannot be pickled, workers convert the cycles again, see init_batch
+        batch_inputs["cycles"] = cycles
+        with Pool(
+            processes=min(n_workers, len(selections)),
+            initializer=init_batch,
+            initargs=(batch_inputs,),
+        ) as pool:
+            rows = pool.map(evaluate_batch_selection, selections, chunksize=1)
+    else:
+        rows = [evaluate_selection(sel, batch_inputs) for sel in selections]
+
+    results_df = pd.DataFrame(rows)
+    if as_arrow:
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(results_df, preserve_index=False)
+    return results_df
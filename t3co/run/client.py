@@ -0,0 +1,208 @@
+"""Module for the client of the local TCO evaluation server, see server. The client only uses the standard library, \
+    so what-if tools can query a warm server without importing FASTSim. Run as a script to benchmark the latency of \
+    a running server."""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import socket
+import statistics
+import time
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# timeout [s] of a request, all evaluations of a request are answered in one response
+REQUEST_TIMEOUT_S = 600
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    This class is an HTTP connection over a Unix socket
+    """
+
+    def __init__(self, socket_path: str, timeout: float = REQUEST_TIMEOUT_S):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(str(self.socket_path))
+
+
+class EvaluationClient:
+    """
+    This class sends JSON requests to a local TCO evaluation server on a TCP port or a Unix socket
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        socket_path: str = None,
+        timeout: float = REQUEST_TIMEOUT_S,
+    ):
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def request(self, method: str, path: str, body: dict = None) -> dict:
+        """
+        This method sends a request to the server and returns its JSON response
+
+        Args:
+            method (str): HTTP method, GET or POST
+            path (str): request path, e.g. /evaluate
+            body (dict, optional): JSON request body. Defaults to None.
+
+        Raises:
+            Exception: the server did not accept the request
+
+        Returns:
+            response (dict): JSON response
+        """
+        if self.socket_path is not None:
+            conn = UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        try:
+            conn.request(
+                method,
+                path,
+                body=None if body is None else json.dumps(body),
+                headers={"Content-Type": "application/json"},
+            )
+            http_response = conn.getresponse()
+            response = json.loads(http_response.read())
+        finally:
+            conn.close()
+        if http_response.status != 200:
+            raise Exception(
+                f"T3CO server error {http_response.status}: {response.get('error')}"
+            )
+        return response
+
+    def health(self) -> dict:
+        """
+        This method gets the status and cache sizes of the server
+
+        Returns:
+            health (dict): Dictionary of server status
+        """
+        return self.request("GET", "/health")
+
+    def evaluate(self, evaluations: list) -> list:
+        """
+        This method evaluates a batch of selections with vehicle and scenario field overrides, see \
+            server.evaluate
+
+        Args:
+            evaluations (list): list of evaluation dictionaries with selection and optional vehicle_overrides, \
+                scenario_overrides, and options
+
+        Returns:
+            results (list): list of result dictionaries, in the order of evaluations
+        """
+        return self.request("POST", "/evaluate", {"evaluations": evaluations})[
+            "results"
+        ]
+
+    def shutdown(self) -> None:
+        """
+        This method stops the server
+        """
+        self.request("POST", "/shutdown")
+
+    def wait_until_ready(self, timeout_s: float = 300, poll_s: float = 0.5) -> dict:
+        """
+        This method waits until the server accepts requests, e.g. after it warmed up its caches
+
+        Args:
+            timeout_s (float, optional): maximum wait time [s]. Defaults to 300.
+            poll_s (float, optional): time between connection attempts [s]. Defaults to 0.5.
+
+        Raises:
+            TimeoutError: the server did not start within timeout_s
+
+        Returns:
+            health (dict): Dictionary of server status
+        """
+        start = time.perf_counter()
+        while True:
+            try:
+                return self.health()
+            except OSError:
+                if time.perf_counter() - start > timeout_s:
+                    raise TimeoutError(f"T3CO server not ready after {timeout_s} s")
+                time.sleep(poll_s)
+
+
+def benchmark_latency(
+    client: EvaluationClient, evaluations: list, n_repeats: int = 10
+) -> dict:
+    """
+    This function measures the latency of evaluating a batch of selections on a running server
+
+    Args:
+        client (EvaluationClient): client of the server
+        evaluations (list): list of evaluation dictionaries, see EvaluationClient.evaluate
+        n_repeats (int, optional): number of requests. Defaults to 10.
+
+    Returns:
+        latency (dict): Dictionary of the number of evaluations and requests and the min, median, mean, and max \
+            request latency [s]
+    """
+    latencies_s = []
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        client.evaluate(evaluations)
+        latencies_s.append(time.perf_counter() - start)
+    return {
+        "n_evaluations": len(evaluations),
+        "n_repeats": n_repeats,
+        "min_s": min(latencies_s),
+        "median_s": statistics.median(latencies_s),
+        "mean_s": statistics.mean(latencies_s),
+        "max_s": max(latencies_s),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="CLIENT",
+        description="""Benchmarks the latency of a running T3CO evaluation server, see server.py""",
+    )
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="server host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument(
+        "--socket", type=str, default=None, help="Unix socket path of the server"
+    )
+    parser.add_argument(
+        "--selections", type=int, nargs="+", default=[1], help="selections to evaluate"
+    )
+    parser.add_argument(
+        "--n-repeats", type=int, default=10, help="number of benchmark requests"
+    )
+    parser.add_argument(
+        "--tco-only",
+        action="store_true",
+        help="skip the acceleration and gradeability tests",
+    )
+    args = parser.parse_args()
+
+    options = (
+        {"get_accel": False, "get_accel_loaded": False, "get_gradability": False}
+        if args.tco_only
+        else {}
+    )
+    evaluations = [{"selection": sel, "options": options} for sel in args.selections]
+    client = EvaluationClient(args.host, args.port, args.socket)
+    print(json.dumps(client.wait_until_ready(), indent=2))
+    for result in client.evaluate(evaluations):
+        print(result["selection"], result.get("discounted_tco_dol"), result["error"])
+    print(json.dumps(benchmark_latency(client, evaluations, args.n_repeats), indent=2))
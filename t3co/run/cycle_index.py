@@ -0,0 +1,315 @@
+"""Module for the drive cycle cache and metadata index. Cycle files are parsed once per process, and cycle statistics \
+    are computed once per cycle file and stored in a JSON index in a cache folder next to the cycle files. The \
+    statistics of a design cycle are looked up by its file when the cycle is loaded, see \
+    run_scenario.get_design_cycle_metadata, and in-memory cycles are indexed by name under IN_MEMORY_CYCLES_DIR."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+import fastsim
+import numpy as np
+import pandas as pd
+from fastsim import cycle
+
+from t3co.run import Global as gl
+from t3co.utilities import file_keys
+
+# cache folder, created in the folder of the cycle files
+CYCLE_CACHE_DIR = ".t3co_cycle_cache"
+CYCLE_INDEX_FILE = "cycle_index.json"
+# bump when metadata fields change so stale index entries are recomputed
+CYCLE_INDEX_VERSION = 2
+# cycle arrays of the content hash of a loaded cycle, all arrays the cycle statistics are calculated from
+CYCLE_HASH_COLUMNS = ["time_s", "mps", "grade"]
+# folder of the index paths of in-memory cycles, see get_in_memory_path
+IN_MEMORY_CYCLES_DIR = "in_memory_cycles"
+
+# parsed Rust cycles, keyed by file_keys.get_file_key
+CYCLE_CACHE = {}
+# cycle metadata, keyed by resolved cycle file path
+CYCLE_METADATA_INDEX = {}
+# cycle folders whose JSON index has been read
+LOADED_INDEX_DIRS = set()
+
+
+def load_cycle(cyc_file_path: str | Path) -> fastsim.cycle.RustCycle:
+    """
+    This function loads the Rust cycle of a drivecycle file, parsing the file only once per process
+
+    Args:
+        cyc_file_path (str | Path): drivecycle file path
+
+    Returns:
+        cyc (fastsim.cycle.RustCycle): copy of the cached Rust cycle
+    """
+    file_key = file_keys.get_file_key(cyc_file_path)
+    if file_key not in CYCLE_CACHE:
+        CYCLE_CACHE[file_key] = cycle.Cycle.from_file(file_key[0]).to_rust()
+    # callers rename cycles, so they get their own copy
+    return CYCLE_CACHE[file_key].copy()
+
+
+def calc_cycle_metadata(cyc: fastsim.cycle.RustCycle) -> dict:
+    """
+    This function calculates the statistics of a cycle. trip_distance_mi and avg_speed_mph use the same arithmetic \
+        as run_scenario.get_scenario_and_cycle and tco_analysis.calc_discountedTCO did from the cycle arrays.
+
+    Args:
+        cyc (fastsim.cycle.RustCycle): Rust cycle
+
+    Returns:
+        metadata (dict): Dictionary of cycle statistics
+    """
+    time_s = np.array(cyc.time_s)
+    mps = np.array(cyc.mps)
+    grade = np.array(cyc.grade)
+    dist_m = np.array(cyc.dist_m)
+    duration_s = time_s[-1] - time_s[0]
+    return {
+        "n_points": len(time_s),
+        "duration_s": float(duration_s),
+        "distance_mi": float(dist_m.sum() * gl.m_to_mi),
+        # scenario.constant_trip_distance_mi; the last step of np.diff(time_s, append=0) is -time_s[-1], so this is \
+        # less than distance_mi for cycles that do not end at standstill
+        "trip_distance_mi": float(
+            sum(cyc.mph * np.diff(time_s, append=0)) / 3600
+        ),
+        # mean of the speed samples over the cycle duration
+        "avg_speed_mph": float(sum(cyc.mps) / max(cyc.time_s) * gl.mps_to_mph),
+        "max_speed_mph": float(np.max(cyc.mph)),
+        "idle_frac": float(
+            np.diff(time_s, prepend=time_s[0])[mps == 0].sum() / duration_s
+        ),
+        "avg_grade": float((grade * dist_m).sum() / max(dist_m.sum(), 1e-9)),
+        "max_grade": float(grade.max()),
+        "min_grade": float(grade.min()),
+        "elevation_gain_m": float(np.maximum(grade * dist_m, 0).sum()),
+    }
+
+
+def get_hash(cyc_file_path: str | Path) -> str:
+    """
+    This function gets the content hash of a cycle file
+
+    Args:
+        cyc_file_path (str | Path): drivecycle file path
+
+    Returns:
+        hash (str): SHA-256 hex digest of the file content
+    """
+    with open(cyc_file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def get_cycle_hash(cyc: fastsim.cycle.RustCycle) -> str:
+    """
+    This function gets the content hash of the arrays of a loaded cycle, which does not depend on the cycle name or \
+        the file it was loaded from
+
+    Args:
+        cyc (fastsim.cycle.RustCycle): Rust cycle
+
+    Returns:
+        cycle_hash (str): SHA-256 hex digest of the CYCLE_HASH_COLUMNS arrays
+    """
+    cycle_hash = hashlib.sha256()
+    for col in CYCLE_HASH_COLUMNS:
+        # converting the Rust arrays via lists is faster than via np.array
+        cycle_hash.update(
+            np.array(getattr(cyc, col).tolist(), dtype=np.float64).tobytes()
+        )
+    return cycle_hash.hexdigest()
+
+
+def get_in_memory_path(name: str) -> str:
+    """
+    This function gets the index path of an in-memory cycle, which is not written to a JSON index
+
+    Args:
+        name (str): drivecycle file name of the cycle, e.g. regional_haul.csv
+
+    Returns:
+        path (str): key of the cycle in CYCLE_METADATA_INDEX
+    """
+    return str(Path(IN_MEMORY_CYCLES_DIR) / name)
+
+
+def get_index_file(cycle_folder: str | Path) -> Path:
+    """
+    This function gets the JSON index file of a cycle folder
+
+    Args:
+        cycle_folder (str | Path): folder of the cycle files
+
+    Returns:
+        index_file (Path): JSON index file path
+    """
+    return Path(cycle_folder) / CYCLE_CACHE_DIR / CYCLE_INDEX_FILE
+
+
+def add_to_index(path: str, metadata: dict) -> None:
+    """
+    This function adds cycle metadata to the in-memory index
+
+    Args:
+        path (str): resolved cycle file path, or get_in_memory_path of an in-memory cycle
+        metadata (dict): cycle metadata
+    """
+    CYCLE_METADATA_INDEX[path] = metadata
+
+
+def read_index(cycle_folder: str | Path) -> None:
+    """
+    This function reads the JSON index of a cycle folder into the in-memory index, once per process
+
+    Args:
+        cycle_folder (str | Path): folder of the cycle files
+    """
+    index_file = get_index_file(cycle_folder)
+    if str(cycle_folder) in LOADED_INDEX_DIRS:
+        return
+    LOADED_INDEX_DIRS.add(str(cycle_folder))
+    if not index_file.exists():
+        return
+    with open(index_file) as f:
+        index = json.load(f)
+    if index.get("version") != CYCLE_INDEX_VERSION:
+        return
+    for path, metadata in index["cycles"].items():
+        if path not in CYCLE_METADATA_INDEX:
+            add_to_index(path, metadata)
+
+
+def write_index(cycle_folder: str | Path) -> None:
+    """
+    This function writes the metadata of the cycles of a folder to its JSON index. Cycle folders that cannot be \
+        written to, e.g. of an installed package, keep their index in memory only.
+
+    Args:
+        cycle_folder (str | Path): folder of the cycle files
+    """
+    cycle_folder = Path(cycle_folder).resolve()
+    index_file = get_index_file(cycle_folder)
+    index = {
+        "version": CYCLE_INDEX_VERSION,
+        "cycles": {
+            path: metadata
+            for path, metadata in CYCLE_METADATA_INDEX.items()
+            if Path(path).parent == cycle_folder
+        },
+    }
+    tmp_file = index_file.with_name(
+        index_file.name + f".{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        index_file.parent.mkdir(exist_ok=True)
+        with open(tmp_file, "w") as f:
+            json.dump(index, f, indent=4)
+        os.replace(tmp_file, index_file)
+    except OSError as err:
+        logging.getLogger(__name__).warning(
+            "cycle index not saved to %s: %s", index_file, err
+        )
+
+
+def get_cycle_metadata(
+    cyc_file_path: str | Path, cyc: fastsim.cycle.RustCycle = None, save: bool = True
+) -> dict:
+    """
+    This function gets the metadata of a cycle file from the index, calculating and saving it if the file is not \
+        indexed or was modified since
+
+    Args:
+        cyc_file_path (str | Path): drivecycle file path
+        cyc (fastsim.cycle.RustCycle, optional): Rust cycle of the file, loaded if None. Defaults to None.
+        save (bool, optional): if False, new metadata is not written to the JSON index yet, e.g. to write the \
+            index of a folder once. Defaults to True.
+
+    Returns:
+        metadata (dict): Dictionary of file name, file and cycle content hashes, and cycle statistics
+    """
+    path, mtime_ns, size = file_keys.get_file_key(cyc_file_path)
+    read_index(Path(path).parent)
+    metadata = CYCLE_METADATA_INDEX.get(path)
+    if (
+        metadata is not None
+        and metadata["mtime_ns"] == mtime_ns
+        and metadata["size"] == size
+    ):
+        return metadata
+
+    if cyc is None:
+        cyc = load_cycle(path)
+    metadata = {
+        "name": Path(path).name,
+        "hash": get_hash(path),
+        "cycle_hash": get_cycle_hash(cyc),
+        "mtime_ns": mtime_ns,
+        "size": size,
+        **calc_cycle_metadata(cyc),
+    }
+    add_to_index(path, metadata)
+    if save:
+        write_index(Path(path).parent)
+    return metadata
+
+
+def index_cycle_folder(cycle_folder: str | Path, pattern: str = "*.csv") -> pd.DataFrame:
+    """
+    This function gets the metadata of all cycle files of a folder, for screening cycles without simulating them. \
+        Only new or modified files are parsed.
+
+    Args:
+        cycle_folder (str | Path): folder of the cycle files
+        pattern (str, optional): glob pattern of cycle files. Defaults to "*.csv".
+
+    Returns:
+        index_df (pd.DataFrame): Dataframe with one row of metadata per cycle file
+    """
+    cycle_folder = Path(cycle_folder).resolve()
+    read_index(cycle_folder)
+    indexed = dict(CYCLE_METADATA_INDEX)
+    records = []
+    is_modified = False
+    for cyc_file_path in sorted(cycle_folder.glob(pattern)):
+        try:
+            metadata = get_cycle_metadata(cyc_file_path, save=False)
+        except Exception as err:
+            logging.getLogger(__name__).warning(
+                "skipping %s, not a drive cycle: %s", cyc_file_path, err
+            )
+            continue
+        is_modified = is_modified or indexed.get(str(cyc_file_path)) is not metadata
+        records.append(metadata)
+    # the index of the folder is written once for all new or modified files
+    if is_modified:
+        write_index(cycle_folder)
+    return pd.DataFrame(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        prog="CYCLE_INDEX",
+        description="""Indexes the drive cycle files of a folder and prints their statistics""",
+    )
+    parser.add_argument(
+        "--cycle-folder",
+        default=gl.OPTIMIZATION_DRIVE_CYCLES,
+        type=str,
+        help="Folder of drive cycle files",
+    )
+    parser.add_argument(
+        "--pattern", default="*.csv", type=str, help="Glob pattern of cycle files"
+    )
+    args = parser.parse_args()
+
+    index_df = index_cycle_folder(args.cycle_folder, args.pattern)
+    print(index_df.drop(columns=["hash", "cycle_hash", "mtime_ns", "size"]).to_string())
@@ -0,0 +1,269 @@
+"""Module for the binary drive cycle store. A folder of cycle files is packed into a single memory-mapped array file \
+    with a JSON index, so cycle libraries are not parsed from CSV and pool workers share the cycle pages. Cycles of a \
+    store are referenced like the files of a folder, e.g. cycles.t3cocycles/regional_haul.csv."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import fastsim
+import numpy as np
+from fastsim import cycle
+
+from t3co.run import Global as gl
+from t3co.run import cycle_index
+from t3co.utilities import file_keys
+
+CYCLE_STORE_SUFFIX = ".t3cocycles"
+CYCLE_STORE_VERSION = 2
+# columns of the store array, one row per cycle time step
+CYCLE_STORE_COLUMNS = ["time_s", "mps", "grade", "road_type"]
+
+# opened cycle stores, keyed by file_keys.get_file_key of the store file
+OPEN_CYCLE_STORES = {}
+
+
+def get_store_index_file(store_file: str | Path) -> Path:
+    """
+    This function gets the JSON index file of a cycle store
+
+    Args:
+        store_file (str | Path): cycle store file path
+
+    Returns:
+        index_file (Path): JSON index file path
+    """
+    store_file = Path(store_file)
+    return store_file.with_name(store_file.name + ".json")
+
+
+def is_cycle_store(path: str | Path) -> bool:
+    """
+    This function checks if a path is a cycle store file
+
+    Args:
+        path (str | Path): file path
+
+    Returns:
+        is_store (bool): True if path is a cycle store file
+    """
+    return Path(path).suffix == CYCLE_STORE_SUFFIX and Path(path).is_file()
+
+
+def split_store_path(cyc_file_path: str | Path) -> tuple:
+    """
+    This function splits the path of a cycle in a cycle store, e.g. cycles.t3cocycles/regional_haul.csv, into the \
+        store file and the cycle name
+
+    Args:
+        cyc_file_path (str | Path): drivecycle path
+
+    Returns:
+        store_ref (tuple): (store file path, cycle name), None if the path is not in a cycle store
+    """
+    cyc_file_path = Path(cyc_file_path)
+    for store_file in cyc_file_path.parents:
+        if is_cycle_store(store_file):
+            return store_file, cyc_file_path.relative_to(store_file).as_posix()
+    return None
+
+
+def pack_cycle_folder(
+    cycle_folder: str | Path, store_file: str | Path = None, pattern: str = "*.csv"
+) -> Path:
+    """
+    This function packs the cycle files of a folder and its subfolders into a cycle store. The store file holds the \
+        float64 columns of all cycles in .npy format, and the JSON index holds the row offset and metadata of each cycle.
+
+    Args:
+        cycle_folder (str | Path): folder of the cycle files
+        store_file (str | Path, optional): cycle store file path. Defaults to None, the folder name with \
+            CYCLE_STORE_SUFFIX next to the folder.
+        pattern (str, optional): glob pattern of cycle files. Defaults to "*.csv".
+
+    Returns:
+        store_file (Path): cycle store file path
+    """
+    cycle_folder = Path(cycle_folder).resolve()
+    if store_file is None:
+        store_file = cycle_folder.with_name(cycle_folder.name + CYCLE_STORE_SUFFIX)
+    store_file = Path(store_file)
+    assert (
+        store_file.suffix == CYCLE_STORE_SUFFIX
+    ), f"cycle store file must end with {CYCLE_STORE_SUFFIX}: {store_file}"
+
+    arrays = []
+    cycles = {}
+    offset = 0
+    for cyc_file_path in sorted(cycle_folder.rglob(pattern)):
+        try:
+            cyc = cycle.Cycle.from_file(str(cyc_file_path))
+        except Exception as err:
+            print(f"skipping {cyc_file_path}, not a drive cycle: {err}")
+            continue
+        name = cyc_file_path.relative_to(cycle_folder).as_posix()
+        arrays.append(
+            np.column_stack([getattr(cyc, col) for col in CYCLE_STORE_COLUMNS])
+        )
+        rust_cyc = cyc.to_rust()
+        cycles[name] = {
+            "name": cyc_file_path.name,
+            "hash": cycle_index.get_hash(cyc_file_path),
+            "cycle_hash": cycle_index.get_cycle_hash(rust_cyc),
+            "offset": offset,
+            **cycle_index.calc_cycle_metadata(rust_cyc),
+        }
+        offset += len(cyc.time_s)
+    assert len(cycles) > 0, f"no drive cycles found in {cycle_folder}"
+
+    index = {
+        "version": CYCLE_STORE_VERSION,
+        "columns": CYCLE_STORE_COLUMNS,
+        "cycles": cycles,
+    }
+    index_file = get_store_index_file(store_file)
+    tmp_suffix = f".{os.getpid()}.tmp"
+    # a file object keeps np.save from appending .npy
+    with open(store_file.with_name(store_file.name + tmp_suffix), "wb") as f:
+        np.save(f, np.concatenate(arrays).astype(np.float64))
+    with open(index_file.with_name(index_file.name + tmp_suffix), "w") as f:
+        json.dump(index, f, indent=4)
+    os.replace(store_file.with_name(store_file.name + tmp_suffix), store_file)
+    os.replace(index_file.with_name(index_file.name + tmp_suffix), index_file)
+    print(f"packed {len(cycles)} drive cycles into {store_file}")
+    return store_file
+
+
+class CycleStore:
+    """
+    Class object for an opened cycle store. The store array is memory-mapped read-only, so processes that open the \
+        same store share its pages.
+    """
+
+    def __init__(self, store_file: str | Path):
+        """
+        This constructor reads the JSON index and memory-maps the array of a cycle store
+
+        Args:
+            store_file (str | Path): cycle store file path
+        """
+        self.store_file = Path(store_file).resolve()
+        with open(get_store_index_file(self.store_file)) as f:
+            index = json.load(f)
+        assert (
+            index.get("version") == CYCLE_STORE_VERSION
+        ), f"cycle store version {index.get('version')} not supported, pack {self.store_file} again"
+        self.columns = index["columns"]
+        self.cycles = index["cycles"]
+        self.data = np.load(self.store_file, mmap_mode="r")
+        # Rust cycles built from the store array
+        self.rust_cycles = {}
+
+    @property
+    def names(self) -> list:
+        """
+        This method gets the names of the cycles in the store
+
+        Returns:
+            names (list): cycle names, the cycle file paths relative to the packed folder
+        """
+        return list(self.cycles)
+
+    def get_metadata(self, name: str) -> dict:
+        """
+        This method gets the metadata of a cycle in the store
+
+        Args:
+            name (str): cycle name
+
+        Returns:
+            metadata (dict): Dictionary of file name, content hash, row offset, and cycle statistics
+        """
+        assert (
+            name in self.cycles
+        ), f"Drive cycle {name} not found in cycle store {self.store_file}"
+        return self.cycles[name]
+
+    def get_cycle(self, name: str) -> fastsim.cycle.RustCycle:
+        """
+        This method gets the Rust cycle of a cycle in the store, building it only once per process
+
+        Args:
+            name (str): cycle name
+
+        Returns:
+            cyc (fastsim.cycle.RustCycle): copy of the cached Rust cycle
+        """
+        if name not in self.rust_cycles:
+            metadata = self.get_metadata(name)
+            start = metadata["offset"]
+            rows = self.data[start : start + metadata["n_points"]]
+            cyc_dict = {col: rows[:, i] for i, col in enumerate(self.columns)}
+            # same name as cycle.Cycle.from_file
+            cyc_dict["name"] = Path(name).stem
+            self.rust_cycles[name] = cycle.Cycle.from_dict(cyc_dict).to_rust()
+        return self.rust_cycles[name].copy()
+
+
+def open_cycle_store(store_file: str | Path) -> CycleStore:
+    """
+    This function opens a cycle store once per process, and again if the store file was packed again
+
+    Args:
+        store_file (str | Path): cycle store file path
+
+    Returns:
+        store (CycleStore): opened cycle store
+    """
+    file_key = file_keys.get_file_key(store_file)
+    if file_key not in OPEN_CYCLE_STORES:
+        OPEN_CYCLE_STORES[file_key] = CycleStore(file_key[0])
+    return OPEN_CYCLE_STORES[file_key]
+
+
+def load_cycle(cyc_file_path: str | Path) -> fastsim.cycle.RustCycle:
+    """
+    This function loads the Rust cycle of a drivecycle path in a cycle store and adds its metadata to the cycle \
+        metadata index, see run_scenario.get_design_cycle_metadata
+
+    Args:
+        cyc_file_path (str | Path): drivecycle path in a cycle store, e.g. cycles.t3cocycles/regional_haul.csv
+
+    Returns:
+        cyc (fastsim.cycle.RustCycle): Rust cycle
+    """
+    store_file, name = split_store_path(cyc_file_path)
+    store = open_cycle_store(store_file)
+    path = str(store.store_file / name)
+    if path not in cycle_index.CYCLE_METADATA_INDEX:
+        cycle_index.add_to_index(path, store.get_metadata(name))
+    return store.get_cycle(name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        prog="CYCLE_STORE",
+        description="""Packs the drive cycle files of a folder into a memory-mapped cycle store""",
+    )
+    parser.add_argument(
+        "--cycle-folder",
+        default=gl.OPTIMIZATION_DRIVE_CYCLES,
+        type=str,
+        help="Folder of drive cycle files",
+    )
+    parser.add_argument(
+        "--store-file",
+        default=None,
+        type=str,
+        help=f"Cycle store file path ending with {CYCLE_STORE_SUFFIX}, defaults to the folder name next to the folder",
+    )
+    parser.add_argument(
+        "--pattern", default="*.csv", type=str, help="Glob pattern of cycle files"
+    )
+    args = parser.parse_args()
+
+    pack_cycle_folder(args.cycle_folder, args.store_file, args.pattern)
@@ -0,0 +1,320 @@
+"""Module for estimating the wall time and peak memory of a sweep before it is launched, see sweep.py --plan. Each job, \
+    a selection and drive cycle variant run with one algorithm, is classified as analysis-only or optimization with its \
+    number of knobs, evaluation budget, design cycle length, and powertrain, and its time is estimated with a per-job \
+    cost model. The jobs of a selection run one after another on one worker, as in sweep.run_optimize_analysis. The \
+    cost model can be calibrated with the results files of earlier sweeps on the same hosts."""
+
+from __future__ import annotations
+
+import ast
+import heapq
+import logging
+import math
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import nnls
+
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+
+logger = logging.getLogger(__name__)
+
+# per-job cost model, calibrated with the demo inputs, see calibrate_cost_model
+DEFAULT_COST_MODEL = {
+    # time [s] of a job besides its evaluations, e.g. loading its inputs and reporting its results
+    "job_overhead_s": 5.0,
+    # time [s] of an evaluation besides its design cycle simulations, e.g. the accel and grade tests and the TCO
+    "eval_overhead_s": 0.5,
+    # time [s] per simulated second of design cycle
+    "sim_s_per_cycle_s": 1e-4,
+    # fraction of n_max_gen that optimizations run before they converge
+    "n_gen_frac": 1.0,
+    # resident memory [MB] of a sweep process with T3CO imported and its inputs loaded
+    "process_base_mb": 170.0,
+    # memory [MB] per point of a cached drive cycle
+    "cached_cycle_mb_per_point": 5e-5,
+    # memory [MB] per point of a running design cycle simulation
+    "sim_mb_per_point": 2e-3,
+}
+
+# design cycle simulations per evaluation, PHEVs simulate charge depleting and charge sustaining operation
+N_DESIGN_SIMS = {gl.PHEV: 2}
+
+
+def get_design_cycle_paths(drive_cycle: str) -> List[str]:
+    """
+    This function gets the drivecycle file paths of a scenario drive_cycle, a file path or a list of drivecycle file \
+        names and weights, as in run_scenario.load_design_cycle_from_scenario
+
+    Args:
+        drive_cycle (str): scenario drive_cycle, or drivecycle file of a Config drive_cycle folder
+
+    Returns:
+        paths (List[str]): drivecycle file paths
+    """
+    drive_cycle = str(drive_cycle)
+    if "[" in drive_cycle and "]" in drive_cycle and "(" in drive_cycle:
+        return [
+            str(Path(gl.OPTIMIZATION_DRIVE_CYCLES) / dc_weight[0])
+            for dc_weight in ast.literal_eval(drive_cycle)
+        ]
+    return [drive_cycle]
+
+
+def get_design_cycle_size(drive_cycle: str) -> Tuple[float, int]:
+    """
+    This function gets the total duration and number of points of the design cycles of a scenario drive_cycle from \
+        the cycle metadata index, see run_scenario.get_design_cycle_metadata. Indexed cycle files are not loaded.
+
+    Args:
+        drive_cycle (str): scenario drive_cycle, see get_design_cycle_paths
+
+    Returns:
+        duration_s, n_points (Tuple[float, int]): total duration [s] and number of points of the design cycles
+    """
+    duration_s = 0.0
+    n_points = 0
+    for path in get_design_cycle_paths(drive_cycle):
+        stats = run_scenario.get_design_cycle_metadata(path)
+        duration_s += stats["duration_s"]
+        n_points += stats["n_points"]
+    return duration_s, n_points
+
+
+def get_n_evals(
+    optimize: bool,
+    pop_size: int,
+    n_max_gen: int,
+    n_max_evals: int = None,
+    n_gen_frac: float = 1.0,
+) -> int:
+    """
+    This function estimates the number of design evaluations of a job
+
+    Args:
+        optimize (bool): if False, the job is analysis-only and evaluates its vehicle once
+        pop_size (int): population size of the optimization
+        n_max_gen (int): maximum number of generations of the optimization
+        n_max_evals (int, optional): maximum number of evaluations of the optimization. Defaults to None.
+        n_gen_frac (float, optional): fraction of n_max_gen run before convergence. Defaults to 1.0.
+
+    Returns:
+        n_evals (int): number of evaluations
+    """
+    if not optimize:
+        return 1
+    n_evals = pop_size * max(1, math.ceil(n_gen_frac * n_max_gen))
+    if n_max_evals is not None:
+        n_evals = min(n_evals, n_max_evals)
+    return n_evals
+
+
+def get_job_time_s(
+    n_evals: float, n_design_sims: int, cycle_s: float, cost_model: dict
+) -> float:
+    """
+    This function estimates the wall time of a job on one worker
+
+    Args:
+        n_evals (float): number of evaluations
+        n_design_sims (int): number of design cycle simulations per evaluation, see N_DESIGN_SIMS
+        cycle_s (float): total duration [s] of the design cycles
+        cost_model (dict): cost model, see DEFAULT_COST_MODEL
+
+    Returns:
+        time_s (float): wall time [s]
+    """
+    return cost_model["job_overhead_s"] + n_evals * (
+        cost_model["eval_overhead_s"]
+        + cost_model["sim_s_per_cycle_s"] * n_design_sims * cycle_s
+    )
+
+
+def get_makespan_s(job_times_s: list, n_workers: int) -> float:
+    """
+    This function estimates the wall time of jobs on a number of workers, assigning the longest job first to the \
+        first free worker
+
+    Args:
+        job_times_s (list): job wall times [s]
+        n_workers (int): number of worker processes
+
+    Returns:
+        makespan_s (float): wall time [s] of all jobs
+    """
+    worker_times_s = [0.0] * max(1, min(n_workers, len(job_times_s)))
+    for job_time_s in sorted(job_times_s, reverse=True):
+        heapq.heappush(worker_times_s, heapq.heappop(worker_times_s) + job_time_s)
+    return max(worker_times_s)
+
+
+def estimate_plan(
+    jobs_df: pd.DataFrame,
+    n_workers: int = 1,
+    cost_model: dict = None,
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    This function estimates the evaluations, wall time, and memory of the jobs of a sweep and of the sweep on a \
+        number of workers. The jobs of a selection, one per algorithm, are scheduled together, as a worker runs the \
+        algorithms of its selection one after another.
+
+    Args:
+        jobs_df (pd.DataFrame): dataframe of jobs with the columns selection, algorithm, veh_pt_type, optimize, \
+            n_knobs, pop_size, n_max_gen, n_max_evals, and drive_cycle, see sweep.get_plan_jobs
+        n_workers (int, optional): number of worker processes. Defaults to 1.
+        cost_model (dict, optional): cost model. Defaults to None, DEFAULT_COST_MODEL.
+
+    Returns:
+        jobs_df, summary (Tuple[pd.DataFrame, dict]): jobs with their cycle duration, number of evaluations, and \
+            estimated time, and Dictionary of job counts, total and wall time [s], and peak memory [MB]
+    """
+    cost_model = {**DEFAULT_COST_MODEL, **(cost_model or {})}
+    jobs_df = jobs_df.copy()
+    cycle_sizes = {
+        drive_cycle: get_design_cycle_size(drive_cycle)
+        for drive_cycle in jobs_df["drive_cycle"].unique()
+    }
+    jobs_df["cycle_s"] = [cycle_sizes[dc][0] for dc in jobs_df["drive_cycle"]]
+    jobs_df["cycle_points"] = [cycle_sizes[dc][1] for dc in jobs_df["drive_cycle"]]
+    jobs_df["n_design_sims"] = [
+        N_DESIGN_SIMS.get(pt, 1) for pt in jobs_df["veh_pt_type"]
+    ]
+    jobs_df["n_evals"] = [
+        get_n_evals(
+            job.optimize,
+            job.pop_size,
+            job.n_max_gen,
+            None if pd.isnull(job.n_max_evals) else int(job.n_max_evals),
+            cost_model["n_gen_frac"],
+        )
+        for job in jobs_df.itertuples()
+    ]
+    jobs_df["time_s"] = [
+        get_job_time_s(job.n_evals, job.n_design_sims, job.cycle_s, cost_model)
+        for job in jobs_df.itertuples()
+    ]
+
+    # wall time [s] of each selection, the sum of its jobs
+    selection_times_s = jobs_df.groupby("selection", sort=False)["time_s"].sum()
+    n_workers_used = max(1, min(n_workers, len(selection_times_s)))
+    # each worker may cache every drive cycle of the sweep
+    worker_peak_mb = (
+        cost_model["process_base_mb"]
+        + cost_model["cached_cycle_mb_per_point"]
+        * sum(size[1] for size in cycle_sizes.values())
+        + cost_model["sim_mb_per_point"]
+        * max(
+            (jobs_df["n_design_sims"] * jobs_df["cycle_points"]).tolist(), default=0
+        )
+    )
+    summary = {
+        "n_jobs": len(jobs_df),
+        "n_analysis_jobs": int((~jobs_df["optimize"].astype(bool)).sum()),
+        "n_optimization_jobs": int(jobs_df["optimize"].astype(bool).sum()),
+        "jobs_by_powertrain": jobs_df["veh_pt_type"].value_counts().to_dict(),
+        "jobs_by_n_knobs": jobs_df["n_knobs"].value_counts().sort_index().to_dict(),
+        "n_evals": int(jobs_df["n_evals"].sum()),
+        "n_workers": n_workers_used,
+        "total_time_s": float(jobs_df["time_s"].sum()),
+        "wall_time_s": get_makespan_s(selection_times_s.tolist(), n_workers),
+        "worker_peak_mb": float(worker_peak_mb),
+        "peak_mb": float(
+            cost_model["process_base_mb"] + n_workers_used * worker_peak_mb
+        ),
+    }
+    return jobs_df, summary
+
+
+def calibrate_cost_model(
+    results_files: list, pop_size: int = None, cost_model: dict = None
+) -> dict:
+    """
+    This function fits the time coefficients of the cost model to the run times of the jobs in the results files \
+        of earlier sweeps. Optimization jobs need their n_evals, or n_gen and the pop_size of their sweep. With fewer \
+        jobs than coefficients, the time coefficients are scaled instead.
+
+    Args:
+        results_files (list): results CSV file paths of sweep.py
+        pop_size (int, optional): population size of sweeps whose results files have no n_evals. Defaults to None.
+        cost_model (dict, optional): cost model to calibrate. Defaults to None, DEFAULT_COST_MODEL.
+
+    Returns:
+        cost_model (dict): calibrated cost model, with the number of calibration jobs in n_calibration_jobs
+    """
+    cost_model = {**DEFAULT_COST_MODEL, **(cost_model or {})}
+    results_df = pd.concat(
+        [pd.read_csv(results_file) for results_file in results_files],
+        ignore_index=True,
+    )
+    n_gen = pd.to_numeric(results_df["n_gen"], errors="coerce")
+    if "n_evals" in results_df.columns:
+        n_evals = pd.to_numeric(results_df["n_evals"], errors="coerce")
+    else:
+        n_evals = pd.Series(np.nan, index=results_df.index)
+    if pop_size is not None:
+        n_evals = n_evals.fillna(n_gen * pop_size)
+    # analysis-only jobs evaluate their vehicle once and have no n_gen, optimization jobs that did not converge \
+    # have an error message instead and are skipped
+    n_evals[results_df["n_gen"].isna()] = 1
+    # each optimized design is reported on its own row with the run time of the job
+    jobs_df = results_df.assign(n_evals=n_evals).drop_duplicates(
+        subset=["selection", "algorithm"]
+    )
+    jobs_df = jobs_df[jobs_df["n_evals"].notna() & jobs_df["run_time_[s]"].notna()]
+
+    features = []
+    run_times_s = []
+    for job in jobs_df.to_dict("records"):
+        try:
+            cycle_s, _ = get_design_cycle_size(job["scenario_drive_cycle"])
+        except Exception as err:
+            logger.warning("skipping selection %s: %s", job["selection"], err)
+            continue
+        n_design_sims = N_DESIGN_SIMS.get(job["veh_pt_type"], 1)
+        features.append([1, job["n_evals"], job["n_evals"] * n_design_sims * cycle_s])
+        run_times_s.append(float(job["run_time_[s]"]))
+    features = np.array(features, dtype=float)
+    run_times_s = np.array(run_times_s)
+    time_keys = ["job_overhead_s", "eval_overhead_s", "sim_s_per_cycle_s"]
+    if len(run_times_s) >= len(time_keys):
+        coefficients, _ = nnls(features, run_times_s)
+        cost_model.update(zip(time_keys, coefficients.tolist()))
+    elif len(run_times_s):
+        default_times_s = features @ np.array([cost_model[key] for key in time_keys])
+        scale = run_times_s.sum() / default_times_s.sum()
+        cost_model.update({key: cost_model[key] * scale for key in time_keys})
+
+    if "max_n_gen" in results_df.columns:
+        n_gen_fracs = n_gen / pd.to_numeric(results_df["max_n_gen"], errors="coerce")
+        if n_gen_fracs.notna().any():
+            cost_model["n_gen_frac"] = float(n_gen_fracs.mean())
+    cost_model["n_calibration_jobs"] = len(run_times_s)
+    return cost_model
+
+
+def format_summary(summary: dict) -> str:
+    """
+    This function formats a plan summary for printing
+
+    Args:
+        summary (dict): plan summary, see estimate_plan
+
+    Returns:
+        text (str): formatted summary
+    """
+    return "\n".join(
+        [
+            f"jobs: {summary['n_jobs']} ({summary['n_analysis_jobs']} analysis-only, "
+            f"{summary['n_optimization_jobs']} optimization)",
+            f"jobs by powertrain: {summary['jobs_by_powertrain']}",
+            f"jobs by number of knobs: {summary['jobs_by_n_knobs']}",
+            f"design evaluations: {summary['n_evals']}",
+            f"total job time: {summary['total_time_s'] / 3600:.2f} h",
+            f"wall time on {summary['n_workers']} workers: {summary['wall_time_s'] / 3600:.2f} h",
+            f"peak memory: {summary['peak_mb'] / 1000:.2f} GB "
+            f"({summary['worker_peak_mb']:.0f} MB per worker)",
+        ]
+    )
@@ -0,0 +1,170 @@
+"""Module for profiling the selections of a sweep, see sweep.py --profile. Each selection is run under cProfile and/or \
+    tracemalloc in the process that runs it, and writes its .pstats file and its top allocations to the profile folder \
+    of the results directory. At the end of the sweep, the profiles of all selections are merged into run-level \
+    reports. tracemalloc slows the selections down, so CPU times of a run with both profiles are inflated."""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+# profiles of --profile
+PROFILE_CPU = "cpu"
+PROFILE_MEM = "mem"
+PROFILES = [PROFILE_CPU, PROFILE_MEM]
+
+# number of allocation sites in the reports of a selection and of the run
+N_TOP_ALLOCATIONS = 25
+# number of functions in the CPU report of the run
+N_TOP_FUNCTIONS = 50
+# file names of the run-level reports
+RUN_PSTATS = "run.pstats"
+RUN_CPU_REPORT = "run_cpu.txt"
+RUN_MEM_REPORT = "run_mem.csv"
+
+
+def profile_call(
+    func: Callable,
+    profiles: list,
+    profile_dir: str | Path,
+    name: str,
+    *args,
+    **kwargs,
+):
+    """
+    This function runs func under the selected profiles and writes the profiles to profile_dir, also if func raises. \
+        The CPU profile is written to <name>.pstats, and the memory peak and top allocation sites by size to \
+        <name>_mem.csv.
+
+    Args:
+        func (Callable): function to profile
+        profiles (list): PROFILE_CPU and/or PROFILE_MEM
+        profile_dir (str | Path): folder of the profiles, created if needed
+        name (str): file name stem of the profiles, e.g. selection_12_000
+        *args: positional arguments of func
+        **kwargs: keyword arguments of func
+
+    Returns:
+        result: return value of func
+    """
+    profile_dir = Path(profile_dir)
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile() if PROFILE_CPU in profiles else None
+    # the selection may run in a process that traces memory already
+    trace_memory = PROFILE_MEM in profiles and not tracemalloc.is_tracing()
+    if trace_memory:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        # the snapshot is taken before the CPU profile allocates its stats
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            get_top_allocations(snapshot, peak_bytes, name).to_csv(
+                profile_dir / f"{name}_mem.csv", index=False
+            )
+        if profiler is not None:
+            profiler.dump_stats(profile_dir / f"{name}.pstats")
+
+
+def get_top_allocations(
+    snapshot: tracemalloc.Snapshot, peak_bytes: int, name: str
+) -> pd.DataFrame:
+    """
+    This function gets the allocation sites of a tracemalloc snapshot with the most memory still allocated. Only \
+        Python allocations are traced, not those of the FASTSim Rust extension.
+
+    Args:
+        snapshot (tracemalloc.Snapshot): snapshot taken at the end of the selection
+        peak_bytes (int): peak traced memory [B] of the selection
+        name (str): name of the profile
+
+    Returns:
+        allocations_df (pd.DataFrame): Dataframe of the top N_TOP_ALLOCATIONS allocation sites with their size and \
+            number of blocks, and the peak of the selection
+    """
+    snapshot = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+    )
+    return pd.DataFrame(
+        [
+            {
+                "profile": name,
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_kb": stat.size / 1e3,
+                "count": stat.count,
+                "peak_mb": peak_bytes / 1e6,
+            }
+            for stat in snapshot.statistics("lineno")[:N_TOP_ALLOCATIONS]
+        ],
+        columns=["profile", "location", "size_kb", "count", "peak_mb"],
+    )
+
+
+def merge_profiles(profile_dir: str | Path) -> dict:
+    """
+    This function merges the profiles of the selections in profile_dir into run-level reports: the summed CPU \
+        profile in RUN_PSTATS with its top N_TOP_FUNCTIONS functions by cumulative time in RUN_CPU_REPORT, and the \
+        allocation sites summed over the selections in RUN_MEM_REPORT
+
+    Args:
+        profile_dir (str | Path): folder of the profiles
+
+    Returns:
+        report_paths (dict): paths of the run-level reports, keyed by profile
+    """
+    profile_dir = Path(profile_dir)
+    report_paths = {}
+    pstats_paths = sorted(
+        path for path in profile_dir.glob("*.pstats") if path.name != RUN_PSTATS
+    )
+    if pstats_paths:
+        stats = pstats.Stats(*[str(path) for path in pstats_paths])
+        stats.dump_stats(profile_dir / RUN_PSTATS)
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(N_TOP_FUNCTIONS)
+        (profile_dir / RUN_CPU_REPORT).write_text(
+            f"{len(pstats_paths)} profiles\n{stream.getvalue()}"
+        )
+        report_paths[PROFILE_CPU] = profile_dir / RUN_CPU_REPORT
+
+    mem_paths = sorted(
+        path for path in profile_dir.glob("*_mem.csv") if path.name != RUN_MEM_REPORT
+    )
+    if mem_paths:
+        allocations_df = pd.concat(
+            [pd.read_csv(path) for path in mem_paths], ignore_index=True
+        )
+        run_df = (
+            allocations_df.groupby("location")
+            .agg(
+                size_kb=("size_kb", "sum"),
+                count=("count", "sum"),
+                n_profiles=("profile", "nunique"),
+            )
+            .sort_values("size_kb", ascending=False)
+            .head(N_TOP_ALLOCATIONS)
+            .reset_index()
+        )
+        # the peak of the run is the largest peak of a selection, not their sum
+        run_df["max_peak_mb"] = allocations_df["peak_mb"].max()
+        run_df.to_csv(profile_dir / RUN_MEM_REPORT, index=False)
+        report_paths[PROFILE_MEM] = profile_dir / RUN_MEM_REPORT
+    return report_paths
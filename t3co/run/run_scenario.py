@@ -1,8 +1,11 @@
 """Module for loading vehicles, scenarios, running them and managing them"""
 
 import ast
+import copy
+import logging
 import os
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 from typing import Tuple
 
@@ -14,9 +17,18 @@ from fastsim import cycle, simdrive, vehicle
 # for debugging convenience
 from typing_extensions import Self
 
-from t3co.objectives import accel, fueleconomy, gradeability
+from t3co.objectives import accel, fueleconomy, gradeability, simdrive_context
 from t3co.run import Global as gl
+from t3co.run import analysis_context, cycle_index, cycle_store
 from t3co.tco import tco_analysis
+from t3co.utilities import file_keys
+
+logger = logging.getLogger(__name__)
+
+# FASTSim vehicles, keyed by (file_keys.get_file_key of the vehicle input file, selection)
+VEHICLE_CACHE = {}
+# scenario input dataframes, keyed by file_keys.get_file_key of the scenario input file
+SCENARIO_INPUTS_CACHE = {}
 
 
 # --------------------------------- \\ powertrain adjustment methods --------------------------------- #
@@ -127,7 +139,7 @@ class Config:
 
     def check_drivecycles_and_create_selections(self, config_file: str | Path):
         """
-        This method checks if the config.drive_cycle input is a file or a folder. If a folder is provided, then it creates a list of all selections for each drivecycle in the folders as config.dc_files
+        This method checks if the config.drive_cycle input is a file, a folder, or a cycle store (see cycle_store). If a folder or a cycle store is provided, then it creates a list of all selections for each drivecycle in the folders or the store as config.dc_files
 
         Args:
             config_file (str|Path): File path of config file
@@ -144,19 +156,51 @@ class Config:
                 except:
                     print(f"Drivecycle folder does not exist: {dc_folder_path}")
 
-            if Path(dc_folder_path).is_dir():
+            if cycle_store.is_cycle_store(dc_folder_path):
+                store = cycle_store.open_cycle_store(dc_folder_path)
+                self.dc_files = [store.store_file / name for name in store.names]
+            elif Path(dc_folder_path).is_dir():
                 self.dc_files = [p.absolute() for p in dc_folder_path.rglob("*.csv")]
+            if self.dc_files is not None:
                 selections_list = list(self.selections)
                 self.selections = []
                 for selection in selections_list:
                     for i in range(len(self.dc_files)):
                         self.selections.append(str(selection) + "_" + str(i).zfill(3))
-            else:
-                self.dc_files = None
         except:
             Exception
 
 
+def load_config(config_file: str | Path, analysis_id: int = 0) -> Config:
+    """
+    This function reads the Config object for analysis_id from the T3CO Config input CSV file, creates the selections \
+        for drivecycle folders, and resolves the vehicle, scenario, and improvement curve file paths relative to config_file
+
+    Args:
+        config_file (str | Path): T3CO Config input CSV file path
+        analysis_id (int, optional): analysis ID selection. Defaults to 0.
+
+    Returns:
+        config (Config): Config object for given analysis_id
+    """
+    try:
+        config = Config()
+        config.from_file(filename=Path(config_file), analysis_id=analysis_id)
+    except ValueError:
+        print(f"Config analysis_id not valid: {analysis_id}")
+        config = Config()
+        config.validate_analysis_id(filename=Path(config_file))
+    config.check_drivecycles_and_create_selections(config_file)
+    config.vehicle_file = Path(config_file).parent / config.vehicle_file
+    config.scenario_file = Path(config_file).parent / config.scenario_file
+    config.eng_eff_imp_curves = Path(config_file).parent / config.eng_eff_imp_curves
+    config.lw_imp_curves = Path(config_file).parent / config.lw_imp_curves
+    config.aero_drag_imp_curves = (
+        Path(config_file).parent / config.aero_drag_imp_curves
+    )
+    return config
+
+
 @dataclass
 class Scenario:
     """
@@ -236,6 +280,12 @@ class Scenario:
     soc_norm_init_for_accel_pct: float = -1
     soc_norm_init_for_grade_pct: float = -1
 
+    # multipliers on the regional fuel price series, keyed by fuel: diesel, gasoline, electricity, cng, hydrogen
+    fuel_price_scale_factors: dict = field(default_factory=dict)
+    # cycle metadata of the design cycles, set by load_design_cycle_from_scenario, see get_design_cycle_metadata. \
+    # It is not a field, so it is not reported with the scenario inputs.
+    design_cycle_stats = ()
+
     # fuel storage
     fs_fueling_rate_gasoline_gpm: float = 0
     fs_fueling_rate_diesel_gpm: float = 0
@@ -346,7 +396,7 @@ class Scenario:
             "fdt_frac_full_charge_bounds",
             "activate_mr_downtime_cost",
         ]
-        if config.dc_files == None:
+        if config is not None and config.dc_files == None:
             fields_override.append("drive_cycle")
         self.fields_overriden = []
         if self.use_config == True and config != None:
@@ -415,7 +465,8 @@ def get_phev_util_factor(
     Returns:
         uf (float): PHEV computed utility factor
     """
-    scenario.shifts_per_year = ast.literal_eval(scenario.shifts_per_year)
+    if isinstance(scenario.shifts_per_year, str):
+        scenario.shifts_per_year = ast.literal_eval(scenario.shifts_per_year)
 
     uf = scenario.phev_utility_factor_override
     assert type(scenario.phev_utility_factor_override) in [
@@ -438,7 +489,8 @@ def get_objective_simdrive(
     analysis_vehicle: vehicle.Vehicle, cycle: fastsim.cycle.Cycle
 ) -> fastsim.simdrive.SimDrive:
     """
-    This function obtains the SimDrive for accel and grade test
+    This function obtains the SimDrive for accel and grade test. The Rust cycle and vehicle are reused across calls \
+        through simdrive_context.SimDriveContext.
 
     Args:
         analysis_vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
@@ -447,16 +499,17 @@ def get_objective_simdrive(
     Returns:
         sd (fastsim.simdrive.SimDrive): FASTSim SimDrive object containing vehicle inputs and simulation output attributes
     """
-    sd = simdrive.SimDrive(cycle, analysis_vehicle)
-    sd = sd.to_rust()
-    sim_params = sd.sim_params
-    sim_params.reset_orphaned()
-    sim_params.missed_trace_correction = False
-    # accel and grade traces are not achievable for our vehicles in the way we've constructed the tests, so suppress this warning with large tolerance
-    sim_params.trace_miss_speed_mps_tol = np.inf
-    sim_params.energy_audit_error_tol = np.inf
-    sim_params.trace_miss_dist_tol = np.inf
-    sd.sim_params = sim_params
+    sim_params = {
+        "missed_trace_correction": False,
+        # accel and grade traces are not achievable for our vehicles in the way we've constructed the tests, so suppress this warning with large tolerance
+        "trace_miss_speed_mps_tol": np.inf,
+        "energy_audit_error_tol": np.inf,
+        "trace_miss_dist_tol": np.inf,
+    }
+    context = simdrive_context.get_sim_drive_context(
+        cycle, analysis_vehicle, sim_params
+    )
+    sd = context.get_sim_drive(analysis_vehicle)
 
     return sd
 
@@ -466,6 +519,8 @@ def run_grade_or_accel(
     analysis_vehicle: fastsim.vehicle.Vehicle,
     sim_drive: fastsim.simdrive.SimDrive,
     ess_init_soc: float,
+    stop_speeds_mph: list = None,
+    early_stop: bool = False,
 ) -> None:
     """
     This function handles initial SOC considerations for grade and accel tests
@@ -483,6 +538,8 @@ def run_grade_or_accel(
         analysis_vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
         sim_drive (fastsim.simdrive.SimDrive): FASTSim SimDrive object
         ess_init_soc (float): ESS initial state of charge (SOC)
+        stop_speeds_mph (list, optional): target speeds for early stopping, see simdrive_context.sim_drive_walk_early_stop. Defaults to None.
+        early_stop (bool, optional): if True, stops the test once the remaining steps cannot change its results. Defaults to False.
 
     Raises:
         Exception: if test not in ['accel', 'grade']
@@ -496,10 +553,19 @@ def run_grade_or_accel(
     else:
         raise Exception("this should not have happened")
 
-    if ess_init_soc is not None:
+    if ess_init_soc is None and analysis_vehicle.veh_pt_type == gl.HEV:
+        ess_init_soc = hev_init_soc
+
+    if early_stop:
+        simdrive_context.sim_drive_walk_early_stop(
+            sim_drive,
+            analysis_vehicle,
+            init_soc=ess_init_soc,
+            stop_speeds_mph=stop_speeds_mph,
+            stop_at_plateau=True,
+        )
+    elif ess_init_soc is not None:
         sim_drive.sim_drive_walk(ess_init_soc)
-    elif analysis_vehicle.veh_pt_type == gl.HEV:
-        sim_drive.sim_drive_walk(hev_init_soc)
     else:
         sim_drive.sim_drive()
 
@@ -527,24 +593,46 @@ def create_fastsim_vehicle(veh_dict: dict = None) -> fastsim.vehicle.Vehicle:
     return v
 
 
-def get_vehicle(veh_no: int, veh_input_path: str) -> fastsim.vehicle.Vehicle:
+def get_vehicle(
+    veh_no: int, veh_input_path: str | pd.DataFrame
+) -> fastsim.vehicle.Vehicle:
     """
-    This function loads vehicle object from vehicle number and input csv filepath
+    This function loads vehicle object from vehicle number and input csv filepath. Vehicles are loaded once per process \
+        from input files, and every time from input dataframes.
 
     Args:
         veh_no (int): vehicle selection number
-        veh_input_path (str): vehicle model assumptions input CSV file path
+        veh_input_path (str | pd.DataFrame): vehicle model assumptions input CSV file path, or dataframe of its \
+            contents with a selection column
 
     Returns:
         veh (fastsim.vehicle.Vehicle): FASTSim vehicle object
     """
 
     scenario_sel = int(float(str(veh_no).split("_")[0]))
-    veh = vehicle.Vehicle.from_vehdb(scenario_sel, veh_input_path, to_rust=True)
-    veh.set_derived()
-    veh.set_veh_mass()
+    if isinstance(veh_input_path, pd.DataFrame):
+        veh = vehicle.Vehicle.from_df(
+            veh_input_path.set_index("selection", drop=False),
+            scenario_sel,
+            None,
+            to_rust=True,
+        )
+        veh.set_derived()
+        veh.set_veh_mass()
+        return veh
+
+    veh_key = (
+        file_keys.get_file_key(veh_input_path) if veh_input_path else None,
+        scenario_sel,
+    )
+    if veh_key not in VEHICLE_CACHE:
+        veh = vehicle.Vehicle.from_vehdb(scenario_sel, veh_input_path, to_rust=True)
+        veh.set_derived()
+        veh.set_veh_mass()
+        VEHICLE_CACHE[veh_key] = veh
 
-    return veh
+    # callers modify vehicles, so they get their own copy
+    return copy.deepcopy(VEHICLE_CACHE[veh_key])
 
 
 # \\ end \\ utility methods to create fastsim vehicles
@@ -556,6 +644,7 @@ def get_scenario_and_cycle(
     a_vehicle: fastsim.vehicle.Vehicle = None,
     config: Config = None,
     do_input_validation: bool = False,
+    cycles: dict = None,
 ) -> Tuple[Scenario, fastsim.cycle.Cycle]:
     """
     This function uses helper methods load_scenario and load_design_cycle_from_scenario \
@@ -563,9 +652,10 @@ def get_scenario_and_cycle(
 
     Args:
         veh_no (int): vehicle selection number
-        scenario_inputs_path (str): input file path for scenario assumptions CSV
+        scenario_inputs_path (str | pd.DataFrame): input file path for scenario assumptions CSV, or dataframe of its contents
         a_vehicle (fastsim.vehicle.Vehicle, optional): FASTSim vehicle object for given selection. Defaults to None.
         config (Config, optional): Config object for current analysis. Defaults to None.
+        cycles (dict, optional): Rust cycles by drivecycle file name, used instead of the drivecycle files. Defaults to None.
 
     Returns:
         scenario (Scenario): T3CO scenario object selected
@@ -577,45 +667,65 @@ def get_scenario_and_cycle(
         config,
         gl.OPTIMIZATION_DRIVE_CYCLES,
         do_input_validation=do_input_validation,
+        cycles=cycles,
     )
 
+    # cycle distances from the cycle metadata of the design cycle files
     if isinstance(cyc, list):
         scenario.constant_trip_distance_mi = sum(
             [
-                sum(cyc[i][0].mph * np.diff(np.array(cyc[i][0].time_s), append=0))
-                * cyc[i][1]
-                / 3600
-                for i in range(len(cyc))
+                stats["trip_distance_mi"] * weight
+                for stats, (_, weight) in zip(scenario.design_cycle_stats, cyc)
             ]
         )
     else:
-        scenario.constant_trip_distance_mi = (
-            sum(cyc.mph * np.diff(np.array(cyc.time_s), append=0)) / 3600
-        )
+        scenario.constant_trip_distance_mi = scenario.design_cycle_stats[0][
+            "trip_distance_mi"
+        ]
 
     return scenario, cyc
 
 
+def get_scenario_inputs(scenario_inputs_path: str) -> pd.DataFrame:
+    """
+    This function reads the scenario input CSV file, once per process and file version. Callers must not modify \
+        the returned dataframe.
+
+    Args:
+        scenario_inputs_path (str): input file path for scenario assumptions CSV
+
+    Returns:
+        scenarios (pd.DataFrame): dataframe of the scenario input file
+    """
+    file_key = file_keys.get_file_key(scenario_inputs_path)
+    if file_key not in SCENARIO_INPUTS_CACHE:
+        SCENARIO_INPUTS_CACHE[file_key] = pd.read_csv(scenario_inputs_path)
+    return SCENARIO_INPUTS_CACHE[file_key]
+
+
 def load_scenario(
     veh_no: int,
-    scenario_inputs_path: str,
+    scenario_inputs_path: str | pd.DataFrame,
     a_vehicle: fastsim.vehicle.Vehicle = None,
     config: Config = None,
 ) -> Scenario:
     """
     This function gets the Scenario object from scenario input CSV filepath, initializes some fields,\
-          and overrides some fields based on Config object
+          and overrides some fields based on Config object. The scenario input CSV file is read once per process.
 
     Args:
         veh_no (int): vehicle selection number
-        scenario_inputs_path (str): input file path for scenario assumptions CSV
+        scenario_inputs_path (str | pd.DataFrame): input file path for scenario assumptions CSV, or dataframe of its contents
         a_vehicle (fastsim.vehicle.Vehicle, optional): FASTSim vehicle object for given selection. Defaults to None.
         config (Config, optional): Config object for current analysis. Defaults to None.
 
     Returns:
         scenario (Scenario): Scenario object for given selection
     """
-    scenarios = pd.read_csv(scenario_inputs_path)
+    if isinstance(scenario_inputs_path, pd.DataFrame):
+        scenarios = scenario_inputs_path
+    else:
+        scenarios = get_scenario_inputs(scenario_inputs_path)
     veh_no_split = str(veh_no).split("_")[0]
     assert (
         len(scenarios[scenarios["selection"] == int(float(str(veh_no).split("_")[0]))])
@@ -635,7 +745,7 @@ def load_scenario(
     if "scenario_name" in scenario_dict:
         del scenario_dict["scenario_name"]
 
-    if len(str(veh_no).split("_")) > 1 and config.dc_files:
+    if len(str(veh_no).split("_")) > 1 and config is not None and config.dc_files:
         dc_id = int(str(veh_no).split("_")[1])
         scenario_dict["drive_cycle"] = config.dc_files[dc_id]
         scenario_dict["selection"] = veh_no
@@ -716,67 +826,126 @@ def load_design_cycle_from_scenario(
     config: Config = None,
     cyc_file_path: str = gl.OPTIMIZATION_DRIVE_CYCLES,
     do_input_validation: bool = False,
+    cycles: dict = None,
 ) -> fastsim.cycle.Cycle:
     """
     This helper method loads the design cycle used for mpgge and range determination.
     It can also be used standalone to get cycles not in standard gl.OPTIMIZATION_DRIVE_CYCLES location,
     but still needs cycle name from scenario object, carried in scenario.drive_cycle.
     If the drive cycles are a list of tuples, handle accordingly with eval.
+    The cycle metadata of the design cycles is set in scenario.design_cycle_stats.
 
     Args:
         scenario (Scenario): Scenario object for current selection
         cyc_file_path (str, optional): drivecycle input file path. Defaults to gl.OPTIMIZATION_DRIVE_CYCLES.
+        cycles (dict, optional): Rust cycles by drivecycle file name, used instead of the drivecycle files. Defaults to None.
 
     Returns:
         range_cyc (fastsim.cycle.Cycle): FASTSim cycle object for current Scenario object
     """
 
-    if config.dc_files != None and not do_input_validation:
+    if config is not None and config.dc_files != None and not do_input_validation:
         dc_id = int(float(str(scenario.selection).split("_")[1]))
         sdc = str(config.dc_files[dc_id])
     else:
         sdc = str(scenario.drive_cycle)
-    print(f"Drivecycle: {sdc}")
+    logger.debug("Drivecycle: %s", sdc)
     if "[" in sdc and "]" in sdc and "(" in sdc and ")" in sdc:
         scenario.drive_cycle = ast.literal_eval(sdc)
         range_cyc = []
+        scenario.design_cycle_stats = []
         for dc_weight in scenario.drive_cycle:
             cycle_file_name = Path(dc_weight[0]).name
             dc = load_design_cycle_from_path(
-                cyc_file_path=Path(cyc_file_path) / dc_weight[0]
+                cyc_file_path=Path(cyc_file_path) / dc_weight[0], cycles=cycles
             )
             dc.name = cycle_file_name
             weight = dc_weight[1]
             range_cyc.append((dc, weight))
+            scenario.design_cycle_stats.append(
+                get_design_cycle_metadata(Path(cyc_file_path) / dc_weight[0], cycles)
+            )
     else:
         cycle_file_name = Path(sdc).name
-        range_cyc = load_design_cycle_from_path(cyc_file_path=sdc)
+        range_cyc = load_design_cycle_from_path(cyc_file_path=sdc, cycles=cycles)
         range_cyc.name = cycle_file_name
+        scenario.design_cycle_stats = [get_design_cycle_metadata(sdc, cycles)]
 
     return range_cyc
 
 
-def load_design_cycle_from_path(cyc_file_path: str) -> fastsim.cycle.Cycle:
+def load_design_cycle_from_path(
+    cyc_file_path: str, cycles: dict = None
+) -> fastsim.cycle.Cycle:
     """
-    This helper method loads the Cycle object from the drivecycle filepath
+    This helper method loads the Cycle object from the drivecycle filepath. The file is parsed once per process \
+        and indexed in the cycle metadata index, see cycle_index. Paths in a cycle store, e.g. \
+        cycles.t3cocycles/regional_haul.csv, are loaded from the memory-mapped store, see cycle_store.
 
     Args:
         cyc_file_path (str): drivecycle input file path
+        cycles (dict, optional): Rust cycles by drivecycle file name, used instead of the drivecycle file. Defaults to None.
 
     Returns:
         range_cyc (fastsim.cycle.Cycle): FASTSim cycle object for current Scenario object
     """
-    if Path(cyc_file_path).exists() == False:
-        print(
-            f"Drive cycle not found in {cyc_file_path}, trying {gl.OPTIMIZATION_DRIVE_CYCLES}"
+    if cycles is not None and Path(cyc_file_path).name in cycles:
+        return cycles[Path(cyc_file_path).name].copy()
+    finalized_path = get_design_cycle_path(cyc_file_path)
+    if cycle_store.split_store_path(finalized_path) is not None:
+        return cycle_store.load_cycle(finalized_path)
+    range_cyc = cycle_index.load_cycle(finalized_path)
+    cycle_index.get_cycle_metadata(finalized_path, range_cyc)
+    return range_cyc
+
+
+def get_design_cycle_path(cyc_file_path: str) -> str:
+    """
+    This helper method gets the path of a drivecycle file, trying gl.OPTIMIZATION_DRIVE_CYCLES if it is not found
+
+    Args:
+        cyc_file_path (str): drivecycle input file path, or path in a cycle store
+
+    Returns:
+        finalized_path (str): drivecycle file path
+    """
+    if (
+        Path(cyc_file_path).exists() == False
+        and cycle_store.split_store_path(cyc_file_path) is None
+    ):
+        logger.debug(
+            "Drive cycle not found in %s, trying %s",
+            cyc_file_path,
+            gl.OPTIMIZATION_DRIVE_CYCLES,
         )
-        finalized_path = Path(gl.OPTIMIZATION_DRIVE_CYCLES) / cyc_file_path
+        return Path(gl.OPTIMIZATION_DRIVE_CYCLES) / cyc_file_path
+    return cyc_file_path
 
-    else:
-        finalized_path = cyc_file_path
-    range_cyc = cycle.Cycle.from_file(finalized_path)
-    range_cyc = range_cyc.to_rust()
-    return range_cyc
+
+def get_design_cycle_metadata(cyc_file_path: str, cycles: dict = None) -> dict:
+    """
+    This helper method gets the cycle metadata of a drivecycle file path from the cycle metadata index, as loaded by \
+        load_design_cycle_from_path, without building its Cycle object if the file is indexed
+
+    Args:
+        cyc_file_path (str): drivecycle input file path
+        cycles (dict, optional): Rust cycles by drivecycle file name, used instead of the drivecycle file. Defaults to None.
+
+    Returns:
+        metadata (dict): Dictionary of cycle statistics, see cycle_index.calc_cycle_metadata
+    """
+    name = Path(cyc_file_path).name
+    if cycles is not None and name in cycles:
+        metadata = cycle_index.CYCLE_METADATA_INDEX.get(
+            cycle_index.get_in_memory_path(name)
+        )
+        # in-memory cycles that batch.get_rust_cycles did not index
+        return metadata or cycle_index.calc_cycle_metadata(cycles[name])
+    finalized_path = get_design_cycle_path(cyc_file_path)
+    if cycle_store.split_store_path(finalized_path) is not None:
+        store_file, name = cycle_store.split_store_path(finalized_path)
+        return cycle_store.open_cycle_store(store_file).get_metadata(name)
+    return cycle_index.get_cycle_metadata(finalized_path)
 
 
 # ---------------------------------- powertrain adjustment methods ---------------------------------- #
@@ -809,6 +978,25 @@ def reset_vehicle_weight(vehicle: fastsim.vehicle.Vehicle) -> None:
     vehicle.set_veh_mass()
 
 
+def get_test_vehicle(
+    vehicle: fastsim.vehicle.Vehicle, scenario: Scenario
+) -> fastsim.vehicle.Vehicle:
+    """
+    This function returns a copy of the vehicle at the standardized accel and grade test weight. The input vehicle \
+        is left unchanged, so test jobs can share it and run independently.
+
+    Args:
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
+        scenario (t3co.run_scenario.Scenario): T3CO scenario object
+
+    Returns:
+        test_vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object at GVWR + gvwr_credit_kg
+    """
+    test_vehicle = copy.deepcopy(vehicle)
+    set_test_weight(test_vehicle, scenario)
+    return test_vehicle
+
+
 def limit_cargo_kg_for_moo_hev_bev(
     opt_scenario: Scenario, mooadvancedvehicle: fastsim.vehicle.Vehicle
 ) -> None:
@@ -935,6 +1123,100 @@ def set_cargo_kg(analysis_vehicle: fastsim.vehicle.Vehicle, cargo_kg):
     analysis_vehicle.set_veh_mass()
 
 
+def run_performance_tests(
+    vehicle: fastsim.vehicle.Vehicle,
+    scenario: Scenario,
+    get_accel: bool = True,
+    get_accel_loaded: bool = True,
+    get_gradeability: bool = True,
+    ess_init_soc_accel: float = None,
+    ess_init_soc_grade: float = None,
+    early_stop: bool = False,
+    gradeability_screening_tol: float = None,
+    gradeability_screening: dict = None,
+    gradeability_agreement: "gradeability.GradeabilityAgreement" = None,
+    verbose: bool = False,
+) -> dict:
+    """
+    This function runs the unloaded accel, loaded accel, and gradeability tests as independent jobs. The unloaded accel \
+        job reads vehicle and the loaded jobs read one get_test_vehicle() snapshot, so no job modifies a vehicle and \
+        the results do not depend on the order of the jobs. Without screening, each grade is a separate job. The jobs \
+        run in order in the calling thread, as sim_drive holds the GIL and a thread pool does not run them faster.
+
+    Args:
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object for current selection
+        scenario (Scenario): Scenario object for current selection
+        get_accel (bool, optional): if True, runs the unloaded accel test. Defaults to True.
+        get_accel_loaded (bool, optional): if True, runs the accel test at test weight. Defaults to True.
+        get_gradeability (bool, optional): if True, runs the 6% and 1.25% grade tests at test weight. Defaults to True.
+        ess_init_soc_accel (float, optional): ESS initial SOC override for accel. Defaults to None.
+        ess_init_soc_grade (float, optional): ESS initial SOC override for grade. Defaults to None.
+        early_stop (bool, optional): passed to accel.get_accel and the grade tests. Defaults to False.
+        gradeability_screening_tol (float, optional): if provided, runs gradeability.get_gradeability_screened. Defaults to None.
+        gradeability_screening (dict, optional): screening of the vehicle from gradeability.screen_gradeability, \
+            e.g. of its population. Defaults to None, screened in get_gradeability_screened.
+        gradeability_agreement (gradeability.GradeabilityAgreement, optional): record of screened tests. Defaults to None.
+        verbose (bool, optional): if True, prints the jobs. Defaults to False.
+
+    Returns:
+        results (dict): Dictionary of job results, keyed by 'accel', 'accel_loaded', and 'grade_6' and 'grade_1p25' \
+            or 'grade' if screened
+    """
+    jobs = {}
+    if get_accel:
+        jobs["accel"] = partial(
+            accel.get_accel,
+            vehicle,
+            scenario,
+            set_weight_to_max_kg=False,
+            ess_init_soc=ess_init_soc_accel,
+            verbose=verbose,
+            early_stop=early_stop,
+        )
+    if get_accel_loaded or get_gradeability:
+        test_vehicle = get_test_vehicle(vehicle, scenario)
+    if get_accel_loaded:
+        jobs["accel_loaded"] = partial(
+            accel.get_accel,
+            test_vehicle,
+            scenario,
+            set_weight_to_max_kg=False,
+            ess_init_soc=ess_init_soc_accel,
+            verbose=verbose,
+            early_stop=early_stop,
+        )
+    if get_gradeability and gradeability_screening_tol is None:
+        for key, target_grade in [
+            ("grade_6", gradeability.SIX_GRADE),
+            ("grade_1p25", gradeability.ONE_POINT_TWENTY_FIVE_GRADE),
+        ]:
+            jobs[key] = partial(
+                gradeability.get_grade_perf,
+                test_vehicle,
+                scenario,
+                target_grade,
+                ess_init_soc=ess_init_soc_grade,
+                early_stop=early_stop,
+                verbose=verbose,
+            )
+    elif get_gradeability:
+        jobs["grade"] = partial(
+            gradeability.get_gradeability_screened,
+            test_vehicle,
+            scenario,
+            ess_init_soc=ess_init_soc_grade,
+            set_weight_to_max_kg=False,
+            early_stop=early_stop,
+            screening_tol=gradeability_screening_tol,
+            screening=gradeability_screening,
+            agreement=gradeability_agreement,
+        )
+
+    if verbose:
+        print(f"{gl.SWEEP_PATH.name}:: Running performance test jobs {list(jobs)}")
+    return {key: job() for key, job in jobs.items()}
+
+
 def vehicle_scenario_sweep(
     vehicle: fastsim.vehicle.Vehicle,
     scenario: Scenario,
@@ -959,6 +1241,12 @@ def vehicle_scenario_sweep(
     get_accel_loaded = kwargs.get("get_accel_loaded", True)
     get_gradability = kwargs.get("get_gradability", True)
     write_tsv = kwargs.get("write_tsv", False)
+    early_stop = kwargs.get("early_stop", False)
+    gradeability_screening_tol = kwargs.get("gradeability_screening_tol", None)
+    gradeability_screening = kwargs.get("gradeability_screening", None)
+    gradeability_agreement = kwargs.get("gradeability_agreement", None)
+    veh_cost_set = kwargs.get("veh_cost_set", None)
+    context = kwargs.get("context", None)
 
     # run the vehicle through TCO calculations
     if verbose:
@@ -976,7 +1264,12 @@ def vehicle_scenario_sweep(
         veh_opp_cost_set,
         tco_files,
     ) = tco_analysis.get_tco_of_vehicle(
-        vehicle, range_cyc, scenario, write_tsv=write_tsv
+        vehicle,
+        range_cyc,
+        scenario,
+        write_tsv=write_tsv,
+        veh_cost_set=veh_cost_set,
+        context=context,
     )
 
     # tco_analysis.get_operating_costs(scenario, ownership_costs_df, veh_opp_cost_set)
@@ -1029,40 +1322,36 @@ def vehicle_scenario_sweep(
             scenario.soc_norm_init_for_accel_pct * (vehicle.max_soc - vehicle.min_soc)
         )
 
-    if get_accel:
-        if verbose:
-            print(f"{gl.SWEEP_PATH.name}:: Running accel.get_accel")
-        zero_to_60, zero_to_30, accel_sdr = accel.get_accel(
-            vehicle,
-            scenario,
-            set_weight_to_max_kg=False,
-            ess_init_soc=ess_init_soc_accel,
-            verbose=verbose,
-        )
-    if get_accel_loaded:
-        if verbose:
-            print(f"{gl.SWEEP_PATH.name}:: Running accel.get_accel loaded")
-        zero_to_60_loaded, zero_to_30_loaded, accel_loaded_sdr = accel.get_accel(
-            vehicle,
-            scenario,
-            set_weight_to_max_kg=True,
-            ess_init_soc=ess_init_soc_accel,
-            verbose=verbose,
-        )
-    if get_gradability:
-        if verbose:
-            print(f"{gl.SWEEP_PATH.name}:: Running gradeability.get_gradeability")
+    perf_results = run_performance_tests(
+        vehicle,
+        scenario,
+        get_accel=get_accel,
+        get_accel_loaded=get_accel_loaded,
+        get_gradeability=get_gradability,
+        ess_init_soc_accel=ess_init_soc_accel,
+        ess_init_soc_grade=ess_init_soc_grade,
+        early_stop=early_stop,
+        gradeability_screening_tol=gradeability_screening_tol,
+        gradeability_screening=gradeability_screening,
+        gradeability_agreement=gradeability_agreement,
+        verbose=verbose,
+    )
+    if "accel" in perf_results:
+        zero_to_60, zero_to_30, accel_sdr = perf_results["accel"]
+    if "accel_loaded" in perf_results:
+        zero_to_60_loaded, zero_to_30_loaded, accel_loaded_sdr = perf_results[
+            "accel_loaded"
+        ]
+    if "grade_6" in perf_results:
+        grade_6_mph_ach, grade_sdr_6 = perf_results["grade_6"]
+        grade_1_25_mph_ach, grade_sdr_125 = perf_results["grade_1p25"]
+    if "grade" in perf_results:
         (
             grade_6_mph_ach,
             grade_1_25_mph_ach,
             grade_sdr_6,
             grade_sdr_125,
-        ) = gradeability.get_gradeability(
-            vehicle,
-            scenario,
-            ess_init_soc=ess_init_soc_grade,
-            set_weight_to_max_kg=True,
-        )
+        ) = perf_results["grade"]
 
     range_dict = fueleconomy.get_range_mi(mpgge, vehicle, scenario)
 
@@ -1115,15 +1404,13 @@ def run(
     """
 
     # set up tco results directories for the vocation-scenario
-    gl.vocation_scenario = vocation
-    gl.set_tco_intermediates()
-    gl.set_tco_results()
+    context = analysis_context.create_analysis_context(vocation)
 
     # load the generated file of vehicles, drive cycles, and tech targets
     vehicle = get_vehicle(veh_no, vehicle_input_path)
     scenario, range_cyc = get_scenario_and_cycle(veh_no, scenario_inputs_path)
 
-    out = vehicle_scenario_sweep(vehicle, scenario, range_cyc)
+    out = vehicle_scenario_sweep(vehicle, scenario, range_cyc, context=context)
 
     return out
 
@@ -1143,12 +1430,10 @@ def rerun(
         out (dict): output dictionary containing TCO outputs
     """
     # set up tco results directories for the vocation-scenario
-    gl.vocation_scenario = vocation
-    gl.set_tco_intermediates()
-    gl.set_tco_results()
+    context = analysis_context.create_analysis_context(vocation)
 
     range_cyc = load_design_cycle_from_scenario(scenario, config)
 
-    out = vehicle_scenario_sweep(vehicle, scenario, range_cyc)
+    out = vehicle_scenario_sweep(vehicle, scenario, range_cyc, context=context)
 
     return out
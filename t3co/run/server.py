@@ -0,0 +1,332 @@
+"""Module for a long-lived local TCO evaluation server for interactive what-if tools. The server loads the Config of an \
+    analysis once and keeps vehicles, scenario inputs, drive cycles, price tables, and the payload KDE in the caches \
+    of its process, so requests for selections with vehicle and scenario field overrides do not re-read inputs. \
+    Requests and responses are JSON over HTTP on localhost or a Unix socket, see client for the client and latency \
+    benchmark. Requests are evaluated one at a time."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import fastsim
+import numpy as np
+import pandas as pd
+
+from t3co.run import Global as gl
+from t3co.run import batch, cycle_index, run_scenario
+from t3co.run.client import DEFAULT_HOST, DEFAULT_PORT
+from t3co.tco import opportunity_cost, tcocalc
+
+# keyword arguments of run_scenario.vehicle_scenario_sweep that requests may set as options
+REQUEST_OPTIONS = [
+    "get_accel",
+    "get_accel_loaded",
+    "get_gradability",
+    "gradeability_screening_tol",
+]
+
+
+def set_vehicle_overrides(
+    vehicle: fastsim.vehicle.Vehicle, vehicle_overrides: dict
+) -> None:
+    """
+    This function overrides fields of a vehicle, e.g. ess_max_kwh, and updates its derived fields and mass
+
+    Args:
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
+        vehicle_overrides (dict): vehicle field values by vehicle input file column
+    """
+    for field, value in vehicle_overrides.items():
+        assert hasattr(vehicle, field), f"vehicle has no field {field}"
+        setattr(vehicle, field, value)
+    if vehicle_overrides:
+        vehicle.set_derived()
+        vehicle.set_veh_mass()
+
+
+def get_scenario_inputs(
+    sel: int | str, scenario_file: str, scenario_overrides: dict
+) -> str | pd.DataFrame:
+    """
+    This function gets the scenario inputs of a selection with overridden scenario input file columns. Fields set \
+        by the analysis Config still override the scenario inputs, as in sweep.py.
+
+    Args:
+        sel (int | str): selection number
+        scenario_file (str): scenario input file path
+        scenario_overrides (dict): scenario field values by scenario input file column, e.g. \
+            discount_rate_pct_per_yr or vmt, list values are written like in the scenario input file
+
+    Returns:
+        scenario_inputs (str | pd.DataFrame): scenario_file if there are no overrides, else dataframe of the \
+            overridden scenario inputs of sel
+    """
+    if not scenario_overrides:
+        return scenario_file
+    scenarios = run_scenario.get_scenario_inputs(scenario_file)
+    scenario_inputs = scenarios[
+        scenarios["selection"] == int(float(str(sel).split("_")[0]))
+    ].copy()
+    for field, value in scenario_overrides.items():
+        assert field in scenarios.columns, f"scenario inputs have no column {field}"
+        scenario_inputs[field] = str(value) if isinstance(value, list) else value
+    return scenario_inputs
+
+
+def evaluate(evaluation: dict, config: run_scenario.Config) -> dict:
+    """
+    This function evaluates the TCO and performance of a selection with vehicle and scenario field overrides
+
+    Args:
+        evaluation (dict): Dictionary of selection and optional vehicle_overrides (see set_vehicle_overrides), \
+            scenario_overrides (see get_scenario_inputs), and options (see REQUEST_OPTIONS)
+        config (run_scenario.Config): Config object of the analysis
+
+    Returns:
+        result (dict): Dictionary of selection, error message, None if there was no error, and the results of \
+            batch.get_result_row
+    """
+    result = {"selection": evaluation.get("selection"), "error": None}
+    try:
+        sel = evaluation["selection"]
+        options = evaluation.get("options", {})
+        invalid_options = set(options) - set(REQUEST_OPTIONS)
+        assert not invalid_options, f"invalid options {sorted(invalid_options)}"
+        vehicle = run_scenario.get_vehicle(sel, config.vehicle_file)
+        set_vehicle_overrides(vehicle, evaluation.get("vehicle_overrides", {}))
+        scenario_inputs = get_scenario_inputs(
+            sel, config.scenario_file, evaluation.get("scenario_overrides", {})
+        )
+        scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+            sel, scenario_inputs, a_vehicle=vehicle, config=config
+        )
+        out = run_scenario.vehicle_scenario_sweep(
+            vehicle, scenario, range_cyc, **options
+        )
+        result.update(batch.get_result_row(out))
+    except Exception as err:
+        result["error"] = f"{type(err).__name__}: {err}"
+    return result
+
+
+def warm_up(config: run_scenario.Config, selections: list = None) -> None:
+    """
+    This function loads the vehicles, scenarios, and drive cycles of the selections into the caches of this \
+        process, and evaluates the first selection to load the price tables, payload KDE, and performance test cycles
+
+    Args:
+        config (run_scenario.Config): Config object of the analysis
+        selections (list, optional): selections to load. Defaults to None, the selections of config.
+    """
+    if selections is None:
+        selections = list(config.selections)
+    for sel in selections:
+        try:
+            vehicle = run_scenario.get_vehicle(sel, config.vehicle_file)
+            run_scenario.get_scenario_and_cycle(
+                sel, config.scenario_file, a_vehicle=vehicle, config=config
+            )
+        except Exception as err:
+            print(f"selection {sel} not loaded: {err}")
+    if len(selections):
+        evaluate({"selection": selections[0]}, config)
+
+
+def to_json(value) -> float | int | str:
+    """
+    This function converts values that json cannot serialize, e.g. numpy numbers
+
+    Args:
+        value: value of a result
+
+    Returns:
+        json_value (float | int | str): JSON serializable value
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class EvaluationRequestHandler(BaseHTTPRequestHandler):
+    """
+    This class handles the requests of the evaluation server: GET /health, POST /evaluate with a JSON body \
+        {"evaluations": [evaluation, ...]}, see evaluate, and POST /shutdown
+    """
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self.send_json(get_health(self.server))
+        else:
+            self.send_json({"error": f"unknown path {self.path}"}, 404)
+
+    def do_POST(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or "{}")
+        except ValueError as err:
+            self.send_json({"error": f"invalid JSON request: {err}"}, 400)
+            return
+        if self.path == "/evaluate":
+            evaluations = request.get("evaluations")
+            if not isinstance(evaluations, list):
+                self.send_json({"error": "evaluations must be a list"}, 400)
+                return
+            start = time.perf_counter()
+            results = [
+                evaluate(evaluation, self.server.config) for evaluation in evaluations
+            ]
+            self.server.n_evaluations += len(results)
+            self.send_json(
+                {"results": results, "time_s": time.perf_counter() - start}
+            )
+        elif self.path == "/shutdown":
+            self.send_json({"status": "shutting down"})
+            # shutdown waits for serve_forever, which is running this request
+            threading.Thread(target=self.server.shutdown).start()
+        else:
+            self.send_json({"error": f"unknown path {self.path}"}, 404)
+
+    def send_json(self, response: dict, status: int = 200) -> None:
+        """
+        This method sends a JSON response
+
+        Args:
+            response (dict): JSON response
+            status (int, optional): HTTP status code. Defaults to 200.
+        """
+        body = json.dumps(response, default=to_json).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            print(f"{self.command} {self.path}: {format % args}")
+
+
+class UnixEvaluationServer(socketserver.UnixStreamServer):
+    """
+    This class is an evaluation server on a Unix socket, which is removed when the server is closed
+    """
+
+    def server_bind(self) -> None:
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def get_health(server: socketserver.BaseServer) -> dict:
+    """
+    This function gets the status and cache sizes of an evaluation server
+
+    Args:
+        server (socketserver.BaseServer): evaluation server, see create_server
+
+    Returns:
+        health (dict): Dictionary of status, analysis ID, number of evaluations, uptime [s], and cache sizes
+    """
+    return {
+        "status": "ok",
+        "analysis_id": server.config.analysis_id,
+        "n_evaluations": server.n_evaluations,
+        "uptime_s": time.perf_counter() - server.start_time,
+        "cache_sizes": {
+            "vehicles": len(run_scenario.VEHICLE_CACHE),
+            "scenario_inputs": len(run_scenario.SCENARIO_INPUTS_CACHE),
+            "cycles": len(cycle_index.CYCLE_CACHE),
+            "price_tables": len(tcocalc.PRICE_TABLE_CACHE),
+            "payload_kdes": len(opportunity_cost.PAYLOAD_KDE_CACHE),
+        },
+    }
+
+
+def create_server(
+    config: run_scenario.Config,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: str | Path = None,
+    verbose: bool = False,
+) -> socketserver.BaseServer:
+    """
+    This function creates an evaluation server for the analysis of a Config, call serve_forever to start it
+
+    Args:
+        config (run_scenario.Config): Config object of the analysis
+        host (str, optional): host address, only local addresses should be used. Defaults to DEFAULT_HOST.
+        port (int, optional): TCP port, 0 for any free port. Defaults to DEFAULT_PORT.
+        socket_path (str | Path, optional): Unix socket path, used instead of host and port. Defaults to None.
+        verbose (bool, optional): if True, print every request. Defaults to False.
+
+    Returns:
+        server (socketserver.BaseServer): evaluation server
+    """
+    if socket_path is not None:
+        server = UnixEvaluationServer(str(socket_path), EvaluationRequestHandler)
+    else:
+        server = HTTPServer((host, port), EvaluationRequestHandler)
+    server.config = config
+    server.verbose = verbose
+    server.n_evaluations = 0
+    server.start_time = time.perf_counter()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="SERVER",
+        description="""Serves TCO evaluations of an analysis with warm caches, see client.py""",
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv",
+        help="input Config file",
+    )
+    parser.add_argument(
+        "--analysis-id", type=int, default=0, help="Config file analysis ID"
+    )
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help="server host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Unix socket path, used instead of host and port",
+    )
+    parser.add_argument(
+        "--skip-warm-up",
+        action="store_true",
+        help="do not load the Config selections before serving",
+    )
+    parser.add_argument("--verbose", action="store_true", help="print every request")
+    args = parser.parse_args()
+
+    config = run_scenario.load_config(args.config, args.analysis_id)
+    if not args.skip_warm_up:
+        start = time.perf_counter()
+        warm_up(config)
+        print(f"warmed up in {time.perf_counter() - start:.1f} s")
+    server = create_server(config, args.host, args.port, args.socket, args.verbose)
+    print(f"T3CO server listening on {args.socket or f'{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,336 @@
+"""Module for running tasks on supervised worker processes, for sweeps where one selection must not stall or stop the \
+    run. Unlike multiprocessing.Pool, each task can have a wall-clock timeout after which its worker is terminated, \
+    groups of tasks can be run in order on one worker while each task is timed out and reported on its own, \
+    workers that crash, e.g. in the FASTSim Rust extension, are restarted, and workers are recycled after a number of \
+    tasks or when their memory grows. Tasks that time out, crash, or raise are reported with a status instead of \
+    raising, so the caller can record them as failed and continue. Workers send their log records over a pipe of their \
+    own, which the pool drains, so terminating a worker cannot break the logging of the other processes."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Callable, Iterable, Iterator, Tuple
+
+from t3co.run import sweep_logging
+
+# task statuses, see SupervisedPool.imap_unordered
+TASK_OK = "ok"
+TASK_ERROR = "error"
+TASK_TIMEOUT = "timeout"
+TASK_CRASHED = "crashed"
+
+# time [s] between checks of the task timeouts
+POLL_S = 0.5
+# time [s] to wait for a stopped worker to exit before it is terminated
+JOIN_TIMEOUT_S = 10
+
+
+def get_rss_mb() -> float:
+    """
+    This function gets the resident memory of this process. It is read from /proc, so it is 0 on systems without \
+        /proc and memory recycling is disabled there.
+
+    Returns:
+        rss_mb (float): resident memory [MB]
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, AttributeError, ValueError):
+        return 0.0
+
+
+def run_worker(
+    conn: multiprocessing.connection.Connection,
+    max_tasks: int = None,
+    max_memory_mb: float = None,
+    log_conn: multiprocessing.connection.Connection = None,
+    log_level: int = logging.WARNING,
+) -> None:
+    """
+    This function runs the tasks sent to a worker process until it is stopped or recycled. For each task, the worker \
+        sends back the task ID, status, result or traceback, and whether it exits to be recycled.
+
+    Args:
+        conn (multiprocessing.connection.Connection): worker end of the pipe to the pool
+        max_tasks (int, optional): number of tasks after which the worker exits. Defaults to None, no limit.
+        max_memory_mb (float, optional): resident memory [MB] above which the worker exits after a task. \
+            Defaults to None, no limit.
+        log_conn (multiprocessing.connection.Connection, optional): worker end of the log pipe to the pool. \
+            Defaults to None, logging is not set up.
+        log_level (int, optional): level of the messages that are logged. Defaults to logging.WARNING.
+    """
+    if log_conn is not None:
+        sweep_logging.start_worker_logging(log_conn, log_level)
+    n_tasks = 0
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        task_id, func, task = message
+        try:
+            status, result = TASK_OK, func(task)
+        except Exception:
+            status, result = TASK_ERROR, traceback.format_exc()
+        n_tasks += 1
+        recycle = (max_tasks is not None and n_tasks >= max_tasks) or (
+            max_memory_mb is not None and get_rss_mb() > max_memory_mb
+        )
+        conn.send((task_id, status, result, recycle))
+        if recycle:
+            break
+    conn.close()
+    if log_conn is not None:
+        log_conn.close()
+
+
+class Worker:
+    """
+    This class is a worker process of a SupervisedPool and the task it is running. The worker logs at the level of \
+        the root logger of the pool process.
+    """
+
+    def __init__(self, max_tasks: int = None, max_memory_mb: float = None):
+        self.conn, worker_conn = multiprocessing.Pipe()
+        self.log_conn, worker_log_conn = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(
+            target=run_worker,
+            args=(
+                worker_conn,
+                max_tasks,
+                max_memory_mb,
+                worker_log_conn,
+                logging.getLogger().getEffectiveLevel(),
+            ),
+            daemon=True,
+        )
+        self.process.start()
+        worker_conn.close()
+        worker_log_conn.close()
+        self.task_id = None
+        self.timeout_s = None
+        self.start_time = None
+        # task IDs of the rest of the task group of the worker, see SupervisedPool.imap_unordered
+        self.group = deque()
+
+    def handle_logs(self) -> None:
+        """
+        This method logs the records that the worker sent, see sweep_logging.handle_worker_records
+        """
+        if not self.log_conn.closed:
+            sweep_logging.handle_worker_records(self.log_conn)
+
+    def stop(self) -> None:
+        """
+        This method stops the worker after its current task, and terminates it if it does not exit
+        """
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        # the worker may wait for its last records to be read
+        end_time = time.monotonic() + JOIN_TIMEOUT_S
+        while self.process.is_alive() and time.monotonic() < end_time:
+            wait([self.log_conn, self.process.sentinel], timeout=POLL_S)
+            self.handle_logs()
+        self.terminate()
+
+    def close(self) -> None:
+        """
+        This method waits for the worker process to exit, logs its last records, and closes its pipes
+        """
+        self.process.join()
+        self.handle_logs()
+        self.conn.close()
+        self.log_conn.close()
+
+    def terminate(self) -> None:
+        """
+        This method terminates the worker process. A record that the worker was sending is lost, its pipe is not \
+            shared with other processes.
+        """
+        if self.process.is_alive():
+            self.process.terminate()
+        self.close()
+
+
+class SupervisedPool:
+    """
+    This class runs tasks on worker processes that are restarted when they crash or time out, and recycled after \
+        max_tasks_per_worker tasks or when their resident memory exceeds max_worker_memory_mb. Workers are started on \
+        first use, so with the fork start method they inherit the input caches of the parent process at that time.
+    """
+
+    def __init__(
+        self,
+        n_workers: int,
+        max_tasks_per_worker: int = None,
+        max_worker_memory_mb: float = None,
+    ):
+        assert n_workers >= 1, "n_workers must be at least 1"
+        self.n_workers = n_workers
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_worker_memory_mb = max_worker_memory_mb
+        self.workers = []
+        self.n_restarts = 0
+
+    def __enter__(self) -> SupervisedPool:
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def start_worker(self) -> Worker:
+        """
+        This method starts a worker process
+
+        Returns:
+            worker (Worker): idle worker
+        """
+        return Worker(self.max_tasks_per_worker, self.max_worker_memory_mb)
+
+    def replace_worker(self, worker: Worker, terminate: bool = False) -> None:
+        """
+        This method replaces a crashed, timed out, or recycled worker with a new worker, which continues the task \
+            group of the worker
+
+        Args:
+            worker (Worker): worker to replace
+            terminate (bool, optional): if True, terminate the worker, e.g. on timeout. Defaults to False.
+        """
+        if terminate:
+            worker.terminate()
+        else:
+            worker.close()
+        new_worker = self.start_worker()
+        new_worker.group = worker.group
+        self.workers[self.workers.index(worker)] = new_worker
+        self.n_restarts += 1
+
+    def imap_unordered(
+        self,
+        func: Callable,
+        tasks: Iterable,
+        timeout_s: float | Callable = None,
+        grouped: bool = False,
+    ) -> Iterator[Tuple[object, str, object]]:
+        """
+        This method runs func on each task and yields the results as they finish. A task that raises, times out, or \
+            crashes its worker is yielded with its status and error message, and the other tasks continue.
+
+        Args:
+            func (Callable): picklable function of one task, e.g. a functools.partial of a module-level function
+            tasks (Iterable): picklable tasks, or lists of tasks if grouped
+            timeout_s (float | Callable, optional): wall-clock timeout [s] of each task, or function of a task that \
+                returns its timeout. Defaults to None, no timeout.
+            grouped (bool, optional): if True, tasks are lists of tasks that are sent one at a time, in order, to \
+                the same worker, e.g. to reuse its input caches. Each task is timed out and reported on its own, and \
+                the rest of a group continues on the replacement worker. Defaults to False.
+
+        Yields:
+            task, status, result (Tuple[object, str, object]): task, TASK_OK, TASK_ERROR, TASK_TIMEOUT, or \
+                TASK_CRASHED, and the return value of func or the error message
+        """
+        groups = (
+            [list(group) for group in tasks] if grouped else [[task] for task in tasks]
+        )
+        tasks = []
+        # task IDs of the groups that have not been started
+        pending = deque()
+        for group in groups:
+            if group:
+                pending.append(deque(range(len(tasks), len(tasks) + len(group))))
+                tasks.extend(group)
+        while len(self.workers) < min(self.n_workers, len(pending)):
+            self.workers.append(self.start_worker())
+        for worker in self.workers:
+            worker.group = deque()
+        n_done = 0
+        while n_done < len(tasks):
+            for worker in self.workers:
+                if worker.task_id is None and not worker.group and pending:
+                    worker.group = pending.popleft()
+                if worker.task_id is None and worker.group:
+                    worker.task_id = worker.group.popleft()
+                    task = tasks[worker.task_id]
+                    worker.timeout_s = (
+                        timeout_s(task) if callable(timeout_s) else timeout_s
+                    )
+                    worker.start_time = time.monotonic()
+                    try:
+                        worker.conn.send((worker.task_id, func, task))
+                    except OSError:
+                        # the worker exited, its task is reported as crashed below
+                        pass
+
+            wait(
+                [worker.conn for worker in self.workers]
+                + [worker.log_conn for worker in self.workers]
+                + [worker.process.sentinel for worker in self.workers],
+                timeout=POLL_S,
+            )
+            for worker in list(self.workers):
+                # the records of a task are logged before its result is yielded
+                worker.handle_logs()
+                if worker.task_id is None:
+                    if not worker.process.is_alive():
+                        self.replace_worker(worker)
+                    continue
+                task = tasks[worker.task_id]
+                try:
+                    message = worker.conn.recv() if worker.conn.poll() else None
+                except EOFError:
+                    message = None
+                if message is not None:
+                    _, status, result, recycle = message
+                    worker.task_id = None
+                    n_done += 1
+                    yield task, status, result
+                    if recycle:
+                        self.replace_worker(worker)
+                elif not worker.process.is_alive():
+                    worker.process.join()
+                    worker.task_id = None
+                    n_done += 1
+                    self.replace_worker(worker)
+                    yield task, TASK_CRASHED, (
+                        f"worker exited with code {worker.process.exitcode}"
+                    )
+                elif (
+                    worker.timeout_s is not None
+                    and time.monotonic() - worker.start_time > worker.timeout_s
+                ):
+                    worker.task_id = None
+                    n_done += 1
+                    self.replace_worker(worker, terminate=True)
+                    yield task, TASK_TIMEOUT, (
+                        f"task did not finish within {worker.timeout_s} s"
+                    )
+
+    def close(self) -> None:
+        """
+        This method stops the workers after their current tasks
+        """
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+
+    def terminate(self) -> None:
+        """
+        This method terminates the workers
+        """
+        for worker in self.workers:
+            worker.terminate()
+        self.workers = []
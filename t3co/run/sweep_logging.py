@@ -0,0 +1,227 @@
+"""Module for logging sweeps from worker processes to the parent process. Log records of the parent process are put \
+    on a multiprocessing queue by a QueueHandler on the root logger, and written by a QueueListener thread of the \
+    parent process to the sweep log file, a JSON-lines file of one structured record per selection, and optionally \
+    the console. Worker processes set up their logging in their entry point with start_worker_logging, so they also \
+    log with the spawn start method, where they do not inherit the handlers of the parent. Workers that can be \
+    terminated, e.g. on a timeout, send their records over a pipe of their own that the parent drains with \
+    handle_worker_records, as terminating a process while it puts a record on the shared queue can corrupt the queue \
+    or leave its lock held. Messages below the log level are dropped in the process that logs them, before they are \
+    formatted or sent."""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import socket
+import sys
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+# log levels of --log-level
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+LOG_FORMAT = "%(asctime)s %(levelname)-8s %(processName)s %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# logger of the structured selection records, see log_selection
+SELECTION_LOGGER = "t3co.selections"
+
+LOG_QUEUE = None
+LISTENER = None
+# process of the log listener, worker processes inherit LISTENER but not its thread
+LISTENER_PID = None
+
+
+class SelectionRecordFilter(logging.Filter):
+    """
+    This class passes only the log records of log_selection
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return hasattr(record, "selection_record")
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    This class formats the selection records of log_selection as JSON lines
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {
+                "time": self.formatTime(record, DATE_FORMAT),
+                "host": socket.gethostname(),
+                "pid": record.process,
+                **record.selection_record,
+            },
+            default=str,
+        )
+
+
+class PipeHandler(logging.handlers.QueueHandler):
+    """
+    This class sends the log records of a worker process over the worker end of a pipe, see handle_worker_records
+    """
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # the lock of the handler serializes the records of the threads of the worker
+        self.queue.send(record)
+
+
+def start_logging(
+    log_file: str | Path,
+    records_file: str | Path = None,
+    level: str | int = logging.INFO,
+    console_level: str | int = None,
+) -> logging.handlers.QueueListener:
+    """
+    This function starts the log listener of a sweep and routes the root logger of this process, and of the worker \
+        processes forked from it later, to it. A running listener is stopped first.
+
+    Args:
+        log_file (str | Path): sweep log file, appended to
+        records_file (str | Path, optional): JSON-lines file of the selection records, appended to. Defaults to None.
+        level (str | int, optional): level of the messages that are logged. Defaults to logging.INFO.
+        console_level (str | int, optional): level of the messages that are also printed. Defaults to None, \
+            messages are only written to the files, e.g. the FASTSim trace miss warnings of every simulation.
+
+    Returns:
+        listener (logging.handlers.QueueListener): running log listener
+    """
+    global LOG_QUEUE, LISTENER, LISTENER_PID
+    stop_logging()
+    level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    file_handler = logging.FileHandler(log_file, mode="a")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+    handlers = [file_handler]
+    if console_level is not None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(console_level)
+        console_handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        handlers.append(console_handler)
+    if records_file is not None:
+        records_handler = logging.FileHandler(records_file, mode="a")
+        records_handler.addFilter(SelectionRecordFilter())
+        records_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(records_handler)
+
+    LOG_QUEUE = multiprocessing.Queue(-1)
+    LISTENER = logging.handlers.QueueListener(
+        LOG_QUEUE, *handlers, respect_handler_level=True
+    )
+    LISTENER.start()
+    LISTENER_PID = os.getpid()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(logging.handlers.QueueHandler(LOG_QUEUE))
+    root.setLevel(level)
+    # selection records are written at any log level
+    logging.getLogger(SELECTION_LOGGER).setLevel(logging.INFO)
+    return LISTENER
+
+
+def stop_logging() -> None:
+    """
+    This function writes the queued log records, stops the log listener of this process, and closes its files. \
+        Worker processes only put records on the queue, so it does nothing in them.
+    """
+    global LOG_QUEUE, LISTENER
+    if LISTENER is None or LISTENER_PID != os.getpid():
+        return
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    LISTENER.stop()
+    for handler in LISTENER.handlers:
+        handler.close()
+    LOG_QUEUE.close()
+    LOG_QUEUE, LISTENER = None, None
+
+
+atexit.register(stop_logging)
+
+
+def start_worker_logging(log_target: object, level: str | int) -> None:
+    """
+    This function routes the root logger of a worker process to the parent process. It is called in the entry point \
+        of the worker, and replaces the handlers that a forked worker inherits.
+
+    Args:
+        log_target (object): LOG_QUEUE of start_logging, for workers that are not terminated, or the worker end \
+            (multiprocessing.connection.Connection) of a pipe that the parent drains with handle_worker_records
+        level (str | int): level of the messages that are logged, e.g. the level of the parent root logger
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if isinstance(log_target, Connection):
+        root.addHandler(PipeHandler(log_target))
+    else:
+        root.addHandler(logging.handlers.QueueHandler(log_target))
+    root.setLevel(level)
+    logging.getLogger(SELECTION_LOGGER).setLevel(logging.INFO)
+
+
+def handle_worker_records(log_conn: Connection) -> bool:
+    """
+    This function logs the records that a worker process sent over its pipe, see start_worker_logging, in this \
+        process, e.g. to the queue of start_logging
+
+    Args:
+        log_conn (multiprocessing.connection.Connection): parent end of the pipe of the worker
+
+    Returns:
+        is_open (bool): False if the worker closed the pipe or exited, e.g. terminated while it sent a record
+    """
+    try:
+        while log_conn.poll():
+            record = log_conn.recv()
+            logging.getLogger(record.name).handle(record)
+    except (EOFError, OSError):
+        return False
+    return True
+
+
+def log_selection(selection: str | int, status: str, **fields) -> None:
+    """
+    This function logs the structured record of a selection, written to the records file of start_logging
+
+    Args:
+        selection (str | int): selection number
+        status (str): status of the selection, e.g. ok, or a failure status of the sweep
+        **fields: fields of the record, e.g. scenario_name, run_time_s, or error
+    """
+    logger = logging.getLogger(SELECTION_LOGGER)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "selection %s %s",
+            selection,
+            status,
+            extra={
+                "selection_record": {
+                    "selection": str(selection),
+                    "status": status,
+                    **fields,
+                }
+            },
+        )
+
+
+def read_selection_records(records_file: str | Path) -> list:
+    """
+    This function reads the selection records of a records file
+
+    Args:
+        records_file (str | Path): JSON-lines file of selection records
+
+    Returns:
+        records (list): selection records
+    """
+    with open(records_file) as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,545 @@
+"""Module for a work queue of sweep selections in a SQLite file on storage shared by the hosts of a sweep. A \
+    coordinator adds the expanded selections and the run inputs, and worker processes on any number of hosts claim \
+    selections with a lease, renew the lease while they run them, and commit their results to the queue. Selections \
+    of workers that stop renewing their lease, e.g. on a lost host, are claimed again after the lease expires. No \
+    server is needed: the SQLite file locks serialize the claims, so the shared file system must support file locks. \
+    The queue stores a hash of the run inputs, so a sweep with other inputs does not resume the results of the old \
+    inputs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# selection statuses in the queue
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+# lease time [s] of a claimed selection, renewed every LEASE_S / 3 while the selection runs
+LEASE_S = 300
+# number of expired leases of a selection after which it is failed, e.g. if it crashes every worker that runs it
+MAX_ATTEMPTS = 3
+# time [s] between claims of a worker waiting for the leases of other workers, and between progress checks
+POLL_S = 5
+# time [s] to wait for the lock of the queue file
+LOCK_TIMEOUT_S = 60
+
+CREATE_TABLES = [
+    """CREATE TABLE IF NOT EXISTS tasks (
+        selection TEXT PRIMARY KEY,
+        position INTEGER,
+        task BLOB,
+        status TEXT DEFAULT 'pending',
+        worker TEXT,
+        lease_expires REAL,
+        attempts INTEGER DEFAULT 0,
+        result TEXT,
+        error TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS run_inputs (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        inputs BLOB,
+        inputs_hash TEXT
+    )""",
+]
+
+
+def connect(queue_path: str | Path) -> sqlite3.Connection:
+    """
+    This function opens a connection to a queue file. Transactions are started explicitly.
+
+    Args:
+        queue_path (str | Path): queue file path
+
+    Returns:
+        conn (sqlite3.Connection): queue connection
+    """
+    # the default rollback journal is kept, the write-ahead log does not work on network file systems
+    return sqlite3.connect(
+        str(queue_path), timeout=LOCK_TIMEOUT_S, isolation_level=None
+    )
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    This function runs a write transaction that holds the lock of the queue file from its start
+
+    Args:
+        conn (sqlite3.Connection): queue connection
+
+    Yields:
+        conn (sqlite3.Connection): queue connection in the transaction
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def get_worker_id() -> str:
+    """
+    This function gets the ID of this worker process, unique across the hosts of a sweep
+
+    Returns:
+        worker_id (str): host name and process ID
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def get_json_value(value: object) -> object:
+    """
+    This function converts a value that json.dumps cannot serialize, e.g. a numpy scalar of a selection number, to a \
+        Python type, or to its string
+
+    Args:
+        value (object): value of a result
+
+    Returns:
+        json_value (object): JSON serializable value
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def get_task_key(task: object) -> str:
+    """
+    This function gets the key of a task in the queue, the same for a task and its numpy scalar, e.g. 12 and \
+        np.int64(12)
+
+    Args:
+        task (object): task, e.g. a selection number
+
+    Returns:
+        key (str): task key
+    """
+    if isinstance(task, np.generic):
+        task = task.item()
+    return str(task)
+
+
+def get_inputs_hash(run_inputs: object) -> str:
+    """
+    This function gets the hash of the run inputs of a queue
+
+    Args:
+        run_inputs (object): picklable run inputs, or the part of them that determines the results of the tasks
+
+    Returns:
+        inputs_hash (str): SHA-256 hex digest of the pickled run inputs
+    """
+    return hashlib.sha256(pickle.dumps(run_inputs)).hexdigest()
+
+
+def create_queue(
+    queue_path: str | Path,
+    tasks: list,
+    run_inputs: dict,
+    inputs_hash: str = None,
+    reset: bool = False,
+) -> int:
+    """
+    This function creates a queue of tasks, e.g. selections, and stores the inputs shared by all tasks. If the queue \
+        exists, its run inputs are replaced, new tasks are added, tasks are ordered as in tasks, and failed tasks are \
+        reset, so an interrupted sweep resumes without running its finished tasks again. If the hash of the run \
+        inputs changed, the results of the queue belong to other inputs: the queue is not resumed unless reset is \
+        set, which resets all tasks. Tasks cannot be reset while workers run them with the old inputs.
+
+    Args:
+        queue_path (str | Path): queue file path on storage shared by the hosts
+        tasks (list): picklable tasks in the order they are claimed, see get_task_key
+        run_inputs (dict): picklable inputs of the workers, see get_run_inputs
+        inputs_hash (str, optional): hash of the run inputs that determine the results, e.g. without the time stamp \
+            of the sweep. Defaults to None, get_inputs_hash of run_inputs.
+        reset (bool, optional): if selected, all tasks are reset if the run inputs changed. Defaults to False.
+
+    Returns:
+        n_added (int): number of tasks added to the queue
+    """
+    if inputs_hash is None:
+        inputs_hash = get_inputs_hash(run_inputs)
+    with closing(connect(queue_path)) as conn, transaction(conn):
+        for create_table in CREATE_TABLES:
+            conn.execute(create_table)
+        row = conn.execute("SELECT inputs_hash FROM run_inputs WHERE id = 0").fetchone()
+        if row is not None and row[0] != inputs_hash:
+            assert (
+                reset
+            ), f"the run inputs of {queue_path} changed, reset its tasks or use a new queue file"
+            n_running = conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status = ? AND lease_expires >= ?",
+                (TASK_RUNNING, time.time()),
+            ).fetchone()[0]
+            assert (
+                n_running == 0
+            ), f"cannot reset {queue_path} while workers run {n_running} of its tasks"
+            conn.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, lease_expires = NULL, "
+                "attempts = 0, result = NULL, error = NULL",
+                (TASK_PENDING,),
+            )
+        conn.execute(
+            "INSERT OR REPLACE INTO run_inputs (id, inputs, inputs_hash) "
+            "VALUES (0, ?, ?)",
+            (pickle.dumps(run_inputs), inputs_hash),
+        )
+        n_before = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        # numpy scalars are stored as Python types, so results and tasks match their keys
+        tasks = [
+            task.item() if isinstance(task, np.generic) else task for task in tasks
+        ]
+        conn.executemany(
+            "INSERT INTO tasks (selection, position, task) VALUES (?, ?, ?) "
+            "ON CONFLICT (selection) DO UPDATE SET position = excluded.position",
+            [
+                (get_task_key(task), i, pickle.dumps(task))
+                for i, task in enumerate(tasks)
+            ],
+        )
+        conn.execute(
+            "UPDATE tasks SET status = ?, attempts = 0, error = NULL WHERE status = ?",
+            (TASK_PENDING, TASK_FAILED),
+        )
+        n_after = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    return n_after - n_before
+
+
+def get_run_inputs(queue_path: str | Path) -> dict:
+    """
+    This function gets the inputs shared by all tasks of a queue
+
+    Args:
+        queue_path (str | Path): queue file path
+
+    Returns:
+        run_inputs (dict): inputs of the workers
+    """
+    with closing(connect(queue_path)) as conn:
+        row = conn.execute("SELECT inputs FROM run_inputs WHERE id = 0").fetchone()
+    assert row is not None, f"{queue_path} is not a T3CO work queue"
+    return pickle.loads(row[0])
+
+
+def claim_task(
+    conn: sqlite3.Connection,
+    worker_id: str,
+    lease_s: float = LEASE_S,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> Tuple[str, object] | None:
+    """
+    This function claims the first pending task, or running task with an expired lease, for a worker. Running tasks \
+        whose lease expired max_attempts times are failed.
+
+    Args:
+        conn (sqlite3.Connection): queue connection
+        worker_id (str): worker ID, see get_worker_id
+        lease_s (float, optional): lease time [s]. Defaults to LEASE_S.
+        max_attempts (int, optional): number of claims of a task. Defaults to MAX_ATTEMPTS.
+
+    Returns:
+        key, task (Tuple[str, object] | None): task key and task, None if no task can be claimed
+    """
+    now = time.time()
+    with transaction(conn):
+        conn.execute(
+            "UPDATE tasks SET status = ?, error = ? "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (
+                TASK_FAILED,
+                f"lease expired {max_attempts} times",
+                TASK_RUNNING,
+                now,
+                max_attempts,
+            ),
+        )
+        row = conn.execute(
+            "SELECT selection, task FROM tasks "
+            "WHERE status = ? OR (status = ? AND lease_expires < ?) "
+            "ORDER BY position LIMIT 1",
+            (TASK_PENDING, TASK_RUNNING, now),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, "
+            "attempts = attempts + 1 WHERE selection = ?",
+            (TASK_RUNNING, worker_id, now + lease_s, row[0]),
+        )
+    return row[0], pickle.loads(row[1])
+
+
+def renew_lease(
+    conn: sqlite3.Connection, key: str, worker_id: str, lease_s: float = LEASE_S
+) -> bool:
+    """
+    This function extends the lease of a running task
+
+    Args:
+        conn (sqlite3.Connection): queue connection
+        key (str): task key
+        worker_id (str): worker ID of the lease
+        lease_s (float, optional): lease time [s]. Defaults to LEASE_S.
+
+    Returns:
+        renewed (bool): False if the task was claimed by another worker after the lease expired
+    """
+    with transaction(conn):
+        cursor = conn.execute(
+            "UPDATE tasks SET lease_expires = ? "
+            "WHERE selection = ? AND worker = ? AND status = ?",
+            (time.time() + lease_s, key, worker_id, TASK_RUNNING),
+        )
+    return cursor.rowcount == 1
+
+
+def complete_task(
+    conn: sqlite3.Connection, key: str, worker_id: str, result: dict
+) -> bool:
+    """
+    This function commits the result of a task. If a lease expired and the task was claimed again, the first result \
+        is kept.
+
+    Args:
+        conn (sqlite3.Connection): queue connection
+        key (str): task key
+        worker_id (str): worker ID
+        result (dict): JSON serializable result, other values are converted by get_json_value
+
+    Returns:
+        committed (bool): False if the task already had a result
+    """
+    with transaction(conn):
+        cursor = conn.execute(
+            "UPDATE tasks SET status = ?, worker = ?, lease_expires = NULL, "
+            "result = ?, error = NULL WHERE selection = ? AND status != ?",
+            (TASK_DONE, worker_id, json.dumps(result, default=get_json_value), key, TASK_DONE),
+        )
+    return cursor.rowcount == 1
+
+
+def fail_task(conn: sqlite3.Connection, key: str, worker_id: str, error: str) -> None:
+    """
+    This function fails a task that raised an error. Errors are not retried, as the inputs are the same on all hosts.
+
+    Args:
+        conn (sqlite3.Connection): queue connection
+        key (str): task key
+        worker_id (str): worker ID
+        error (str): error message or traceback
+    """
+    with transaction(conn):
+        conn.execute(
+            "UPDATE tasks SET status = ?, worker = ?, lease_expires = NULL, error = ? "
+            "WHERE selection = ? AND status = ?",
+            (TASK_FAILED, worker_id, error, key, TASK_RUNNING),
+        )
+
+
+@contextmanager
+def keep_lease(
+    queue_path: str | Path, key: str, worker_id: str, lease_s: float = LEASE_S
+) -> Iterator[None]:
+    """
+    This function renews the lease of a task on a background thread while the task runs
+
+    Args:
+        queue_path (str | Path): queue file path
+        key (str): task key
+        worker_id (str): worker ID of the lease
+        lease_s (float, optional): lease time [s]. Defaults to LEASE_S.
+    """
+    stop = threading.Event()
+
+    def renew() -> None:
+        # SQLite connections are used by the thread that opened them
+        with closing(connect(queue_path)) as conn:
+            while not stop.wait(lease_s / 3):
+                if not renew_lease(conn, key, worker_id, lease_s):
+                    logger.warning(
+                        "work_queue:: lease of %s was claimed by another worker", key
+                    )
+                    break
+
+    thread = threading.Thread(target=renew, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_worker(
+    queue_path: str | Path,
+    func: Callable,
+    lease_s: float = LEASE_S,
+    poll_s: float = POLL_S,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> int:
+    """
+    This function claims and runs the tasks of a queue until all tasks are done or failed. A worker waits while \
+        other workers run the last tasks, so it claims them again if their leases expire.
+
+    Args:
+        queue_path (str | Path): queue file path
+        func (Callable): function of one task that returns its result dictionary
+        lease_s (float, optional): lease time [s]. Defaults to LEASE_S.
+        poll_s (float, optional): time [s] between claims while other workers run the last tasks. Defaults to POLL_S.
+        max_attempts (int, optional): number of claims of a task. Defaults to MAX_ATTEMPTS.
+
+    Returns:
+        n_tasks (int): number of tasks run by this worker
+    """
+    worker_id = get_worker_id()
+    n_tasks = 0
+    with closing(connect(queue_path)) as conn:
+        while True:
+            claim = claim_task(conn, worker_id, lease_s, max_attempts)
+            if claim is None:
+                if is_finished(get_status_counts(queue_path)):
+                    break
+                time.sleep(poll_s)
+                continue
+            key, task = claim
+            logger.info("work_queue:: %s running %s", worker_id, key)
+            error = None
+            with keep_lease(queue_path, key, worker_id, lease_s):
+                try:
+                    result = func(task)
+                except Exception:
+                    error = traceback.format_exc()
+            if error is None:
+                complete_task(conn, key, worker_id, result)
+            else:
+                fail_task(conn, key, worker_id, error)
+            n_tasks += 1
+    return n_tasks
+
+
+def get_status_counts(queue_path: str | Path) -> dict:
+    """
+    This function counts the tasks of a queue by status
+
+    Args:
+        queue_path (str | Path): queue file path
+
+    Returns:
+        counts (dict): number of tasks by status
+    """
+    with closing(connect(queue_path)) as conn:
+        rows = conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+        counts = dict(rows.fetchall())
+    return {
+        status: counts.get(status, 0)
+        for status in [TASK_PENDING, TASK_RUNNING, TASK_DONE, TASK_FAILED]
+    }
+
+
+def is_finished(counts: dict) -> bool:
+    """
+    This function checks if all tasks of a queue are done or failed
+
+    Args:
+        counts (dict): number of tasks by status, see get_status_counts
+
+    Returns:
+        finished (bool): True if no task is pending or running
+    """
+    return counts[TASK_PENDING] + counts[TASK_RUNNING] == 0
+
+
+def wait_for_queue(
+    queue_path: str | Path,
+    worker_target: Callable = None,
+    worker_args: tuple = (),
+    n_workers: int = 0,
+    poll_s: float = POLL_S,
+) -> dict:
+    """
+    This function waits until all tasks of a queue are done or failed, while running local worker processes. Local \
+        workers that exit before, e.g. on a crash, are restarted.
+
+    Args:
+        queue_path (str | Path): queue file path
+        worker_target (Callable, optional): function of a local worker process, e.g. calling run_worker. \
+            Defaults to None.
+        worker_args (tuple, optional): arguments of worker_target. Defaults to ().
+        n_workers (int, optional): number of local worker processes. Defaults to 0, only workers on other hosts.
+        poll_s (float, optional): time [s] between progress checks. Defaults to POLL_S.
+
+    Returns:
+        counts (dict): number of tasks by status, see get_status_counts
+    """
+    workers = []
+    counts = get_status_counts(queue_path)
+    while not is_finished(counts):
+        workers = [worker for worker in workers if worker.is_alive()]
+        while len(workers) < n_workers:
+            worker = multiprocessing.Process(target=worker_target, args=worker_args)
+            worker.start()
+            workers.append(worker)
+        time.sleep(poll_s)
+        new_counts = get_status_counts(queue_path)
+        if new_counts != counts:
+            logger.info("work_queue:: %s", new_counts)
+        counts = new_counts
+    for worker in workers:
+        worker.join()
+    return counts
+
+
+def get_results(
+    queue_path: str | Path, tasks: list = None
+) -> Tuple[List[dict], List[Tuple[object, str]]]:
+    """
+    This function gets the results of the done tasks and the errors of the failed tasks of a queue
+
+    Args:
+        queue_path (str | Path): queue file path
+        tasks (list, optional): tasks to get, matched by get_task_key, e.g. without the tasks of earlier sweeps. \
+            Defaults to None, all tasks.
+
+    Returns:
+        results, failures (Tuple[List[dict], List[Tuple[object, str]]]): result dictionaries of done tasks, and task \
+            and error of failed tasks, in the order of the tasks
+    """
+    with closing(connect(queue_path)) as conn:
+        rows = conn.execute(
+            "SELECT selection, task, status, result, error FROM tasks ORDER BY position"
+        ).fetchall()
+    if tasks is not None:
+        keys = {get_task_key(task) for task in tasks}
+        rows = [row for row in rows if row[0] in keys]
+    results = [
+        json.loads(result) for _, _, status, result, _ in rows if status == TASK_DONE
+    ]
+    failures = [
+        (pickle.loads(task), error)
+        for _, task, status, _, error in rows
+        if status == TASK_FAILED
+    ]
+    return results, failures
@@ -5,12 +5,15 @@
 import argparse
 import ast
 import csv
+import json
 import logging
+import multiprocessing
 import os
 import re
+import sys
 import time
+import traceback
 from functools import partial
-from multiprocessing import Pool
 from pathlib import Path
 from time import gmtime, strftime
 from typing import List, Tuple
@@ -25,9 +28,19 @@ import pymoo.core.result
 from t3co.moopack import moo
 from t3co.objectives import fueleconomy as fe
 from t3co.run import Global as gl
-from t3co.run import run_scenario
+from t3co.run import (
+    cycle_store,
+    planner,
+    profiling,
+    run_scenario,
+    supervised_pool,
+    sweep_logging,
+    work_queue,
+)
 from t3co.run import run_scenario as rs
 
+logger = logging.getLogger(__name__)
+
 
 def deug_traces(
     vehicle: fastsim.vehicle.Vehicle,
@@ -231,9 +244,8 @@ def get_knobs_bounds_curves(
 
     # validate knobs bounds and remove inactive knobs (user left blank or NA)
     knobs = list(knobs_bounds.keys())
-    print("knobs and bounds")
     for k in knobs:
-        print(k, knobs_bounds[k][0], knobs_bounds[k][1])
+        logger.debug("knob %s bounds %s %s", k, knobs_bounds[k][0], knobs_bounds[k][1])
         nans = np.isnan(knobs_bounds[k][0]) or np.isnan(knobs_bounds[k][1])
         if nans or knobs_bounds[k][0] is None or knobs_bounds[k][1] is None:
             del knobs_bounds[k]
@@ -249,7 +261,7 @@ def get_objectives_constraints(
     Args:
         selection (int): selection number
         sdf (DataFrame): scenario dataframe
-        verbose (bool, optional): if selected, function will print objectives and constraints. Defaults to True.
+        verbose (bool, optional): if selected, function will log objectives and constraints. Defaults to True.
 
     Returns:
         objectives (list): list of selected objective variables
@@ -278,8 +290,7 @@ def get_objectives_constraints(
         objectives.append(moo.TCO)
 
     if verbose:
-        print("objectives:", objectives)
-        print("constraints:", constraints)
+        logger.debug("objectives: %s constraints: %s", objectives, constraints)
 
     return objectives, constraints
 
@@ -398,13 +409,18 @@ def skip_scenario(sel, selections, scenario_name, report_kwargs, verbose=False)
     """
     if any(ex in scenario_name for ex in report_kwargs["exclude"]):
         if verbose:
-            print(
-                f"skipping {sel} {exclude} has parts in scenario_name {scenario_name}"
+            logger.info(
+                "skipping %s %s has parts in scenario_name %s",
+                sel,
+                report_kwargs["exclude"],
+                scenario_name,
             )
         return True
     if not any(lf in scenario_name for lf in report_kwargs["look_for"]):
         if verbose:
-            print(f"skipping {sel}, want to run from {look_for}")
+            logger.info(
+                "skipping %s, want to run from %s", sel, report_kwargs["look_for"]
+            )
         return True
     # print(str(sel))
     # print(list(set([selection_id.split("_")[0] for selection_id in selections])))
@@ -413,7 +429,7 @@ def skip_scenario(sel, selections, scenario_name, report_kwargs, verbose=False)
     )
     if str(sel) not in sel_set:
         if verbose:
-            print(f"skipping {sel} not in desired selections:{selections}")
+            logger.info("skipping %s not in desired selections: %s", sel, selections)
         return True
     return False
 
@@ -447,16 +463,18 @@ def optimize(
     Returns:
         report_i (dict): Dictionary of T3CO results for given selection
     """
-    print(f"sel: {sel}")
     scenario_name = vdf.loc[int(str(sel).split("_")[0]), "scenario_name"]
-    print(
-        f"\nRunning selection {sel} for scenario {scenario_name} - skip opt = {skip_opt} -algo = {algo}"
+    logger.info(
+        "Running selection %s for scenario %s - skip opt = %s - algo = %s",
+        sel,
+        scenario_name,
+        skip_opt,
+        algo,
     )
 
     optpt = vdf.loc[int(str(sel).split("_")[0]), "veh_pt_type"]
     ti = time.time()
     # sel = float(sel)
-    algo = report_kwargs["algo"]
     x_tol = report_kwargs["x_tol"]
     f_tol = report_kwargs["f_tol"]
     pop_size = report_kwargs["pop_size"]
@@ -468,7 +486,6 @@ def optimize(
     ts = report_kwargs["ts"]
     file_mark = report_kwargs["file_mark"]
     skip_save_veh = report_kwargs["skip_save_veh"]
-    gl.vocation_scenario = scenario_name
     if not skip_opt:
         moo_results, moo_problem, moo_code = run_moo(
             sel,
@@ -488,6 +505,11 @@ def optimize(
             config.aero_drag_imp_curves_df,
             config.eng_eff_imp_curves_df,
             config,
+            gradeability_screening_tol=report_kwargs.get(
+                "gradeability_screening_tol"
+            ),
+            batch_eval=report_kwargs.get("batch_eval", False),
+            n_max_evals=report_kwargs.get("n_max_evals"),
         )
         num_results = 1
         if moo_code == moo.OPTIMIZATION_SUCCEEDED:
@@ -499,14 +521,14 @@ def optimize(
                 )
         if moo_problem is not None:
             input_vehicle = moo_problem.moobasevehicle
-            print(f"optimize: {input_vehicle.veh_pt_type}")
+            logger.debug("optimize: %s", input_vehicle.veh_pt_type)
 
             report_vehicle = moo_problem.mooadvancedvehicle
             report_scenario = moo_problem.opt_scenario
         else:
             input_vehicle = rs.get_vehicle(sel, veh_input_path=config.vehicle_file)
             report_vehicle = None
-            print(f"optimize: {input_vehicle.veh_pt_type}")
+            logger.debug("optimize: %s", input_vehicle.veh_pt_type)
             report_scenario, design_cycle = rs.get_scenario_and_cycle(
                 sel, config.scenario_file, a_vehicle=input_vehicle, config=config
             )
@@ -530,7 +552,10 @@ def optimize(
         )
 
         outdict = rs.vehicle_scenario_sweep(
-            input_vehicle, report_scenario, design_cycle, write_tsv=write_tsv
+            input_vehicle,
+            report_scenario,
+            design_cycle,
+            write_tsv=write_tsv,
         )
 
     # iterate thru all results from run, num_results can singleton [1] from analysis-only runs
@@ -599,7 +624,7 @@ def optimize(
                 report_i = {k: str(v) for k, v in report_i.items()}
                 # reports.append(report_i)
                 result = report_i["n_gen"]
-                logging.info(f"scenario {sel} failed. {result}")
+                logger.info("scenario %s failed. %s", sel, result)
                 full_report = False
                 return report_i
 
@@ -661,6 +686,8 @@ def optimize(
                 ]
                 report_i["n_gen"] = n_gens_used
                 report_i["max_n_gen"] = n_max_gen
+                # number of design evaluations, used to calibrate planner.py
+                report_i["n_evals"] = moo_results.history[-1].evaluator.n_eval
         if full_report:
             (
                 tot_cost,
@@ -682,27 +709,26 @@ def optimize(
                 outdict["veh_opp_cost_set"],
             )
 
-            print(
-                f"selection {sel} {gl.PT_TYPES_NUM_TO_STR[optpt]} opt time [s]",
-                opt_time,
-            )
-            print(
-                f"selection {sel} {gl.PT_TYPES_NUM_TO_STR[optpt]} total cost",
-                tot_cost,
-            )
-            print(f"selection {sel} {gl.PT_TYPES_NUM_TO_STR[optpt]} mpgge", mpgge)
-            print(
-                f"selection {sel} {gl.PT_TYPES_NUM_TO_STR[optpt]} MSRP breakdown",
-                veh_cost_set,
-            )
-            print(
-                f"selection {sel} {gl.PT_TYPES_NUM_TO_STR[optpt]} Operating Costs breakdown",
-                veh_oper_cost_set,
-            )
-            print(
-                f"selection {sel} {gl.PT_TYPES_NUM_TO_STR[optpt]} Opportunity costs breakdown",
-                veh_opp_cost_set,
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                pt_name = gl.PT_TYPES_NUM_TO_STR[optpt]
+                logger.debug("selection %s %s opt time [s] %s", sel, pt_name, opt_time)
+                logger.debug("selection %s %s total cost %s", sel, pt_name, tot_cost)
+                logger.debug("selection %s %s mpgge %s", sel, pt_name, mpgge)
+                logger.debug(
+                    "selection %s %s MSRP breakdown %s", sel, pt_name, veh_cost_set
+                )
+                logger.debug(
+                    "selection %s %s Operating Costs breakdown %s",
+                    sel,
+                    pt_name,
+                    veh_oper_cost_set,
+                )
+                logger.debug(
+                    "selection %s %s Opportunity costs breakdown %s",
+                    sel,
+                    pt_name,
+                    veh_opp_cost_set,
+                )
 
             disc_cost_agg = discounted_costs_df.groupby("Category").sum(
                 numeric_only=True
@@ -856,9 +882,106 @@ def optimize(
     return report_i
 
 
+# worker pool of the sweep, see get_worker_pool
+WORKER_POOL = None
+
+
+def get_worker_pool(
+    n_processes: int,
+    max_tasks_per_worker: int = None,
+    max_worker_memory_mb: float = None,
+) -> supervised_pool.SupervisedPool:
+    """
+    This function gets the worker pool shared by the input validation and the run of a sweep. The pool is created \
+        on first use, after the logging setup of run_vehicle_scenarios, so that workers log to the sweep error log.
+
+    Args:
+        n_processes (int): number of worker processes
+        max_tasks_per_worker (int, optional): number of tasks after which a worker is recycled. Defaults to None.
+        max_worker_memory_mb (float, optional): resident memory [MB] above which a worker is recycled. Defaults to None.
+
+    Returns:
+        pool (supervised_pool.SupervisedPool): worker pool
+    """
+    global WORKER_POOL
+    if WORKER_POOL is None:
+        WORKER_POOL = supervised_pool.SupervisedPool(
+            n_processes,
+            max_tasks_per_worker=max_tasks_per_worker,
+            max_worker_memory_mb=max_worker_memory_mb,
+        )
+    return WORKER_POOL
+
+
+def validate_selection(
+    sel_inputs: tuple,
+    config: run_scenario.Config,
+    sdf: pd.DataFrame,
+    validation_kwargs: dict,
+) -> str | None:
+    """
+    This function obtains the vehicle, scenario, and cycle objects for a given selection and creates its optimization \
+        problem to validate inputs. The objects stay in the input caches of this process (see run_scenario.get_vehicle \
+        and cycle_index.load_cycle) for the run of the selection.
+
+    Args:
+        sel_inputs (tuple): selection number, scenario name, and vehicle powertrain type
+        config (Config): Config object
+        sdf (pd.DataFrame): scenario input dataframe
+        validation_kwargs (dict): keyword arguments of moo.run_optimization
+
+    Returns:
+        error (str | None): traceback of the input error, None if the inputs are valid
+    """
+    sel, scenario_name, optpt = sel_inputs
+    logger.debug("validating input %s:%s", sel, scenario_name)
+    try:
+        v = rs.get_vehicle(
+            sel,
+            veh_input_path=config.vehicle_file,
+        )
+        logger.debug("input_validation: %s %s", sel, v.veh_pt_type)
+        s, c = rs.get_scenario_and_cycle(
+            sel,
+            config.scenario_file,
+            a_vehicle=v,
+            config=config,
+            do_input_validation=True,
+        )
+        rs.check_phev_init_socs(v, s)
+
+        knobs_bounds, curve_settings = get_knobs_bounds_curves(
+            sel,
+            optpt,
+            sdf,
+            config.lw_imp_curves_df,
+            config.aero_drag_imp_curves_df,
+            config.eng_eff_imp_curves_df,
+        )
+        objectives, constraints = get_objectives_constraints(sel, sdf, verbose=False)
+
+        _ = moo.run_optimization(
+            knobs_bounds=knobs_bounds,
+            vnum=sel,
+            optimize_pt=optpt,
+            skip_optimization=True,
+            obj_list=objectives,
+            constr_list=constraints,
+            config=config,
+            do_input_validation=True,
+            **curve_settings,
+            **validation_kwargs,
+        )
+    except Exception:
+        return traceback.format_exc()
+    return None
+
+
 def run_vehicle_scenarios(
     config: run_scenario.Config,
     REPORT_COLS: dict,
+    n_processes: int = 1,
+    worker_pool_kwargs: dict = None,
     **kwargs,
 ) -> Tuple[List[int | str], pd.DataFrame, pd.DataFrame, bool, dict, dict]:
     """
@@ -868,6 +991,8 @@ def run_vehicle_scenarios(
     Args:
         config (Config): Config object containing analysis attributes and scenario attribute overrides
         REPORT_COLS (dict): Dictionary of reporting columns from T3CO
+        n_processes (int, optional): number of worker processes validating the inputs, see get_worker_pool. Defaults to 1.
+        worker_pool_kwargs (dict, optional): keyword arguments of get_worker_pool. Defaults to None.
 
     Raises:
         Exception: input validation error
@@ -890,8 +1015,8 @@ def run_vehicle_scenarios(
     global FASTSIM_INPUTS, OTHER_INPUTS
     FASTSIM_INPUTS = config.vehicle_file
     OTHER_INPUTS = config.scenario_file
-    print("vehicle src:", config.vehicle_file)
-    print("scenario src:", config.scenario_file)
+    logger.info("vehicle src: %s", config.vehicle_file)
+    logger.info("scenario src: %s", config.scenario_file)
 
     for scen_key in rs.Scenario.__dict__["__annotations__"].keys():
         REPORT_COLS.update({"scenario_" + scen_key: ""})
@@ -920,6 +1045,8 @@ def run_vehicle_scenarios(
     x_tol = kwargs.pop("x_tol", 0.5)  # parameter space tolerance
     f_tol = kwargs.pop("f_tol", 3.0)  # objective space tolerance
     verbose = kwargs.pop("verbose", False)
+    log_level = kwargs.pop("log_level", "INFO")
+    profile = kwargs.pop("profile", None)
     look_for = kwargs.pop("look_for", [""])
     assert isinstance(
         look_for, list
@@ -989,6 +1116,8 @@ def run_vehicle_scenarios(
         resdir.mkdir(parents=True)
 
     report_kwargs["resdir"] = resdir
+    if profile:
+        report_kwargs["profile_dir"] = resdir / f"{file_mark}profile_{ts}".strip("_")
 
     # with open(str(resdir / RES_FILE), "a", newline="") as f:
     #     print("writing to ", resdir / RES_FILE)
@@ -998,123 +1127,79 @@ def run_vehicle_scenarios(
     loggingfname = Path(
         str(Path(resdir / f"{file_mark}sweep_error_log_{ts}.log")).strip("_")
     )
-    logging.basicConfig(
-        filename=loggingfname,
-        level=logging.INFO,
-        filemode="a",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        format="%(asctime)s %(levelname)-8s %(message)s",
-        force=True,
-    )
-    logging.info(f"kwargs {report_kwargs}")
-
-    # list of report dataframes to write final output at each iteration
-
-    def input_validation(
-        sel: float, optpt: str, algo: str, config: run_scenario.Config
-    ) -> None:
-        """
-        This function obtains the vehicle, scenario, and cycle object for a given selection and runs optimization to validate inputs
-
-        Args:
-            sel (float): selection number
-            optpt (str): vehicle powertrain type
-            algo (str): algorithm name
-            config (Config): Config object
-
-        Returns:
-            None: None
-        """
-        v = rs.get_vehicle(
-            sel,
-            veh_input_path=config.vehicle_file,
-        )
-        print(f"input_validation: {sel} {v.veh_pt_type}")
-        s, c = rs.get_scenario_and_cycle(
-            sel,
-            config.scenario_file,
-            a_vehicle=v,
-            config=config,
-            do_input_validation=True,
-        )
-        rs.check_phev_init_socs(v, s)
-
-        knobs_bounds, curve_settings = get_knobs_bounds_curves(
-            sel,
-            optpt,
-            sdf,
-            config.lw_imp_curves_df,
-            config.aero_drag_imp_curves_df,
-            config.eng_eff_imp_curves_df,
-        )
-        objectives, constraints = get_objectives_constraints(sel, sdf, verbose=False)
-
-        _ = moo.run_optimization(
-            pop_size,
-            n_max_gen,
-            knobs_bounds,
-            sel,
-            optimize_pt=optpt,
-            skip_optimization=True,
-            obj_list=objectives,
-            constr_list=constraints,
-            verbose=verbose,
-            n_last=n_last,
-            algo=algo,
-            nth_gen=nth_gen,
-            x_tol=x_tol,
-            f_tol=f_tol,
-            config=config,
-            do_input_validation=True,
-            **curve_settings,
-            **kwargs,
-        )
-        return None
+    # one structured record per selection, see sweep_logging.log_selection
+    records_fname = Path(
+        str(Path(resdir / f"{file_mark}sweep_records_{ts}.jsonl")).strip("_")
+    )
+    sweep_logging.start_logging(loggingfname, records_fname, level=log_level)
+    logger.info("kwargs %s", report_kwargs)
 
     if do_input_validation:
         st = time.time()
-        print("sweep:: Running input validation...")
-        badinputs = False
-        noinputs = True
-        for sel, scenario_name, optpt in zip(
-            vdf.index, vdf["scenario_name"], vdf["veh_pt_type"]
-        ):
-            if skip_scenario(
+        logger.info("sweep:: Running input validation...")
+        validation_sels = [
+            (sel, scenario_name, optpt)
+            for sel, scenario_name, optpt in zip(
+                vdf.index, vdf["scenario_name"], vdf["veh_pt_type"]
+            )
+            if not skip_scenario(
                 sel,
                 selections,
                 scenario_name,
                 report_kwargs=report_kwargs,
                 verbose=False,
+            )
+        ]
+        # the optimization algorithm is not used by the validation, so each selection is validated once,
+        # not once per algorithm
+        validate = partial(
+            validate_selection,
+            config=config,
+            sdf=sdf,
+            validation_kwargs=dict(
+                pop_size=pop_size,
+                n_max_gen=n_max_gen,
+                algo=None,
+                verbose=verbose,
+                n_last=n_last,
+                nth_gen=nth_gen,
+                x_tol=x_tol,
+                f_tol=f_tol,
+                **kwargs,
+            ),
+        )
+        if n_processes > 1 and len(validation_sels) > 1:
+            pool = get_worker_pool(n_processes, **(worker_pool_kwargs or {}))
+            errors = {}
+            for sel_inputs, status, result in pool.imap_unordered(
+                validate, validation_sels
             ):
-                # print(f'input_validation skip selection: {sel}')
-                continue
-
-            for algo in algorithms:
-                try:
-                    algopart = f"algorithm: {algo.rjust(15)} or None if skipping"
-                    print(
-                        f"sweep:: validating input {sel}:{scenario_name}".ljust(90),
-                        algopart,
-                    )
-                    # print(f'config: {config}')
-
-                    input_validation(sel, optpt, algo, config)
-                except KeyboardInterrupt:
-                    raise
-                except Exception as e:
-                    badinputs = True
-                    logging.exception(
-                        f"sweep:: INPUT ERROR selection {sel}, {scenario_name} :: {e}",
-                        stack_info=False,
-                        exc_info=True,
-                    )
-                noinputs = False
-        print(f"sweep:: Finished input validation, time [s] {round(time.time()-st)}")
+                errors[sel_inputs] = (
+                    result
+                    if status == supervised_pool.TASK_OK
+                    else f"{status}: {result}"
+                )
+            errors = [errors[sel_inputs] for sel_inputs in validation_sels]
+        else:
+            errors = [validate(sel_inputs) for sel_inputs in validation_sels]
+        badinputs = False
+        for (sel, scenario_name, _), error in zip(validation_sels, errors):
+            if error is not None:
+                badinputs = True
+                logger.error(
+                    "sweep:: INPUT ERROR selection %s, %s :: %s",
+                    sel,
+                    scenario_name,
+                    error,
+                )
+        logger.info(
+            "sweep:: Finished input validation, time [s] %s", round(time.time() - st)
+        )
         if badinputs:
             raise Exception(
                 f"sweep:: input_validation failure, see log file!\n{loggingfname}"
             )
-        if noinputs:
+        if len(validation_sels) == 0:
             raise Exception(
                 f"sweep:: no inputs available, see log file!\n{loggingfname}"
             )
@@ -1146,7 +1231,24 @@ def run_optimize_analysis(
     Returns:
         report_i (dict): Dictionary of T3CO results for given selection
     """
-    if skip_all_opt is True or skip_all_opt == "TRUE":
+    if report_kwargs.get("profile"):
+        # run the selection again inside the profilers, see profiling.profile_call
+        return profiling.profile_call(
+            run_optimize_analysis,
+            report_kwargs["profile"],
+            report_kwargs["profile_dir"],
+            f"selection_{sel}",
+            sel,
+            vdf,
+            sdf,
+            skip_all_opt,
+            config,
+            {**report_kwargs, "profile": None},
+            REPORT_COLS,
+        )
+    ti = time.perf_counter()
+    skip_opt = skip_all_opt is True or skip_all_opt == "TRUE"
+    if skip_opt:
         report_i = optimize(
             sel=sel,
             sdf=sdf,
@@ -1160,7 +1262,7 @@ def run_optimize_analysis(
         )
     else:
         for algo in algorithms:
-            print(f"run optimize {sel}")
+            logger.debug("run optimize %s %s", sel, algo)
             report_i = optimize(
                 sel=sel,
                 sdf=sdf,
@@ -1173,11 +1275,333 @@ def run_optimize_analysis(
                 write_tsv=False,
             )
 
-    logging.info(f"done with selection {sel}: {report_i['scenario_name']}")
+    logger.info("done with selection %s: %s", sel, report_i["scenario_name"])
+    # optimizations that failed report the failure in n_gen instead of their n_evals
+    failed = not skip_opt and report_i.get("n_evals") is None
+    sweep_logging.log_selection(
+        sel,
+        "failed" if failed else "ok",
+        scenario_name=report_i.get("scenario_name"),
+        veh_pt_type=report_i.get("veh_pt_type"),
+        algorithm=report_i.get("algorithm"),
+        wall_time_s=round(time.perf_counter() - ti, 3),
+        n_evals=report_i.get("n_evals"),
+        error=report_i.get("n_gen") if failed else None,
+    )
 
     return report_i
 
 
+# load times [s] of the selection group cost model, see get_selection_groups
+VEHICLE_SCENARIO_LOAD_COST_S = 0.04
+CYCLE_LOAD_COST_S = 0.002
+CYCLE_LOAD_COST_S_PER_BYTE = 4.5e-8
+
+
+def get_cycle_load_cost_s(cyc_file_path: str | Path) -> float:
+    """
+    This function estimates the time to load a drive cycle. Cycles in a cycle store are not parsed from CSV.
+
+    Args:
+        cyc_file_path (str | Path): drivecycle file path or path in a cycle store
+
+    Returns:
+        cost_s (float): estimated load time [s]
+    """
+    if cycle_store.split_store_path(cyc_file_path) is not None:
+        return CYCLE_LOAD_COST_S
+    return CYCLE_LOAD_COST_S + CYCLE_LOAD_COST_S_PER_BYTE * os.path.getsize(
+        cyc_file_path
+    )
+
+
+def get_selection_groups(
+    selections_list: list, config: run_scenario.Config, n_workers: int = 1
+) -> Tuple[List[list], str]:
+    """
+    This function groups the selections expanded for each drivecycle of config.drive_cycle, e.g. 1_000, 1_001, so each \
+        group runs on one worker. Vehicles, scenarios, and cycles are loaded once per process, so a group by base \
+        selection loads its vehicle and scenario once while each worker loads every cycle, and a group by cycle loads \
+        its cycle once while each worker loads every vehicle and scenario. The grouping with the lower estimated load \
+        time is used, and groups are split so that there are at least n_workers groups.
+
+    Args:
+        selections_list (list): selections to run
+        config (run_scenario.Config): Config object
+        n_workers (int, optional): number of worker processes. Defaults to 1.
+
+    Returns:
+        groups, group_by (Tuple[List[list], str]): lists of selections to run in order, and "selection" or "cycle", \
+            None if the selections are not expanded for drivecycles
+    """
+    # config.dc_files is set by run_scenario.load_config
+    if not getattr(config, "dc_files", None):
+        return [[sel] for sel in selections_list], None
+
+    by_selection = {}
+    by_cycle = {}
+    for sel in selections_list:
+        base_sel, dc_id = str(sel).split("_")
+        by_selection.setdefault(base_sel, []).append(sel)
+        by_cycle.setdefault(int(dc_id), []).append(sel)
+    cycles_cost_s = sum(
+        get_cycle_load_cost_s(config.dc_files[dc_id]) for dc_id in by_cycle
+    )
+    by_selection_cost_s = (
+        len(by_selection) * VEHICLE_SCENARIO_LOAD_COST_S
+        + min(n_workers, len(by_selection)) * cycles_cost_s
+    )
+    by_cycle_cost_s = (
+        cycles_cost_s
+        + min(n_workers, len(by_cycle))
+        * len(by_selection)
+        * VEHICLE_SCENARIO_LOAD_COST_S
+    )
+    if by_cycle_cost_s < by_selection_cost_s:
+        group_by, groups = "cycle", list(by_cycle.values())
+    else:
+        group_by, groups = "selection", list(by_selection.values())
+
+    # keep all workers busy
+    n_splits = -(-n_workers // len(groups))
+    split_groups = []
+    for group in groups:
+        split_size = -(-len(group) // n_splits)
+        split_groups.extend(
+            group[i : i + split_size] for i in range(0, len(group), split_size)
+        )
+    logger.info(
+        "Running %s selections in %s groups by %s",
+        len(selections_list),
+        len(split_groups),
+        group_by,
+    )
+    return split_groups, group_by
+
+
+def run_optimize_analysis_group(
+    sel_group: list,
+    vdf: pd.DataFrame,
+    sdf: pd.DataFrame,
+    skip_all_opt: bool,
+    config: run_scenario.Config,
+    report_kwargs: dict,
+    REPORT_COLS: dict,
+) -> List[dict]:
+    """
+    This function runs run_optimize_analysis for a group of selections from get_selection_groups in order
+
+    Args:
+        sel_group (list): selection numbers
+        vdf (pd.DataFrame): Dataframe of input vehicle file
+        sdf (pd.DataFrame): Dataframe of input scenario file
+        skip_all_opt (bool): Skip all optimization. If true, then the optimizer is not run for any scenario
+        config (run_scenario.Config): Config object
+        report_kwargs (dict): Dictionary of args required for running T3CO
+        REPORT_COLS (dict): Dictionary of reporting columns from T3CO
+
+    Returns:
+        reports (List[dict]): Dictionaries of T3CO results, one per selection
+    """
+    return [
+        run_optimize_analysis(
+            sel,
+            vdf=vdf,
+            sdf=sdf,
+            skip_all_opt=skip_all_opt,
+            config=config,
+            report_kwargs=report_kwargs,
+            REPORT_COLS=REPORT_COLS,
+        )
+        for sel in sel_group
+    ]
+
+
+def get_failed_reports(
+    sel_group: list, vdf: pd.DataFrame, status: str, error: str
+) -> List[dict]:
+    """
+    This function gets the result rows of selections that did not finish, e.g. because they timed out or crashed \
+        their worker, so that the sweep records them as failed and continues
+
+    Args:
+        sel_group (list): selection numbers
+        vdf (pd.DataFrame): Dataframe of input vehicle file
+        status (str): task status, see supervised_pool.SupervisedPool.imap_unordered
+        error (str): error message or traceback
+
+    Returns:
+        reports (List[dict]): Dictionaries of selection, scenario name, powertrain type, run status, and the last \
+            line of the error, one per selection
+    """
+    reports = []
+    for sel in sel_group:
+        base_sel = int(str(sel).split("_")[0])
+        reports.append(
+            {
+                "selection": str(sel),
+                "scenario_name": vdf.loc[base_sel, "scenario_name"],
+                "veh_pt_type": vdf.loc[base_sel, "veh_pt_type"],
+                "run_status": status,
+                "error": error.strip().splitlines()[-1],
+            }
+        )
+    return reports
+
+
+# report_kwargs that do not change the results of the selections of a sweep, see get_queue_inputs_hash
+RUN_SPECIFIC_REPORT_KWARGS = [
+    "ts",
+    "RES_FILE",
+    "profile_dir",
+    "selections",
+    "look_for",
+    "exclude",
+    "verbose",
+    "log_level",
+]
+
+
+def get_queue_inputs_hash(run_inputs: dict) -> str:
+    """
+    This function gets the hash of the run inputs of a work queue that determine the results of its selections, \
+        without the time stamp, selections, and other RUN_SPECIFIC_REPORT_KWARGS of the sweep that created it, so \
+        that a rerun of an interrupted sweep resumes its queue
+
+    Args:
+        run_inputs (dict): run inputs of the work queue, see run_optimize_analysis
+
+    Returns:
+        inputs_hash (str): hash of the run inputs, see work_queue.get_inputs_hash
+    """
+    report_kwargs = {
+        key: value
+        for key, value in run_inputs["report_kwargs"].items()
+        if key not in RUN_SPECIFIC_REPORT_KWARGS
+    }
+    return work_queue.get_inputs_hash(
+        {**run_inputs, "report_kwargs": sorted(report_kwargs.items())}
+    )
+
+
+def run_queue_worker(
+    queue_path: str | Path,
+    lease_s: float = work_queue.LEASE_S,
+    log_queue: multiprocessing.Queue = None,
+    log_level: int = logging.INFO,
+) -> int:
+    """
+    This function runs the selections of a work queue created by a sweep with --queue. Workers can run on any host \
+        with access to the queue file, input files, and results directory at the same paths.
+
+    Args:
+        queue_path (str | Path): queue file path
+        lease_s (float, optional): lease time [s] of a selection. Defaults to work_queue.LEASE_S.
+        log_queue (multiprocessing.Queue, optional): log queue of the sweep process, for local worker processes. \
+            Defaults to None, the logging of this process is used.
+        log_level (int, optional): level of the messages sent to log_queue. Defaults to logging.INFO.
+
+    Returns:
+        n_selections (int): number of selections run by this worker
+    """
+    global algorithms
+    if log_queue is not None:
+        sweep_logging.start_worker_logging(log_queue, log_level)
+    run_inputs = work_queue.get_run_inputs(queue_path)
+    algorithms = run_inputs["report_kwargs"]["algorithms"]
+    return work_queue.run_worker(
+        queue_path, partial(run_optimize_analysis, **run_inputs), lease_s=lease_s
+    )
+
+
+def get_plan_jobs(
+    config: run_scenario.Config,
+    selections: list,
+    algorithms: list,
+    skip_all_opt: bool,
+    look_for: list,
+    exclude: list,
+    pop_size: int,
+    n_max_gen: int,
+    n_max_evals: int = None,
+) -> pd.DataFrame:
+    """
+    This function expands the selections of a sweep for drivecycles and algorithms into the jobs estimated by \
+        planner.estimate_plan, without validating or running them
+
+    Args:
+        config (run_scenario.Config): Config object
+        selections (list): selections to run, -1 for all selections of the vehicle input file
+        algorithms (list): optimization algorithm names
+        skip_all_opt (bool): Skip all optimization. If true, then the optimizer is not run for any scenario
+        look_for (list): parts of the scenario names to run
+        exclude (list): parts of the scenario names to skip
+        pop_size (int): population size for optimization
+        n_max_gen (int): maximum number of generations for optimization
+        n_max_evals (int, optional): maximum number of evaluations for optimization. Defaults to None.
+
+    Returns:
+        jobs_df (pd.DataFrame): Dataframe of one job per selection and algorithm, one per selection if it is not \
+            optimized, with its powertrain, number of knobs, and design drive cycle
+    """
+    vdf = pd.read_csv(config.vehicle_file, index_col="selection", skip_blank_lines=True)
+    sdf = pd.read_csv(
+        config.scenario_file, index_col="selection", skip_blank_lines=True
+    )
+    curves_dfs = [
+        pd.read_csv(config.lw_imp_curves),
+        pd.read_csv(config.aero_drag_imp_curves),
+        pd.read_csv(config.eng_eff_imp_curves),
+    ]
+    if isinstance(selections, int) and selections == -1:
+        selections = vdf.index
+    dc_files = getattr(config, "dc_files", None)
+
+    jobs = []
+    for sel, scenario_name, optpt in zip(
+        vdf.index, vdf["scenario_name"], vdf["veh_pt_type"]
+    ):
+        if skip_scenario(
+            sel,
+            selections,
+            scenario_name,
+            report_kwargs={"look_for": look_for, "exclude": exclude},
+        ):
+            continue
+        scen_df = dict(sdf.loc[sel, :])
+        # as in run_optimize_analysis
+        optimize = not (skip_all_opt is True or skip_all_opt == "TRUE")
+        knobs_bounds, _ = get_knobs_bounds_curves(sel, optpt, sdf, *curves_dfs)
+        if dc_files:
+            sel_drive_cycles = [
+                (
+                    scenario_selection,
+                    dc_files[int(str(scenario_selection).split("_")[1])],
+                )
+                for scenario_selection in selections
+                if str(scenario_selection).split("_")[0] == str(sel)
+            ]
+        else:
+            sel_drive_cycles = [(sel, scen_df["drive_cycle"])]
+        for scenario_selection, drive_cycle in sel_drive_cycles:
+            for algo in algorithms if optimize else ["None"]:
+                jobs.append(
+                    {
+                        "selection": scenario_selection,
+                        "scenario_name": scenario_name,
+                        "algorithm": algo,
+                        "veh_pt_type": optpt,
+                        "optimize": optimize,
+                        "n_knobs": len(knobs_bounds),
+                        "pop_size": pop_size,
+                        "n_max_gen": n_max_gen,
+                        "n_max_evals": n_max_evals,
+                        "drive_cycle": str(drive_cycle),
+                    }
+                )
+    return pd.DataFrame(jobs)
+
+
 if __name__ == "__main__":
     start = time.time()
 
@@ -1335,6 +1759,42 @@ if __name__ == "__main__":
         type=float,
         help="Range overshoot tolerance, example '0.20' allows 20%% range overshoot. Default of 'None' does not constrain overshoot.",
     )
+    parser.add_argument(
+        "--gradeability-screening-tol",
+        default=None,
+        type=float,
+        help="Estimate gradeability during optimization unless within this relative distance of the grade targets, example '0.05' simulates within 5%%. Default of 'None' always simulates.",
+    )
+    parser.add_argument(
+        "--batch-eval",
+        action="store_true",
+        help="Evaluate each optimization population as a batch. The designs of a population run in order, as the simulations hold the GIL. Default evaluates designs one at a time.",
+    )
+    parser.add_argument(
+        "--max-evals",
+        default=None,
+        type=int,
+        help="Maximum number of design evaluations of each optimization, in addition to --n-max-gen. Default of 'None' sets no limit.",
+    )
+    # watchdog of the --run-multi worker pool, see supervised_pool.py
+    parser.add_argument(
+        "--selection-timeout-s",
+        default=None,
+        type=float,
+        help="Wall-clock time [s] per selection after which its worker is terminated and the selection is recorded as failed. The other selections of its group continue on a new worker. Default of 'None' sets no limit.",
+    )
+    parser.add_argument(
+        "--max-tasks-per-worker",
+        default=None,
+        type=int,
+        help="Number of selections after which a worker process is replaced. Default of 'None' keeps workers for the whole run.",
+    )
+    parser.add_argument(
+        "--max-worker-memory-mb",
+        default=None,
+        type=float,
+        help="Resident memory [MB] above which a worker process is replaced, checked after each selection it runs (Linux only). Default of 'None' sets no limit.",
+    )
     # time-dilation-args passed to T3COProblem instantiation for optimization usage
     parser.add_argument(
         "---missed-trace-correction",
@@ -1378,9 +1838,95 @@ if __name__ == "__main__":
         help="Number of processors to use for multiprocessing",
         default=9,
     )
+    # run planning, see planner.py
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Estimate the wall time and peak memory of the sweep and exit without running it",
+    )
+    parser.add_argument(
+        "--plan-workers",
+        default=None,
+        type=int,
+        help="Number of worker processes of the --plan. Default of 'None' uses the workers of --run-multi, or 1.",
+    )
+    parser.add_argument(
+        "--plan-history",
+        default=None,
+        nargs="+",
+        help="Results files of earlier sweeps on the same hosts to calibrate the --plan cost model. Jobs without n_evals are assumed to have used --pop-size.",
+    )
+    parser.add_argument(
+        "--plan-output",
+        default=None,
+        type=str,
+        help="CSV file to write the --plan estimates of each job to",
+    )
+    # multi-host sweeps, see work_queue.py
+    parser.add_argument(
+        "--queue",
+        default=None,
+        type=str,
+        help="Run the selections through a work queue file on storage shared by all hosts, and merge the results of all workers. An existing queue is resumed if it has the same inputs.",
+    )
+    parser.add_argument(
+        "--queue-reset",
+        action="store_true",
+        help="Reset the selections of an existing --queue whose inputs changed, instead of refusing to resume it",
+    )
+    parser.add_argument(
+        "--queue-workers",
+        default=1,
+        type=int,
+        help="Number of worker processes of the --queue on this host",
+    )
+    parser.add_argument(
+        "--queue-worker",
+        default=None,
+        type=str,
+        help="Run as a worker of the work queue file created by a sweep with --queue, e.g. on another host. All other arguments are ignored.",
+    )
+    parser.add_argument(
+        "--lease-s",
+        default=work_queue.LEASE_S,
+        type=float,
+        help="Time [s] after which a selection of a worker that stopped is run again by another worker",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=sweep_logging.LOG_LEVELS,
+        help="Level of the messages written to the sweep log file. DEBUG adds the knobs, drivecycles, and cost breakdowns of each selection. The records of each selection are written to a JSON-lines file at any level.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="+",
+        default=None,
+        choices=profiling.PROFILES,
+        help="Profile each selection with cProfile (cpu) and/or tracemalloc (mem) and write the profiles of the selections and of the run to a profile folder of the results directory",
+    )
 
     args = parser.parse_args()
-    print(f"Sweep file path: {gl.SWEEP_PATH}")
+    logger.debug("Sweep file path: %s", gl.SWEEP_PATH)
+
+    if args.queue_worker is not None:
+        report_kwargs = work_queue.get_run_inputs(args.queue_worker)["report_kwargs"]
+        worker_mark = f"{report_kwargs['ts']}_{work_queue.get_worker_id()}"
+        sweep_logging.start_logging(
+            Path(report_kwargs["resdir"])
+            / f"{report_kwargs['file_mark']}sweep_error_log_{worker_mark}.log",
+            Path(report_kwargs["resdir"])
+            / f"{report_kwargs['file_mark']}sweep_records_{worker_mark}.jsonl",
+            level=report_kwargs.get("log_level", "INFO"),
+        )
+        n_selections = run_queue_worker(args.queue_worker, args.lease_s)
+        logger.info(
+            "sweep:: ran %s selections of %s in %.1fs",
+            n_selections,
+            args.queue_worker,
+            time.time() - start,
+        )
+        sys.exit(0)
 
     # selections can be an int, or list of ints, or range expression
     if args.config is None:
@@ -1400,22 +1946,8 @@ if __name__ == "__main__":
         config.aero_drag_imp_curves = Path(args.aero_drag_imp_curves)
         write_tsv = args.write_tsv
     else:
-        try:
-            config = rs.Config()
-            config.from_file(filename=Path(args.config), analysis_id=args.analysis_id)
-        except ValueError:
-            print(f"Config analysis_id not valid: {args.analysis_id}")
-            config = rs.Config()
-            config.validate_analysis_id(filename=Path(args.config))
-        config.check_drivecycles_and_create_selections(args.config)
+        config = rs.load_config(args.config, args.analysis_id)
         selections = config.selections
-        config.vehicle_file = Path(args.config).parent / config.vehicle_file
-        config.scenario_file = Path(args.config).parent / config.scenario_file
-        config.eng_eff_imp_curves = Path(args.config).parent / config.eng_eff_imp_curves
-        config.lw_imp_curves = Path(args.config).parent / config.lw_imp_curves
-        config.aero_drag_imp_curves = (
-            Path(args.config).parent / config.aero_drag_imp_curves
-        )
         write_tsv = config.write_tsv
 
     look_for = args.look_for
@@ -1437,6 +1969,11 @@ if __name__ == "__main__":
         algorithms = config.algorithms
     else:
         algorithms = args.algorithms
+    # a single algorithm is one optimization, not one per character
+    if isinstance(algorithms, str):
+        algorithms = (
+            ast.literal_eval(algorithms) if "[" in algorithms else [algorithms]
+        )
 
     kwargs = {
         "selections": selections,
@@ -1461,6 +1998,11 @@ if __name__ == "__main__":
         if args.range_overshoot_tol is not None
         else None,
         "write_tsv": write_tsv,
+        "gradeability_screening_tol": args.gradeability_screening_tol,
+        "batch_eval": args.batch_eval,
+        "n_max_evals": args.max_evals,
+        "log_level": args.log_level,
+        "profile": args.profile,
     }
     if args.missed_trace_correction:
         kwargs.update(
@@ -1472,6 +2014,36 @@ if __name__ == "__main__":
             }
         )
 
+    if args.plan:
+        n_workers = args.plan_workers or (9 if args.run_multi else 1)
+        cost_model = None
+        if args.plan_history:
+            cost_model = planner.calibrate_cost_model(
+                args.plan_history, pop_size=int(args.pop_size)
+            )
+            print(f"sweep:: cost model calibrated with {args.plan_history}")
+            print(json.dumps(cost_model, indent=2))
+        jobs_df, summary = planner.estimate_plan(
+            get_plan_jobs(
+                config,
+                selections,
+                algorithms,
+                kwargs["skip_all_opt"],
+                look_for,
+                exclude,
+                int(args.pop_size),
+                int(args.n_max_gen),
+                args.max_evals,
+            ),
+            n_workers=n_workers,
+            cost_model=cost_model,
+        )
+        print(planner.format_summary(summary))
+        if args.plan_output is not None:
+            jobs_df.to_csv(args.plan_output, index=False)
+            print(f"sweep:: plan of each job written to {args.plan_output}")
+        sys.exit(0)
+
     REPORT_COLS = {
         "selection": "",
         "scenario_name": "",
@@ -1510,8 +2082,19 @@ if __name__ == "__main__":
         "target_max0to30secAtGVWR": "",
         "delta_0to30sec": "",
     }
+    n_processes = 9 if args.run_multi else 1
+    worker_pool_kwargs = {
+        "max_tasks_per_worker": args.max_tasks_per_worker,
+        "max_worker_memory_mb": args.max_worker_memory_mb,
+    }
     selections, vdf, sdf, skip_all_opt, report_kwargs, REPORT_COLS = (
-        run_vehicle_scenarios(config, REPORT_COLS=REPORT_COLS, **kwargs)
+        run_vehicle_scenarios(
+            config,
+            REPORT_COLS=REPORT_COLS,
+            n_processes=n_processes,
+            worker_pool_kwargs=worker_pool_kwargs,
+            **kwargs,
+        )
     )
     selections_list = []
     for sel, scenario_name, optpt in zip(
@@ -1528,28 +2111,80 @@ if __name__ == "__main__":
                     for scenario_selection in config.selections
                     if str(scenario_selection).split("_")[0] == str(sel)
                 ]
-                print(f"Selections List: {sel_list}")
+                logger.debug("Selections List of %s: %s", scenario_name, sel_list)
                 selections_list.extend(sel_list)
-                print(scenario_name)
             else:
                 selections_list.append(sel)
         except:
             logging.exception("Fatal Error")
             raise
 
-    print(f"Selections List final: {selections_list}")
+    logger.info("Selections List final: %s", selections_list)
     resdir = Path(report_kwargs["resdir"])
     RES_FILE = report_kwargs["RES_FILE"]
 
-    if args.run_multi:
-        print(f"Running multiprocessing version of T3CO")
-        with Pool(processes=9) as pool:
+    sel_groups, _ = get_selection_groups(selections_list, config, n_processes)
+
+    if args.queue is not None:
+        logger.info("Running T3CO on work queue %s", args.queue)
+        run_inputs = dict(
+            vdf=vdf,
+            sdf=sdf,
+            skip_all_opt=skip_all_opt,
+            config=config,
+            report_kwargs=report_kwargs,
+            REPORT_COLS=REPORT_COLS,
+        )
+        n_added = work_queue.create_queue(
+            args.queue,
+            [sel for sel_group in sel_groups for sel in sel_group],
+            run_inputs,
+            inputs_hash=get_queue_inputs_hash(run_inputs),
+            reset=args.queue_reset,
+        )
+        logger.info(
+            "sweep:: added %s selections, run more workers with --queue-worker %s",
+            n_added,
+            args.queue,
+        )
+        work_queue.wait_for_queue(
+            args.queue,
+            run_queue_worker,
+            (
+                args.queue,
+                args.lease_s,
+                sweep_logging.LOG_QUEUE,
+                logging.getLogger().getEffectiveLevel(),
+            ),
+            n_workers=args.queue_workers,
+        )
+        # the queue may have results of selections of earlier sweeps
+        reports, failures = work_queue.get_results(args.queue, selections_list)
+        for sel, error in failures:
+            logger.error("sweep:: selection %s failed :: %s", sel, error)
+            sweep_logging.log_selection(sel, work_queue.TASK_FAILED, error=error)
+            reports.extend(get_failed_reports([sel], vdf, work_queue.TASK_FAILED, error))
+        reports_df = pd.DataFrame(reports)
+        reports_df.sort_values(by=["selection"], inplace=True)
+        logger.debug("results:\n%s", reports_df.head(5))
+        try:
+            reports_df.to_csv(resdir / RES_FILE, index=False, header=True)
+        except PermissionError:
+            reports_df.to_csv(resdir / ("alternate_" + RES_FILE), index=False)
+            logger.warning("Could not write file %s, file open", resdir / RES_FILE)
+        logger.info("writing to %s", resdir / RES_FILE)
+
+    elif args.run_multi:
+        logger.info("Running multiprocessing version of T3CO")
+        # the workers that validated the inputs keep them in their input caches
+        with get_worker_pool(n_processes, **worker_pool_kwargs) as pool:
             # call the same function with different data in parallel
             # for result in tqdm(pool.map(partial(read_file, root = root),files), total= len(files)):
             reports = []
             # reports_df =  pd.DataFrame()
 
-            for report_i in pool.imap_unordered(
+            # the selections of a group run in order on one worker, each with its own timeout
+            for sel, status, result in pool.imap_unordered(
                 partial(
                     run_optimize_analysis,
                     vdf=vdf,
@@ -1559,49 +2194,59 @@ if __name__ == "__main__":
                     report_kwargs=report_kwargs,
                     REPORT_COLS=REPORT_COLS,
                 ),
-                selections_list,
+                sel_groups,
+                timeout_s=args.selection_timeout_s,
+                grouped=True,
             ):
-                reports.append(report_i)
+                if status == supervised_pool.TASK_OK:
+                    reports_group = [result]
+                else:
+                    # the run continues without the selection
+                    logger.error("sweep:: selection %s %s :: %s", sel, status, result)
+                    sweep_logging.log_selection(sel, status, error=result)
+                    reports_group = get_failed_reports([sel], vdf, status, result)
+                reports.extend(reports_group)
                 k = len(reports)
-                if (k % 20 == 0 or k == 4) and (len(selections_list) != 1 and k != 0):
+                k_prev = k - len(reports_group)
+                # save at 4 and every 20 results
+                if (k // 20 > k_prev // 20 or k_prev < 4 <= k) and (
+                    len(selections_list) != 1 and k != 0
+                ):
                     reports_df = pd.DataFrame(reports)
                     reports_df.sort_values(by=["selection"], inplace=True)
                     reports_df.to_csv(resdir / RES_FILE, index=False, header=True)
-                    print(
-                        f"\nSaving intermediate results to {str(resdir / RES_FILE)}\n"
-                    )
-                print(f"Number of files done: {k}/{len(selections_list)}")
+                    logger.info("Saving intermediate results to %s", resdir / RES_FILE)
+                logger.info("Number of files done: %s/%s", k, len(selections_list))
 
             pool.close()
-            pool.join()
 
             reports_df = pd.DataFrame(reports)
             reports_df.sort_values(by=["selection"], inplace=True)
-            print(reports_df.head(5))
+            logger.debug("results:\n%s", reports_df.head(5))
             try:
                 reports_df.to_csv(resdir / RES_FILE, index=False, header=True)
             except PermissionError:
                 reports_df.to_csv(resdir / ("alternate_" + RES_FILE), index=False)
-                print(f"Could not write file {resdir / RES_FILE}, file open")
-        print("writing to ", resdir / RES_FILE)
+                logger.warning("Could not write file %s, file open", resdir / RES_FILE)
+        logger.info("writing to %s", resdir / RES_FILE)
 
     else:
         reports = []
-        print(f"selections_list: {selections_list}")
-        for sel in selections_list:
-            report_i = run_optimize_analysis(
-                sel,
-                vdf=vdf,
-                sdf=sdf,
-                skip_all_opt=skip_all_opt,
-                config=config,
-                report_kwargs=report_kwargs,
-                REPORT_COLS=REPORT_COLS,
+        for sel_group in sel_groups:
+            reports.extend(
+                run_optimize_analysis_group(
+                    sel_group,
+                    vdf=vdf,
+                    sdf=sdf,
+                    skip_all_opt=skip_all_opt,
+                    config=config,
+                    report_kwargs=report_kwargs,
+                    REPORT_COLS=REPORT_COLS,
+                )
             )
-            reports.append(report_i)
         reports_df = pd.DataFrame(reports)
         reports_df.sort_values(by=["selection"], inplace=True)
-        print(reports_df.head(5))
+        logger.debug("results:\n%s", reports_df.head(5))
         try:
             if os.path.exists(resdir / RES_FILE):
                 reports_df.to_csv(
@@ -1611,12 +2256,20 @@ if __name__ == "__main__":
                 reports_df.to_csv(resdir / RES_FILE, index=False, header=True)
         except PermissionError:
             reports_df.to_csv(resdir / ("alternate_" + RES_FILE), index=False)
-            print(f"Could not write file {resdir / RES_FILE}, file open")
-        print("writing to ", resdir / RES_FILE)
+            logger.warning("Could not write file %s, file open", resdir / RES_FILE)
+        logger.info("writing to %s", resdir / RES_FILE)
+
+    if args.profile:
+        for profile, report_path in profiling.merge_profiles(
+            report_kwargs["profile_dir"]
+        ).items():
+            logger.info(
+                "sweep:: %s profile of the run written to %s", profile, report_path
+            )
 
     end = time.time()
 
-    logging.info("T3CO finished")
+    logger.info("T3CO finished in %ss", end - start)
     print(f"T3CO finished in {end-start}s")
 
 
@@ -0,0 +1,344 @@
+"""Module for finding the breakeven value of a cost parameter at which two selections have equal discounted TCO"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import copy
+import logging
+import time
+from functools import partial
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import brentq
+
+from t3co.objectives import fueleconomy
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+from t3co.tco import tco_analysis
+
+logger = logging.getLogger(__name__)
+
+# breakeven parameter prefix for scaling a fuel price series, e.g. 'fuel_price_scale:diesel'
+FUEL_PRICE_SCALE_PREFIX = "fuel_price_scale:"
+FUEL_PRICE_SCALE_FUELS = ["diesel", "gasoline", "electricity", "cng", "hydrogen"]
+
+# Scenario fields only read by the cost stage, so the simulated mpgge of a selection stays valid when they change
+COST_PARAMS = [
+    "discount_rate_pct_per_yr",
+    "ess_cost_dol_per_kwh",
+    "ess_base_cost_dol",
+    "pe_mc_cost_dol_per_kw",
+    "pe_mc_base_cost_dol",
+    "fc_ice_cost_dol_per_kw",
+    "fc_ice_base_cost_dol",
+    "fc_fuelcell_cost_dol_per_kw",
+    "fc_cng_ice_cost_dol_per_kw",
+    "fs_cost_dol_per_kwh",
+    "fs_h2_cost_dol_per_kwh",
+    "fs_cng_cost_dol_per_kwh",
+    "plug_base_cost_dol",
+    "markup_pct",
+    "tax_rate_pct",
+    "vehicle_glider_cost_dol",
+    "labor_rate_dol_per_hr",
+    "downtime_oppy_cost_dol_per_hr",
+    "ess_max_charging_power_kw",
+    "fs_fueling_rate_gasoline_gpm",
+    "fs_fueling_rate_diesel_gpm",
+    "fs_fueling_rate_kg_per_min",
+    "fdt_dwpt_fraction_power_pct",
+    "fdt_avg_overhead_hr_per_dwell_hr",
+    "fdt_frac_full_charge_bounds",
+    "fdt_num_free_dwell_trips",
+    "fdt_available_freetime_hr",
+    "mr_planned_downtime_hr_per_yr",
+    "mr_avg_tire_life_mi",
+    "mr_tire_replace_downtime_hr_per_event",
+]
+
+
+def check_cost_param(param: str) -> None:
+    """
+    This function checks that param is a cost parameter: a Scenario field in COST_PARAMS or a fuel price series \
+        scale of the form 'fuel_price_scale:<fuel>'. Other Scenario fields, e.g. gvwr_kg or the SOC and performance \
+        targets, change the simulation results that the cost stage reuses.
+
+    Args:
+        param (str): Scenario field name or fuel price series scale
+
+    Raises:
+        ValueError: if param is not a cost parameter
+    """
+    if param.startswith(FUEL_PRICE_SCALE_PREFIX):
+        fuel = param[len(FUEL_PRICE_SCALE_PREFIX) :]
+        if fuel not in FUEL_PRICE_SCALE_FUELS:
+            raise ValueError(
+                f"invalid fuel {fuel} in {param}, choose from {FUEL_PRICE_SCALE_FUELS}"
+            )
+    elif param not in COST_PARAMS:
+        raise ValueError(
+            f"{param} is not a cost parameter, choose a Scenario field from COST_PARAMS or '{FUEL_PRICE_SCALE_PREFIX}<fuel>'"
+        )
+
+
+def set_cost_param(scenario: run_scenario.Scenario, param: str, value: float) -> None:
+    """
+    This function sets a cost parameter of the scenario, see check_cost_param
+
+    Args:
+        scenario (run_scenario.Scenario): Scenario object
+        param (str): Scenario field name in COST_PARAMS or fuel price series scale
+        value (float): parameter value
+    """
+    check_cost_param(param)
+    if param.startswith(FUEL_PRICE_SCALE_PREFIX):
+        scenario.fuel_price_scale_factors = {
+            **scenario.fuel_price_scale_factors,
+            param[len(FUEL_PRICE_SCALE_PREFIX) :]: value,
+        }
+    else:
+        setattr(scenario, param, value)
+
+
+def get_cost_stage_inputs(
+    sel: str, config: run_scenario.Config, cache: dict = None
+) -> dict:
+    """
+    This function loads the vehicle, scenario, and design cycle of a selection and simulates its mpgge once. \
+        If cache is provided, results are kept in it by selection, so selections shared by several pairs of one \
+        run_breakeven_pairs call are only simulated once.
+
+    Args:
+        sel (str): selection number
+        config (run_scenario.Config): Config object
+        cache (dict, optional): cost stage inputs of the selections of one run, keyed by selection. Defaults to None.
+
+    Returns:
+        cost_stage_inputs (dict): Dictionary containing vehicle, scenario, range_cyc, mpgge, and sim_drives
+    """
+    if cache is not None and str(sel) in cache:
+        return cache[str(sel)]
+    logger.debug("simulating selection %s for the cost stage", sel)
+    vehicle = run_scenario.get_vehicle(sel, config.vehicle_file)
+    scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+        sel, config.scenario_file, a_vehicle=vehicle, config=config
+    )
+    mpgge, sim_drives = fueleconomy.get_mpgge(range_cyc, vehicle, scenario)
+    cost_stage_inputs = {
+        "vehicle": vehicle,
+        "scenario": scenario,
+        "range_cyc": range_cyc,
+        "mpgge": mpgge,
+        "sim_drives": sim_drives,
+    }
+    if cache is not None:
+        cache[str(sel)] = cost_stage_inputs
+    return cost_stage_inputs
+
+
+def get_disc_cost(cost_stage_inputs: dict, param: str, value: float) -> float:
+    """
+    This function runs only the cost stage (tco_analysis.get_tco_from_mpgge) for a cost parameter value
+
+    Args:
+        cost_stage_inputs (dict): Dictionary from get_cost_stage_inputs
+        param (str): Scenario field name in COST_PARAMS or fuel price series scale
+        value (float): parameter value
+
+    Returns:
+        disc_cost (float): discounted TCO in dollars
+    """
+    scenario = copy.deepcopy(cost_stage_inputs["scenario"])
+    set_cost_param(scenario, param, value)
+    return tco_analysis.get_tco_from_mpgge(
+        cost_stage_inputs["vehicle"],
+        scenario,
+        cost_stage_inputs["mpgge"],
+        cost_stage_inputs["sim_drives"],
+    )[1]
+
+
+def get_breakeven(
+    sel_a: str,
+    sel_b: str,
+    param: str,
+    bounds: tuple,
+    config: run_scenario.Config,
+    xtol: float = 1e-6,
+    maxiter: int = 100,
+    cache: dict = None,
+) -> dict:
+    """
+    This function finds the value of param within bounds at which selections sel_a and sel_b have equal discounted TCO, \
+        using Brent's method. FASTSim is run once per selection; each iteration only re-runs the cost stage.
+
+    Args:
+        sel_a (str): first selection number
+        sel_b (str): second selection number
+        param (str): Scenario field name in COST_PARAMS or fuel price series scale, e.g. 'ess_cost_dol_per_kwh' or \
+            'fuel_price_scale:diesel'
+        bounds (tuple): (lower, upper) bounds of param
+        config (run_scenario.Config): Config object
+        xtol (float, optional): absolute tolerance of the breakeven value. Defaults to 1e-6.
+        maxiter (int, optional): maximum number of iterations. Defaults to 100.
+        cache (dict, optional): cost stage inputs shared with other pairs, see get_cost_stage_inputs. Defaults to None.
+
+    Returns:
+        breakeven (dict): Dictionary containing breakeven value, discounted TCOs at breakeven, and solver statistics
+    """
+    check_cost_param(param)
+    ti = time.time()
+    inputs_a = get_cost_stage_inputs(sel_a, config, cache)
+    inputs_b = get_cost_stage_inputs(sel_b, config, cache)
+    t_sim = time.time() - ti
+    n_cost_evals = 0
+
+    def delta_disc_cost(value):
+        nonlocal n_cost_evals
+        n_cost_evals += 1
+        return get_disc_cost(inputs_a, param, value) - get_disc_cost(
+            inputs_b, param, value
+        )
+
+    breakeven = {
+        "selection_a": sel_a,
+        "selection_b": sel_b,
+        "param": param,
+        "lower_bound": bounds[0],
+        "upper_bound": bounds[1],
+        "breakeven_value": np.nan,
+        "disc_cost_a": np.nan,
+        "disc_cost_b": np.nan,
+        "converged": False,
+        "message": "",
+    }
+    delta_lower = delta_disc_cost(bounds[0])
+    delta_upper = delta_disc_cost(bounds[1])
+    if np.sign(delta_lower) == np.sign(delta_upper):
+        breakeven["message"] = (
+            f"no breakeven within bounds, disc_cost_a - disc_cost_b = {delta_lower} at {bounds[0]} and {delta_upper} at {bounds[1]}"
+        )
+    else:
+        value, res = brentq(
+            delta_disc_cost,
+            bounds[0],
+            bounds[1],
+            xtol=xtol,
+            maxiter=maxiter,
+            full_output=True,
+            disp=False,
+        )
+        breakeven["breakeven_value"] = value
+        breakeven["disc_cost_a"] = get_disc_cost(inputs_a, param, value)
+        breakeven["disc_cost_b"] = get_disc_cost(inputs_b, param, value)
+        breakeven["converged"] = res.converged
+        breakeven["message"] = res.flag
+
+    breakeven["n_cost_evals"] = n_cost_evals
+    breakeven["simulation_time_[s]"] = t_sim
+    breakeven["run_time_[s]"] = time.time() - ti
+    return breakeven
+
+
+def run_breakeven_pairs(
+    pairs: list,
+    param: str,
+    bounds: tuple,
+    config: run_scenario.Config,
+    n_processors: int = 1,
+    out_file: str | Path = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    This function runs get_breakeven over many selection pairs, in parallel if n_processors > 1. Run in order, the \
+        pairs share the simulations of their selections; in parallel, each pair simulates its own.
+
+    Args:
+        pairs (list): list of (sel_a, sel_b) selection pairs
+        param (str): Scenario field name in COST_PARAMS or fuel price series scale
+        bounds (tuple): (lower, upper) bounds of param
+        config (run_scenario.Config): Config object
+        n_processors (int, optional): number of processes. Defaults to 1.
+        out_file (str | Path, optional): if provided, results are saved to this CSV file. Defaults to None.
+
+    Returns:
+        breakeven_df (pd.DataFrame): Dataframe with one row of get_breakeven results per pair
+    """
+    run_pair = partial(get_breakeven, param=param, bounds=bounds, config=config, **kwargs)
+    if n_processors > 1:
+        with Pool(processes=n_processors) as pool:
+            results = pool.starmap(run_pair, pairs)
+    else:
+        cache = {}
+        results = [run_pair(sel_a, sel_b, cache=cache) for sel_a, sel_b in pairs]
+
+    breakeven_df = pd.DataFrame(results)
+    if out_file is not None:
+        Path(out_file).parent.mkdir(parents=True, exist_ok=True)
+        breakeven_df.to_csv(out_file, index=False)
+    return breakeven_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        prog="BREAKEVEN",
+        description="""Finds the value of a cost parameter at which pairs of selections have equal discounted TCO""",
+    )
+    parser.add_argument(
+        "--config",
+        default=gl.SWEEP_PATH.parents[0] / "resources/T3COConfig.csv",
+        type=str,
+        help="Input Config file",
+    )
+    parser.add_argument(
+        "--analysis-id",
+        default=0,
+        type=int,
+        help="Analysis key from input Config file - 'config.analysis_id'",
+    )
+    parser.add_argument(
+        "--pairs",
+        required=True,
+        type=str,
+        help="""List of selection pairs. Ex: --pairs "[(12, 15), (12, 16)]" """,
+    )
+    parser.add_argument(
+        "--param",
+        required=True,
+        type=str,
+        help=f"""Scenario field in COST_PARAMS or fuel price series scale '{FUEL_PRICE_SCALE_PREFIX}<fuel>', fuel in {FUEL_PRICE_SCALE_FUELS}""",
+    )
+    parser.add_argument(
+        "--bounds",
+        required=True,
+        type=str,
+        help="""Lower and upper bounds of param. Ex: --bounds "(0, 500)" """,
+    )
+    parser.add_argument(
+        "--xtol", default=1e-6, type=float, help="Tolerance of the breakeven value"
+    )
+    parser.add_argument(
+        "--n-processors", default=1, type=int, help="Number of processes"
+    )
+    parser.add_argument(
+        "--out", default="breakeven.csv", type=str, help="Output CSV file"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    config = run_scenario.load_config(args.config, args.analysis_id)
+    breakeven_df = run_breakeven_pairs(
+        ast.literal_eval(args.pairs),
+        args.param,
+        ast.literal_eval(args.bounds),
+        config,
+        n_processors=args.n_processors,
+        out_file=args.out,
+        xtol=args.xtol,
+    )
+    logger.info("breakeven of %s pairs:\n%s", len(breakeven_df), breakeven_df)
@@ -0,0 +1,417 @@
+"""Module for Monte Carlo uncertainty analysis of discounted TCO using cached vehicle simulation outputs"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+
+logger = logging.getLogger(__name__)
+
+# uncertain cost inputs that can be sampled without re-running FASTSim
+FUEL_PRICE_SCALE = "fuel_price_scale"
+FUEL_PRICE_ESCALATION = "fuel_price_escalation_pct_per_yr"
+DISCOUNT_RATE = "discount_rate_pct_per_yr"
+RESIDUAL_RATE = "residual_rate_pct_of_msrp"
+MAINT_COST_SCALE = "maint_oper_cost_scale"
+UNCERTAIN_INPUTS = [
+    FUEL_PRICE_SCALE,
+    FUEL_PRICE_ESCALATION,
+    DISCOUNT_RATE,
+    RESIDUAL_RATE,
+    MAINT_COST_SCALE,
+]
+
+DISTRIBUTIONS = ["constant", "uniform", "triangular", "normal", "lognormal"]
+
+# DIRECT method operating cost categories, see tco_analysis.get_operating_costs
+OPERATING_COST_CATEGORIES = [
+    "Fuel",
+    "maintenance",
+    "insurance",
+    "fueling labor cost",
+    "fueling downtime cost",
+    "MR downtime cost",
+]
+RESIDUAL_COST_CATEGORY = "residual cost"
+
+DEFAULT_PERCENTILES = [5, 10, 25, 50, 75, 90, 95]
+
+
+@dataclass
+class UncertainInput:
+    """
+    This class contains the sampling distribution of one uncertain cost input of the Monte Carlo TCO analysis
+    - constant: value
+    - uniform: low, high
+    - triangular: low, mode, high
+    - normal: mean, std (optionally truncated to [low, high])
+    - lognormal: mean, std of the underlying normal distribution
+    """
+
+    distribution: str = "constant"
+    value: float = None
+    low: float = None
+    high: float = None
+    mode: float = None
+    mean: float = None
+    std: float = None
+
+    def sample(self, n_samples: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        This method draws n_samples values from the distribution
+
+        Args:
+            n_samples (int): number of samples
+            rng (np.random.Generator): numpy random number generator
+
+        Raises:
+            Exception: Invalid distribution name
+
+        Returns:
+            samples (np.ndarray): array of sampled values
+        """
+        if self.distribution == "constant":
+            samples = np.full(n_samples, float(self.value))
+        elif self.distribution == "uniform":
+            samples = rng.uniform(self.low, self.high, n_samples)
+        elif self.distribution == "triangular":
+            samples = rng.triangular(self.low, self.mode, self.high, n_samples)
+        elif self.distribution == "normal":
+            samples = rng.normal(self.mean, self.std, n_samples)
+            if self.low is not None or self.high is not None:
+                samples = np.clip(samples, self.low, self.high)
+        elif self.distribution == "lognormal":
+            samples = rng.lognormal(self.mean, self.std, n_samples)
+        else:
+            raise Exception(
+                f"UncertainInput.sample:: unknown distribution {self.distribution}, choose from {DISTRIBUTIONS}"
+            )
+        return samples
+
+
+def get_cost_basis(out: dict) -> dict:
+    """
+    This function extracts the yearly undiscounted cost streams of one simulated vehicle and scenario from the output dictionary of \
+        run_scenario.vehicle_scenario_sweep. These are the cached physics dependent values that every Monte Carlo sample reuses.
+
+    Args:
+        out (dict): output dictionary from run_scenario.vehicle_scenario_sweep
+
+    Returns:
+        cost_basis (dict): Dictionary containing vehicle age array, yearly costs per category, MSRP, purchase tax, residual rate, and payload multiplier
+    """
+    discounted_costs_df = out["discounted_costs_df"]
+    yearly_costs_df = discounted_costs_df.pivot_table(
+        index="Year", columns="Category", values="Cost [$]", aggfunc="sum"
+    ).fillna(0)
+    model_year = int(discounted_costs_df["Model Year"].iloc[0])
+    age = yearly_costs_df.index.values.astype(float) - model_year
+
+    yearly_costs = {}
+    for category in OPERATING_COST_CATEGORIES + [RESIDUAL_COST_CATEGORY]:
+        if category in yearly_costs_df.columns:
+            yearly_costs[category] = yearly_costs_df[category].values
+        else:
+            yearly_costs[category] = np.zeros(len(age))
+
+    msrp = out["veh_msrp_set"]["msrp"]
+    residual_rate = (
+        -yearly_costs[RESIDUAL_COST_CATEGORY].sum() / msrp if msrp != 0 else 0
+    )
+
+    cost_basis = {
+        "age": age,
+        "yearly_costs": yearly_costs,
+        "msrp": msrp,
+        "purchase_tax": out["veh_msrp_set"]["Purchase tax"],
+        "residual_rate": residual_rate,
+        "payload_multiplier": out["veh_opp_cost_set"]["payload_cap_cost_multiplier"]
+        or 1,
+        "discount_rate_pct_per_yr": out["scenario"].discount_rate_pct_per_yr,
+    }
+    return cost_basis
+
+
+def get_base_samples(cost_basis: dict, n_samples: int) -> dict:
+    """
+    This function returns arrays of the base (deterministic) value of every uncertain input
+
+    Args:
+        cost_basis (dict): Dictionary from get_cost_basis
+        n_samples (int): number of samples
+
+    Returns:
+        samples (dict): Dictionary of base value arrays for each of UNCERTAIN_INPUTS
+    """
+    return {
+        FUEL_PRICE_SCALE: np.ones(n_samples),
+        FUEL_PRICE_ESCALATION: np.zeros(n_samples),
+        DISCOUNT_RATE: np.full(n_samples, cost_basis["discount_rate_pct_per_yr"]),
+        RESIDUAL_RATE: np.full(n_samples, cost_basis["residual_rate"]),
+        MAINT_COST_SCALE: np.ones(n_samples),
+    }
+
+
+def sample_inputs(
+    cost_basis: dict,
+    input_dists: dict,
+    n_samples: int,
+    rng: np.random.Generator,
+) -> dict:
+    """
+    This function samples the uncertain inputs. Inputs not in input_dists are held at their base values.
+
+    Args:
+        cost_basis (dict): Dictionary from get_cost_basis
+        input_dists (dict): Dictionary of {uncertain input name: UncertainInput}
+        n_samples (int): number of samples
+        rng (np.random.Generator): numpy random number generator
+
+    Returns:
+        samples (dict): Dictionary of sampled arrays for each of UNCERTAIN_INPUTS
+    """
+    samples = get_base_samples(cost_basis, n_samples)
+    for input_name, input_dist in input_dists.items():
+        assert (
+            input_name in UNCERTAIN_INPUTS
+        ), f"invalid uncertain input {input_name}, choose from {UNCERTAIN_INPUTS}"
+        samples[input_name] = input_dist.sample(n_samples, rng)
+    return samples
+
+
+def get_discounted_tco_samples(cost_basis: dict, samples: dict) -> dict:
+    """
+    This function calculates the DIRECT discounted TCO, and its discounted category breakdown, for arrays of sampled inputs. \
+        It is the array equivalent of tco_analysis.discounted_costs and tco_analysis.calc_discountedTCO.
+
+    Args:
+        cost_basis (dict): Dictionary from get_cost_basis
+        samples (dict): Dictionary of sampled input arrays from sample_inputs
+
+    Returns:
+        results (dict): Dictionary of arrays for 'disc_cost' and each discounted cost category
+    """
+    age = cost_basis["age"][None, :]
+    yearly_costs = cost_basis["yearly_costs"]
+    discount_factor = 1 / (1.0 + samples[DISCOUNT_RATE][:, None]) ** age
+
+    fuel_cost = (
+        yearly_costs["Fuel"][None, :]
+        * samples[FUEL_PRICE_SCALE][:, None]
+        * (1.0 + samples[FUEL_PRICE_ESCALATION][:, None]) ** age
+    )
+    maint_cost = yearly_costs["maintenance"][None, :] * samples[MAINT_COST_SCALE][:, None]
+
+    results = {
+        "Fuel": (fuel_cost * discount_factor).sum(axis=1),
+        "maintenance": (maint_cost * discount_factor).sum(axis=1),
+    }
+    for category in OPERATING_COST_CATEGORIES[2:]:
+        results[category] = discount_factor @ yearly_costs[category]
+
+    # residual value is only realized in the last year of vehicle life
+    results[RESIDUAL_COST_CATEGORY] = (
+        -samples[RESIDUAL_RATE] * cost_basis["msrp"] * discount_factor[:, -1]
+    )
+
+    disc_operating_costs = sum(
+        results[category] for category in OPERATING_COST_CATEGORIES
+    )
+    results["disc_cost"] = cost_basis["payload_multiplier"] * (
+        cost_basis["msrp"]
+        + cost_basis["purchase_tax"]
+        + disc_operating_costs
+        + results[RESIDUAL_COST_CATEGORY]
+    )
+    return results
+
+
+def run_monte_carlo(
+    out: dict,
+    input_dists: dict,
+    n_samples: int = 100000,
+    seed: int = None,
+    chunk_size: int = 25000,
+) -> dict:
+    """
+    This function runs the Monte Carlo TCO analysis for one simulated vehicle and scenario. Samples are evaluated in chunks \
+        of chunk_size to bound peak memory.
+
+    Args:
+        out (dict): output dictionary from run_scenario.vehicle_scenario_sweep
+        input_dists (dict): Dictionary of {uncertain input name: UncertainInput}
+        n_samples (int, optional): number of Monte Carlo samples. Defaults to 100000.
+        seed (int, optional): random seed. Defaults to None.
+        chunk_size (int, optional): number of samples evaluated at once. Defaults to 25000.
+
+    Returns:
+        results (dict): Dictionary of arrays of length n_samples for 'disc_cost' and each discounted cost category
+    """
+    rng = np.random.default_rng(seed)
+    cost_basis = get_cost_basis(out)
+
+    results = {}
+    for start in range(0, n_samples, chunk_size):
+        n_chunk = min(chunk_size, n_samples - start)
+        samples = sample_inputs(cost_basis, input_dists, n_chunk, rng)
+        chunk_results = get_discounted_tco_samples(cost_basis, samples)
+        for k, v in chunk_results.items():
+            if k not in results:
+                results[k] = np.empty(n_samples)
+            results[k][start : start + n_chunk] = v
+
+    return results
+
+
+def get_percentiles(
+    results: dict, percentiles: list = DEFAULT_PERCENTILES
+) -> pd.DataFrame:
+    """
+    This function summarizes Monte Carlo results as mean, standard deviation, and percentiles of each metric
+
+    Args:
+        results (dict): Dictionary of sample arrays from run_monte_carlo
+        percentiles (list, optional): list of percentiles. Defaults to DEFAULT_PERCENTILES.
+
+    Returns:
+        percentiles_df (pd.DataFrame): Dataframe with one row per metric
+    """
+    data = []
+    for metric, values in results.items():
+        row = {"metric": metric, "mean": values.mean(), "std": values.std()}
+        row.update(
+            {
+                f"p{p}": v
+                for p, v in zip(percentiles, np.percentile(values, percentiles))
+            }
+        )
+        data.append(row)
+    return pd.DataFrame(data)
+
+
+def write_percentiles(
+    percentiles_df: pd.DataFrame, out_file: str | Path, selection: str
+) -> None:
+    """
+    This function appends the percentile summary of one selection to out_file, writing the header if the file is new
+
+    Args:
+        percentiles_df (pd.DataFrame): Dataframe from get_percentiles
+        out_file (str | Path): output CSV file path
+        selection (str): selection number
+    """
+    percentiles_df.insert(0, "selection", selection)
+    out_file = Path(out_file)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    percentiles_df.to_csv(
+        out_file, mode="a", index=False, header=not out_file.exists()
+    )
+
+
+def run_monte_carlo_selections(
+    selections: list,
+    config: run_scenario.Config,
+    input_dists: dict,
+    out_file: str | Path,
+    n_samples: int = 100000,
+    seed: int = None,
+    percentiles: list = DEFAULT_PERCENTILES,
+) -> None:
+    """
+    This function simulates each selection once with run_scenario.vehicle_scenario_sweep, runs the Monte Carlo TCO analysis \
+        on the cached outputs, and streams the percentile summary of each selection to out_file as it completes
+
+    Args:
+        selections (list): list of selection numbers
+        config (run_scenario.Config): Config object
+        input_dists (dict): Dictionary of {uncertain input name: UncertainInput}
+        out_file (str | Path): output CSV file path
+        n_samples (int, optional): number of Monte Carlo samples per selection. Defaults to 100000.
+        seed (int, optional): random seed. Defaults to None.
+        percentiles (list, optional): list of percentiles. Defaults to DEFAULT_PERCENTILES.
+    """
+    for sel in selections:
+        ti = time.time()
+        vehicle = run_scenario.get_vehicle(sel, config.vehicle_file)
+        scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+            sel, config.scenario_file, a_vehicle=vehicle, config=config
+        )
+        out = run_scenario.vehicle_scenario_sweep(
+            vehicle,
+            scenario,
+            range_cyc,
+            get_accel=False,
+            get_accel_loaded=False,
+            get_gradability=False,
+        )
+        ts = time.time()
+        results = run_monte_carlo(out, input_dists, n_samples=n_samples, seed=seed)
+        write_percentiles(get_percentiles(results, percentiles), out_file, sel)
+        logger.info(
+            "selection %s: simulation %.2fs, %s Monte Carlo samples %.2fs",
+            sel,
+            ts - ti,
+            n_samples,
+            time.time() - ts,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        prog="MONTE CARLO",
+        description="""Monte Carlo uncertainty analysis of discounted TCO""",
+    )
+    parser.add_argument(
+        "--config",
+        default=gl.SWEEP_PATH.parents[0] / "resources/T3COConfig.csv",
+        type=str,
+        help="Input Config file",
+    )
+    parser.add_argument(
+        "--analysis-id",
+        default=0,
+        type=int,
+        help="Analysis key from input Config file - 'config.analysis_id'",
+    )
+    parser.add_argument(
+        "--inputs",
+        default="{'fuel_price_scale': {'distribution': 'triangular', 'low': 0.8, 'mode': 1.0, 'high': 1.3}}",
+        type=str,
+        help=f"""Dictionary of uncertain inputs and UncertainInput fields. Inputs: {UNCERTAIN_INPUTS}. Distributions: {DISTRIBUTIONS}""",
+    )
+    parser.add_argument(
+        "--n-samples", default=100000, type=int, help="Number of Monte Carlo samples"
+    )
+    parser.add_argument("--seed", default=None, type=int, help="Random seed")
+    parser.add_argument(
+        "--out",
+        default="monte_carlo_tco_percentiles.csv",
+        type=str,
+        help="Output CSV file of percentiles",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    config = run_scenario.load_config(args.config, args.analysis_id)
+    input_dists = {
+        k: UncertainInput(**v) for k, v in ast.literal_eval(args.inputs).items()
+    }
+    run_monte_carlo_selections(
+        config.selections,
+        config,
+        input_dists,
+        args.out,
+        n_samples=args.n_samples,
+        seed=args.seed,
+    )
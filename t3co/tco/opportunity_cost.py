@@ -7,13 +7,18 @@ from math import ceil
 from pathlib import Path
 
 import fastsim
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from scipy.stats import gaussian_kde
 import os
 from t3co.run import Global as gl
 from t3co.run import run_scenario
+from t3co.utilities import file_keys
+
+# payload kernel density estimates, keyed by (weight distribution file, bw_method)
+PAYLOAD_KDE_CACHE = {}
+
+# vehicle weight distributions, keyed by file_keys.get_file_key of the weight distribution file
+WEIGHT_DIST_CACHE = {}
 
 
 class OpportunityCost:
@@ -70,7 +75,11 @@ class OpportunityCost:
             / "auxiliary"
             / "tractorweightvars.csv",
         )
-        self.df_veh_wt = pd.read_csv(self.wt_dist_file, index_col=0)
+        # the weight distribution file is read once per process, set_kdes filters a copy
+        wt_dist_key = file_keys.get_file_key(self.wt_dist_file)
+        if wt_dist_key not in WEIGHT_DIST_CACHE:
+            WEIGHT_DIST_CACHE[wt_dist_key] = pd.read_csv(self.wt_dist_file, index_col=0)
+        self.df_veh_wt = WEIGHT_DIST_CACHE[wt_dist_key]
 
     def set_kdes(
         self,
@@ -79,7 +88,7 @@ class OpportunityCost:
         verbose: bool = False,
     ) -> None:
         """
-        This method sets tje kde kernel. This is time-consuming, only call this once, if possible.
+        This method sets tje kde kernel. The kernel evaluation is time-consuming, so it is cached in PAYLOAD_KDE_CACHE.
 
         Args:
             scenario (run_scenario.Scenario): Scenario object
@@ -94,25 +103,38 @@ class OpportunityCost:
         self.df_veh_wt = self.df_veh_wt[~self.df_veh_wt["WEIGHTEMPTY"].isnull()]
         self.df_veh_wt = self.df_veh_wt[self.df_veh_wt["WEIGHTAVG"] < 120000]
 
-        weights = self.df_veh_wt["TAB_MILES"] / np.nansum(self.df_veh_wt["TAB_MILES"])
-        kernel = gaussian_kde(
-            self.df_veh_wt["WEIGHTAVG"], weights=weights, bw_method=bw_method
-        )
-        self.vehicle_weights_bins_lb = np.linspace(
-            self.df_veh_wt["WEIGHTAVG"].min(), self.df_veh_wt["WEIGHTAVG"].max(), 1000
-        )
-        self.vehicle_weights_bins_kg = gl.lbs_to_kgs(self.vehicle_weights_bins_lb)
+        # the kernel only depends on the weight distribution file and bw_method, so it is evaluated once per process
+        kde_key = (str(self.wt_dist_file), bw_method)
+        if kde_key not in PAYLOAD_KDE_CACHE:
+            from scipy.stats import gaussian_kde
 
-        # get probability of each vehicle weight
-        self.p_of_weights = kernel(self.vehicle_weights_bins_lb)
+            weights = self.df_veh_wt["TAB_MILES"] / np.nansum(
+                self.df_veh_wt["TAB_MILES"]
+            )
+            kernel = gaussian_kde(
+                self.df_veh_wt["WEIGHTAVG"], weights=weights, bw_method=bw_method
+            )
+            vehicle_weights_bins_lb = np.linspace(
+                self.df_veh_wt["WEIGHTAVG"].min(),
+                self.df_veh_wt["WEIGHTAVG"].max(),
+                1000,
+            )
+            # get probability of each vehicle weight
+            p_of_weights = kernel(vehicle_weights_bins_lb)
+
+            pd.DataFrame(
+                [gl.lbs_to_kgs(vehicle_weights_bins_lb), p_of_weights],
+                index=["vehicle_weights_bins_kg", "p_of_weights"],
+            ).T.to_csv(Path(self.wt_dist_file).parents[0] / "payload_pdf.csv")
+            PAYLOAD_KDE_CACHE[kde_key] = (vehicle_weights_bins_lb, p_of_weights)
+
+        self.vehicle_weights_bins_lb, self.p_of_weights = PAYLOAD_KDE_CACHE[kde_key]
+        self.vehicle_weights_bins_kg = gl.lbs_to_kgs(self.vehicle_weights_bins_lb)
 
         probability_payload = pd.DataFrame(
             [self.vehicle_weights_bins_kg, self.p_of_weights],
             index=["vehicle_weights_bins_kg", "p_of_weights"],
         ).T
-        probability_payload.to_csv(
-            Path(self.wt_dist_file).parents[0] / "payload_pdf.csv"
-        )
         normalization_factor = probability_payload[
             probability_payload["vehicle_weights_bins_kg"].between(
                 scenario.plf_ref_veh_empty_mass_kg, scenario.gvwr_kg
@@ -191,6 +213,8 @@ class OpportunityCost:
             Args:
                 save_dir (str, optional): Output directory path to save plot figure. Defaults to None.
             """
+            import matplotlib.pyplot as plt
+
             if save_dir and not Path(save_dir).exists():
                 save_dir.mkdir()
 
@@ -0,0 +1,550 @@
+"""Module for global sensitivity analysis (Sobol and Morris) of discounted TCO to Scenario and vehicle inputs"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import copy
+import logging
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import fastsim
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from t3co.objectives import fueleconomy
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+from t3co.tco import breakeven, monte_carlo, tco_analysis, tcocalc
+
+logger = logging.getLogger(__name__)
+
+# sensitivity input prefix for FASTSim vehicle attributes, e.g. 'vehicle:glider_kg'. These inputs re-run FASTSim.
+VEHICLE_INPUT_PREFIX = "vehicle:"
+
+# list-valued Scenario fields, sampled as a multiplier applied to every year
+SCALED_SCENARIO_FIELDS = [
+    "vmt",
+    "insurance_rates_pct_per_yr",
+    "mr_unplanned_downtime_hr_per_mi",
+    "maint_oper_cost_dol_per_mi",
+]
+
+METHODS = ["sobol", "morris"]
+
+
+def is_physics_input(name: str) -> bool:
+    """
+    This function checks whether a sensitivity input changes the vehicle and therefore requires a FASTSim run
+
+    Args:
+        name (str): sensitivity input name
+
+    Returns:
+        is_physics (bool): True if name is of the form 'vehicle:<attr>'
+    """
+    return name.startswith(VEHICLE_INPUT_PREFIX)
+
+
+def set_sensitivity_input(
+    vehicle: fastsim.vehicle.Vehicle,
+    scenario: run_scenario.Scenario,
+    name: str,
+    value: float,
+) -> None:
+    """
+    This function sets one sensitivity input on the vehicle or scenario. Supported input names are:
+    - 'vehicle:<attr>': FASTSim vehicle attribute, e.g. 'vehicle:glider_kg' or 'vehicle:drag_coef'
+    - list-valued Scenario fields in SCALED_SCENARIO_FIELDS: value is a multiplier applied to every year
+    - Scenario fields in breakeven.COST_PARAMS and fuel price series scales 'fuel_price_scale:<fuel>', see \
+        breakeven.set_cost_param
+
+    Args:
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object, modified in place
+        scenario (run_scenario.Scenario): Scenario object, modified in place
+        name (str): sensitivity input name
+        value (float): input value
+    """
+    if is_physics_input(name):
+        attr = name[len(VEHICLE_INPUT_PREFIX) :]
+        assert hasattr(vehicle, attr), f"{attr} is not a FASTSim vehicle attribute"
+        setattr(vehicle, attr, value)
+    elif name == "maint_oper_cost_dol_per_mi":
+        maint = np.float_(scenario.maint_oper_cost_dol_per_mi.strip(" ][").split(","))
+        scenario.maint_oper_cost_dol_per_mi = str(list(maint * value))
+    elif name in SCALED_SCENARIO_FIELDS:
+        setattr(scenario, name, list(np.array(getattr(scenario, name)) * value))
+    else:
+        breakeven.set_cost_param(scenario, name, value)
+
+
+def get_saltelli_samples(
+    bounds: np.ndarray, n_samples: int, seed: int = None
+) -> np.ndarray:
+    """
+    This function generates the Saltelli sampling design for Sobol indices from a scrambled Sobol sequence. \
+        Rows are stacked as [A, B, AB_1, ..., AB_k], where AB_i is A with column i taken from B.
+
+    Args:
+        bounds (np.ndarray): (k, 2) array of lower and upper input bounds
+        n_samples (int): number of base samples N, preferably a power of 2
+        seed (int, optional): random seed. Defaults to None.
+
+    Returns:
+        X (np.ndarray): (N * (k + 2), k) array of input samples
+    """
+    k = len(bounds)
+    base = qmc.Sobol(d=2 * k, scramble=True, seed=seed).random(n_samples)
+    base = qmc.scale(base, np.tile(bounds[:, 0], 2), np.tile(bounds[:, 1], 2))
+    A, B = base[:, :k], base[:, k:]
+    AB = []
+    for i in range(k):
+        AB_i = A.copy()
+        AB_i[:, i] = B[:, i]
+        AB.append(AB_i)
+    return np.vstack([A, B] + AB)
+
+
+def get_sobol_indices(Y: np.ndarray, n_samples: int, k: int) -> tuple:
+    """
+    This function estimates first-order (Saltelli 2010) and total (Jansen) Sobol indices from outputs of the \
+        get_saltelli_samples design
+
+    Args:
+        Y (np.ndarray): model outputs of the N * (k + 2) Saltelli samples
+        n_samples (int): number of base samples N
+        k (int): number of inputs
+
+    Returns:
+        S1 (np.ndarray): first-order indices
+        ST (np.ndarray): total indices
+    """
+    Y = Y.reshape(k + 2, n_samples)
+    fA, fB, fAB = Y[0], Y[1], Y[2:]
+    var = np.var(np.concatenate([fA, fB]))
+    if var == 0:
+        return np.zeros(k), np.zeros(k)
+    S1 = np.mean(fB * (fAB - fA), axis=1) / var
+    ST = 0.5 * np.mean((fA - fAB) ** 2, axis=1) / var
+    return S1, ST
+
+
+def get_morris_samples(
+    bounds: np.ndarray, n_trajectories: int, n_levels: int = 4, seed: int = None
+) -> np.ndarray:
+    """
+    This function generates Morris one-at-a-time trajectories on a grid of n_levels levels. Each trajectory has \
+        k + 1 points and moves one input at a time by delta = n_levels / (2 * (n_levels - 1)).
+
+    Args:
+        bounds (np.ndarray): (k, 2) array of lower and upper input bounds
+        n_trajectories (int): number of trajectories r
+        n_levels (int, optional): number of grid levels p (even). Defaults to 4.
+        seed (int, optional): random seed. Defaults to None.
+
+    Returns:
+        X (np.ndarray): (r * (k + 1), k) array of input samples
+    """
+    rng = np.random.default_rng(seed)
+    k = len(bounds)
+    delta = n_levels / (2 * (n_levels - 1))
+    start_levels = np.arange(n_levels // 2) / (n_levels - 1)
+    trajectories = []
+    for _ in range(n_trajectories):
+        x = rng.choice(start_levels, size=k)
+        points = [x.copy()]
+        for i in rng.permutation(k):
+            x[i] += delta
+            points.append(x.copy())
+        trajectories.append(points)
+    X = np.array(trajectories).reshape(-1, k)
+    return bounds[:, 0] + X * (bounds[:, 1] - bounds[:, 0])
+
+
+def get_morris_indices(
+    X: np.ndarray, Y: np.ndarray, n_trajectories: int, bounds: np.ndarray
+) -> tuple:
+    """
+    This function computes Morris elementary effect statistics, scaled by the input ranges so they are \
+        in units of the output
+
+    Args:
+        X (np.ndarray): samples from get_morris_samples
+        Y (np.ndarray): model outputs of X
+        n_trajectories (int): number of trajectories r
+        bounds (np.ndarray): (k, 2) array of lower and upper input bounds
+
+    Returns:
+        mu (np.ndarray): mean elementary effect
+        mu_star (np.ndarray): mean absolute elementary effect
+        sigma (np.ndarray): standard deviation of elementary effects
+    """
+    k = X.shape[1]
+    X = (X - bounds[:, 0]) / (bounds[:, 1] - bounds[:, 0])
+    X = X.reshape(n_trajectories, k + 1, k)
+    Y = Y.reshape(n_trajectories, k + 1)
+    effects = np.zeros((n_trajectories, k))
+    for t in range(n_trajectories):
+        dX = np.diff(X[t], axis=0)
+        dY = np.diff(Y[t])
+        i = np.argmax(np.abs(dX), axis=1)
+        effects[t, i] = dY / dX[np.arange(k), i]
+    sigma = np.std(effects, axis=0, ddof=1) if n_trajectories > 1 else np.zeros(k)
+    return effects.mean(axis=0), np.abs(effects).mean(axis=0), sigma
+
+
+def get_monte_carlo_input(name: str, scenario: run_scenario.Scenario) -> tuple:
+    """
+    This function gets the uncertain input of monte_carlo.get_discounted_tco_samples that a cost-only sensitivity \
+        input is equivalent to, so that samples of it can be evaluated as array operations on the yearly costs of \
+        one cost stage run. Fuel price scales are only equivalent if the scenario uses that fuel only.
+
+    Args:
+        name (str): sensitivity input name
+        scenario (run_scenario.Scenario): Scenario object of the selection
+
+    Returns:
+        mc_input (str): uncertain input of monte_carlo, None if the input needs the cost stage for every sample
+        scale (float): factor from the sensitivity input value to the uncertain input value
+    """
+    if name == "discount_rate_pct_per_yr":
+        return monte_carlo.DISCOUNT_RATE, 1.0
+    if name == "maint_oper_cost_dol_per_mi":
+        return monte_carlo.MAINT_COST_SCALE, 1.0
+    if name.startswith(breakeven.FUEL_PRICE_SCALE_PREFIX):
+        fuel = name[len(breakeven.FUEL_PRICE_SCALE_PREFIX) :]
+        # set_cost_param replaces the scale factor of the scenario
+        base_scale = scenario.fuel_price_scale_factors.get(fuel, 1)
+        if base_scale != 0 and all(
+            tcocalc.get_fuel_name(fuel_type) == fuel for fuel_type in scenario.fuel_type
+        ):
+            return monte_carlo.FUEL_PRICE_SCALE, 1 / base_scale
+    return None, None
+
+
+def get_disc_costs_vectorized(
+    vehicle: fastsim.vehicle.Vehicle,
+    scenario: run_scenario.Scenario,
+    mpgge: dict,
+    sim_drives: list,
+    mc_inputs: list,
+    X: np.ndarray,
+) -> np.ndarray:
+    """
+    This function evaluates discounted TCO for rows of cost-only input samples with one cost stage run, using the \
+        array TCO of monte_carlo.get_discounted_tco_samples over the yearly costs of that run
+
+    Args:
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object
+        scenario (run_scenario.Scenario): Scenario object at the base cost input values
+        mpgge (dict): Dictionary containing MPGGEs from fueleconomy.get_mpgge
+        sim_drives (list): FASTSim SimDrive objects from fueleconomy.get_mpgge
+        mc_inputs (list): (uncertain input, scale) of get_monte_carlo_input, one per column of X
+        X (np.ndarray): (n, k) array of cost-only input samples
+
+    Returns:
+        disc_costs (np.ndarray): discounted TCO of each row
+    """
+    scenario = copy.deepcopy(scenario)
+    tco = tco_analysis.get_tco_from_mpgge(vehicle, scenario, mpgge, sim_drives)
+    cost_basis = monte_carlo.get_cost_basis(
+        {
+            "discounted_costs_df": tco[4],
+            "veh_msrp_set": tco[6],
+            "veh_opp_cost_set": tco[9],
+            "scenario": scenario,
+        }
+    )
+    samples = monte_carlo.get_base_samples(cost_basis, len(X))
+    for i, (mc_input, scale) in enumerate(mc_inputs):
+        samples[mc_input] = X[:, i] * scale
+    return monte_carlo.get_discounted_tco_samples(cost_basis, samples)["disc_cost"]
+
+
+def evaluate_disc_cost(
+    sel: str, config: run_scenario.Config, input_names: list, X: np.ndarray
+) -> tuple:
+    """
+    This function evaluates discounted TCO of one selection for each row of X. Without physics inputs, all rows reuse \
+        the cached FASTSim results of breakeven.get_cost_stage_inputs; otherwise get_mpgge is re-run once per unique \
+        set of physics input values. If all cost inputs have an equivalent in get_monte_carlo_input, the rows of each \
+        set of physics input values are evaluated in one vectorized pass, otherwise the cost stage is re-run per row.
+
+    Args:
+        sel (str): selection number
+        config (run_scenario.Config): Config object
+        input_names (list): sensitivity input names, one per column of X
+        X (np.ndarray): (n, k) array of input samples
+
+    Returns:
+        disc_costs (np.ndarray): discounted TCO of each row
+        n_simulations (int): number of FASTSim runs
+    """
+    cost_stage_inputs = breakeven.get_cost_stage_inputs(sel, config)
+    physics_cols = [i for i, name in enumerate(input_names) if is_physics_input(name)]
+    cost_cols = [i for i, name in enumerate(input_names) if not is_physics_input(name)]
+    mc_inputs = [
+        get_monte_carlo_input(input_names[i], cost_stage_inputs["scenario"])
+        for i in cost_cols
+    ]
+    is_vectorized = all(mc_input is not None for mc_input, _ in mc_inputs)
+    physics_groups = {}
+    for row, x in enumerate(X):
+        physics_groups.setdefault(tuple(x[physics_cols]), []).append(row)
+    disc_costs = np.zeros(len(X))
+    for rows in physics_groups.values():
+        x = X[rows[0]]
+        if physics_cols:
+            vehicle = copy.deepcopy(cost_stage_inputs["vehicle"])
+            base_scenario = copy.deepcopy(cost_stage_inputs["scenario"])
+            for i in physics_cols:
+                set_sensitivity_input(vehicle, base_scenario, input_names[i], x[i])
+            vehicle.set_derived()
+            vehicle.set_veh_mass()
+            mpgge, sim_drives = fueleconomy.get_mpgge(
+                cost_stage_inputs["range_cyc"], vehicle, base_scenario
+            )
+        else:
+            vehicle, base_scenario, mpgge, sim_drives = (
+                cost_stage_inputs["vehicle"],
+                cost_stage_inputs["scenario"],
+                cost_stage_inputs["mpgge"],
+                cost_stage_inputs["sim_drives"],
+            )
+        if is_vectorized:
+            disc_costs[rows] = get_disc_costs_vectorized(
+                vehicle,
+                base_scenario,
+                mpgge,
+                sim_drives,
+                mc_inputs,
+                X[np.ix_(rows, cost_cols)],
+            )
+            continue
+        for row in rows:
+            scenario = copy.deepcopy(base_scenario)
+            for i in cost_cols:
+                set_sensitivity_input(vehicle, scenario, input_names[i], X[row, i])
+            disc_costs[row] = tco_analysis.get_tco_from_mpgge(
+                vehicle, scenario, mpgge, sim_drives
+            )[1]
+    n_simulations = len(physics_groups) if physics_cols else 0
+    return disc_costs, n_simulations
+
+
+def evaluate_samples(
+    sel: str,
+    config: run_scenario.Config,
+    input_names: list,
+    X: np.ndarray,
+    n_processors: int = 1,
+) -> tuple:
+    """
+    This function evaluates discounted TCO for all samples, in parallel if n_processors > 1. Rows are grouped by \
+        their physics input values so each FASTSim run is done by one process only.
+
+    Args:
+        sel (str): selection number
+        config (run_scenario.Config): Config object
+        input_names (list): sensitivity input names, one per column of X
+        X (np.ndarray): (n, k) array of input samples
+        n_processors (int, optional): number of processes. Defaults to 1.
+
+    Returns:
+        disc_costs (np.ndarray): discounted TCO of each row
+        n_simulations (int): number of FASTSim runs
+    """
+    if n_processors <= 1:
+        return evaluate_disc_cost(sel, config, input_names, X)
+
+    physics_cols = [i for i, name in enumerate(input_names) if is_physics_input(name)]
+    if physics_cols:
+        _, group = np.unique(X[:, physics_cols], axis=0, return_inverse=True)
+        group = group.ravel() % n_processors
+    else:
+        group = np.arange(len(X)) % n_processors
+    rows = [np.flatnonzero(group == p) for p in range(n_processors)]
+    rows = [r for r in rows if len(r)]
+    with Pool(processes=n_processors) as pool:
+        results = pool.starmap(
+            evaluate_disc_cost, [(sel, config, input_names, X[r]) for r in rows]
+        )
+    disc_costs = np.zeros(len(X))
+    for r, (chunk_disc_costs, _) in zip(rows, results):
+        disc_costs[r] = chunk_disc_costs
+    return disc_costs, sum(n for _, n in results)
+
+
+def run_sensitivity(
+    sel: str,
+    config: run_scenario.Config,
+    input_bounds: dict,
+    method: str = "sobol",
+    n_samples: int = 64,
+    n_levels: int = 4,
+    n_processors: int = 1,
+    seed: int = None,
+) -> tuple:
+    """
+    This function runs a Sobol or Morris sensitivity analysis of discounted TCO for one selection
+
+    Args:
+        sel (str): selection number
+        config (run_scenario.Config): Config object
+        input_bounds (dict): Dictionary of {input name: (lower, upper)}, see set_sensitivity_input for input names
+        method (str, optional): 'sobol' or 'morris'. Defaults to "sobol".
+        n_samples (int, optional): Sobol base samples N or Morris trajectories r. Defaults to 64.
+        n_levels (int, optional): Morris grid levels. Defaults to 4.
+        n_processors (int, optional): number of processes. Defaults to 1.
+        seed (int, optional): random seed. Defaults to None.
+
+    Raises:
+        Exception: Invalid method
+
+    Returns:
+        indices_df (pd.DataFrame): Dataframe of sensitivity indices per input
+        stats (dict): Dictionary of runtime statistics
+    """
+    ti = time.time()
+    input_names = list(input_bounds.keys())
+    bounds = np.array([input_bounds[name] for name in input_names], dtype=float)
+    k = len(input_names)
+
+    if method == "sobol":
+        X = get_saltelli_samples(bounds, n_samples, seed=seed)
+    elif method == "morris":
+        X = get_morris_samples(bounds, n_samples, n_levels=n_levels, seed=seed)
+    else:
+        raise Exception(f"Invalid method {method}, choose from {METHODS}")
+
+    Y, n_simulations = evaluate_samples(sel, config, input_names, X, n_processors)
+
+    indices_df = pd.DataFrame({"selection": sel, "input": input_names})
+    if method == "sobol":
+        indices_df["S1"], indices_df["ST"] = get_sobol_indices(Y, n_samples, k)
+        indices_df = indices_df.sort_values("ST", ascending=False)
+    else:
+        indices_df["mu"], indices_df["mu_star"], indices_df["sigma"] = (
+            get_morris_indices(X, Y, n_samples, bounds)
+        )
+        indices_df = indices_df.sort_values("mu_star", ascending=False)
+
+    run_time = time.time() - ti
+    stats = {
+        "selection": sel,
+        "method": method,
+        "n_inputs": k,
+        "n_evaluations": len(X),
+        "n_simulations": n_simulations,
+        "disc_cost_mean": Y.mean(),
+        "disc_cost_std": Y.std(),
+        "run_time_[s]": run_time,
+        "evaluations_per_s": len(X) / run_time,
+    }
+    return indices_df.reset_index(drop=True), stats
+
+
+def run_sensitivity_selections(
+    selections: list,
+    config: run_scenario.Config,
+    input_bounds: dict,
+    out_file: str | Path = None,
+    **kwargs,
+) -> tuple:
+    """
+    This function runs run_sensitivity for each selection and optionally saves indices and runtime statistics
+
+    Args:
+        selections (list): list of selection numbers
+        config (run_scenario.Config): Config object
+        input_bounds (dict): Dictionary of {input name: (lower, upper)}
+        out_file (str | Path, optional): if provided, indices are saved to this CSV file and runtime statistics \
+            to '<out_file stem>_stats.csv'. Defaults to None.
+
+    Returns:
+        indices_df (pd.DataFrame): Dataframe of sensitivity indices of all selections
+        stats_df (pd.DataFrame): Dataframe of runtime statistics of all selections
+    """
+    indices_dfs = []
+    stats = []
+    for sel in selections:
+        logger.info("Running sensitivity analysis for selection %s", sel)
+        sel_indices_df, sel_stats = run_sensitivity(sel, config, input_bounds, **kwargs)
+        indices_dfs.append(sel_indices_df)
+        stats.append(sel_stats)
+    indices_df = pd.concat(indices_dfs, ignore_index=True)
+    stats_df = pd.DataFrame(stats)
+
+    if out_file is not None:
+        out_file = Path(out_file)
+        out_file.parent.mkdir(parents=True, exist_ok=True)
+        indices_df.to_csv(out_file, index=False)
+        stats_df.to_csv(
+            out_file.with_name(out_file.stem + "_stats.csv"), index=False
+        )
+    return indices_df, stats_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        prog="SENSITIVITY",
+        description="""Ranks the Scenario and vehicle inputs that drive discounted TCO using Sobol or Morris sensitivity analysis""",
+    )
+    parser.add_argument(
+        "--config",
+        default=gl.SWEEP_PATH.parents[0] / "resources/T3COConfig.csv",
+        type=str,
+        help="Input Config file",
+    )
+    parser.add_argument(
+        "--analysis-id",
+        default=0,
+        type=int,
+        help="Analysis key from input Config file - 'config.analysis_id'",
+    )
+    parser.add_argument(
+        "--inputs",
+        required=True,
+        type=str,
+        help="""Dictionary of input bounds. Ex: --inputs "{'discount_rate_pct_per_yr': (0.02, 0.07), 'vmt': (0.8, 1.2), 'vehicle:glider_kg': (9000, 13000)}" """,
+    )
+    parser.add_argument(
+        "--method", default="sobol", type=str, choices=METHODS, help="Method"
+    )
+    parser.add_argument(
+        "--n-samples",
+        default=64,
+        type=int,
+        help="Sobol base samples or Morris trajectories",
+    )
+    parser.add_argument(
+        "--n-levels", default=4, type=int, help="Morris grid levels"
+    )
+    parser.add_argument(
+        "--n-processors", default=1, type=int, help="Number of processes"
+    )
+    parser.add_argument("--seed", default=None, type=int, help="Random seed")
+    parser.add_argument(
+        "--out", default="sensitivity.csv", type=str, help="Output CSV file"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    config = run_scenario.load_config(args.config, args.analysis_id)
+    indices_df, stats_df = run_sensitivity_selections(
+        config.selections,
+        config,
+        ast.literal_eval(args.inputs),
+        out_file=args.out,
+        method=args.method,
+        n_samples=args.n_samples,
+        n_levels=args.n_levels,
+        n_processors=args.n_processors,
+        seed=args.seed,
+    )
+    logger.info("sensitivity indices:\n%s", indices_df)
+    logger.info("run statistics:\n%s", stats_df)
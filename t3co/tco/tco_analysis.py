@@ -5,6 +5,7 @@ import fastsim
 import pandas as pd
 from t3co.objectives import fueleconomy
 from t3co.run import Global as gl, run_scenario
+from t3co.run import analysis_context
 from t3co.tco import tco_stock_emissions
 from t3co.tco import tcocalc as tcocalc
 
@@ -149,9 +150,14 @@ def calc_discountedTCO(
                 for i in range(scenario.vehicle_life_yr)
             ]
         )
-        avg_speed_mph = (
-            sum(sim_drive.cyc.mps) / max(sim_drive.cyc.time_s) * gl.mps_to_mph
-        )
+        if scenario.design_cycle_stats and not scenario.missed_trace_correction:
+            # the last design cycle is the cycle of sim_drives[-1], see get_tco_from_mpgge
+            avg_speed_mph = scenario.design_cycle_stats[-1]["avg_speed_mph"]
+        else:
+            # time-dilated cycle, or a cycle not loaded by run_scenario.get_scenario_and_cycle
+            avg_speed_mph = (
+                sum(sim_drive.cyc.mps) / max(sim_drive.cyc.time_s) * gl.mps_to_mph
+            )
         downtime_efficiency = 1 / (1 + avg_speed_mph * disc_downtime_sum / disc_VMT_sum)
         # print(f'downtime_efficiency = {downtime_efficiency}')
         discounted_tco_dol = payloadmultiplier * (
@@ -181,6 +187,8 @@ def get_tco_of_vehicle(
     range_cyc: fastsim.cycle.Cycle,
     scenario: run_scenario.Scenario,
     write_tsv: bool = False,
+    veh_cost_set: dict = None,
+    context: analysis_context.AnalysisContext = None,
 ) -> Tuple[
     float,
     float,
@@ -205,6 +213,8 @@ def get_tco_of_vehicle(
         range_cyc (fastsim.cycle.Cycle): FASTSim range cycle object
         scenario (run_scenario.Scenario): Scenario object for current selection
         write_tsv (bool, optional): if True, save intermediate files as TSV. Defaults to False.
+        veh_cost_set (dict, optional): precalculated MSRP breakdown, see get_tco_from_mpgge. Defaults to None.
+        context (analysis_context.AnalysisContext, optional): analysis context. Defaults to None, analysis_context.DEFAULT_CONTEXT.
 
     Returns:
         tot_cost_dol (float): TCO in dollars
@@ -221,9 +231,72 @@ def get_tco_of_vehicle(
     """
 
     mpgge, sim_drives = fueleconomy.get_mpgge(range_cyc, vehicle, scenario)
+
+    return get_tco_from_mpgge(
+        vehicle,
+        scenario,
+        mpgge,
+        sim_drives,
+        write_tsv=write_tsv,
+        veh_cost_set=veh_cost_set,
+        context=context,
+    )
+
+
+def get_tco_from_mpgge(
+    vehicle: fastsim.vehicle.Vehicle,
+    scenario: run_scenario.Scenario,
+    mpgge: dict,
+    sim_drives: list,
+    write_tsv: bool = False,
+    veh_cost_set: dict = None,
+    context: analysis_context.AnalysisContext = None,
+) -> Tuple[
+    float,
+    float,
+    dict,
+    pd.DataFrame,
+    pd.DataFrame,
+    dict,
+    dict,
+    fastsim.simdrive.SimDrive,
+    dict,
+    dict,
+    dict,
+]:
+    """
+    This function runs the cost stage of get_tco_of_vehicle from the simulated mpgge of a vehicle, without running FASTSim. \
+        It can be called repeatedly for cost-only changes to the scenario, e.g. fuel prices or component costs.
+
+    Args:
+        vehicle (fastsim.vehicle.Vehicle): FASTSim vehicle object of selected vehicle
+        scenario (run_scenario.Scenario): Scenario object for current selection
+        mpgge (dict): Dictionary containing MPGGEs from fueleconomy.get_mpgge
+        sim_drives (list): FASTSim SimDrive objects for design drivecycle from fueleconomy.get_mpgge
+        write_tsv (bool, optional): if True, save intermediate files as TSV. Defaults to False.
+        veh_cost_set (dict, optional): MSRP breakdown precalculated for many designs by \
+            tcocalc.calculate_dollar_cost_batch, calculated with tcocalc.calculate_dollar_cost if None. Defaults to None.
+        context (analysis_context.AnalysisContext, optional): analysis context. Defaults to None, analysis_context.DEFAULT_CONTEXT.
+
+    Returns:
+        tot_cost_dol (float): TCO in dollars
+        discounted_tco_dol (float): discounted TCO in dollars
+        oppy_cost_set (dict): Dictionary of opportunity cost breakdown
+        ownership_costs_df (pd.DataFrame): Ownerhip Costs dataframe containing different categories per year
+        discounted_costs_df (pd.DataFrame): discounted Ownerhip Costs dataframe containing different categories per year
+        mpgge (dict): Dictionary containing MPGGEs
+        veh_cost_set (dict): Dictionary containing MSRP breakdown
+        design_cycle_sdr (fastsim.simdrive.SimDrive): FASTSim SimDrive object for design drivecycle
+        veh_oper_cost_set (dict): Dictionary containing operating costs breakdown
+        veh_opp_cost_set (dict): Dictionary containing opportunity costs breakdown
+        tco_files (dict): Dictionary containing TCO intermediate dataframes
+    """
+    if context is None:
+        context = analysis_context.DEFAULT_CONTEXT
     range_dict = fueleconomy.get_range_mi(mpgge, vehicle, scenario)
     veh_opp_cost_set = tcocalc.calculate_opp_costs(vehicle, scenario, range_dict)
-    veh_cost_set = tcocalc.calculate_dollar_cost(vehicle, scenario)
+    if veh_cost_set is None:
+        veh_cost_set = tcocalc.calculate_dollar_cost(vehicle, scenario)
     veh_eff_df = tcocalc.fill_fuel_eff_file(vehicle, scenario, mpgge)
     veh_exp_df = tcocalc.fill_veh_expense_file(scenario, veh_cost_set)
     veh_spt_df = tcocalc.fill_fuel_split_tsv(vehicle, scenario, mpgge)
@@ -257,7 +330,8 @@ def get_tco_of_vehicle(
         veh_insurance_df,
         veh_residual_df,
         veh_downtime_labor_df,
-        write_files=gl.write_files,
+        write_files=context.write_files,
+        tco_intermediates=context.tco_intermediates,
     )
 
     # discountRate = float(scenario.discount_rate_pct_per_yr)
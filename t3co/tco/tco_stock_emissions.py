@@ -1,8 +1,7 @@
+from pathlib import Path
 from typing import Tuple
 import pandas as pd
 
-from t3co.run import Global as gl
-
 
 def dropCols(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -35,6 +34,7 @@ def stockModel(
     residualCosts: pd.DataFrame = None,
     downtimeCosts: pd.DataFrame = None,
     write_files: bool = False,
+    tco_intermediates: Path = None,
 ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     This function generates the ownershipCosts dataframe from the dataframes for each cost category
@@ -54,6 +54,7 @@ def stockModel(
         residualCosts (pd.DataFrame, optional): Dataframe of yearly residual costs [dol]. Defaults to None.
         downtimeCosts (pd.DataFrame, optional): Dataframe of yearly downtime costs [dol]. Defaults to None.
         write_files (bool, optional): if True, save vehicleCosts, travelCosts, fuelCosts, insuranceCosts,residualCosts, downtimeCosts . Defaults to False.
+        tco_intermediates (Path, optional): directory of the saved files, see analysis_context.AnalysisContext. Defaults to None.
 
     Returns:
         stock (pd.DataFrame): Dataframe of stock model of vehicles in the market
@@ -170,12 +171,12 @@ def stockModel(
     downtimeCosts = downtimeCosts.drop(["Cost [$/Yr]"], axis=1)
 
     if write_files:
-        vehicleCosts.to_csv(gl.TCO_INTERMEDIATES / "vehicle_costs.csv", index=False)
-        travelCosts.to_csv(gl.TCO_INTERMEDIATES / "travel_costs.csv", index=False)
-        fuelCosts.to_csv(gl.TCO_INTERMEDIATES / "fuel_costs.csv", index=False)
-        insuranceCosts.to_csv(gl.TCO_INTERMEDIATES / "insurance_costs.csv", index=False)
-        residualCosts.to_csv(gl.TCO_INTERMEDIATES / "residual_costs.csv", index=False)
-        downtimeCosts.to_csv(gl.TCO_INTERMEDIATES / "downtime_costs.csv", index=False)
+        vehicleCosts.to_csv(tco_intermediates / "vehicle_costs.csv", index=False)
+        travelCosts.to_csv(tco_intermediates / "travel_costs.csv", index=False)
+        fuelCosts.to_csv(tco_intermediates / "fuel_costs.csv", index=False)
+        insuranceCosts.to_csv(tco_intermediates / "insurance_costs.csv", index=False)
+        residualCosts.to_csv(tco_intermediates / "residual_costs.csv", index=False)
+        downtimeCosts.to_csv(tco_intermediates / "downtime_costs.csv", index=False)
 
     ownershipCosts = pd.concat(
         [
@@ -6,14 +6,35 @@ import pandas as pd
 from t3co.run import Global as gl
 from t3co.run import run_scenario
 from t3co.tco import opportunity_cost
+from t3co.utilities import file_keys
 import fastsim
 
+# price and residual value tables, keyed by file_keys.get_file_key of the table file
+PRICE_TABLE_CACHE = {}
+
 # keeping this for when we do Emissions work
 # with open(gl.TCO_INTERMEDIATES / gl.EMISSION_RATE_TSV, 'w', newline='') as er_file:
 #         writer = csv.writer(er_file, delimiter='\t')
 #         writer.writerow(["Vehicle", "Model Year", "Fuel", "Age [yr]", "Region", "Pollutant", "Emission Rate [g/gge]", "Vocation" ])
 
 
+def get_price_table(table_file: str) -> pd.DataFrame:
+    """
+    This helper method reads a price or residual value table. Each table file is read once per process, and again \
+        if it is modified. Callers must not modify the returned dataframe.
+
+    Args:
+        table_file (str): price or residual value table CSV file path
+
+    Returns:
+        table_df (pd.DataFrame): table dataframe
+    """
+    file_key = file_keys.get_file_key(table_file)
+    if file_key not in PRICE_TABLE_CACHE:
+        PRICE_TABLE_CACHE[file_key] = pd.read_csv(table_file)
+    return PRICE_TABLE_CACHE[file_key]
+
+
 def find_residual_rates(
     vehicle: fastsim.vehicle.Vehicle, scenario: run_scenario.Scenario
 ) -> float:  # finds residual rate at end of vehicle life
@@ -27,7 +48,7 @@ def find_residual_rates(
     Returns:
         residual_rates (float): Residual rate as percentage of MSRP
     """
-    residual_rates_all = pd.read_csv(gl.RESIDUAL_VALUE_PER_YEAR)
+    residual_rates_all = get_price_table(gl.RESIDUAL_VALUE_PER_YEAR)
     vehicle_class = scenario.vehicle_class
     powertrain_type = vehicle.veh_pt_type.lower()
     year = str(scenario.vehicle_life_yr)
@@ -191,6 +212,168 @@ def calculate_dollar_cost(
     return cost_set
 
 
+def calculate_dollar_cost_batch(
+    scenario: run_scenario.Scenario,
+    veh_pt_type: np.ndarray,
+    fc_max_kw: np.ndarray,
+    fs_kwh: np.ndarray,
+    mc_max_kw: np.ndarray,
+    ess_max_kwh: np.ndarray,
+    fc_eff_type: np.ndarray = None,
+    vehicle_glider_cost_dol: np.ndarray = None,
+    fc_ice_cost_dol_per_kw: np.ndarray = None,
+) -> dict:
+    """
+    This helper method calculates the MSRP breakdown of many designs of one scenario as array operations, with the \
+        same branches and arithmetic as calculate_dollar_cost so results are identical. Inputs are broadcast \
+        against each other.
+
+    Args:
+        scenario (run_scenario.Scenario): Scenario object of current selection
+        veh_pt_type (np.ndarray): Array of vehicle powertrain types - gl.CONV, gl.HEV, gl.PHEV, or gl.BEV
+        fc_max_kw (np.ndarray): Array of fuel converter max power [kW]
+        fs_kwh (np.ndarray): Array of fuel storage energy [kWh]
+        mc_max_kw (np.ndarray): Array of motor max power [kW]
+        ess_max_kwh (np.ndarray): Array of battery energy [kWh]
+        fc_eff_type (np.ndarray, optional): Array of fuel converter efficiency types. Defaults to None.
+        vehicle_glider_cost_dol (np.ndarray, optional): Array of glider costs, scenario.vehicle_glider_cost_dol if None. Defaults to None.
+        fc_ice_cost_dol_per_kw (np.ndarray, optional): Array of engine costs per kW, scenario.fc_ice_cost_dol_per_kw if None. Defaults to None.
+
+    Returns:
+        cost_set (dict): Dictionary containing arrays of the MSRP breakdown, with the keys of calculate_dollar_cost
+    """
+    if vehicle_glider_cost_dol is None:
+        vehicle_glider_cost_dol = scenario.vehicle_glider_cost_dol
+    if fc_ice_cost_dol_per_kw is None:
+        fc_ice_cost_dol_per_kw = scenario.fc_ice_cost_dol_per_kw
+    (
+        fc_max_kw,
+        fs_kwh,
+        mc_max_kw,
+        ess_max_kwh,
+        vehicle_glider_cost_dol,
+        fc_ice_cost_dol_per_kw,
+    ) = np.broadcast_arrays(
+        *(
+            np.asarray(values, dtype=float)
+            for values in [
+                fc_max_kw,
+                fs_kwh,
+                mc_max_kw,
+                ess_max_kwh,
+                vehicle_glider_cost_dol,
+                fc_ice_cost_dol_per_kw,
+            ]
+        )
+    )
+    veh_pt_type = np.broadcast_to(
+        np.asarray(veh_pt_type, dtype=object), fc_max_kw.shape
+    )
+    fc_eff_type = np.broadcast_to(
+        np.asarray(fc_eff_type, dtype=object), fc_max_kw.shape
+    )
+    assert np.isin(
+        veh_pt_type, [gl.CONV, gl.HEV, gl.PHEV, gl.BEV]
+    ).all(), f"veh_pt_type must be one of {[gl.CONV, gl.HEV, gl.PHEV, gl.BEV]}"
+    is_conv = veh_pt_type == gl.CONV
+    is_hev = veh_pt_type == gl.HEV
+    is_phev = veh_pt_type == gl.PHEV
+    is_bev = veh_pt_type == gl.BEV
+    markup_pct = scenario.markup_pct
+
+    # fcPrice, branch costs are only evaluated if a design takes the branch
+    fcPrice = (fc_ice_cost_dol_per_kw * fc_max_kw) + scenario.fc_ice_base_cost_dol
+    is_cng_fc = fc_eff_type == 9
+    if is_cng_fc.any():
+        fcPrice = np.where(
+            is_cng_fc,
+            (scenario.fc_cng_ice_cost_dol_per_kw * fc_max_kw)
+            + scenario.fc_ice_base_cost_dol,
+            fcPrice,
+        )
+    is_h2fc = fc_eff_type == "H2FC"
+    if is_h2fc.any():
+        fcPrice = np.where(
+            is_h2fc, scenario.fc_fuelcell_cost_dol_per_kw * fc_max_kw, fcPrice
+        )
+    fcPrice = np.where(is_bev | (fc_max_kw == 0), 0, fcPrice) * markup_pct
+
+    # fuelStorPrice
+    if scenario.fuel_type[0] == "cng":
+        fuelStorPrice = scenario.fs_cng_cost_dol_per_kwh * fs_kwh
+    else:
+        fuelStorPrice = scenario.fs_cost_dol_per_kwh * fs_kwh
+    if scenario.fuel_type[0] == "hydrogen" and is_hev.any():
+        fuelStorPrice = np.where(
+            is_hev, scenario.fs_h2_cost_dol_per_kwh * fs_kwh, fuelStorPrice
+        )
+    fuelStorPrice = np.where(is_bev, 0, fuelStorPrice) * markup_pct
+
+    # mcPrice, markup_pct is not applied, as in calculate_dollar_cost
+    mcPrice = np.where(
+        mc_max_kw == 0,
+        0,
+        scenario.pe_mc_base_cost_dol + (scenario.pe_mc_cost_dol_per_kw * mc_max_kw),
+    )
+
+    essPrice = (
+        np.where(
+            ess_max_kwh == 0,
+            0,
+            scenario.ess_base_cost_dol + (scenario.ess_cost_dol_per_kwh * ess_max_kwh),
+        )
+        * markup_pct
+    )
+
+    plugPrice = np.where(is_phev | is_bev, scenario.plug_base_cost_dol, 0) * markup_pct
+
+    msrp = np.select(
+        [is_conv, is_hev, is_phev],
+        [
+            vehicle_glider_cost_dol + fuelStorPrice + fcPrice,
+            vehicle_glider_cost_dol + fuelStorPrice + fcPrice + mcPrice + essPrice,
+            vehicle_glider_cost_dol
+            + fuelStorPrice
+            + fcPrice
+            + mcPrice
+            + essPrice
+            + plugPrice,
+        ],
+        vehicle_glider_cost_dol + mcPrice + essPrice + plugPrice,
+    )
+
+    return {
+        "Glider": vehicle_glider_cost_dol,
+        "Fuel converter": fcPrice,
+        "Fuel Storage": fuelStorPrice,
+        "Motor & power electronics": mcPrice,
+        "Plug": plugPrice,
+        "Battery": essPrice,
+        "Battery replacement": np.zeros(fc_max_kw.shape),
+        "Purchase tax": scenario.tax_rate_pct * msrp,
+        "msrp": msrp,
+    }
+
+
+def get_cost_set(cost_sets: dict, i: int) -> dict:
+    """
+    This helper method gets the MSRP breakdown of one design from calculate_dollar_cost_batch results
+
+    Args:
+        cost_sets (dict): Dictionary containing arrays of the MSRP breakdown from calculate_dollar_cost_batch
+        i (int): design index
+
+    Returns:
+        cost_set (dict): Dictionary containing MSRP breakdown, like calculate_dollar_cost
+    """
+    cost_set = {key: float(values[i]) for key, values in cost_sets.items()}
+    # calculate_dollar_cost returns zero costs without markup_pct applied as int 0
+    for key in ["Motor & power electronics", "Battery replacement"]:
+        if cost_set[key] == 0:
+            cost_set[key] = 0
+    return cost_set
+
+
 def calculate_opp_costs(
     vehicle: fastsim.vehicle.Vehicle, scenario: run_scenario.Scenario, range_dict: dict
 ) -> dict:
@@ -485,6 +668,35 @@ def fill_market_share_tsv(
     return df
 
 
+def get_fuel_name(fuel_type: str) -> str:
+    """
+    This helper method gets the fuel of the fuel price table of a scenario fuel_type, e.g. diesel for cd_diesel
+
+    Args:
+        fuel_type (str): fuel type of scenario.fuel_type
+
+    Raises:
+        Exception: Invalid fuel_type type
+
+    Returns:
+        fuel_name (str): diesel, gasoline, electricity, cng, or hydrogen, as in scenario.fuel_price_scale_factors
+    """
+    # TODO, may want to be more explicit than just finding substrings
+    if "diesel" in fuel_type.lower() and "bio" not in fuel_type.lower():
+        return "diesel"
+    elif "gasoline" in fuel_type.lower():
+        return "gasoline"
+    elif "electricity" in fuel_type.lower():
+        return "electricity"
+    elif fuel_type.lower() == "cng":
+        return "cng"
+    elif fuel_type.lower() == "hydrogen":
+        return "hydrogen"
+    raise Exception(
+        f"TCO fuel calc: fill_fuel_expense_tsv:: unknown fuel type {fuel_type}"
+    )
+
+
 def fill_fuel_expense_tsv(
     vehicle: fastsim.vehicle.Vehicle, scenario: run_scenario.Scenario
 ) -> pd.DataFrame:
@@ -528,7 +740,7 @@ def fill_fuel_expense_tsv(
     cat = "Fuel"
     columns = ["Year", "Fuel", "Category", "Cost [$/gge]"]
     data = []
-    regdf = pd.read_csv(gl.REGIONAL_FUEL_PRICES_BY_TYPE_BY_YEAR)
+    regdf = get_price_table(gl.REGIONAL_FUEL_PRICES_BY_TYPE_BY_YEAR)
     regdf = regdf.set_index("Fuel")
     for fuel_type in fuels:
         # cat = fuel_type
@@ -537,27 +749,25 @@ def fill_fuel_expense_tsv(
         ):
             regdf = regdf[regdf["Region"] == scenario.region]
             # all costs are converted to $ per gallon gasoline equivalent
-            # TODO, may want to be more explicit than just finding substrings
-            if "diesel" in fuel_type.lower() and "bio" not in fuel_type.lower():
+            fuel_name = get_fuel_name(fuel_type)
+            if fuel_name == "diesel":
                 dieselDolPerGal = regdf.loc["dieselDolPerGal", str(yr)]
                 Dslgge = 1 * (33.7 / 37.95)
                 cost = dieselDolPerGal * Dslgge
-            elif "gasoline" in fuel_type.lower():
+            elif fuel_name == "gasoline":
                 gasolineDolPerGal = regdf.loc["gasolineDolPerGal", str(yr)]
                 cost = gasolineDolPerGal
-            elif "electricity" in fuel_type.lower():
+            elif fuel_name == "electricity":
                 dolPerKwh = regdf.loc["dolPerKwh", str(yr)]
                 cost = dolPerKwh * 33.7  # 33.41 kwh per gallon of gasoline
-            elif fuel_type.lower() == "cng":
+            elif fuel_name == "cng":
                 CNGDolPerGge = regdf.loc["CNGDolPerGge", str(yr)]
                 cost = CNGDolPerGge
-            elif fuel_type.lower() == "hydrogen":
+            else:
                 hydrogenDolPerGGE = regdf.loc["hydrogenDolPerGGE", str(yr)]
                 cost = hydrogenDolPerGGE
-            else:
-                raise Exception(
-                    f"TCO fuel calc: fill_fuel_expense_tsv:: unknown fuel type {fuel_type}"
-                )
+            # scenario multiplier on the fuel price series, e.g. for breakeven and sensitivity analyses
+            cost *= scenario.fuel_price_scale_factors.get(fuel_name, 1)
             data.append([yr, fuel_type, cat, cost])
 
     df = pd.DataFrame(data, columns=columns)
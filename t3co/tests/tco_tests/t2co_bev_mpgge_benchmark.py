@@ -181,7 +181,6 @@ from t3co import Global as gl
 veh_no = 4  #
 vocation = "EV 2025 tech,  750 mi range"
 
-gl.vocation_scenario = vocation
 
 
 def benchmark_vehicles():
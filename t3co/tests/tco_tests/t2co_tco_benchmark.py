@@ -172,7 +172,6 @@ t2vehicle = ast.literal_eval(t2vehicle)
 veh_no = 1  #
 vocation = "Conv 2020 tech, 500 mi range"
 
-gl.vocation_scenario = vocation
 # gl.FASTSIM_INPUTS = gl.T2COBENCHMARKDATADIR / 't3cobenchmarkFASTSimInputs.csv'
 # gl.OTHER_INPUTS = gl.T2COBENCHMARKDATADIR / 't3cobenchmarkOtherInputs.csv'
 
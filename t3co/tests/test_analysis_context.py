@@ -0,0 +1,70 @@
+"""
+Module for testing analysis_context. Contexts must not be modifiable, must create their output directories once,
+and selections run concurrently with different contexts must match the selections run one at a time.
+"""
+
+import dataclasses
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from t3co.run import Global as gl
+from t3co.run import analysis_context, run_scenario
+from t3co.tco import tco_analysis
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+# Conv, BEV, and HEV selections of the demo inputs
+SELECTIONS = [1, 34, 64]
+
+
+class TestAnalysisContext(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.resources_dir = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def get_tco(self, sel: int, context: analysis_context.AnalysisContext) -> float:
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        vehicle = run_scenario.get_vehicle(sel, config.vehicle_file)
+        scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+            sel, config.scenario_file, a_vehicle=vehicle, config=config
+        )
+        return tco_analysis.get_tco_of_vehicle(
+            vehicle, range_cyc, scenario, context=context
+        )[1]
+
+    def test_context_is_immutable(self):
+        context = analysis_context.create_analysis_context(
+            "vocation", resources_dir=self.resources_dir
+        )
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            context.write_files = True
+        for dir_path in [
+            context.tco_intermediates,
+            context.tco_results,
+            context.tco_res_figs,
+        ]:
+            self.assertTrue(dir_path.is_dir())
+            self.assertIn(dir_path, analysis_context.CREATED_DIRS)
+
+    def test_concurrent_selections(self):
+        contexts = [
+            analysis_context.create_analysis_context(
+                f"vocation {sel}", write_files=True, resources_dir=self.resources_dir
+            )
+            for sel in SELECTIONS
+        ]
+        serial_tcos = [self.get_tco(sel, None) for sel in SELECTIONS]
+        with ThreadPoolExecutor(max_workers=len(SELECTIONS)) as executor:
+            concurrent_tcos = list(executor.map(self.get_tco, SELECTIONS, contexts))
+        self.assertEqual(concurrent_tcos, serial_tcos)
+        for context in contexts:
+            self.assertTrue((context.tco_intermediates / "fuel_costs.csv").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
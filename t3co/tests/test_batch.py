@@ -0,0 +1,109 @@
+"""
+Module for testing the batch evaluation API. Selections evaluated from input dataframes and in-memory drive cycles,
+in this process or in worker processes, must match the selections evaluated from the input files.
+"""
+
+import unittest
+
+import pandas as pd
+
+import t3co
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+# Conv and BEV selections of the demo inputs
+SELECTIONS = [1, 34]
+
+# drive cycles of the demo selections
+CYCLE_NAMES = [
+    "EPA_Ph2_rural_interstate_65mph.csv",
+    "EPA_Ph2_urban_highway_55mph.csv",
+    "EPA_Ph2_transient.csv",
+]
+
+
+class TestBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = run_scenario.load_config(CONFIG_FILE, 0)
+        cls.vehicles_df = pd.read_csv(cls.config.vehicle_file)
+        cls.scenarios_df = pd.read_csv(cls.config.scenario_file)
+        cls.file_tcos = []
+        for sel in SELECTIONS:
+            vehicle = run_scenario.get_vehicle(sel, cls.config.vehicle_file)
+            scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+                sel, cls.config.scenario_file, a_vehicle=vehicle, config=cls.config
+            )
+            cls.file_tcos.append(
+                run_scenario.vehicle_scenario_sweep(vehicle, scenario, range_cyc)[
+                    "disc_cost"
+                ]
+            )
+
+    def evaluate_batch(self, **kwargs) -> pd.DataFrame:
+        return t3co.evaluate_batch(
+            self.vehicles_df,
+            self.scenarios_df,
+            selections=SELECTIONS,
+            config=self.config,
+            **kwargs,
+        )
+
+    def test_matches_input_files(self):
+        results_df = self.evaluate_batch()
+        self.assertEqual(results_df["selection"].tolist(), SELECTIONS)
+        self.assertTrue(results_df["error"].isna().all())
+        self.assertEqual(results_df["discounted_tco_dol"].tolist(), self.file_tcos)
+        self.assertEqual(results_df["veh_pt_type"].tolist(), ["Conv", "BEV"])
+
+    def test_in_memory_cycles(self):
+        cycles = {
+            name: pd.read_csv(gl.OPTIMIZATION_DRIVE_CYCLES / name)
+            for name in CYCLE_NAMES
+        }
+        results_df = self.evaluate_batch(cycles=cycles)
+        self.assertEqual(results_df["discounted_tco_dol"].tolist(), self.file_tcos)
+
+        slow_cycle = cycles["EPA_Ph2_rural_interstate_65mph.csv"].copy()
+        slow_cycle["cycMps"] *= 0.8
+        slow_cycles = {**cycles, "EPA_Ph2_rural_interstate_65mph.csv": slow_cycle}
+        slow_results_df = self.evaluate_batch(cycles=slow_cycles)
+        self.assertNotEqual(
+            slow_results_df["discounted_tco_dol"].tolist(), self.file_tcos
+        )
+
+    def test_worker_processes(self):
+        results_df = self.evaluate_batch(n_workers=2)
+        self.assertEqual(results_df["discounted_tco_dol"].tolist(), self.file_tcos)
+
+        cycles = {
+            name: pd.read_csv(gl.OPTIMIZATION_DRIVE_CYCLES / name)
+            for name in CYCLE_NAMES
+        }
+        results_df = self.evaluate_batch(cycles=cycles, n_workers=2)
+        self.assertTrue(results_df["error"].isna().all())
+        self.assertEqual(results_df["discounted_tco_dol"].tolist(), self.file_tcos)
+
+    def test_selection_errors(self):
+        results_df = t3co.evaluate_batch(
+            self.vehicles_df.set_index("selection"),
+            self.scenarios_df,
+            selections=[1, 999999],
+            config=self.config,
+        )
+        self.assertIsNone(results_df["error"].iloc[0])
+        self.assertIn("999999", results_df["error"].iloc[1])
+        with self.assertRaises(KeyError):
+            t3co.evaluate_batch(
+                self.vehicles_df,
+                self.scenarios_df,
+                selections=[999999],
+                config=self.config,
+                raise_errors=True,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Module for testing the breakeven solver. The cost stage re-run must reproduce
+the full TCO calculation, the breakeven value must equalize discounted TCOs, and
+parameters that change the simulation must be rejected.
+"""
+
+import unittest
+from unittest import mock
+
+from t3co.objectives import fueleconomy
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+from t3co.tco import breakeven, tco_analysis
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+
+class TestBreakeven(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = run_scenario.load_config(CONFIG_FILE, 0)
+
+    def test_cost_stage_matches_get_tco_of_vehicle(self):
+        vehicle = run_scenario.get_vehicle(12, self.config.vehicle_file)
+        scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+            12, self.config.scenario_file, a_vehicle=vehicle, config=self.config
+        )
+        disc_cost = tco_analysis.get_tco_of_vehicle(vehicle, range_cyc, scenario)[1]
+
+        cost_stage_inputs = breakeven.get_cost_stage_inputs(12, self.config)
+        self.assertEqual(
+            breakeven.get_disc_cost(
+                cost_stage_inputs, "fuel_price_scale:diesel", 1.0
+            ),
+            disc_cost,
+        )
+
+    def test_breakeven_fuel_price_scale(self):
+        result = breakeven.get_breakeven(
+            12, 50, "fuel_price_scale:diesel", (0.1, 10), self.config
+        )
+        self.assertTrue(result["converged"])
+        self.assertAlmostEqual(
+            result["disc_cost_a"] / result["disc_cost_b"], 1.0, places=9
+        )
+
+    def test_rejects_simulation_params(self):
+        scenario = run_scenario.Scenario()
+        for param in [
+            "gvwr_kg",
+            "soc_norm_init_for_grade_pct",
+            "fuel_price_scale:coal",
+        ]:
+            with self.assertRaises(ValueError):
+                breakeven.set_cost_param(scenario, param, 1.0)
+        # the parameter is checked before the selections are simulated
+        with mock.patch.object(fueleconomy, "get_mpgge") as get_mpgge:
+            with self.assertRaises(ValueError):
+                breakeven.get_breakeven(12, 50, "gvwr_kg", (10000, 20000), self.config)
+        get_mpgge.assert_not_called()
+        breakeven.set_cost_param(scenario, "ess_cost_dol_per_kwh", 150.0)
+        self.assertEqual(scenario.ess_cost_dol_per_kwh, 150.0)
+
+    def test_cost_stage_inputs_cache(self):
+        cache = {}
+        cost_stage_inputs = breakeven.get_cost_stage_inputs(12, self.config, cache)
+        self.assertIs(
+            breakeven.get_cost_stage_inputs(12, self.config, cache), cost_stage_inputs
+        )
+        # without a cache, every call simulates the selection
+        self.assertIsNot(
+            breakeven.get_cost_stage_inputs(12, self.config), cost_stage_inputs
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
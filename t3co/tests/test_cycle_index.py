@@ -0,0 +1,125 @@
+"""
+Module for testing cycle_index. Cycle statistics must match the statistics computed from the cycle arrays,
+the index must be persisted and refreshed when cycle files change, and indexed design cycles must not be
+parsed or calculated again.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from t3co.run import Global as gl
+from t3co.run import cycle_index, run_scenario
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+CYCLE_FILE = gl.OPTIMIZATION_DRIVE_CYCLES / "EPA_Ph2_transient.csv"
+
+
+class TestCycleIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cycle_folder = Path(self.tmp_dir.name).resolve()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def copy_cycle(self, folder_name: str = "") -> Path:
+        folder = self.cycle_folder / folder_name
+        folder.mkdir(exist_ok=True)
+        return Path(shutil.copy(CYCLE_FILE, folder / CYCLE_FILE.name))
+
+    def test_stats_match_cycle_arrays(self):
+        cyc = run_scenario.load_design_cycle_from_path(CYCLE_FILE)
+        metadata = cycle_index.get_cycle_metadata(CYCLE_FILE)
+        self.assertEqual(
+            metadata["trip_distance_mi"],
+            sum(cyc.mph * np.diff(np.array(cyc.time_s), append=0)) / 3600,
+        )
+        self.assertAlmostEqual(
+            metadata["distance_mi"],
+            np.trapz(cyc.mps, cyc.time_s) * gl.m_to_mi,
+            delta=0.05,
+        )
+        self.assertEqual(
+            metadata["avg_speed_mph"],
+            sum(cyc.mps) / max(cyc.time_s) * gl.mps_to_mph,
+        )
+        self.assertEqual(metadata["n_points"], len(cyc.time_s))
+        self.assertAlmostEqual(metadata["max_speed_mph"], max(cyc.mph))
+        self.assertTrue(0 < metadata["idle_frac"] < 1)
+
+    def test_index_is_saved_and_refreshed(self):
+        cyc_file_path = self.copy_cycle()
+        metadata = cycle_index.get_cycle_metadata(cyc_file_path)
+        index_file = cycle_index.get_index_file(self.cycle_folder)
+        self.assertTrue(index_file.exists())
+
+        # a new process reads the saved index
+        del cycle_index.CYCLE_METADATA_INDEX[str(cyc_file_path)]
+        cycle_index.LOADED_INDEX_DIRS.discard(str(self.cycle_folder))
+        self.assertEqual(cycle_index.get_cycle_metadata(cyc_file_path), metadata)
+
+        # modified files are indexed again
+        with open(cyc_file_path) as f:
+            lines = f.readlines()
+        with open(cyc_file_path, "w") as f:
+            f.writelines(lines[: len(lines) // 2])
+        os.utime(cyc_file_path, ns=(0, metadata["mtime_ns"] + 1))
+        modified = cycle_index.get_cycle_metadata(cyc_file_path)
+        self.assertNotEqual(modified["hash"], metadata["hash"])
+        self.assertLess(modified["n_points"], metadata["n_points"])
+
+    def test_design_cycle_stats_from_index(self):
+        cyc_file_path = self.copy_cycle()
+        metadata = cycle_index.get_cycle_metadata(cyc_file_path)
+        # indexed cycle files are neither parsed nor calculated again
+        with mock.patch.object(
+            cycle_index, "calc_cycle_metadata", side_effect=AssertionError("cache miss")
+        ), mock.patch.object(
+            cycle_index, "load_cycle", side_effect=AssertionError("cycle loaded")
+        ):
+            self.assertIs(run_scenario.get_design_cycle_metadata(cyc_file_path), metadata)
+
+        # the trip distance of a scenario cycle is looked up once the cycle is indexed
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        scenario, _ = run_scenario.get_scenario_and_cycle(1, config.scenario_file)
+        with mock.patch.object(
+            cycle_index, "calc_cycle_metadata", side_effect=AssertionError("cache miss")
+        ):
+            indexed_scenario, cyc = run_scenario.get_scenario_and_cycle(
+                1, config.scenario_file
+            )
+        self.assertEqual(
+            indexed_scenario.constant_trip_distance_mi,
+            scenario.constant_trip_distance_mi,
+        )
+        # the design cycle statistics are those of the loaded design cycles
+        self.assertEqual(len(indexed_scenario.design_cycle_stats), len(cyc))
+        for stats, (dc, _) in zip(indexed_scenario.design_cycle_stats, cyc):
+            self.assertEqual(
+                stats["avg_speed_mph"], sum(dc.mps) / max(dc.time_s) * gl.mps_to_mph
+            )
+
+    def test_index_cycle_folder(self):
+        self.copy_cycle()
+        (self.cycle_folder / "notes.csv").write_text("not,a\ncycle,file\n")
+        self.copy_cycle("other")
+        shutil.copy(CYCLE_FILE, self.cycle_folder / "copy.csv")
+        with mock.patch.object(
+            cycle_index, "write_index", wraps=cycle_index.write_index
+        ) as write_index:
+            index_df = cycle_index.index_cycle_folder(self.cycle_folder)
+            # the index of the folder is written once, and not again without changes
+            self.assertEqual(write_index.call_count, 1)
+            cycle_index.index_cycle_folder(self.cycle_folder)
+            self.assertEqual(write_index.call_count, 1)
+        self.assertEqual(index_df["name"].tolist(), [CYCLE_FILE.name, "copy.csv"])
+
+
+if __name__ == "__main__":
+    unittest.main()
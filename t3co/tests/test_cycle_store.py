@@ -0,0 +1,78 @@
+"""
+Module for testing cycle_store. Cycles loaded from a cycle store must be identical to the cycles loaded from
+their files, and cycle stores must be usable as config.drive_cycle like a cycle folder.
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from t3co.run import Global as gl
+from t3co.run import cycle_index, cycle_store, run_scenario
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+CYCLE_FILES = [
+    gl.OPTIMIZATION_DRIVE_CYCLES / "EPA_Ph2_transient.csv",
+    gl.OPTIMIZATION_DRIVE_CYCLES / "regional_haul.csv",
+]
+
+
+class TestCycleStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cycle_folder = Path(cls.tmp_dir.name).resolve() / "cycles"
+        (cycle_folder / "sub").mkdir(parents=True)
+        shutil.copy(CYCLE_FILES[0], cycle_folder / CYCLE_FILES[0].name)
+        shutil.copy(CYCLE_FILES[1], cycle_folder / "sub" / CYCLE_FILES[1].name)
+        (cycle_folder / "notes.csv").write_text("not,a\ncycle,file\n")
+        cls.store_file = cycle_store.pack_cycle_folder(cycle_folder)
+        cls.names = [CYCLE_FILES[0].name, "sub/" + CYCLE_FILES[1].name]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_store_cycles_match_files(self):
+        store = cycle_store.open_cycle_store(self.store_file)
+        self.assertEqual(store.names, self.names)
+        self.assertIsInstance(store.data, np.memmap)
+        for name, cyc_file_path in zip(self.names, CYCLE_FILES):
+            cyc = run_scenario.load_design_cycle_from_path(self.store_file / name)
+            file_cyc = run_scenario.load_design_cycle_from_path(cyc_file_path)
+            self.assertEqual(cyc.name, file_cyc.name)
+            for col in cycle_store.CYCLE_STORE_COLUMNS:
+                np.testing.assert_array_equal(
+                    getattr(cyc, col), getattr(file_cyc, col)
+                )
+            self.assertEqual(
+                store.get_metadata(name)["hash"],
+                cycle_index.get_cycle_metadata(cyc_file_path)["hash"],
+            )
+            self.assertEqual(
+                run_scenario.get_design_cycle_metadata(self.store_file / name)[
+                    "trip_distance_mi"
+                ],
+                cycle_index.calc_cycle_metadata(file_cyc)["trip_distance_mi"],
+            )
+
+    def test_store_as_config_drive_cycle(self):
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        config.selections = [1]
+        config.drive_cycle = str(self.store_file)
+        config.check_drivecycles_and_create_selections(CONFIG_FILE)
+        self.assertEqual(config.selections, ["1_000", "1_001"])
+        scenario = run_scenario.Scenario(selection="1_001")
+        cyc = run_scenario.load_design_cycle_from_scenario(scenario, config)
+        self.assertEqual(cyc.name, CYCLE_FILES[1].name)
+        np.testing.assert_array_equal(
+            cyc.mps, run_scenario.load_design_cycle_from_path(CYCLE_FILES[1]).mps
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
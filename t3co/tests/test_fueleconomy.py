@@ -0,0 +1,104 @@
+"""
+Module for testing fueleconomy. The batched composite and range calculations must match get_mpgge and
+get_range_mi exactly for every powertrain type.
+"""
+
+import copy
+import unittest
+
+import numpy as np
+
+from t3co.objectives import fueleconomy
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+# Conv, BEV, HEV, and PHEV selections of the demo inputs
+SELECTIONS = [1, 34, 64, 124]
+
+
+class TestBatchComposite(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        cls.cycles = [
+            (
+                run_scenario.load_design_cycle_from_path(
+                    gl.OPTIMIZATION_DRIVE_CYCLES / "regional_haul.csv"
+                ),
+                1,
+            ),
+            (
+                run_scenario.load_design_cycle_from_path(
+                    gl.OPTIMIZATION_DRIVE_CYCLES / "EPA_Ph2_transient.csv"
+                ),
+                3,
+            ),
+        ]
+        cls.designs = {}
+        for sel in SELECTIONS:
+            vehicle = run_scenario.get_vehicle(sel, config.vehicle_file)
+            scenario, _ = run_scenario.get_scenario_and_cycle(
+                sel, config.scenario_file, a_vehicle=vehicle, config=config
+            )
+            designs = []
+            for glider_scale in [1.0, 0.8]:
+                design = copy.deepcopy(vehicle)
+                design.glider_kg = vehicle.glider_kg * glider_scale
+                design.set_veh_mass()
+                design_scenario = copy.deepcopy(scenario)
+                mpgge_comp, _, mpgges = fueleconomy.get_mpgge(
+                    cls.cycles, design, design_scenario, diagnostic=True
+                )
+                designs.append((design, design_scenario, mpgge_comp, mpgges))
+            cls.designs[sel] = designs
+
+    def test_composite_matches_get_mpgge(self):
+        for sel, designs in self.designs.items():
+            veh_pt_type = designs[0][0].veh_pt_type
+            cycle_results = {
+                field: np.array([[m[field] for m in mpgges] for *_, mpgges in designs])
+                for field in designs[0][3][0]
+            }
+            uf = None
+            if veh_pt_type == gl.PHEV:
+                uf = [
+                    run_scenario.get_phev_util_factor(scenario, design, mpgges[-1])
+                    for design, scenario, _, mpgges in designs
+                ]
+            mpgge_comp = fueleconomy.get_mpgge_batch(
+                cycle_results,
+                [w for _, w in self.cycles],
+                veh_pt_type,
+                phev_util_factor=uf,
+            )
+            range_dict = fueleconomy.get_range_mi_batch(
+                mpgge_comp,
+                veh_pt_type,
+                [design.ess_max_kwh for design, *_ in designs],
+                [design.max_soc for design, *_ in designs],
+                [design.min_soc for design, *_ in designs],
+                [design.fs_kwh for design, *_ in designs],
+            )
+            for i, (design, scenario, design_mpgge_comp, _) in enumerate(designs):
+                self.assertEqual(
+                    {key: values[i] for key, values in mpgge_comp.items()},
+                    design_mpgge_comp,
+                    f"selection {sel}",
+                )
+                self.assertEqual(
+                    {key: values[i] for key, values in range_dict.items()},
+                    fueleconomy.get_range_mi(design_mpgge_comp, design, scenario),
+                    f"selection {sel}",
+                )
+
+    def test_composite_skips_zero_values(self):
+        composite = fueleconomy.get_composite(
+            np.array([[10.0, 20.0], [10.0, 0.0]]), [1, 1]
+        )
+        np.testing.assert_array_equal(composite, [2 / (1 / 10 + 1 / 20), 20.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Module for benchmarking the import time of t3co. Importing t3co must not load its submodules, and importing
+run_scenario must not load the optimization and test modules, so pool workers start fast.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+# import time [s] of t3co modules, excluding FASTSim and its dependencies
+IMPORT_TIME_BUDGET_S = 0.5
+
+
+def run_import(statement: str, import_fastsim: bool = True) -> dict:
+    """
+    This function runs an import statement in a new interpreter
+
+    Args:
+        statement (str): import statement
+        import_fastsim (bool, optional): import FASTSim before timing the statement. Defaults to True.
+
+    Returns:
+        result (dict): Dictionary of import time [s] and loaded module names
+    """
+    code = "\n".join(
+        [
+            "import json, sys, time",
+            "import fastsim" if import_fastsim else "",
+            "t = time.perf_counter()",
+            statement,
+            "time_s = time.perf_counter() - t",
+            "print(json.dumps({'time_s': time_s, 'modules': list(sys.modules)}))",
+        ]
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(Path(__file__).parents[2]), env.get("PYTHONPATH", "")]
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+    def test_import_t3co(self):
+        result = run_import("import t3co", import_fastsim=False)
+        self.assertLess(result["time_s"], IMPORT_TIME_BUDGET_S)
+        self.assertNotIn("fastsim", result["modules"])
+        self.assertNotIn("pandas", result["modules"])
+
+    def test_import_run_scenario(self):
+        result = run_import("from t3co.run import run_scenario")
+        self.assertLess(result["time_s"], IMPORT_TIME_BUDGET_S)
+        for module in [
+            "t3co.moopack.moo",
+            "t3co.tests",
+            "pymoo.algorithms.soo.nonconvex.pso",
+        ]:
+            self.assertNotIn(module, result["modules"])
+
+    def test_lazy_submodules(self):
+        result = run_import("import t3co; from t3co import Global; t3co.tcocalc")
+        self.assertIn("t3co.run.Global", result["modules"])
+        self.assertIn("t3co.tco.tcocalc", result["modules"])
+        self.assertNotIn("t3co.moopack.moo", result["modules"])
+
+
+if __name__ == "__main__":
+    unittest.main()
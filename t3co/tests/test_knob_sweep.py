@@ -0,0 +1,127 @@
+"""
+Module for testing knob_sweep. Sweep points must be evaluated like the optimization evaluates them, and
+resumed sweeps must only evaluate the missing points.
+"""
+
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from t3co.moopack import knob_sweep, moo
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+KNOBS = [moo.KNOB_FCMAXKW, moo.KNOB_CDA]
+
+
+class TestSweepPoints(unittest.TestCase):
+    def test_grid(self):
+        X = knob_sweep.get_sweep_points(
+            {"a": (0, 1), "b": (10, 20)}, {"a": 3, "b": 2}, sampling="grid"
+        )
+        self.assertEqual(X.shape, (6, 2))
+        np.testing.assert_array_equal(X[:, 0], [0, 0, 0.5, 0.5, 1, 1])
+        np.testing.assert_array_equal(X[:, 1], [10, 20, 10, 20, 10, 20])
+
+    def test_lhs_has_one_point_per_stratum(self):
+        X = knob_sweep.get_sweep_points(
+            {"a": (0, 1), "b": (10, 20)}, 8, sampling="lhs", seed=3
+        )
+        self.assertEqual(X.shape, (8, 2))
+        np.testing.assert_array_equal(np.sort((X[:, 0] * 8).astype(int)), range(8))
+        np.testing.assert_array_equal(
+            np.sort(((X[:, 1] - 10) / 10 * 8).astype(int)), range(8)
+        )
+        np.testing.assert_array_equal(
+            X,
+            knob_sweep.get_sweep_points(
+                {"a": (0, 1), "b": (10, 20)}, 8, sampling="lhs", seed=3
+            ),
+        )
+
+
+class TestRunKnobSweep(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = run_scenario.load_config(CONFIG_FILE, 1)
+        cls.out_dir = tempfile.TemporaryDirectory()
+        cls.sweep_df = knob_sweep.run_knob_sweep(
+            1,
+            cls.config,
+            KNOBS,
+            n_points=2,
+            chunk_size=3,
+            out_dir=cls.out_dir.name,
+            file_format="csv",
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.out_dir.cleanup()
+
+    def test_matches_elementwise_problem(self):
+        problem_kwargs = knob_sweep.get_sweep_problem_kwargs(1, self.config, KNOBS)
+        problem = moo.T3COProblem(**problem_kwargs)
+        constraints = problem.get_constraint_names()
+        self.assertEqual(len(self.sweep_df), 4)
+        for _, row in self.sweep_df.iterrows():
+            F, G, _ = problem.get_objs(row[KNOBS].to_numpy(dtype=float))
+            self.assertAlmostEqual(row[moo.TCO], F[0])
+            for constraint, g in zip(constraints, G):
+                self.assertAlmostEqual(row[f"G_{constraint}"], g)
+                self.assertEqual(row[f"feasible_{constraint}"], g <= 0)
+            self.assertEqual(row["feasible"], all(G <= 0))
+
+    def test_resume_evaluates_missing_points(self):
+        part_files = knob_sweep.get_part_files(Path(self.out_dir.name), "csv")
+        self.assertEqual(len(part_files), 2)
+        part_files[-1].unlink()
+        resumed_df = knob_sweep.run_knob_sweep(
+            1,
+            self.config,
+            KNOBS,
+            n_points=2,
+            chunk_size=3,
+            out_dir=self.out_dir.name,
+            file_format="csv",
+        )
+        self.assertTrue(resumed_df.equals(self.sweep_df))
+        with self.assertRaises(Exception):
+            knob_sweep.run_knob_sweep(
+                1,
+                self.config,
+                KNOBS,
+                n_points=3,
+                out_dir=self.out_dir.name,
+                file_format="csv",
+            )
+
+    def test_parquet_requires_pyarrow(self):
+        with mock.patch.object(importlib.util, "find_spec", return_value=None):
+            with self.assertRaisesRegex(ImportError, "pyarrow"):
+                knob_sweep.run_knob_sweep(
+                    1, self.config, KNOBS, n_points=2, out_dir=self.out_dir.name
+                )
+
+    @unittest.skipIf(
+        importlib.util.find_spec("pyarrow") is None, "parquet requires pyarrow"
+    )
+    def test_parquet_matches_csv(self):
+        with tempfile.TemporaryDirectory() as out_dir:
+            sweep_df = knob_sweep.run_knob_sweep(
+                1, self.config, KNOBS, n_points=2, chunk_size=3, out_dir=out_dir
+            )
+            self.assertEqual(
+                len(knob_sweep.get_part_files(Path(out_dir), "parquet")), 2
+            )
+        self.assertTrue(sweep_df.equals(self.sweep_df))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Module for testing the Monte Carlo TCO analysis. Monte Carlo samples held at
+the base inputs must reproduce the deterministic discounted TCO.
+"""
+
+import copy
+import unittest
+
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+from t3co.tco import monte_carlo, tco_analysis
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+
+class TestMonteCarlo(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        vehicle = run_scenario.get_vehicle(12, config.vehicle_file)
+        scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+            12, config.scenario_file, a_vehicle=vehicle, config=config
+        )
+        cls.out = run_scenario.vehicle_scenario_sweep(
+            vehicle,
+            scenario,
+            range_cyc,
+            get_accel=False,
+            get_accel_loaded=False,
+            get_gradability=False,
+        )
+
+    def test_base_samples_match_disc_cost(self):
+        results = monte_carlo.run_monte_carlo(self.out, {}, n_samples=10, seed=0)
+        for disc_cost in results["disc_cost"]:
+            self.assertAlmostEqual(disc_cost, self.out["disc_cost"], places=6)
+
+    def test_discount_rate_matches_tco_analysis(self):
+        discount_rate = 0.07
+        input_dists = {
+            monte_carlo.DISCOUNT_RATE: monte_carlo.UncertainInput(
+                distribution="constant", value=discount_rate
+            )
+        }
+        results = monte_carlo.run_monte_carlo(
+            self.out, input_dists, n_samples=10, seed=0
+        )
+
+        scenario = copy.deepcopy(self.out["scenario"])
+        scenario.discount_rate_pct_per_yr = discount_rate
+        discounted_costs_df = tco_analysis.discounted_costs(
+            scenario, self.out["discounted_costs_df"].copy()
+        )
+        disc_cost, _, _ = tco_analysis.calc_discountedTCO(
+            scenario,
+            discounted_costs_df,
+            self.out["veh_msrp_set"],
+            self.out["veh_opp_cost_set"],
+            None,
+        )
+        self.assertAlmostEqual(results["disc_cost"][0], disc_cost, places=6)
+
+    def test_percentiles(self):
+        input_dists = {
+            monte_carlo.FUEL_PRICE_SCALE: monte_carlo.UncertainInput(
+                distribution="uniform", low=0.8, high=1.2
+            )
+        }
+        results = monte_carlo.run_monte_carlo(
+            self.out, input_dists, n_samples=20000, seed=1, chunk_size=3000
+        )
+        percentiles_df = monte_carlo.get_percentiles(results).set_index("metric")
+        self.assertLess(
+            percentiles_df.loc["disc_cost", "p5"], self.out["disc_cost"]
+        )
+        self.assertGreater(
+            percentiles_df.loc["disc_cost", "p95"], self.out["disc_cost"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,12 +6,166 @@ main() can be called via importing
 
 
 import unittest 
+from unittest import mock
+
+import numpy as np
+from pymoo.algorithms.soo.nonconvex.ga import GA
+from pymoo.core.problem import ElementwiseProblem
+from pymoo.optimize import minimize
+
 from t3co import Global as gl
+from t3co.moopack import moo
+from t3co.objectives import gradeability
+from t3co.run import analysis_context, run_scenario
 
 
 class TestMoo(unittest.TestCase):
     def test_moo(self):
         self.assertTrue(True) # TODO: actually build a test here
 
+
+class TestParetoArchive(unittest.TestCase):
+    @staticmethod
+    def add(archive, x, F, G=()):
+        state = {"x": x}
+        return archive.add(
+            np.array(x), F, G, {"vehicle": state, "scenario": None}, state, None
+        )
+
+    def test_keeps_non_dominated_solutions(self):
+        archive = moo.ParetoArchive()
+        self.assertTrue(self.add(archive, [1.0], [2.0, 2.0]))
+        self.assertTrue(self.add(archive, [2.0], [1.0, 3.0]))
+        self.assertFalse(self.add(archive, [3.0], [3.0, 3.0]))
+        self.assertTrue(self.add(archive, [4.0], [1.0, 1.0]))
+        self.assertEqual(list(archive.entries.keys()), [(4.0,)])
+        self.assertFalse(self.add(archive, [5.0], [0.0, 0.0], [1.0]))
+
+    def test_get_returns_copied_state(self):
+        archive = moo.ParetoArchive()
+        state = {"x": 1.0}
+        out, vehicle, scenario = moo.ParetoArchive.copy_solution(
+            {"vehicle": state, "scenario": None}, state, None
+        )
+        archive.add(np.array([1.0]), [1.0], [], out, vehicle, scenario)
+        state["x"] = 2.0
+        entry = archive.get(np.array([1.0]))
+        self.assertEqual(entry["vehicle"], {"x": 1.0})
+        self.assertIs(entry["out"]["vehicle"], entry["vehicle"])
+        self.assertIsNone(archive.get(np.array([2.0])))
+        self.assertEqual((archive.n_hits, archive.n_misses), (1, 1))
+
+    def test_bounded_size(self):
+        archive = moo.ParetoArchive(max_size=3)
+        for i in range(6):
+            self.add(archive, [float(i)], [float(i), 5.0 - i])
+        self.assertEqual(len(archive.entries), 3)
+        self.assertIn((0.0,), archive.entries)
+        self.assertIn((5.0,), archive.entries)
+
+    def test_callback_archive_not_in_history(self):
+        class QueueingProblem(ElementwiseProblem):
+            def __init__(self):
+                super().__init__(n_var=1, n_obj=1, xl=0.0, xu=1.0)
+                self.pareto_archive = None
+                self.pending_solutions = None
+
+            def _evaluate(self, x, out, *args, **kwargs):
+                out["F"] = [float((x[0] - 0.5) ** 2)]
+                self.pending_solutions.append(
+                    (np.copy(x), out["F"], [], {}, None, None)
+                )
+
+        problem = QueueingProblem()
+        callback = moo.ParetoArchiveCallback(problem, max_size=3)
+        res = minimize(
+            problem,
+            GA(pop_size=4),
+            termination=("n_gen", 3),
+            seed=1,
+            save_history=True,
+            callback=callback,
+        )
+        # pymoo deep-copies the problem every generation with save_history, the archive is only on the callback
+        for algorithm in res.history:
+            self.assertIsNone(algorithm.problem.pareto_archive)
+            self.assertEqual(algorithm.problem.pending_solutions, [])
+        self.assertEqual(problem.pending_solutions, [])
+        self.assertIn(moo.ParetoArchive.get_key(res.X), callback.archive.entries)
+
+class TestBatchProblem(unittest.TestCase):
+    @staticmethod
+    def get_problem(problem_class, **kwargs):
+        config = run_scenario.load_config(
+            gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv", 1
+        )
+        return problem_class(
+            knobs_bounds={
+                moo.KNOB_WTDELTAPERC: (0, 0.25),
+                moo.KNOB_CDA: (0, 0.3),
+                moo.KNOB_FCPEAKEFF: (0.46, 0.55),
+            },
+            vnum=1,
+            optimize_pt=gl.CONV,
+            obj_list=[moo.TCO],
+            constr_list=[moo.ACCEL30, moo.ACCEL60, moo.GRADE125, moo.GRADE6],
+            config=config,
+            **kwargs,
+        )
+
+    def test_batch_matches_elementwise(self):
+        X = np.array([[0.05, 0.1, 0.5], [0.0, 0.3, 0.46], [0.17, 0.02, 0.55]])
+        elementwise = self.get_problem(moo.T3COProblem)
+        F, G = elementwise.evaluate(X, return_values_of=["F", "G"])
+        batch = self.get_problem(moo.T3COBatchProblem)
+        F_batch, G_batch = batch.evaluate(X, return_values_of=["F", "G"])
+        np.testing.assert_array_equal(F, F_batch)
+        np.testing.assert_array_equal(G, G_batch)
+        self.assertEqual(elementwise.r_tcos, batch.r_tcos)
+        self.assertEqual(
+            elementwise.grade_accel_overshoot_tol_constraint,
+            batch.grade_accel_overshoot_tol_constraint,
+        )
+        self.assertEqual(
+            elementwise.opt_scenario.vehicle_glider_cost_dol,
+            batch.opt_scenario.vehicle_glider_cost_dol,
+        )
+
+    def test_batch_screens_gradeability_once(self):
+        X = np.array([[0.05, 0.1, 0.5], [0.0, 0.3, 0.46], [0.17, 0.02, 0.55]])
+        elementwise = self.get_problem(
+            moo.T3COProblem, gradeability_screening_tol=0.012
+        )
+        F, G = elementwise.evaluate(X, return_values_of=["F", "G"])
+        batch = self.get_problem(
+            moo.T3COBatchProblem, gradeability_screening_tol=0.012
+        )
+        with mock.patch.object(
+            gradeability,
+            "screen_gradeability",
+            wraps=gradeability.screen_gradeability,
+        ) as screen_gradeability:
+            F_batch, G_batch = batch.evaluate(X, return_values_of=["F", "G"])
+        self.assertEqual(screen_gradeability.call_count, 1)
+        np.testing.assert_array_equal(F, F_batch)
+        np.testing.assert_array_equal(G, G_batch)
+        # each problem records its own tests
+        stats = batch.gradeability_agreement.get_stats()
+        self.assertEqual(stats, elementwise.gradeability_agreement.get_stats())
+        # the second design is within the tolerance of the 6% grade target
+        self.assertEqual((stats["n_estimated"], stats["n_simulated"]), (2, 1))
+
+    def test_passes_context(self):
+        context = analysis_context.AnalysisContext(vocation_scenario="test")
+        problem = self.get_problem(moo.T3COProblem, context=context)
+        with mock.patch.object(
+            run_scenario,
+            "vehicle_scenario_sweep",
+            wraps=run_scenario.vehicle_scenario_sweep,
+        ) as vehicle_scenario_sweep:
+            problem.evaluate(np.array([[0.05, 0.1, 0.5]]))
+        self.assertIs(vehicle_scenario_sweep.call_args.kwargs["context"], context)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
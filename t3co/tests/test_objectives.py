@@ -0,0 +1,145 @@
+"""
+Module for testing the accel and gradeability objectives. Test cycles must be cached,
+early stopping must reproduce the results of the full test cycle, and gradeability
+estimates must agree with the simulation.
+"""
+
+import copy
+import unittest
+
+import numpy as np
+
+from t3co.objectives import accel, gradeability
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+
+class ObjectivesTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        cls.vehicles = {}
+        for sel in [12, 45]:
+            vehicle = run_scenario.get_vehicle(sel, config.vehicle_file)
+            scenario, _ = run_scenario.get_scenario_and_cycle(
+                sel, config.scenario_file, a_vehicle=vehicle, config=config
+            )
+            cls.vehicles[sel] = (vehicle, scenario)
+
+
+class TestEarlyStop(ObjectivesTestCase):
+    def test_cycles_are_cached(self):
+        self.assertIs(accel.get_accel_cycle(), accel.get_accel_cycle())
+        self.assertIs(
+            gradeability.get_grade_cycle(0.06, 30),
+            gradeability.get_grade_cycle(0.06, 30),
+        )
+
+    def test_early_stop_accel_matches_full_cycle(self):
+        for sel, (vehicle, scenario) in self.vehicles.items():
+            full = accel.get_accel(copy.deepcopy(vehicle), copy.deepcopy(scenario))
+            early = accel.get_accel(
+                copy.deepcopy(vehicle), copy.deepcopy(scenario), early_stop=True
+            )
+            self.assertEqual(full[:2], early[:2], f"selection {sel}")
+            self.assertLess(early[2].i, full[2].i)
+
+    def test_early_stop_gradeability_matches_full_cycle(self):
+        for sel, (vehicle, scenario) in self.vehicles.items():
+            full = gradeability.get_gradeability(
+                copy.deepcopy(vehicle), copy.deepcopy(scenario)
+            )
+            early = gradeability.get_gradeability(
+                copy.deepcopy(vehicle), copy.deepcopy(scenario), early_stop=True
+            )
+            self.assertEqual(full[:2], early[:2], f"selection {sel}")
+
+
+class TestGradeabilityEstimate(ObjectivesTestCase):
+    def test_estimate_matches_simulation(self):
+        for sel, (vehicle, scenario) in self.vehicles.items():
+            screening = gradeability.screen_gradeability([vehicle], scenario)
+            self.assertTrue(screening["is_estimable"][0])
+            simulated = gradeability.get_gradeability(
+                copy.deepcopy(vehicle), copy.deepcopy(scenario)
+            )
+            self.assertAlmostEqual(
+                screening["grade_6_mph_ach"][0], simulated[0], places=4
+            )
+            self.assertAlmostEqual(
+                screening["grade_1_25_mph_ach"][0], simulated[1], places=4
+            )
+
+    def test_screened_falls_back_near_target(self):
+        vehicle, scenario = self.vehicles[12]
+        agreement = gradeability.GradeabilityAgreement()
+        estimated = gradeability.get_gradeability_screened(
+            copy.deepcopy(vehicle),
+            copy.deepcopy(scenario),
+            screening_tol=0.0,
+            agreement=agreement,
+        )
+        self.assertIsNone(estimated[2])
+        simulated = gradeability.get_gradeability_screened(
+            copy.deepcopy(vehicle),
+            copy.deepcopy(scenario),
+            screening_tol=1.0,
+            agreement=agreement,
+        )
+        self.assertIsNotNone(simulated[2])
+        stats = agreement.get_stats()
+        self.assertEqual((stats["n_estimated"], stats["n_simulated"]), (1, 1))
+        self.assertEqual(stats["n_compared"], 2)
+        self.assertLess(stats["max_abs_err_mph"], 1e-4)
+        # the record is copied without its lock, e.g. with the optimization problem
+        self.assertEqual(copy.deepcopy(agreement).get_stats(), stats)
+
+    def test_population_screening_matches_vehicle(self):
+        vehicles = [vehicle for vehicle, _ in self.vehicles.values()]
+        _, scenario = self.vehicles[12]
+        screening = gradeability.screen_gradeability(vehicles, scenario)
+        test_vehicle = run_scenario.get_test_vehicle(vehicles[1], scenario)
+        vehicle_screening = gradeability.screen_gradeability(
+            [test_vehicle], scenario, set_weight_to_max_kg=False
+        )
+        row = gradeability.get_screening_row(screening, 1)
+        self.assertEqual(list(row), list(vehicle_screening))
+        for key in row:
+            np.testing.assert_array_equal(row[key], vehicle_screening[key])
+
+
+class TestPerformanceJobs(ObjectivesTestCase):
+    def test_tests_do_not_modify_vehicle(self):
+        vehicle, scenario = self.vehicles[12]
+        veh_kg, veh_override_kg = vehicle.veh_kg, vehicle.veh_override_kg
+        accel.get_accel(vehicle, scenario)
+        gradeability.get_gradeability(vehicle, scenario)
+        self.assertEqual(vehicle.veh_kg, veh_kg)
+        self.assertEqual(vehicle.veh_override_kg, veh_override_kg)
+
+    def test_jobs_match_tests(self):
+        for sel, (vehicle, scenario) in self.vehicles.items():
+            results = run_scenario.run_performance_tests(vehicle, scenario)
+            self.assertEqual(
+                list(results), ["accel", "accel_loaded", "grade_6", "grade_1p25"]
+            )
+            # the jobs do not modify the vehicle, so running them again gives the same results
+            self.assertEqual(
+                {key: value[:-1] for key, value in results.items()},
+                {
+                    key: value[:-1]
+                    for key, value in run_scenario.run_performance_tests(
+                        vehicle, scenario
+                    ).items()
+                },
+                f"selection {sel}",
+            )
+            grade = gradeability.get_gradeability(vehicle, scenario)
+            self.assertEqual(results["grade_6"][0], grade[0])
+            self.assertEqual(results["grade_1p25"][0], grade[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
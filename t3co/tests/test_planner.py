@@ -0,0 +1,147 @@
+"""
+Module for testing the sweep planner. Jobs must be estimated from their evaluation budget, powertrain, and design cycle,
+jobs must be scheduled on the workers longest first with the jobs of a selection on one worker, and the cost model
+must be recovered from the run times of earlier sweeps.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from t3co import sweep
+from t3co.run import Global as gl
+from t3co.run import cycle_index, planner, run_scenario
+
+CYCLES = ["EPA_Ph2_transient.csv", "regional_haul.csv", "long_haul_cyc.csv"]
+
+
+class TestPlanner(unittest.TestCase):
+    def test_n_evals(self):
+        self.assertEqual(planner.get_n_evals(False, 10, 5), 1)
+        self.assertEqual(planner.get_n_evals(True, 10, 5), 50)
+        self.assertEqual(planner.get_n_evals(True, 10, 5, n_max_evals=20), 20)
+        self.assertEqual(planner.get_n_evals(True, 10, 5, n_gen_frac=0.5), 30)
+
+    def test_makespan(self):
+        self.assertEqual(planner.get_makespan_s([3, 3, 2, 2, 2], 2), 7)
+        self.assertEqual(planner.get_makespan_s([1, 2, 3, 4], 2), 5)
+        self.assertEqual(planner.get_makespan_s([3, 3, 2, 2, 2], 9), 3)
+        self.assertEqual(planner.get_makespan_s([], 2), 0)
+
+    def test_estimate_plan(self):
+        jobs_df = pd.DataFrame(
+            {
+                "selection": [1, 2, 3],
+                "algorithm": ["NSGA2", "NSGA2", "None"],
+                "veh_pt_type": [gl.CONV, gl.PHEV, gl.BEV],
+                "optimize": [True, True, False],
+                "n_knobs": [3, 4, 0],
+                "pop_size": [10, 10, 10],
+                "n_max_gen": [5, 5, 5],
+                "n_max_evals": [None, None, None],
+                "drive_cycle": [CYCLES[0], CYCLES[0], CYCLES[2]],
+            }
+        )
+        cost_model = {"job_overhead_s": 1.0, "eval_overhead_s": 0.1}
+        jobs_df, summary = planner.estimate_plan(jobs_df, 2, cost_model)
+        self.assertEqual(jobs_df["n_evals"].tolist(), [50, 50, 1])
+        self.assertEqual(jobs_df["n_design_sims"].tolist(), [1, 2, 1])
+        cycle_s = jobs_df["cycle_s"].iloc[0]
+        self.assertGreater(cycle_s, 0)
+        sim_s = planner.DEFAULT_COST_MODEL["sim_s_per_cycle_s"] * cycle_s
+        self.assertAlmostEqual(jobs_df["time_s"].iloc[0], 1 + 50 * (0.1 + sim_s))
+        self.assertAlmostEqual(jobs_df["time_s"].iloc[1], 1 + 50 * (0.1 + 2 * sim_s))
+        self.assertEqual(summary["n_optimization_jobs"], 2)
+        self.assertEqual(summary["n_evals"], 101)
+        # the analysis-only job runs after the shorter optimization
+        self.assertAlmostEqual(
+            summary["wall_time_s"], jobs_df["time_s"].iloc[[0, 2]].sum()
+        )
+        self.assertGreater(summary["peak_mb"], 2 * summary["worker_peak_mb"])
+
+    def test_estimate_plan_algorithms(self):
+        jobs_df = pd.DataFrame(
+            {
+                "selection": [1, 1, 2, 2, 3],
+                "algorithm": ["NSGA2", "PatternSearch", "NSGA2", "PatternSearch", "None"],
+                "veh_pt_type": [gl.CONV, gl.CONV, gl.PHEV, gl.PHEV, gl.BEV],
+                "optimize": [True, True, True, True, False],
+                "n_knobs": [3, 3, 4, 4, 0],
+                "pop_size": [10, 10, 10, 10, 10],
+                "n_max_gen": [5, 5, 5, 5, 5],
+                "n_max_evals": [None, None, None, None, None],
+                "drive_cycle": [CYCLES[0]] * 4 + [CYCLES[2]],
+            }
+        )
+        cost_model = {"job_overhead_s": 1.0, "eval_overhead_s": 0.1}
+        # the design cycles are read from the cycle metadata index, not loaded
+        planner.estimate_plan(jobs_df, 3, cost_model)
+        with mock.patch.object(
+            cycle_index, "load_cycle", side_effect=AssertionError("cycle loaded")
+        ):
+            jobs_df, summary = planner.estimate_plan(jobs_df, 3, cost_model)
+        # each worker runs the algorithms of its selection one after another
+        times_s = jobs_df["time_s"].tolist()
+        self.assertEqual(summary["n_workers"], 3)
+        self.assertAlmostEqual(
+            summary["wall_time_s"],
+            max(times_s[0] + times_s[1], times_s[2] + times_s[3], times_s[4]),
+        )
+        self.assertGreater(summary["wall_time_s"], planner.get_makespan_s(times_s, 3))
+
+    def test_plan_jobs(self):
+        config = run_scenario.load_config(
+            gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv", 1
+        )
+        jobs_df = sweep.get_plan_jobs(
+            config, [1], ["NSGA2"], False, [""], [], 10, 5, n_max_evals=30
+        )
+        self.assertEqual(jobs_df["selection"].tolist(), [1])
+        self.assertGreater(jobs_df["n_knobs"].iloc[0], 0)
+        jobs_df, summary = planner.estimate_plan(jobs_df)
+        self.assertEqual(summary["n_evals"], 30)
+
+        jobs_df = sweep.get_plan_jobs(config, [1, 2], ["NSGA2"], True, [""], [], 10, 5)
+        self.assertEqual(jobs_df["algorithm"].tolist(), ["None", "None"])
+
+    def test_calibrate_cost_model(self):
+        true_model = {
+            "job_overhead_s": 3.0,
+            "eval_overhead_s": 0.2,
+            "sim_s_per_cycle_s": 5e-4,
+        }
+        rows = []
+        for i, (cycle, n_gen) in enumerate(
+            [(CYCLES[0], None), (CYCLES[1], 4), (CYCLES[2], 2), (CYCLES[0], 3)]
+        ):
+            n_evals = 1 if n_gen is None else 10 * n_gen
+            cycle_s, _ = planner.get_design_cycle_size(cycle)
+            run_time_s = planner.get_job_time_s(n_evals, 1, cycle_s, true_model)
+            # optimizations report each optimized design on its own row
+            for _ in range(1 if n_gen is None else 2):
+                rows.append(
+                    {
+                        "selection": i,
+                        "algorithm": "NSGA2",
+                        "veh_pt_type": gl.CONV,
+                        "scenario_drive_cycle": cycle,
+                        "n_gen": n_gen,
+                        "max_n_gen": 4,
+                        "run_time_[s]": run_time_s,
+                    }
+                )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            results_file = Path(tmp_dir) / "results.csv"
+            pd.DataFrame(rows).to_csv(results_file, index=False)
+            cost_model = planner.calibrate_cost_model([results_file], pop_size=10)
+        self.assertEqual(cost_model["n_calibration_jobs"], 4)
+        for key, value in true_model.items():
+            self.assertAlmostEqual(cost_model[key], value, places=6)
+        self.assertAlmostEqual(cost_model["n_gen_frac"], 0.75)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Module for testing the sweep profiling. Each profiled selection must write its CPU and memory profiles, also if it
+raises, and the profiles of the selections must be merged into the run-level reports.
+"""
+
+import pstats
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from t3co.run import profiling
+
+
+def run_toy_selection(n: int) -> list:
+    if n < 0:
+        raise ValueError("bad selection")
+    return [list(range(1000)) for _ in range(n)]
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.profile_dir = Path(self.tmp_dir.name) / "profile"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_profiles(self):
+        for n in [10, 20]:
+            result = profiling.profile_call(
+                run_toy_selection,
+                profiling.PROFILES,
+                self.profile_dir,
+                f"selection_{n}",
+                n,
+            )
+            self.assertEqual(len(result), n)
+        with self.assertRaises(ValueError):
+            profiling.profile_call(
+                run_toy_selection,
+                [profiling.PROFILE_CPU],
+                self.profile_dir,
+                "selection_bad",
+                -1,
+            )
+        self.assertTrue((self.profile_dir / "selection_bad.pstats").exists())
+        self.assertFalse((self.profile_dir / "selection_bad_mem.csv").exists())
+
+        selection_df = pd.read_csv(self.profile_dir / "selection_20_mem.csv")
+        self.assertLessEqual(len(selection_df), profiling.N_TOP_ALLOCATIONS)
+        self.assertGreater(selection_df["peak_mb"].iloc[0], 0)
+
+        report_paths = profiling.merge_profiles(self.profile_dir)
+        self.assertEqual(set(report_paths), set(profiling.PROFILES))
+        self.assertIn("3 profiles", report_paths[profiling.PROFILE_CPU].read_text())
+        stats = pstats.Stats(str(self.profile_dir / profiling.RUN_PSTATS))
+        n_calls = [
+            stat[0]
+            for (_, _, function), stat in stats.stats.items()
+            if function == "run_toy_selection"
+        ]
+        self.assertEqual(n_calls, [3])
+        run_df = pd.read_csv(report_paths[profiling.PROFILE_MEM])
+        self.assertTrue((run_df["n_profiles"] <= 2).all())
+        peaks_mb = [
+            pd.read_csv(self.profile_dir / f"selection_{n}_mem.csv")["peak_mb"].max()
+            for n in [10, 20]
+        ]
+        self.assertEqual(run_df["max_peak_mb"].iloc[0], max(peaks_mb))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Module for testing the sensitivity analysis. The Sobol and Morris estimators must
+recover known indices of an analytic model, and cost-only inputs must not re-run FASTSim.
+Cost-only inputs with an array equivalent must be evaluated in one cost stage run, with
+the discounted TCO of a cost stage run per sample.
+"""
+
+import copy
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+from t3co.tco import breakeven, sensitivity, tco_analysis
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+
+class TestSensitivity(unittest.TestCase):
+    def test_sobol_indices_linear_model(self):
+        bounds = np.array([[0.0, 1.0], [0.0, 1.0]])
+        X = sensitivity.get_saltelli_samples(bounds, 4096, seed=0)
+        Y = 2 * X[:, 0] + X[:, 1]
+        S1, ST = sensitivity.get_sobol_indices(Y, 4096, 2)
+        np.testing.assert_allclose(S1, [0.8, 0.2], atol=0.02)
+        np.testing.assert_allclose(ST, [0.8, 0.2], atol=0.02)
+
+    def test_morris_indices_linear_model(self):
+        bounds = np.array([[0.0, 10.0], [-1.0, 1.0]])
+        X = sensitivity.get_morris_samples(bounds, 5, seed=0)
+        Y = 3 * X[:, 0] - 5 * X[:, 1]
+        mu, mu_star, sigma = sensitivity.get_morris_indices(X, Y, 5, bounds)
+        np.testing.assert_allclose(mu, [30.0, -10.0])
+        np.testing.assert_allclose(mu_star, [30.0, 10.0])
+        np.testing.assert_allclose(sigma, [0.0, 0.0], atol=1e-9)
+
+    def test_cost_only_inputs_skip_fastsim(self):
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        indices_df, stats = sensitivity.run_sensitivity(
+            12,
+            config,
+            {"discount_rate_pct_per_yr": (0.02, 0.07), "vmt": (0.8, 1.2)},
+            method="morris",
+            n_samples=1,
+            seed=0,
+        )
+        self.assertEqual(stats["n_evaluations"], 3)
+        self.assertEqual(stats["n_simulations"], 0)
+        mu = indices_df.set_index("input")["mu"]
+        self.assertLess(mu["discount_rate_pct_per_yr"], 0)
+        self.assertGreater(mu["vmt"], 0)
+
+    def test_vectorized_cost_only_inputs(self):
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        input_names = [
+            "discount_rate_pct_per_yr",
+            "maint_oper_cost_dol_per_mi",
+            "fuel_price_scale:diesel",
+        ]
+        X = np.array([[0.02, 0.8, 0.9], [0.05, 1.2, 1.3], [0.07, 1.0, 1.0]])
+        with mock.patch.object(
+            tco_analysis,
+            "get_tco_from_mpgge",
+            wraps=tco_analysis.get_tco_from_mpgge,
+        ) as get_tco:
+            disc_costs, n_simulations = sensitivity.evaluate_disc_cost(
+                12, config, input_names, X
+            )
+        self.assertEqual(get_tco.call_count, 1)
+        self.assertEqual(n_simulations, 0)
+
+        cost_stage_inputs = breakeven.get_cost_stage_inputs(12, config)
+        expected = []
+        for x in X:
+            scenario = copy.deepcopy(cost_stage_inputs["scenario"])
+            for name, value in zip(input_names, x):
+                sensitivity.set_sensitivity_input(
+                    cost_stage_inputs["vehicle"], scenario, name, value
+                )
+            expected.append(
+                tco_analysis.get_tco_from_mpgge(
+                    cost_stage_inputs["vehicle"],
+                    scenario,
+                    cost_stage_inputs["mpgge"],
+                    cost_stage_inputs["sim_drives"],
+                )[1]
+            )
+        np.testing.assert_allclose(disc_costs, expected, rtol=1e-9)
+        # another fuel than the one of the scenario needs the cost stage per sample
+        self.assertEqual(
+            sensitivity.get_monte_carlo_input(
+                "fuel_price_scale:electricity", cost_stage_inputs["scenario"]
+            ),
+            (None, None),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Module for testing and benchmarking the local TCO evaluation server. Served evaluations must match the evaluations
+of run_scenario, overrides must change the results, and warm TCO evaluations must be answered within the latency
+budget.
+"""
+
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from t3co.run import Global as gl
+from t3co.run import client, run_scenario, server
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+# Conv and BEV selections of the demo inputs
+SELECTIONS = [1, 34]
+
+# options of evaluations without performance tests
+TCO_ONLY = {"get_accel": False, "get_accel_loaded": False, "get_gradability": False}
+
+# latency [s] of a warm TCO evaluation of one selection
+LATENCY_BUDGET_S = 2
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = run_scenario.load_config(CONFIG_FILE, 0)
+        server.warm_up(cls.config, SELECTIONS)
+        cls.server = server.create_server(cls.config, port=0)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+        cls.client = client.EvaluationClient(port=cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.shutdown()
+        cls.thread.join()
+        cls.server.server_close()
+
+    def get_tco(self, sel: int) -> float:
+        vehicle = run_scenario.get_vehicle(sel, self.config.vehicle_file)
+        scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+            sel, self.config.scenario_file, a_vehicle=vehicle, config=self.config
+        )
+        return run_scenario.vehicle_scenario_sweep(
+            vehicle, scenario, range_cyc, **TCO_ONLY
+        )["disc_cost"]
+
+    def test_matches_run_scenario(self):
+        results = self.client.evaluate(
+            [{"selection": sel, "options": TCO_ONLY} for sel in SELECTIONS]
+        )
+        self.assertEqual([result["selection"] for result in results], SELECTIONS)
+        self.assertEqual(
+            [result["discounted_tco_dol"] for result in results],
+            [self.get_tco(sel) for sel in SELECTIONS],
+        )
+        health = self.client.health()
+        self.assertEqual(health["cache_sizes"]["payload_kdes"], 1)
+        self.assertGreaterEqual(health["cache_sizes"]["vehicles"], len(SELECTIONS))
+
+    def test_overrides(self):
+        base, battery, discount, bad_field, bad_option = self.client.evaluate(
+            [
+                {"selection": 34, "options": TCO_ONLY},
+                {
+                    "selection": 34,
+                    "vehicle_overrides": {"ess_max_kwh": 300},
+                    "options": TCO_ONLY,
+                },
+                {
+                    "selection": 34,
+                    "scenario_overrides": {"discount_rate_pct_per_yr": 0.07},
+                    "options": TCO_ONLY,
+                },
+                {"selection": 34, "vehicle_overrides": {"no_field": 1}},
+                {"selection": 34, "options": {"no_option": True}},
+            ]
+        )
+        self.assertGreater(base["range_ach_mi"], battery["range_ach_mi"])
+        self.assertNotEqual(base["discounted_tco_dol"], discount["discounted_tco_dol"])
+        self.assertIn("no_field", bad_field["error"])
+        self.assertIn("no_option", bad_option["error"])
+        # overrides do not modify the cached vehicles
+        self.assertEqual(
+            self.client.evaluate([{"selection": 34, "options": TCO_ONLY}]), [base]
+        )
+
+    def test_latency(self):
+        latency = client.benchmark_latency(
+            self.client, [{"selection": 1, "options": TCO_ONLY}], n_repeats=3
+        )
+        self.assertLess(latency["median_s"], LATENCY_BUDGET_S)
+
+    def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            socket_path = Path(tmp_dir) / "t3co.sock"
+            unix_server = server.create_server(self.config, socket_path=socket_path)
+            thread = threading.Thread(target=unix_server.serve_forever)
+            thread.start()
+            unix_client = client.EvaluationClient(socket_path=socket_path)
+            results = unix_client.evaluate([{"selection": 1, "options": TCO_ONLY}])
+            unix_client.shutdown()
+            thread.join()
+            unix_server.server_close()
+            self.assertFalse(socket_path.exists())
+        self.assertEqual(results[0]["discounted_tco_dol"], self.get_tco(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
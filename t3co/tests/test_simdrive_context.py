@@ -0,0 +1,75 @@
+"""
+Module for testing the reusable SimDrive context. The Rust vehicle updated in place
+must match Vehicle.to_rust(), and reused contexts must reproduce fresh simulations.
+"""
+
+import copy
+import unittest
+
+import numpy as np
+
+from t3co.objectives import simdrive_context
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+
+class TestSimDriveContext(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        cls.vehicle = run_scenario.get_vehicle(45, config.vehicle_file)
+        cls.scenario, range_cyc = run_scenario.get_scenario_and_cycle(
+            45, config.scenario_file, a_vehicle=cls.vehicle, config=config
+        )
+        cls.cyc = range_cyc[0][0] if isinstance(range_cyc, list) else range_cyc
+
+    def test_sync_vehicle_matches_to_rust(self):
+        vehicle = copy.deepcopy(self.vehicle)
+        context = simdrive_context.SimDriveContext(self.cyc)
+        context.sync_vehicle(vehicle)
+
+        run_scenario.set_max_motor_kw(vehicle, self.scenario, vehicle.mc_max_kw * 1.2)
+        run_scenario.set_max_battery_kwh(vehicle, vehicle.ess_max_kwh * 0.8)
+        vehicle.glider_kg *= 0.9
+        vehicle.set_veh_mass()
+        changed_keys = context.sync_vehicle(vehicle)
+
+        self.assertIn("mc_max_kw", changed_keys)
+        self.assertEqual((context.n_rebuilds, context.n_updates), (1, 1))
+        self.assertEqual(context.rust_veh.to_json(), vehicle.to_rust().to_json())
+        self.assertEqual(context.sync_vehicle(vehicle), [])
+
+    def test_sync_vehicle_rederives_fc_eff_array(self):
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        vehicle = run_scenario.get_vehicle(12, config.vehicle_file)
+        context = simdrive_context.SimDriveContext(self.cyc)
+        context.sync_vehicle(vehicle)
+
+        vehicle.fc_eff_map = vehicle.fc_eff_map * 1.05
+        vehicle.set_derived()
+        context.sync_vehicle(vehicle)
+
+        np.testing.assert_array_equal(
+            context.rust_veh.fc_eff_array, vehicle.to_rust().fc_eff_array
+        )
+
+    def test_reused_context_matches_fresh_simulation(self):
+        vehicle = copy.deepcopy(self.vehicle)
+        context = simdrive_context.SimDriveContext(self.cyc)
+        first = context.get_sim_drive(vehicle)
+        first.sim_drive()
+        second = context.get_sim_drive(vehicle)
+        self.assertIsNot(first, second)
+        second.sim_drive()
+
+        fresh = simdrive_context.SimDriveContext(self.cyc).get_sim_drive(vehicle)
+        fresh.sim_drive()
+        np.testing.assert_array_equal(first.mph_ach, fresh.mph_ach)
+        np.testing.assert_array_equal(second.mph_ach, fresh.mph_ach)
+        self.assertEqual(second.electric_kwh_per_mi, fresh.electric_kwh_per_mi)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Module for testing the supervised worker pool. Tasks that raise, time out, or crash their worker must be reported
+with their status while the other tasks finish, and workers must be recycled after max_tasks_per_worker tasks.
+"""
+
+import os
+import time
+import unittest
+
+from t3co.run import supervised_pool
+from t3co.run.supervised_pool import SupervisedPool
+
+
+def run_toy_task(task: str) -> int:
+    if task == "raise":
+        raise ValueError("bad task")
+    if task == "sleep":
+        time.sleep(60)
+    if task == "crash":
+        os._exit(3)
+    return os.getpid()
+
+
+class TestSupervisedPool(unittest.TestCase):
+    def run_tasks(self, pool: SupervisedPool, tasks: list, **kwargs) -> dict:
+        results = {}
+        for task, status, result in pool.imap_unordered(run_toy_task, tasks, **kwargs):
+            results[task] = (status, result)
+        return results
+
+    def test_failed_tasks(self):
+        tasks = ["ok_0", "raise", "sleep", "crash", "ok_1"]
+        start = time.perf_counter()
+        with SupervisedPool(2) as pool:
+            results = self.run_tasks(pool, tasks, timeout_s=2)
+            self.assertEqual(len(pool.workers), 2)
+            self.assertEqual(pool.n_restarts, 2)
+        self.assertLess(time.perf_counter() - start, 30)
+        self.assertEqual(set(results), set(tasks))
+        self.assertEqual(results["ok_0"][0], supervised_pool.TASK_OK)
+        self.assertEqual(results["ok_1"][0], supervised_pool.TASK_OK)
+        self.assertEqual(results["raise"][0], supervised_pool.TASK_ERROR)
+        self.assertIn("bad task", results["raise"][1])
+        self.assertEqual(results["sleep"][0], supervised_pool.TASK_TIMEOUT)
+        self.assertEqual(results["crash"][0], supervised_pool.TASK_CRASHED)
+        self.assertIn("code 3", results["crash"][1])
+
+    def test_timeout_per_task(self):
+        with SupervisedPool(1) as pool:
+            results = self.run_tasks(
+                pool,
+                ["sleep", "ok"],
+                timeout_s=lambda task: 1 if task == "sleep" else None,
+            )
+        self.assertEqual(results["sleep"][0], supervised_pool.TASK_TIMEOUT)
+        self.assertEqual(results["ok"][0], supervised_pool.TASK_OK)
+
+    def test_task_groups(self):
+        groups = [["ok_0", "sleep", "ok_1"], ["ok_2", "ok_3"]]
+        with SupervisedPool(2) as pool:
+            results = self.run_tasks(pool, groups, timeout_s=2, grouped=True)
+        # only the task that timed out fails, and the rest of its group continues on a new worker
+        self.assertEqual(results["sleep"][0], supervised_pool.TASK_TIMEOUT)
+        for i in range(4):
+            self.assertEqual(results[f"ok_{i}"][0], supervised_pool.TASK_OK)
+        self.assertNotEqual(results["ok_0"][1], results["ok_1"][1])
+        self.assertEqual(results["ok_2"][1], results["ok_3"][1])
+        self.assertNotEqual(results["ok_0"][1], results["ok_2"][1])
+
+    def test_worker_recycling(self):
+        tasks = [f"ok_{i}" for i in range(4)]
+        with SupervisedPool(1, max_tasks_per_worker=2) as pool:
+            results = self.run_tasks(pool, tasks)
+            # the pool stays usable for more tasks
+            results.update(self.run_tasks(pool, ["ok_4"]))
+        pids = [results[f"ok_{i}"][1] for i in range(5)]
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+        self.assertEqual(pids[2], pids[3])
+        self.assertNotEqual(pids[3], pids[4])
+
+        with SupervisedPool(1, max_worker_memory_mb=1e-3) as pool:
+            results = self.run_tasks(pool, tasks[:2])
+        self.assertNotEqual(results["ok_0"][1], results["ok_1"][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Module for testing the sweep selection groups and input validation. Every selection expanded for the drive cycles of
+a folder must be run exactly once, grouped by base selection or by cycle, whichever reloads less. Input validation
+must report input errors and keep the validated vehicles in the input caches.
+"""
+
+import unittest
+
+import pandas as pd
+
+from t3co import sweep
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+from t3co.utilities import file_keys
+
+
+class TestSelectionGroups(unittest.TestCase):
+    def get_config(self, cycle_names: list) -> run_scenario.Config:
+        config = run_scenario.Config()
+        config.dc_files = [gl.OPTIMIZATION_DRIVE_CYCLES / name for name in cycle_names]
+        return config
+
+    def get_selections(self, n_selections: int, n_cycles: int) -> list:
+        return [
+            f"{sel}_{dc_id:03d}"
+            for sel in range(1, n_selections + 1)
+            for dc_id in range(n_cycles)
+        ]
+
+    def assert_runs_each_selection_once(self, groups: list, selections: list):
+        self.assertEqual(
+            sorted(sel for group in groups for sel in group), sorted(selections)
+        )
+
+    def test_unexpanded_selections(self):
+        groups, group_by = sweep.get_selection_groups([1, 34], run_scenario.Config())
+        self.assertEqual(groups, [[1], [34]])
+        self.assertIsNone(group_by)
+
+    def test_single_worker_groups_by_selection(self):
+        config = self.get_config(["regional_haul.csv", "EPA_Ph2_transient.csv"])
+        selections = self.get_selections(3, 2)
+        groups, group_by = sweep.get_selection_groups(selections, config)
+        self.assertEqual(group_by, "selection")
+        self.assertEqual(
+            groups, [["1_000", "1_001"], ["2_000", "2_001"], ["3_000", "3_001"]]
+        )
+
+    def test_large_cycles_group_by_cycle(self):
+        config = self.get_config(["regional_haul.csv", "regional_haul.csv"])
+        selections = self.get_selections(10, 2)
+        groups, group_by = sweep.get_selection_groups(selections, config, 9)
+        self.assertEqual(group_by, "cycle")
+        self.assertGreaterEqual(len(groups), 9)
+        for group in groups:
+            self.assertEqual(len({sel.split("_")[1] for sel in group}), 1)
+        self.assert_runs_each_selection_once(groups, selections)
+
+    def test_small_cycles_group_by_selection(self):
+        config = self.get_config(["EPA_Ph2_transient.csv"] * 4)
+        selections = self.get_selections(10, 4)
+        groups, group_by = sweep.get_selection_groups(selections, config, 9)
+        self.assertEqual(group_by, "selection")
+        self.assert_runs_each_selection_once(groups, selections)
+
+
+class TestInputValidation(unittest.TestCase):
+    def setUp(self):
+        self.config = run_scenario.load_config(
+            gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv", 0
+        )
+        for curves in ["eng_eff_imp_curves", "lw_imp_curves", "aero_drag_imp_curves"]:
+            curves_df = pd.read_csv(getattr(self.config, curves))
+            setattr(self.config, f"{curves}_df", curves_df)
+        self.sdf = pd.read_csv(self.config.scenario_file, index_col="selection")
+        self.validation_kwargs = dict(
+            pop_size=6,
+            n_max_gen=3,
+            algo=None,
+            n_last=5,
+            nth_gen=1,
+            x_tol=0.5,
+            f_tol=3.0,
+        )
+
+    def test_valid_selection_is_cached(self):
+        error = sweep.validate_selection(
+            (1, "Conv", "Conv"), self.config, self.sdf, self.validation_kwargs
+        )
+        self.assertIsNone(error)
+        self.assertIn(
+            (file_keys.get_file_key(self.config.vehicle_file), 1),
+            run_scenario.VEHICLE_CACHE,
+        )
+
+    def test_input_error(self):
+        error = sweep.validate_selection(
+            (999999, "missing", "Conv"), self.config, self.sdf, self.validation_kwargs
+        )
+        self.assertIn("999999", error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Module for testing the sweep logging. Messages and selection records of worker processes must reach the log files of
+the parent process, and messages below the log level must be dropped. Terminating a worker of the supervised pool
+while it logs must not break the logging of the sweep, and workers must also log with the spawn start method.
+"""
+
+import logging
+import multiprocessing
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from t3co.run import supervised_pool, sweep_logging
+
+
+def run_toy_selection(selection: int) -> None:
+    logging.getLogger("t3co.test").debug("debug message of %s", selection)
+    logging.getLogger("t3co.test").info("info message of %s", selection)
+    sweep_logging.log_selection(selection, "ok", run_time_s=1.5)
+
+
+def run_toy_pool_task(task: str) -> None:
+    if task == "flood":
+        # logs until the worker is terminated on its timeout
+        while True:
+            logging.getLogger("t3co.test").info("flood message " + "x" * 1000)
+    run_toy_selection(task)
+
+
+class TestSweepLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_file = Path(self.tmp_dir.name) / "sweep.log"
+        self.records_file = Path(self.tmp_dir.name) / "records.jsonl"
+
+    def tearDown(self):
+        sweep_logging.stop_logging()
+        self.tmp_dir.cleanup()
+
+    def test_worker_records(self):
+        sweep_logging.start_logging(self.log_file, self.records_file, level="INFO")
+        workers = [
+            multiprocessing.Process(target=run_toy_selection, args=(selection,))
+            for selection in [1, 2]
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+        run_toy_selection(3)
+        sweep_logging.stop_logging()
+
+        log = self.log_file.read_text()
+        for selection in [1, 2, 3]:
+            self.assertIn(f"info message of {selection}", log)
+        self.assertNotIn("debug message", log)
+        records = sweep_logging.read_selection_records(self.records_file)
+        self.assertEqual(
+            sorted(record["selection"] for record in records), ["1", "2", "3"]
+        )
+        self.assertEqual(len({record["pid"] for record in records}), 3)
+        self.assertTrue(all(record["run_time_s"] == 1.5 for record in records))
+
+    def test_records_at_any_level(self):
+        sweep_logging.start_logging(self.log_file, self.records_file, level="ERROR")
+        run_toy_selection(1)
+        sweep_logging.stop_logging()
+        self.assertNotIn("info message", self.log_file.read_text())
+        self.assertEqual(
+            len(sweep_logging.read_selection_records(self.records_file)), 1
+        )
+
+    def test_terminated_pool_workers(self):
+        sweep_logging.start_logging(self.log_file, self.records_file, level="INFO")
+        with supervised_pool.SupervisedPool(2) as pool:
+            results = list(
+                pool.imap_unordered(
+                    run_toy_pool_task,
+                    ["flood", "flood", "a", "b", "c"],
+                    timeout_s=lambda task: 1 if task == "flood" else None,
+                )
+            )
+        sweep_logging.stop_logging()
+        statuses = sorted(status for _, status, _ in results)
+        self.assertEqual(statuses.count(supervised_pool.TASK_TIMEOUT), 2)
+        self.assertEqual(statuses.count(supervised_pool.TASK_OK), 3)
+        self.assertIn("flood message", self.log_file.read_text())
+        records = sweep_logging.read_selection_records(self.records_file)
+        self.assertEqual(
+            sorted(record["selection"] for record in records), ["a", "b", "c"]
+        )
+
+    def test_spawned_pool_workers(self):
+        sweep_logging.start_logging(self.log_file, self.records_file, level="INFO")
+        with mock.patch.object(
+            supervised_pool, "multiprocessing", multiprocessing.get_context("spawn")
+        ):
+            with supervised_pool.SupervisedPool(1) as pool:
+                list(pool.imap_unordered(run_toy_pool_task, ["a"]))
+        sweep_logging.stop_logging()
+        self.assertIn("info message of a", self.log_file.read_text())
+        self.assertNotIn("debug message", self.log_file.read_text())
+        self.assertEqual(
+            len(sweep_logging.read_selection_records(self.records_file)), 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Module for testing tcocalc. The batched MSRP calculator must match calculate_dollar_cost exactly
+for every powertrain type and component size.
+"""
+
+import copy
+import unittest
+
+import numpy as np
+
+from t3co.run import Global as gl
+from t3co.run import run_scenario
+from t3co.tco import tcocalc
+
+CONFIG_FILE = gl.SWEEP_PATH.parent / "resources" / "T3COConfig.csv"
+
+# Conv, BEV, HEV, HEV fuel cell, and PHEV selections of the demo inputs
+SELECTIONS = [1, 34, 64, 94, 124]
+
+
+class TestCalculateDollarCostBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        config = run_scenario.load_config(CONFIG_FILE, 0)
+        cls.vehicles = {}
+        for sel in SELECTIONS:
+            vehicle = run_scenario.get_vehicle(sel, config.vehicle_file)
+            scenario, _ = run_scenario.get_scenario_and_cycle(
+                sel, config.scenario_file, a_vehicle=vehicle, config=config
+            )
+            cls.vehicles[sel] = (vehicle, scenario)
+
+    def assert_matches_scalar(self, vehicles, scenario, **kwargs):
+        cost_sets = tcocalc.calculate_dollar_cost_batch(
+            scenario,
+            [v.veh_pt_type for v in vehicles],
+            [v.fc_max_kw for v in vehicles],
+            [v.fs_kwh for v in vehicles],
+            [v.mc_max_kw for v in vehicles],
+            [v.ess_max_kwh for v in vehicles],
+            fc_eff_type=[v.fc_eff_type for v in vehicles],
+            **kwargs,
+        )
+        for i, vehicle in enumerate(vehicles):
+            design_scenario = copy.deepcopy(scenario)
+            for key, values in kwargs.items():
+                setattr(design_scenario, key, values[i])
+            self.assertEqual(
+                tcocalc.get_cost_set(cost_sets, i),
+                tcocalc.calculate_dollar_cost(vehicle, design_scenario),
+                f"selection {vehicle.selection}",
+            )
+
+    def test_matches_scalar_for_sizes(self):
+        rng = np.random.default_rng(0)
+        for sel, (vehicle, scenario) in self.vehicles.items():
+            vehicles = []
+            for scale in [0.0, 0.5, 1.0, 1.7]:
+                design = copy.deepcopy(vehicle)
+                for key in ["fc_max_kw", "fs_kwh", "mc_max_kw", "ess_max_kwh"]:
+                    setattr(design, key, getattr(vehicle, key) * scale)
+                vehicles.append(design)
+            self.assert_matches_scalar(
+                vehicles,
+                scenario,
+                vehicle_glider_cost_dol=scenario.vehicle_glider_cost_dol
+                * rng.uniform(1, 1.2, len(vehicles)),
+                fc_ice_cost_dol_per_kw=scenario.fc_ice_cost_dol_per_kw
+                + rng.uniform(0, 70, len(vehicles)),
+            )
+
+    def test_matches_scalar_for_mixed_powertrains(self):
+        _, scenario = self.vehicles[124]
+        self.assert_matches_scalar(
+            [vehicle for vehicle, _ in self.vehicles.values()], scenario
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Module for testing the work queue of multi-host sweeps, with local worker processes standing in for hosts. Every
+task must run to a result or a failure, tasks of a lost worker must be claimed again after their lease expires, and
+an existing queue must resume without running its finished tasks again, unless its run inputs changed.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import unittest
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from t3co.run import work_queue
+
+# lease time [s] of the test queues
+LEASE_S = 1
+
+
+def run_toy_task(task: str, marker_dir: str) -> dict:
+    if task == "raise":
+        raise ValueError("bad task")
+    if task == "lost":
+        # the first worker that claims the task is lost with its host
+        marker = Path(marker_dir) / "lost"
+        if not marker.exists():
+            marker.touch()
+            os._exit(1)
+    return {"task": task, "worker": work_queue.get_worker_id()}
+
+
+def run_toy_worker(queue_path: str, marker_dir: str) -> None:
+    work_queue.run_worker(
+        queue_path,
+        partial(run_toy_task, marker_dir=marker_dir),
+        lease_s=LEASE_S,
+        poll_s=0.2,
+    )
+
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.queue_path = Path(self.tmp_dir.name) / "queue.sqlite"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_workers(self, n_workers: int) -> list:
+        workers = [
+            multiprocessing.Process(
+                target=run_toy_worker, args=(self.queue_path, self.tmp_dir.name)
+            )
+            for _ in range(n_workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+        return [worker.exitcode for worker in workers]
+
+    def test_workers(self):
+        tasks = [f"task_{i}" for i in range(6)] + ["raise", "lost"]
+        self.assertEqual(
+            work_queue.create_queue(self.queue_path, tasks, {"analysis_id": 1}),
+            len(tasks),
+        )
+        self.assertEqual(
+            work_queue.get_run_inputs(self.queue_path), {"analysis_id": 1}
+        )
+        exit_codes = self.run_workers(3)
+        # one worker was lost, the others finished all tasks
+        self.assertEqual(sorted(exit_codes), [0, 0, 1])
+
+        counts = work_queue.get_status_counts(self.queue_path)
+        self.assertTrue(work_queue.is_finished(counts))
+        results, failures = work_queue.get_results(self.queue_path)
+        self.assertEqual(
+            [result["task"] for result in results],
+            [task for task in tasks if task != "raise"],
+        )
+        self.assertEqual([task for task, _ in failures], ["raise"])
+        self.assertIn("bad task", failures[0][1])
+
+        # only new and failed tasks run when the queue is resumed
+        workers = {result["task"]: result["worker"] for result in results}
+        self.assertEqual(
+            work_queue.create_queue(
+                self.queue_path, tasks + ["task_6"], {"analysis_id": 1}
+            ),
+            1,
+        )
+        self.assertEqual(
+            work_queue.get_status_counts(self.queue_path)[work_queue.TASK_PENDING], 2
+        )
+        work_queue.wait_for_queue(
+            self.queue_path,
+            run_toy_worker,
+            (self.queue_path, self.tmp_dir.name),
+            n_workers=1,
+            poll_s=0.2,
+        )
+        results, failures = work_queue.get_results(self.queue_path)
+        self.assertEqual(len(results), 8)
+        self.assertEqual([task for task, _ in failures], ["raise"])
+        for result in results:
+            if result["task"] in workers:
+                self.assertEqual(result["worker"], workers[result["task"]])
+
+    def test_leases(self):
+        work_queue.create_queue(self.queue_path, ["a", "b"], {})
+        with work_queue.connect(self.queue_path) as conn:
+            self.assertEqual(
+                work_queue.claim_task(conn, "host_1", lease_s=60)[0], "a"
+            )
+            self.assertEqual(work_queue.claim_task(conn, "host_2", lease_s=0)[0], "b")
+            # the lease of host_2 expired, so host_3 claims b again
+            self.assertEqual(
+                work_queue.claim_task(conn, "host_3", lease_s=60)[0], "b"
+            )
+            self.assertFalse(work_queue.renew_lease(conn, "b", "host_2"))
+            self.assertTrue(work_queue.renew_lease(conn, "b", "host_3"))
+            self.assertIsNone(work_queue.claim_task(conn, "host_4"))
+            self.assertTrue(work_queue.complete_task(conn, "b", "host_2", {"x": 1}))
+            self.assertFalse(work_queue.complete_task(conn, "b", "host_3", {"x": 2}))
+        self.assertEqual(work_queue.get_results(self.queue_path)[0], [{"x": 1}])
+
+        work_queue.create_queue(self.queue_path, ["c"], {})
+        with work_queue.connect(self.queue_path) as conn:
+            for attempt in range(work_queue.MAX_ATTEMPTS):
+                self.assertEqual(
+                    work_queue.claim_task(conn, f"host_{attempt}", lease_s=0)[0], "c"
+                )
+            self.assertIsNone(work_queue.claim_task(conn, "host_5", lease_s=0))
+        self.assertEqual(
+            work_queue.get_results(self.queue_path)[1],
+            [("c", f"lease expired {work_queue.MAX_ATTEMPTS} times")],
+        )
+
+    def test_changed_run_inputs(self):
+        work_queue.create_queue(self.queue_path, ["a", "b"], {"analysis_id": 1})
+        with work_queue.connect(self.queue_path) as conn:
+            work_queue.claim_task(conn, "host_1")
+            work_queue.complete_task(conn, "a", "host_1", {"x": 1})
+            work_queue.claim_task(conn, "host_1", lease_s=60)
+        with self.assertRaises(AssertionError):
+            work_queue.create_queue(self.queue_path, ["a", "b"], {"analysis_id": 2})
+        # b is still run by a worker with the old inputs
+        with self.assertRaises(AssertionError):
+            work_queue.create_queue(
+                self.queue_path, ["a", "b"], {"analysis_id": 2}, reset=True
+            )
+        with work_queue.connect(self.queue_path) as conn:
+            work_queue.complete_task(conn, "b", "host_1", {"x": 2})
+        work_queue.create_queue(
+            self.queue_path, ["a", "b"], {"analysis_id": 2}, reset=True
+        )
+        self.assertEqual(
+            work_queue.get_status_counts(self.queue_path)[work_queue.TASK_PENDING], 2
+        )
+        self.assertEqual(work_queue.get_results(self.queue_path), ([], []))
+        self.assertEqual(
+            work_queue.get_run_inputs(self.queue_path), {"analysis_id": 2}
+        )
+
+    def test_numpy_tasks(self):
+        work_queue.create_queue(self.queue_path, [np.int64(12), "12_001"], {})
+        with work_queue.connect(self.queue_path) as conn:
+            key, task = work_queue.claim_task(conn, "host_1")
+            self.assertEqual((key, task), ("12", 12))
+            work_queue.complete_task(
+                conn,
+                key,
+                "host_1",
+                {"selection": np.int64(12), "tco": np.float64(1.5), "ok": np.bool_(1)},
+            )
+        results, _ = work_queue.get_results(self.queue_path, [np.int64(12)])
+        self.assertEqual(results, [{"selection": 12, "tco": 1.5, "ok": True}])
+        self.assertEqual(work_queue.get_results(self.queue_path, ["12_001"]), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
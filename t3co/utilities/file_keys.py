@@ -0,0 +1,22 @@
+"""Module for the keys of input files in the in-process caches of T3CO, e.g. cycle_index.CYCLE_CACHE, \
+    run_scenario.SCENARIO_INPUTS_CACHE, and tcocalc.PRICE_TABLE_CACHE. A key changes if its file is modified, so \
+    cached entries of modified files are not reused."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def get_file_key(file_path: str | Path) -> tuple:
+    """
+    This function gets the key of an input file, which changes if the file is modified
+
+    Args:
+        file_path (str | Path): input file path
+
+    Returns:
+        file_key (tuple): (resolved path, modification time [ns], size [bytes])
+    """
+    path = Path(file_path).resolve()
+    stat = path.stat()
+    return str(path), stat.st_mtime_ns, stat.st_size